@@ -9,6 +9,8 @@ from dataclasses import dataclass, field
 from enum import Enum
 from typing import TYPE_CHECKING, Any
 
+from agents.prompt_segments import PromptSegments, file_signature
+
 if TYPE_CHECKING:
     from agents.orchestrator import AgentOrchestrator
     from agents.scratchpad import SharedScratchpad
@@ -96,6 +98,8 @@ class BaseAgent:
         self.services = services
         self.socketio = socketio
         self.orchestrator = orchestrator
+        self.prompt_segments = PromptSegments()
+        self._available_tools: tuple[tuple, list[str]] | None = None
 
     def run(self, message: str, history: list[dict], context: dict | None = None) -> AgentResult:
         """Process a user message and return a result.
@@ -112,10 +116,41 @@ class BaseAgent:
         return AgentResult(text=reply, agent_name=self.config.name)
 
     def _build_system_prompt(self, context: dict | None = None) -> str:
-        """Build the full system prompt. Subclasses can override to add context."""
-        prompt = self.config.system_prompt
+        """Build the full system prompt. Subclasses can override to add context.
+
+        Segments are cached and re-rendered only when their inputs change.
+        Stable segments come first so the prefix stays byte-identical.
+        """
+        segments = self.prompt_segments
+        prompt = segments.get(
+            "identity", (self.config.name, self.config.display_name, self.config.system_prompt),
+            self._render_identity,
+        )
+
+        settings = self.orchestrator.settings if self.orchestrator else None
+        if settings and settings.get("memory.enabled", True):
+            try:
+                from agents.memory import get_memory_guidance, get_memory_path, load_memory
+                max_lines = settings.get("memory.max_lines_loaded", 200)
+                cwd = os.getcwd()
+                memory = segments.get(
+                    "memory", (cwd, max_lines, file_signature(get_memory_path(cwd))),
+                    lambda: load_memory(cwd, max_lines),
+                )
+                if memory:
+                    prompt += f"\n\n[Auto-Memory]\n{memory}"
+                prompt += f"\n\n{get_memory_guidance()}"
+            except ImportError:
+                pass
+
+        summary = segments.get("scratchpad", self.scratchpad.version, self.scratchpad.summary)
+        if summary:
+            prompt += f"\n\n[Scratchpad Context]\n{summary}"
+
+        return prompt
 
-        prompt += f"""
+    def _render_identity(self) -> str:
+        return self.config.system_prompt + f"""
 
 [Agent Identity]
 You are currently operating as the "{self.config.display_name}" agent ({self.config.name}).
@@ -136,25 +171,6 @@ Available agents to relay to: code, dnd_dm, music, smart_home, timer, calendar,
 - Keep responses concise and factual.
 - Do NOT use markdown formatting (no **, *, #, ```, etc). Your text is spoken aloud via TTS."""
 
-        summary = self.scratchpad.summary()
-        if summary:
-            prompt += f"\n\n[Scratchpad Context]\n{summary}"
-
-        if self.orchestrator and self.orchestrator.settings:
-            settings = self.orchestrator.settings
-            if settings.get("memory.enabled", True):
-                try:
-                    from agents.memory import load_memory, get_memory_guidance
-                    max_lines = settings.get("memory.max_lines_loaded", 200)
-                    memory = load_memory(os.getcwd(), max_lines)
-                    if memory:
-                        prompt += f"\n\n[Auto-Memory]\n{memory}"
-                    prompt += f"\n\n{get_memory_guidance()}"
-                except ImportError:
-                    pass
-
-        return prompt
-
     def llm_call(self, messages: list[dict], options: dict | None = None) -> str:
         """Make an LLM call using the shared infrastructure.
 
@@ -170,15 +186,11 @@ Available agents to relay to: code, dnd_dm, music, smart_home, timer, calendar,
 
         return llm_chat(messages, options, agent_name=self.config.name)
 
-    def get_available_tools(self) -> list[str]:
-        """Return tools available to this agent, respecting plan mode and settings.
-
-        Plan mode (read-only) restriction applies only to the Plan Agent during
-        exploration/design. Code Agent and other agents always get full tools.
-        """
+    def _tools_key(self) -> tuple:
+        """Versions of everything the available tool list depends on."""
         from agents.orchestrator import OrchestratorMode
 
-        in_plan_mode = (
+        in_plan_mode = bool(
             self.config.name == "plan"
             and self.orchestrator
             and self.orchestrator.mode in (
@@ -186,7 +198,26 @@ Available agents to relay to: code, dnd_dm, music, smart_home, timer, calendar,
                 OrchestratorMode.PLAN_DESIGN,
             )
         )
+        orch = self.orchestrator
+        return (
+            in_plan_mode,
+            tuple(self.config.tools),
+            orch.settings.version if orch and orch.settings else None,
+            orch.mcp_manager.version if orch and orch.mcp_manager else None,
+        )
+
+    def get_available_tools(self) -> list[str]:
+        """Return tools available to this agent, respecting plan mode and settings.
+
+        Plan mode (read-only) restriction applies only to the Plan Agent during
+        exploration/design. Code Agent and other agents always get full tools.
+        Cached until plan mode, settings, or the MCP tool index change.
+        """
+        key = self._tools_key()
+        if self._available_tools is not None and self._available_tools[0] == key:
+            return list(self._available_tools[1])
 
+        in_plan_mode = key[0]
         if in_plan_mode:
             base = [t for t in self.config.tools if t in READ_ONLY_TOOLS]
         else:
@@ -205,13 +236,17 @@ Available agents to relay to: code, dnd_dm, music, smart_home, timer, calendar,
 
         # Apply settings-based allow/deny chains
         if self.orchestrator and self.orchestrator.settings:
-            return self.orchestrator.settings.get_effective_tool_list(
+            base = self.orchestrator.settings.get_effective_tool_list(
                 self.config.name, base
             )
+        self._available_tools = (key, list(base))
         return base
 
     def get_tool_descriptions(self) -> str:
         """Generate formatted tool descriptions for the LLM prompt, filtered to available tools."""
+        return self.prompt_segments.get("tools", self._tools_key(), self._render_tool_descriptions)
+
+    def _render_tool_descriptions(self) -> str:
         from dev_tools import TOOL_DEFINITIONS
 
         available = set(self.get_available_tools())
@@ -337,6 +372,27 @@ Available agents to relay to: code, dnd_dm, music, smart_home, timer, calendar,
 
         return result
 
+    def is_parallel_safe_tool(self, name: str) -> bool:
+        """Whether a tool call may overlap other calls (read-only, no side effects)."""
+        from agents.tool_scheduler import PARALLEL_SAFE_TOOLS
+        if name in PARALLEL_SAFE_TOOLS:
+            return True
+        if name.startswith("mcp__") and self.orchestrator and self.orchestrator.mcp_manager:
+            return name in self.orchestrator.mcp_manager.get_readonly_tools()
+        return False
+
+    def run_tool_calls(self, calls: list[tuple[str, dict]], on_start=None, on_done=None,
+                       stop_after=None) -> list:
+        """Dispatch a turn's tool calls, running read-only ones concurrently.
+
+        Mutating calls keep their order; results come back in call order.
+        See agents.tool_scheduler.run_tool_calls for the hook signatures.
+        """
+        from agents.tool_scheduler import run_tool_calls
+
+        return run_tool_calls(calls, self.dispatch_tool, self.is_parallel_safe_tool,
+                              on_start=on_start, on_done=on_done, stop_after=stop_after)
+
     def emit(self, event: str, data: dict) -> None:
         """Emit a SocketIO event if socketio is available."""
         if self.socketio:
@@ -12,6 +12,7 @@ import os
 import re
 
 from agents.base_agent import ALL_DEV_TOOLS, AgentConfig, AgentResult, BaseAgent
+from agents.prompt_segments import file_signature
 
 SYSTEM_PROMPT = """You are BMO's coding assistant mode. You help with programming, debugging, file operations, git, SSH, and system administration.
 
@@ -93,7 +94,7 @@ Commands: docker compose logs -f | docker compose restart | docker ps
 | cloud_providers.py | Gemini/Groq/Claude/Fish API |
 | agents/ | 20 specialist agents (orchestrator, code, dnd_dm, etc.) |
 | data/settings.json | Volume, UI settings (nested: volume.music, volume.voice) |
-| data/recent_chat.json | Chat history |
+| data/recent_chat/ | Chat history (JSONL segments) |
 | data/dnd_sessions/ | Saved D&D campaigns |
 | data/memory/ | Agent memory (MEMORY.md per project) |
 | data/rag_data/ | RAG index files |
@@ -199,26 +200,28 @@ class CodeAgent(BaseAgent):
 
     def _build_system_prompt(self, context: dict | None = None) -> str:
         """Build system prompt with available tool descriptions and project context."""
+        segments = self.prompt_segments
         tool_list = self.get_tool_descriptions()
-        prompt = SYSTEM_PROMPT.format(
+        # Tool list + BMO Pi cheat sheet (services, containers, file locations)
+        prompt = segments.get("header", tool_list, lambda: SYSTEM_PROMPT.format(
             tool_list=tool_list,
             max_calls=MAX_TOOL_CALLS_PER_TURN,
-        )
-
-        # Inject BMO Pi cheat sheet (services, containers, file locations)
-        prompt += f"\n\n{BMO_CHEAT_SHEET}"
+        ) + f"\n\n{BMO_CHEAT_SHEET}")
 
-        # Inject BMO.md project context if available
+        # Inject BMO.md project context if available (re-read only when a file changes)
         try:
-            from agents.project_context import load_bmo_md
-            project_ctx = load_bmo_md(os.getcwd() if os.path.exists(os.getcwd()) else None)
+            from agents.project_context import find_bmo_md, load_bmo_md
+            cwd = os.getcwd() if os.path.exists(os.getcwd()) else None
+            project_ctx = segments.get(
+                "project", (cwd, file_signature(*find_bmo_md(cwd))), lambda: load_bmo_md(cwd),
+            )
             if project_ctx:
                 prompt += f"\n\n{project_ctx}"
         except Exception:
             pass
 
         # Inject scratchpad context
-        summary = self.scratchpad.summary()
+        summary = segments.get("scratchpad", self.scratchpad.version, self.scratchpad.summary)
         if summary:
             prompt += f"\n\n[Scratchpad Context]\n{summary}"
 
@@ -278,6 +281,7 @@ class CodeAgent(BaseAgent):
                 messages,
                 tools=tools,
                 tool_dispatch=tool_dispatch,
+                is_parallel_safe=self.is_parallel_safe_tool,
                 model=model,
                 temperature=self.config.temperature,
                 max_tokens=65536,
@@ -308,17 +312,27 @@ class CodeAgent(BaseAgent):
             if not tool_calls:
                 break
 
-            tool_results = []
-            for tc in tool_calls:
-                tool_calls_made += 1
-                name = tc.get("tool", "")
-                args = tc.get("args", {})
+            calls = [(tc.get("tool", ""), tc.get("args", {})) for tc in tool_calls]
+            call_base = tool_calls_made
+            tool_calls_made += len(calls)
 
-                print(f"[code_agent] Tool call #{tool_calls_made}: {name}({json.dumps(args)[:100]})")
+            def on_start(i, name, args):
+                print(f"[code_agent] Tool call #{call_base + i + 1}: {name}({json.dumps(args)[:100]})")
                 self._emit_progress(name, "running")
-                result = self.dispatch_tool(name, args)
 
-                if result.get("needs_confirmation"):
+            def on_done(i, name, args, result):
+                if isinstance(result, dict) and result.get("needs_confirmation"):
+                    self._emit_progress(name, "confirm", result.get("reason", ""))
+                else:
+                    preview = str(result)[:200] if isinstance(result, (str, dict)) else ""
+                    self._emit_progress(name, "done", preview)
+
+            # Read-only calls overlap; mutating calls run in order
+            results = self.run_tool_calls(calls, on_start=on_start, on_done=on_done)
+
+            tool_results = []
+            for (name, args), result in zip(calls, results):
+                if isinstance(result, dict) and result.get("needs_confirmation"):
                     pending_confirmations.append({
                         "tool": name,
                         "args": args,
@@ -329,11 +343,8 @@ class CodeAgent(BaseAgent):
                         "tool": name,
                         "result": f"CONFIRMATION NEEDED: {result['reason']}",
                     })
-                    self._emit_progress(name, "confirm", result.get("reason", ""))
                 else:
                     tool_results.append({"tool": name, "result": result})
-                    preview = str(result)[:200] if isinstance(result, (str, dict)) else ""
-                    self._emit_progress(name, "done", preview)
 
             # Strip tool_call blocks from reply text
             clean_reply = self.strip_tool_calls(reply)
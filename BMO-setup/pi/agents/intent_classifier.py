@@ -0,0 +1,167 @@
+"""On-device intent classifier — router tier between keywords and the default agent.
+
+Multinomial naive Bayes over word, word-bigram, and character trigram
+features. It is small enough to train in milliseconds from the router's
+keyword tables and agent descriptions, and it predicts in well under a
+millisecond on the Pi.
+train_router_classifier.py adds logged routing decisions and evaluates
+the model offline. The trained model is saved as plain JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+
+MODEL_PATH = os.path.expanduser("~/bmo/data/router/intent_model.json")
+DECISIONS_PATH = os.path.expanduser("~/bmo/data/router/decisions.jsonl")
+
+DEFAULT_THRESHOLD = 0.9   # Min posterior probability to accept a prediction
+ALPHA = 0.1               # Additive smoothing
+
+# Decision-log tiers whose labels are trustworthy enough to train on
+TRAINING_TIERS = ("prefix", "override", "relay")
+DECISIONS_MAX_BYTES = 512 * 1024   # Log rotates to decisions.jsonl.1 past this size
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Function words carry no intent on their own; they still count inside bigrams
+# ("who is", "how does") where they do.
+STOPWORDS = frozenset(
+    "a an the to of in on for is are was be it i me my you your we our this that and or "
+    "with at by from can do does what what's how who where when which please some any just".split()
+)
+
+
+def extract_features(text: str) -> list[str]:
+    """Content words, word bigrams, and boundary-marked character trigrams."""
+    words = _TOKEN_RE.findall(text.lower().replace("\u2019", "'"))
+    content = [w for w in words if w not in STOPWORDS]
+    feats = [f"w:{w}" for w in content]
+    feats.extend(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+    for w in content:
+        padded = f"<{w}>"
+        feats.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return feats
+
+
+def examples_from_keywords(keywords: dict[str, list[str] | dict]) -> list[tuple[str, str]]:
+    """One training example per router keyword (prefix markers stripped)."""
+    return [
+        (kw.rstrip("*"), agent_name)
+        for agent_name, entries in keywords.items()
+        for kw in entries
+        if isinstance(kw, str)
+    ]
+
+
+def examples_from_descriptions(prompt: str) -> list[tuple[str, str]]:
+    """Examples from the "- agent: topic, topic, ..." lines of the LLM classification prompt."""
+    examples = []
+    for match in re.finditer(r"^- (\w+): (.+)$", prompt, re.MULTILINE):
+        for part in re.split(r"[,()]", match.group(2)):
+            if part.strip():
+                examples.append((part.strip(), match.group(1)))
+    return examples
+
+
+def load_decisions(path: str = DECISIONS_PATH, tiers=TRAINING_TIERS) -> list[tuple[str, str]]:
+    """Labeled examples from the router's decision log (rotated file first)."""
+    examples = []
+    for log in (path + ".1", path):
+        if not os.path.isfile(log):
+            continue
+        with open(log, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line after a crash
+                if row.get("tier") in tiers and row.get("text") and row.get("agent"):
+                    examples.append((row["text"], row["agent"]))
+    return examples
+
+
+class IntentClassifier:
+    """Naive Bayes text classifier with a confidence threshold."""
+
+    def __init__(self, classes: list[str], priors: list[float], table: dict[str, list[float]],
+                 threshold: float = DEFAULT_THRESHOLD):
+        self.classes = classes
+        self.threshold = threshold
+        self._priors = priors
+        self._table = table  # feature → per-class log P(feature | class)
+
+    @classmethod
+    def train(cls, examples: list[tuple[str, str]], alpha: float = ALPHA,
+              threshold: float = DEFAULT_THRESHOLD) -> IntentClassifier:
+        classes = sorted({label for _, label in examples})
+        index = {c: i for i, c in enumerate(classes)}
+        counts: dict[str, list[float]] = {}
+        totals = [0.0] * len(classes)
+        docs = [0] * len(classes)
+        for text, label in examples:
+            i = index[label]
+            docs[i] += 1
+            for feat in extract_features(text):
+                row = counts.setdefault(feat, [0.0] * len(classes))
+                row[i] += 1
+                totals[i] += 1
+
+        vocab = len(counts) or 1
+        denom = [math.log(totals[i] + alpha * vocab) for i in range(len(classes))]
+        table = {
+            feat: [math.log(row[i] + alpha) - denom[i] for i in range(len(classes))]
+            for feat, row in counts.items()
+        }
+        n = sum(docs) or 1
+        priors = [math.log((docs[i] + 1) / (n + len(classes))) for i in range(len(classes))]
+        return cls(classes, priors, table, threshold)
+
+    def scores(self, text: str) -> list[float]:
+        """Posterior probability per class (same order as self.classes)."""
+        logp = list(self._priors)
+        for feat in extract_features(text):
+            row = self._table.get(feat)
+            if row is not None:
+                logp = [a + b for a, b in zip(logp, row)]
+        top = max(logp)
+        exp = [math.exp(v - top) for v in logp]
+        total = sum(exp)
+        return [v / total for v in exp]
+
+    def predict(self, text: str) -> tuple[str | None, float]:
+        """Best class and its probability; class is None below the threshold."""
+        if not self.classes:
+            return None, 0.0
+        probs = self.scores(text)
+        best = max(range(len(probs)), key=probs.__getitem__)
+        label = self.classes[best] if probs[best] >= self.threshold else None
+        return label, probs[best]
+
+    # ── Persistence ──────────────────────────────────────────────────
+
+    def to_dict(self) -> dict:
+        return {"classes": self.classes, "priors": self._priors, "table": self._table}
+
+    def save(self, path: str = MODEL_PATH) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH, threshold: float = DEFAULT_THRESHOLD) -> IntentClassifier | None:
+        """Load a saved model, or None if missing/unreadable."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(data["classes"], data["priors"], data["table"], threshold)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"[router] Failed to load intent model {path}: {e}")
+            return None
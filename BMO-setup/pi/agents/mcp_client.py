@@ -36,6 +36,7 @@ class McpClient:
         self._sse_thread: threading.Thread | None = None
         self._sse_running = False
         self._lock = threading.Lock()
+        self._io_lock = threading.Lock()  # One in-flight stdio request at a time
         self._request_id = 0
         self._server_capabilities: dict = {}
         self._message_endpoint: str | None = None  # For SSE transport
@@ -414,7 +415,9 @@ class McpClient:
         }
 
         if self._transport == "stdio":
-            return self._stdio_send_receive(msg)
+            # Tool calls may arrive concurrently; stdio framing can't interleave
+            with self._io_lock:
+                return self._stdio_send_receive(msg)
         elif self._transport == "http":
             return self._http_send(msg)
         elif self._transport == "sse":
@@ -43,6 +43,11 @@ class McpManager:
         self._clients: dict[str, McpClient] = {}
         self._tools: dict[str, McpToolInfo] = {}  # namespaced_name → info
         self._lock = threading.Lock()
+        self._version = 0  # Bumped whenever the tool index changes
+
+    @property
+    def version(self) -> int:
+        return self._version
 
     def initialize(self) -> None:
         """Read mcp.servers from settings, create clients, connect non-lazy ones."""
@@ -216,6 +221,7 @@ class McpManager:
                 print(f"[mcp] Error disconnecting {name}: {e}")
         self._clients.clear()
         self._tools.clear()
+        self._version += 1
 
     # ── Internal ──────────────────────────────────────────────────────
 
@@ -243,6 +249,7 @@ class McpManager:
                     description=tool.get("description", ""),
                     input_schema=tool.get("inputSchema", {}),
                 )
+            self._version += 1
 
     def _remove_server_tools(self, server_name: str) -> None:
         """Remove all cached tools for a server."""
@@ -250,6 +257,8 @@ class McpManager:
         to_remove = [k for k in self._tools if k.startswith(prefix)]
         for k in to_remove:
             del self._tools[k]
+        if to_remove:
+            self._version += 1
 
     def _tool_info_to_definition(self, info: McpToolInfo) -> dict:
         """Convert McpToolInfo to the BMO tool definition format."""
@@ -42,8 +42,13 @@ class AgentOrchestrator:
         self._plan_task: str | None = None  # Task being planned
         self._llm_func = llm_func  # Shared llm_chat function
 
-        # Router uses the shared LLM function for tier 3
-        self.router = AgentRouter(llm_func=llm_func, settings=settings)
+        # Router uses the shared LLM function for the LLM tier; its decision
+        # log is training data for the local intent classifier
+        decision_log = None
+        if settings and settings.get("router.log_decisions", True):
+            from agents.intent_classifier import DECISIONS_PATH
+            decision_log = DECISIONS_PATH
+        self.router = AgentRouter(llm_func=llm_func, settings=settings, decision_log=decision_log)
 
         # Agent registry — populated by register_agent()
         self.agents: dict[str, BaseAgent] = {}
@@ -99,6 +104,7 @@ class AgentOrchestrator:
         if agent_override and agent_override != "auto" and agent_override in self.agents:
             agent_name = agent_override
             print(f"[orchestrator] Agent override: {agent_name}")
+            self.router.record_decision(clean_message, agent_name, "override")
         else:
             agent_name = self.router.route(message)
 
@@ -171,6 +177,8 @@ class AgentOrchestrator:
             return None
 
         print(f"[orchestrator] Relaying to {target_agent}: {relay_message[:80]}")
+        # The first agent picked wrong — remember the correction for the classifier
+        self.router.record_decision(original_message, target_agent, "relay")
 
         self._emit("agent_relay", {
             "from": "previous_agent",
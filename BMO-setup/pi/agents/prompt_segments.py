@@ -0,0 +1,53 @@
+"""Segment cache for agent system prompts.
+
+A system prompt is assembled from named segments (identity, grounding,
+tool list, memory, scratchpad, ...). Each segment is cached together with
+the key it was rendered from — a version counter, a file signature, or the
+inputs themselves — and is only re-rendered when that key changes.
+
+Keeping the stable segments first and byte-identical between turns also
+lets providers reuse their prompt cache for the shared prefix.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable
+
+
+def file_signature(*paths: str) -> tuple:
+    """Cheap change key for a set of files: (path, mtime_ns, size) or (path, None)."""
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            sig.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append((path, None))
+    return tuple(sig)
+
+
+class PromptSegments:
+    """Per-agent cache of rendered prompt segments."""
+
+    def __init__(self):
+        self._cache: dict[str, tuple[Any, str]] = {}
+        self.stats = {"hits": 0, "renders": 0}
+
+    def get(self, name: str, key: Any, render: Callable[[], str]) -> str:
+        """Return the cached text for ``name`` if ``key`` is unchanged, else re-render."""
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == key:
+            self.stats["hits"] += 1
+            return cached[1]
+        text = render()
+        self._cache[name] = (key, text)
+        self.stats["renders"] += 1
+        return text
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Drop one segment, or all of them."""
+        if name is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(name, None)
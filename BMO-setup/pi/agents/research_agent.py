@@ -65,14 +65,13 @@ class ResearchAgent(BaseAgent):
             if not tool_calls:
                 break
 
-            tool_results = []
-            for tc in tool_calls:
+            calls = [(tc.get("tool", ""), tc.get("args", {})) for tc in tool_calls]
+            for name, args in calls:
                 tool_calls_made += 1
-                name = tc.get("tool", "")
-                args = tc.get("args", {})
                 print(f"[research] Tool call #{tool_calls_made}: {name}({json.dumps(args)[:100]})")
-                result = self.dispatch_tool(name, args)
-                tool_results.append({"tool": name, "result": result})
+            # All research tools are read-only, so the whole turn runs concurrently
+            results = self.run_tool_calls(calls)
+            tool_results = [{"tool": name, "result": result} for (name, _), result in zip(calls, results)]
 
             messages.append({"role": "assistant", "content": reply})
             result_text = "\n".join(
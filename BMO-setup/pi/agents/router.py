@@ -1,8 +1,11 @@
-"""3-tier agent router: explicit prefix → keyword matching → LLM classification."""
+"""Agent router: explicit prefix → keyword matching → local intent classifier → LLM classification."""
 
 from __future__ import annotations
 
+import json
+import os
 import re
+import time
 from typing import Any
 
 
@@ -46,11 +49,16 @@ EXPLICIT_PREFIXES = {
 
 
 # ── Tier 2: Keyword patterns per agent ──────────────────────────────
+#
+# Keywords match whole words/phrases (punctuation and extra spaces are
+# ignored, a trailing plural "s"/"es" is allowed). A trailing "*" makes the
+# last word a prefix: "roll a d*" matches "roll a d20". Each matched keyword
+# scores its word count, so specific phrases outweigh single words.
 
 KEYWORD_PATTERNS: dict[str, list[str]] = {
     "code": [
         "read file", "read the file", "git status", "git log", "git diff",
-        "run command", "grep", "help me debug", "fix the bug", "refactor",
+        "run command", "grep", "help me debug", "fix the bug", "refactor*",
         "write a test", "create a pr", "pull request", "deploy code",
         "ssh to", "check gpu", "what does this code do", "open file",
         "edit file", "find files", "list directory", "package.json",
@@ -59,7 +67,7 @@ KEYWORD_PATTERNS: dict[str, list[str]] = {
     "dnd_dm": [
         "roll initiative", "start a campaign", "be the dm", "dungeon master",
         "d20", "saving throw", "dnd campaign", "d&d campaign", "one shot",
-        "one-shot", "run a campaign", "dm for", "roll a d",
+        "one-shot", "run a campaign", "dm for", "roll a d*",
         "attack roll", "skill check", "ability check",
     ],
     "music": [
@@ -99,7 +107,7 @@ KEYWORD_PATTERNS: dict[str, list[str]] = {
         "vitest", "pytest", "test results", "failing test",
     ],
     "plan": [
-        "plan how to", "design a system", "architect", "how should we",
+        "plan how to", "design a system", "architect*", "how should we",
         "plan mode", "bmo plan", "make a plan", "think this through",
     ],
     "research": [
@@ -194,6 +202,104 @@ KEYWORD_PATTERNS: dict[str, list[str]] = {
 }
 
 
+# ── Keyword matcher ─────────────────────────────────────────────────
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower().replace("\u2019", "'"))
+
+
+class _Node:
+    __slots__ = ("children", "hits", "stems")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.hits: list[tuple[str, str, float]] = []                   # (agent, keyword, weight)
+        self.stems: list[tuple[str, list[tuple[str, str, float]]]] = []  # prefix word → hits
+
+
+class KeywordMatcher:
+    """All agents' keywords compiled into one word-level trie.
+
+    One pass over the message's words walks the trie from each word, so the
+    cost depends on message length, not on how many keywords exist.
+    """
+
+    def __init__(self, keywords: dict[str, list[str] | dict[str, float]]):
+        self._root = _Node()
+        self._order: dict[str, int] = {}
+        self.size = 0
+        for agent_name, entries in keywords.items():
+            self._order.setdefault(agent_name, len(self._order))
+            weighted = entries.items() if isinstance(entries, dict) else ((kw, None) for kw in entries)
+            for keyword, weight in weighted:
+                if isinstance(keyword, str):
+                    self.add(agent_name, keyword, weight)
+
+    def add(self, agent_name: str, keyword: str, weight: float | None = None) -> None:
+        prefix = keyword.rstrip().endswith("*")
+        words = _tokenize(keyword)
+        if not words:
+            return
+        hit = (agent_name, keyword, float(weight) if weight is not None else float(len(words)))
+        node = self._root
+        for word in words[:-1]:
+            node = node.children.setdefault(word, _Node())
+        if prefix:
+            for stem, hits in node.stems:
+                if stem == words[-1]:
+                    hits.append(hit)
+                    break
+            else:
+                node.stems.append((words[-1], [hit]))
+        else:
+            node.children.setdefault(words[-1], _Node()).hits.append(hit)
+        self.size += 1
+
+    @staticmethod
+    def _child(node: _Node, word: str) -> _Node | None:
+        child = node.children.get(word)
+        if child is None and word.endswith("s"):
+            child = node.children.get(word[:-1])
+            if child is None and word.endswith("es"):
+                child = node.children.get(word[:-2])
+        return child
+
+    def matches(self, message: str) -> list[tuple[str, str, float]]:
+        """Distinct (agent, keyword, weight) hits in the message."""
+        words = _tokenize(message)
+        found: dict[tuple[str, str], float] = {}
+        for i in range(len(words)):
+            node = self._root
+            for word in words[i:]:
+                for stem, hits in node.stems:
+                    if word.startswith(stem):
+                        for agent_name, keyword, weight in hits:
+                            found[(agent_name, keyword)] = weight
+                node = self._child(node, word)
+                if node is None:
+                    break
+                for agent_name, keyword, weight in node.hits:
+                    found[(agent_name, keyword)] = weight
+        return [(agent_name, keyword, weight) for (agent_name, keyword), weight in found.items()]
+
+    def scores(self, message: str) -> dict[str, float]:
+        """Summed keyword weight per agent (agents with no hits omitted)."""
+        scores: dict[str, float] = {}
+        for agent_name, _, weight in self.matches(message):
+            scores[agent_name] = scores.get(agent_name, 0.0) + weight
+        return scores
+
+    def best(self, message: str) -> str | None:
+        """Highest-scoring agent; ties go to the agent listed first."""
+        scores = self.scores(message)
+        if not scores:
+            return None
+        return max(scores, key=lambda a: (scores[a], -self._order.get(a, len(self._order))))
+
+
 # ── Tier 3: LLM classification prompt ──────────────────────────────
 
 CLASSIFICATION_PROMPT = """You are a message classifier for BMO, a smart assistant. Given a user message, classify it into exactly ONE agent category.
@@ -236,7 +342,7 @@ User message: {message}"""
 class AgentRouter:
     """Routes user messages to the best specialized agent using 3-tier matching."""
 
-    def __init__(self, llm_func=None, settings=None):
+    def __init__(self, llm_func=None, settings=None, decision_log: str | None = None):
         """Initialize router.
 
         Args:
@@ -244,28 +350,55 @@ class AgentRouter:
                       Signature: llm_func(messages, options) -> str
                       If None, falls back to "conversation" for tier 3.
             settings: BmoSettings instance for custom prefixes/keywords/overrides.
+            decision_log: JSONL path to log routing decisions to (None = off).
         """
         self._llm_func = llm_func
         self._settings = settings
-
-        # Build effective prefix/keyword maps (base + settings overrides)
+        self._settings_version = None
+        self._decision_log = decision_log
+        self._log_writer = None
+        self._log_size: int | None = None
+        self._load_tables()
+
+    def _load_tables(self) -> None:
+        """Build prefix/keyword maps (base + settings overrides) and compile the matcher."""
         self._prefixes = dict(EXPLICIT_PREFIXES)
-        self._keywords = {k: list(v) for k, v in KEYWORD_PATTERNS.items()}
+        self._keywords: dict[str, list[str] | dict[str, float]] = {
+            k: list(v) for k, v in KEYWORD_PATTERNS.items()
+        }
 
+        settings = self._settings
         if settings:
+            self._settings_version = getattr(settings, "version", None)
             custom_prefixes = settings.get("router.custom_prefixes", {})
             if isinstance(custom_prefixes, dict):
                 self._prefixes.update(custom_prefixes)
 
+            # Values are a keyword list, or {keyword: weight} to override scoring
             custom_keywords = settings.get("router.custom_keywords", {})
             if isinstance(custom_keywords, dict):
                 for agent_name, kw_list in custom_keywords.items():
-                    if isinstance(kw_list, list):
+                    if isinstance(kw_list, dict):
+                        merged = {kw: None for kw in self._keywords.get(agent_name, [])}
+                        merged.update(kw_list)
+                        self._keywords[agent_name] = merged
+                    elif isinstance(kw_list, list):
                         if agent_name in self._keywords:
                             self._keywords[agent_name].extend(kw_list)
                         else:
                             self._keywords[agent_name] = list(kw_list)
 
+        self._matcher = KeywordMatcher(self._keywords)
+        self._classifier = None  # Built on first use from the current tables
+
+    def _refresh(self) -> None:
+        """Recompile if router settings were reloaded since the last build."""
+        if self._settings is None:
+            return
+        version = getattr(self._settings, "version", None)
+        if version is not None and version != self._settings_version:
+            self._load_tables()
+
     def route(self, message: str, context: dict | None = None) -> str:
         """Route a message to the best agent.
 
@@ -274,8 +407,15 @@ class AgentRouter:
         Routing tiers:
             1. Explicit prefix ("!code ...", "!dm ...", etc.)
             2. Keyword matching (fast, no LLM call)
-            3. LLM classification (fallback)
+            3. Local intent classifier (on-device, sub-millisecond)
+            4. LLM classification (fallback, disabled)
         """
+        agent, tier = self._route(message)
+        self.record_decision(message, agent, tier)
+        return agent
+
+    def _route(self, message: str) -> tuple[str, str]:
+        self._refresh()
         disabled_tiers = []
         default_agent = "conversation"
         if self._settings:
@@ -286,15 +426,21 @@ class AgentRouter:
         if "prefix" not in disabled_tiers:
             agent = self._check_explicit_prefix(message)
             if agent:
-                return agent
+                return agent, "prefix"
 
         # Tier 2: Keyword matching
         if "keyword" not in disabled_tiers:
             agent = self._check_keywords(message)
             if agent:
-                return agent
+                return agent, "keyword"
 
-        # Tier 3: LLM classification — DISABLED for voice pipeline speed
+        # Tier 3: Local intent classifier — catches paraphrases keywords miss
+        if "classifier" not in disabled_tiers:
+            agent = self._classify(message)
+            if agent:
+                return agent, "classifier"
+
+        # Tier 4: LLM classification — DISABLED for voice pipeline speed
         # LLM classification adds 10-20s latency for marginal routing benefit.
         # Keywords already cover all specialized agents; unmatched messages
         # are overwhelmingly conversational.
@@ -302,9 +448,43 @@ class AgentRouter:
         # if "llm" not in disabled_tiers:
         #     agent = self._llm_classify(message)
         #     if agent:
-        #         return agent
+        #         return agent, "llm"
+
+        return default_agent, "default"
 
-        return default_agent
+    def record_decision(self, message: str, agent_name: str, tier: str) -> None:
+        """Append a routing decision to the decision log (training data for tier 3).
+
+        Only tiers whose labels are trusted for training are logged: explicit
+        prefixes, plus the agent overrides and [RELAY:...] corrections the
+        orchestrator records. Keyword, classifier and default decisions would
+        just be raw user messages. The log is rotated once it passes
+        DECISIONS_MAX_BYTES, keeping one previous file.
+        """
+        from agents.intent_classifier import DECISIONS_MAX_BYTES, TRAINING_TIERS
+
+        if not self._decision_log or tier not in TRAINING_TIERS:
+            return
+        if tier == "prefix":
+            message = self.strip_prefix(message)
+        line = {"ts": time.time(), "text": message[:500], "agent": agent_name, "tier": tier}
+        try:
+            if self._log_writer is None:
+                from message_log import JsonlWriter
+                self._log_writer = JsonlWriter()
+            if self._log_size is None:
+                try:
+                    self._log_size = os.path.getsize(self._decision_log)
+                except OSError:
+                    self._log_size = 0
+            if self._log_size >= DECISIONS_MAX_BYTES:
+                self._log_writer.close(self._decision_log)
+                os.replace(self._decision_log, self._decision_log + ".1")
+                self._log_size = 0
+            self._log_writer.append(self._decision_log, line)
+            self._log_size += len(json.dumps(line, ensure_ascii=False)) + 1
+        except Exception as e:
+            print(f"[router] Failed to log decision: {e}")
 
     def _check_explicit_prefix(self, message: str) -> str | None:
         """Tier 1: Check for explicit !prefix override."""
@@ -317,23 +497,35 @@ class AgentRouter:
     def _check_keywords(self, message: str) -> str | None:
         """Tier 2: Fast keyword matching.
 
-        Returns the agent name with the most keyword matches, or None if
+        Returns the agent with the highest summed keyword weight, or None if
         no keywords match.
         """
-        lower = message.lower()
-        scores: dict[str, int] = {}
-
-        for agent_name, keywords in self._keywords.items():
-            count = sum(1 for kw in keywords if kw in lower)
-            if count > 0:
-                scores[agent_name] = count
-
-        if not scores:
-            return None
-
-        # Return the agent with the highest score
-        best = max(scores, key=scores.get)
-        return best
+        return self._matcher.best(message)
+
+    def _get_classifier(self):
+        if self._classifier is None:
+            from agents.intent_classifier import (
+                DEFAULT_THRESHOLD, MODEL_PATH, IntentClassifier,
+                examples_from_descriptions, examples_from_keywords,
+            )
+            threshold = DEFAULT_THRESHOLD
+            if self._settings:
+                threshold = self._settings.get("router.classifier_threshold", DEFAULT_THRESHOLD)
+            # Prefer the offline-trained model; otherwise train from the keyword tables
+            clf = None
+            if self._settings:
+                model_path = self._settings.get("router.classifier_model", MODEL_PATH)
+                clf = IntentClassifier.load(model_path, threshold) if model_path else None
+            self._classifier = clf or IntentClassifier.train(
+                examples_from_keywords(self._keywords) + examples_from_descriptions(CLASSIFICATION_PROMPT),
+                threshold=threshold,
+            )
+        return self._classifier
+
+    def _classify(self, message: str) -> str | None:
+        """Tier 3: On-device intent classifier, None when not confident."""
+        agent_name, _ = self._get_classifier().predict(message)
+        return agent_name
 
     def _llm_classify(self, message: str) -> str | None:
         """Tier 3: Use a cheap LLM call to classify the message.
@@ -12,6 +12,11 @@ class SharedScratchpad:
 
     def __init__(self):
         self._sections: dict[str, str] = {}
+        self._version = 0  # Bumped on every change; keys cached prompt segments
+
+    @property
+    def version(self) -> int:
+        return self._version
 
     def write(self, section: str, content: str, append: bool = False) -> None:
         """Write content to a named section.
@@ -25,6 +30,7 @@ class SharedScratchpad:
             self._sections[section] += "\n" + content
         else:
             self._sections[section] = content
+        self._version += 1
 
     def read(self, section: str) -> str:
         """Read a named section. Returns empty string if section doesn't exist."""
@@ -45,6 +51,7 @@ class SharedScratchpad:
             self._sections.clear()
         else:
             self._sections.pop(section, None)
+        self._version += 1
 
     def summary(self) -> str:
         """One-line summary per section, for context injection into prompts."""
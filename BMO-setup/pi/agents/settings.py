@@ -13,7 +13,6 @@ from __future__ import annotations
 import json
 import os
 import threading
-import time
 from pathlib import Path
 from typing import Any, Callable
 
@@ -62,6 +61,9 @@ def _get_default_settings() -> dict:
             "custom_keywords": {},
             "disable_tiers": [],
             "default_agent": "conversation",
+            "classifier_threshold": 0.9,
+            "classifier_model": os.path.expanduser("~/bmo/data/router/intent_model.json"),
+            "log_decisions": True,
         },
         "plan_mode": {
             "max_plan_steps": 20,
@@ -195,9 +197,10 @@ class BmoSettings:
         self._working_dir = working_dir or os.getcwd()
         self._defaults = _get_default_settings()
         self._merged: dict = {}
+        self._version = 0  # Bumped on every reload; keys cached prompt segments
         self._file_mtimes: dict[str, float] = {}
         self._lock = threading.Lock()
-        self._watcher_thread: threading.Thread | None = None
+        self._watch_tokens: list[int] = []
         self._watcher_running = False
         self._change_callbacks: list[Callable[[], None]] = []
 
@@ -252,6 +255,11 @@ class BmoSettings:
                     print(f"[settings] Failed to load {path}: {e}")
 
             self._merged = merged
+            self._version += 1
+
+    @property
+    def version(self) -> int:
+        return self._version
 
     # ── Getters ──────────────────────────────────────────────────────
 
@@ -406,57 +414,78 @@ class BmoSettings:
     # ── Hot Reload Watcher ───────────────────────────────────────────
 
     def start_watching(self) -> None:
-        """Start a background thread that polls file mtimes every 2s."""
+        """Subscribe the settings files to the shared watch service.
+
+        Uses inotify where available, so edits propagate in milliseconds with
+        no idle wakeups; the watch service falls back to polling otherwise.
+        """
         if self._watcher_running:
             return
         self._watcher_running = True
-        self._watcher_thread = threading.Thread(target=self._watch_loop, daemon=True)
-        self._watcher_thread.start()
+        self._rewatch()
 
     def stop_watching(self) -> None:
-        """Stop the file watcher thread."""
+        """Stop watching settings files."""
         self._watcher_running = False
-        if self._watcher_thread:
-            self._watcher_thread.join(timeout=5)
-            self._watcher_thread = None
+        from watch_service import get_watch_service
+        service = get_watch_service()
+        for token in self._watch_tokens:
+            service.unwatch(token)
+        self._watch_tokens = []
 
     def on_change(self, callback: Callable[[], None]) -> None:
         """Register a callback to be called when settings change on disk."""
         self._change_callbacks.append(callback)
 
-    def _watch_loop(self) -> None:
-        """Poll settings files for changes every 2 seconds."""
-        while self._watcher_running:
-            time.sleep(2)
-            try:
-                changed = False
-                for path, old_mtime in list(self._file_mtimes.items()):
-                    try:
-                        current_mtime = os.path.getmtime(path)
-                        if current_mtime != old_mtime:
-                            changed = True
-                            break
-                    except FileNotFoundError:
-                        changed = True
-                        break
-
-                # Also check if new settings files appeared
-                if not changed:
-                    current_files = set(self._find_settings_files())
-                    known_files = set(self._file_mtimes.keys())
-                    if current_files != known_files:
+    def _watch_targets(self) -> list[str]:
+        """Paths whose creation or modification can change the merged settings."""
+        targets = [USER_SETTINGS_PATH]
+        current = Path(self._working_dir).resolve()
+        for _ in range(10):
+            bmo_dir = current / ".bmo"
+            # Watch the file if its .bmo dir exists, else watch for .bmo appearing
+            targets.append(str(bmo_dir / PROJECT_SETTINGS_NAME) if bmo_dir.is_dir() else str(bmo_dir))
+            parent = current.parent
+            if parent == current:
+                break
+            current = parent
+        return targets
+
+    def _rewatch(self) -> None:
+        """(Re)subscribe to the current set of watch targets."""
+        from watch_service import get_watch_service
+        service = get_watch_service()
+        for token in self._watch_tokens:
+            service.unwatch(token)
+        self._watch_tokens = [service.watch(path, self._on_file_event) for path in self._watch_targets()]
+
+    def _on_file_event(self, path: str) -> None:
+        """Watch service callback — reload if anything we load from changed."""
+        if not self._watcher_running:
+            return
+        try:
+            with self._lock:
+                old_mtimes = dict(self._file_mtimes)
+            current_files = self._find_settings_files()
+            changed = set(current_files) != set(old_mtimes)
+            for f in current_files:
+                try:
+                    if os.path.getmtime(f) != old_mtimes.get(f):
                         changed = True
-
-                if changed:
-                    print("[settings] Settings changed on disk — reloading")
-                    self.reload()
-                    for cb in self._change_callbacks:
-                        try:
-                            cb()
-                        except Exception as e:
-                            print(f"[settings] Change callback error: {e}")
-            except Exception as e:
-                print(f"[settings] Watcher error: {e}")
+                except FileNotFoundError:
+                    changed = True
+            if os.path.basename(path) == ".bmo":
+                self._rewatch()  # A project .bmo dir appeared or vanished
+            if changed:
+                print("[settings] Settings changed on disk — reloading")
+                self.reload()
+                for cb in self._change_callbacks:
+                    try:
+                        cb()
+                    except Exception as e:
+                        print(f"[settings] Change callback error: {e}")
+        except Exception as e:
+            print(f"[settings] Watcher error: {e}")
 
 
 # ── Module-level Singleton ───────────────────────────────────────────
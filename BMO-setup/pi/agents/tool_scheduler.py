@@ -0,0 +1,99 @@
+"""Tool execution scheduler — runs independent read-only tool calls concurrently.
+
+When the model returns several tool calls in one turn, consecutive calls
+that are safe to overlap (file reads, greps, searches, read-only MCP tools)
+run together on a small bounded pool; anything that mutates state runs on
+its own, in order, after the batch before it has finished. Results always
+come back in the original call order.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+from typing import Any, Callable
+
+from agents.base_agent import READ_ONLY_TOOLS
+
+# READ_ONLY_TOOLS is the plan-mode allowlist; write_memory is allowed there
+# but it mutates state, so it must not overlap other calls.
+PARALLEL_SAFE_TOOLS = READ_ONLY_TOOLS - {"write_memory"}
+
+MAX_PARALLEL_TOOLS = 4
+
+_pool: concurrent.futures.ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=MAX_PARALLEL_TOOLS, thread_name_prefix="bmo-tool",
+            )
+        return _pool
+
+
+def plan_batches(names: list[str], is_parallel_safe: Callable[[str], bool]) -> list[list[int]]:
+    """Group call indices into execution batches.
+
+    Consecutive parallel-safe calls share a batch; every other call is a
+    batch of one. Batches run strictly one after another.
+    """
+    batches: list[list[int]] = []
+    for i, name in enumerate(names):
+        if is_parallel_safe(name) and batches and all(is_parallel_safe(names[j]) for j in batches[-1]):
+            batches[-1].append(i)
+        else:
+            batches.append([i])
+    return batches
+
+
+def run_tool_calls(
+    calls: list[tuple[str, dict]],
+    dispatch: Callable[[str, dict], Any],
+    is_parallel_safe: Callable[[str], bool],
+    on_start: Callable[[int, str, dict], None] | None = None,
+    on_done: Callable[[int, str, dict, Any], None] | None = None,
+    stop_after: Callable[[Any], bool] | None = None,
+) -> list[Any]:
+    """Execute tool calls, overlapping read-only batches.
+
+    Args:
+        calls: (name, args) pairs in the order the model issued them.
+        dispatch: Executes one call and returns its result.
+        is_parallel_safe: Whether a tool may run concurrently with others.
+        on_start / on_done: Progress hooks, called with the call's index.
+        stop_after: If it returns True for a result, later batches are not
+            run (e.g. a destructive call needs user confirmation).
+
+    Returns:
+        Results in original call order; calls skipped by ``stop_after`` are None.
+    """
+    results: list[Any] = [None] * len(calls)
+    batches = plan_batches([name for name, _ in calls], is_parallel_safe)
+
+    def _run(i: int):
+        name, args = calls[i]
+        if on_start:
+            on_start(i, name, args)
+        try:
+            result = dispatch(name, args)
+        except Exception as e:
+            result = {"error": f"Tool '{name}' failed: {e}"}
+        results[i] = result
+        if on_done:
+            on_done(i, name, args, result)
+        return result
+
+    for batch in batches:
+        if len(batch) == 1:
+            _run(batch[0])
+        else:
+            futures = [_get_pool().submit(_run, i) for i in batch]
+            concurrent.futures.wait(futures)
+        if stop_after and any(stop_after(results[i]) for i in batch):
+            break
+
+    return results
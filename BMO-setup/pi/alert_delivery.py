@@ -0,0 +1,164 @@
+"""BMO Alert Delivery — Independent per-channel queues for alert dispatch.
+
+AlertService used to call every channel inline, so a slow Discord post held
+up the voice announcement and the caller (often the health-check loop).
+Each channel now has its own DeliveryChannel: a bounded priority queue
+drained by one worker thread.
+
+- ``submit()`` never blocks. If the queue is full, the lowest-priority,
+  newest alert is dropped, so a critical alert is never turned away by a
+  backlog of low-priority ones.
+- Queues are priority ordered: critical, high, medium, low. A critical alert
+  goes ahead of anything still waiting.
+- Coalescing: when the worker takes a non-critical alert, it first waits
+  ``linger`` seconds. It then takes every other waiting non-critical alert
+  too, up to ``max_batch``, and hands them to the deliver function as one
+  list, so a burst becomes one digest message. A queued critical alert, or a
+  critical retry coming due, cuts the wait short and goes first.
+- A failed delivery is retried after ``backoff`` seconds (1, 2, 4, …) up to
+  ``retries`` times. While it waits, the item is off the queue, so other
+  alerts still go out.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable
+
+PRIORITY_RANK = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+CRITICAL = PRIORITY_RANK["critical"]
+
+QUEUE_SIZE = 50
+RETRIES = 3
+BACKOFF = 1.0
+MAX_BATCH = 10
+
+
+def _rank(alert: dict) -> int:
+    return PRIORITY_RANK.get(alert.get("priority"), PRIORITY_RANK["medium"])
+
+
+class DeliveryChannel:
+    """Bounded priority queue + worker thread for one delivery channel."""
+
+    def __init__(self, name: str, deliver: Callable[[list[dict]], None],
+                 maxsize: int = QUEUE_SIZE, retries: int = RETRIES, backoff: float = BACKOFF,
+                 linger: float = 0.0, max_batch: int = MAX_BATCH, clock=time.monotonic):
+        self.name = name
+        self._deliver = deliver
+        self._maxsize = maxsize
+        self._retries = retries
+        self._backoff = backoff
+        self._linger = linger
+        self._max_batch = max(1, max_batch)
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._heap: list[tuple[int, int, dict]] = []     # (rank, seq, alert)
+        self._delayed: list[tuple[float, int, int, list, int]] = []  # (ready_at, seq, rank, batch, attempts)
+        self._seq = itertools.count()
+        self._running = True
+        self.stats = {"delivered": 0, "batches": 0, "retried": 0, "failed": 0, "dropped": 0}
+        self._thread = threading.Thread(target=self._worker, name=f"alert-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, alert: dict) -> bool:
+        """Queue an alert without blocking. False if it was dropped."""
+        rank = _rank(alert)
+        with self._cond:
+            if len(self._heap) >= self._maxsize:
+                # Evict the least urgent, newest item — unless that's the new one
+                worst = max(self._heap)
+                if (rank, float("inf")) >= worst[:2]:
+                    self.stats["dropped"] += 1
+                    return False
+                self._heap.remove(worst)
+                heapq.heapify(self._heap)
+                self.stats["dropped"] += 1
+            heapq.heappush(self._heap, (rank, next(self._seq), alert))
+            self._cond.notify()
+        return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap) + sum(len(d[3]) for d in self._delayed)
+
+    def stop(self, timeout: float = 2.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    # ── Worker ────────────────────────────────────────────────────────
+
+    def _next_batch(self) -> tuple[list[dict], int] | None:
+        """Block until a retry is due or an alert is queued; take it (and its digest peers)."""
+        with self._cond:
+            while self._running:
+                now = self._clock()
+                if self._delayed and self._delayed[0][0] <= now and \
+                        (not self._heap or self._heap[0][0] > CRITICAL):
+                    _, _, _, batch, attempts = heapq.heappop(self._delayed)
+                    return batch, attempts
+                if not self._heap:
+                    timeout = self._delayed[0][0] - now if self._delayed else None
+                    self._cond.wait(timeout)
+                    continue
+
+                rank, _, first = heapq.heappop(self._heap)
+                if rank == CRITICAL:
+                    return [first], 0
+                if self._linger and self._linger_interrupted():
+                    # Back at the front of its rank; the critical one goes first
+                    heapq.heappush(self._heap, (rank, -next(self._seq), first))
+                    continue
+                batch = [first]
+                while self._heap and len(batch) < self._max_batch and \
+                        self._heap[0][0] > CRITICAL:
+                    batch.append(heapq.heappop(self._heap)[2])
+                return batch, 0
+            return None
+
+    def _linger_interrupted(self) -> bool:
+        """Let the rest of a burst arrive (lock held).
+
+        True if a queued critical alert or a due critical retry ended the
+        wait early. Sleeps no later than the next critical retry, which
+        nothing would notify us about.
+        """
+        deadline = self._clock() + self._linger
+        while self._running:
+            now = self._clock()
+            if self._heap and self._heap[0][0] == CRITICAL:
+                return True
+            critical_retries = [d[0] for d in self._delayed if d[2] == CRITICAL]
+            if critical_retries and min(critical_retries) <= now:
+                return True
+            if now >= deadline:
+                return False
+            self._cond.wait(min([deadline, *critical_retries]) - now)
+        return False
+
+    def _worker(self):
+        while True:
+            taken = self._next_batch()
+            if taken is None:
+                return
+            batch, attempts = taken
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                with self._cond:
+                    if attempts < self._retries:
+                        delay = self._backoff * (2 ** attempts)
+                        self.stats["retried"] += 1
+                        heapq.heappush(self._delayed, (self._clock() + delay, next(self._seq),
+                                                       min(map(_rank, batch)), batch, attempts + 1))
+                        print(f"[alert] {self.name} delivery failed ({e}), retry in {delay:.0f}s")
+                    else:
+                        self.stats["failed"] += len(batch)
+                        print(f"[alert] {self.name} delivery gave up after {attempts + 1} tries: {e}")
+                continue
+            with self._cond:
+                self.stats["delivered"] += len(batch)
+                self.stats["batches"] += 1
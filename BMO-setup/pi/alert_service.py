@@ -1,24 +1,28 @@
 """BMO Alert Service — Proactive multi-channel alert dispatcher.
 
 Sends alerts via voice, kiosk UI, and Discord DM based on priority levels.
-Respects quiet hours (critical alerts override). Keeps rolling history.
+Respects quiet hours (critical alerts override). Keeps a bounded, indexed
+history in which repeats of a recent alert collapse into one counted entry.
 
 Config: ~/bmo/data/alert_config.json
-History: ~/bmo/data/alert_history.json
+History: ~/bmo/data/alerts/alerts-NNNNNN.jsonl (see alert_store.py)
 """
 
 import json
 import os
-import threading
 import time
 
 import requests
 
+from alert_delivery import DeliveryChannel
+from alert_store import AlertStore
 
 DATA_DIR = os.path.expanduser("~/bmo/data")
 CONFIG_FILE = os.path.join(DATA_DIR, "alert_config.json")
-HISTORY_FILE = os.path.join(DATA_DIR, "alert_history.json")
-MAX_HISTORY = 200
+HISTORY_DIR = os.path.join(DATA_DIR, "alerts")
+LEGACY_HISTORY_FILE = os.path.join(DATA_DIR, "alert_history.json")
+MAX_HISTORY = 500
+MAX_HISTORY_AGE = 30 * 86400
 
 # Priority → delivery channels
 PRIORITY_CHANNELS = {
@@ -28,6 +32,11 @@ PRIORITY_CHANNELS = {
     "low":      ["kiosk"],
 }
 
+# Seconds a channel waits for the rest of a burst before sending one digest
+CHANNEL_LINGER = {"voice": 0.0, "kiosk": 0.0, "discord": 2.0, "chime": 0.5}
+
+PRIORITY_EMOJI = {"critical": "🚨", "high": "⚠️", "medium": "📢", "low": "ℹ️"}
+
 # Default quiet hours (overridden by config)
 DEFAULT_QUIET_START = 23  # 11 PM
 DEFAULT_QUIET_END = 7     # 7 AM
@@ -40,10 +49,22 @@ class AlertService:
         self.voice = voice_pipeline
         self.socketio = socketio
         self._config = self._load_config()
-        self._history = self._load_history()
-        self._lock = threading.Lock()
-        self._dedup = {}  # source:title → last_sent timestamp
-        self._dedup_window = 300  # 5 min dedup window
+        self._history = AlertStore(
+            HISTORY_DIR, max_count=MAX_HISTORY, max_age=MAX_HISTORY_AGE,
+            dedup_window=self._config.get("dedup_window", 300),
+            legacy_file=LEGACY_HISTORY_FILE,
+        )
+        self._discord_dm_channel: str | None = None
+        # One queue + worker per channel so a slow Discord post never delays voice
+        self._channels = {
+            name: DeliveryChannel(name, deliver, linger=CHANNEL_LINGER[name])
+            for name, deliver in (
+                ("voice", self._deliver_voice),
+                ("kiosk", self._deliver_kiosk),
+                ("discord", self._deliver_discord),
+                ("chime", self._deliver_chime),
+            )
+        }
 
     # ── Send Alert ────────────────────────────────────────────────────
 
@@ -63,18 +84,7 @@ class AlertService:
         if priority not in PRIORITY_CHANNELS:
             priority = "medium"
 
-        # Dedup check
-        dedup_key = f"{source}:{title}"
         now = time.time()
-        with self._lock:
-            last = self._dedup.get(dedup_key, 0)
-            if now - last < self._dedup_window:
-                return False
-            self._dedup[dedup_key] = now
-            # Clean old dedup entries
-            cutoff = now - self._dedup_window * 2
-            self._dedup = {k: v for k, v in self._dedup.items() if v > cutoff}
-
         channels = list(PRIORITY_CHANNELS[priority])
         is_quiet = self._is_quiet_hours()
 
@@ -93,51 +103,52 @@ class AlertService:
             "quiet_suppressed": is_quiet and "voice" not in channels,
         }
 
-        # Save to history
-        self._save_alert(alert)
+        # Save to history; a repeat within the dedup window only bumps the count
+        alert, is_new = self._history.add(alert)
+        if not is_new:
+            return False
 
-        # Dispatch to channels
+        # Queue on each channel; delivery happens on the channel workers
         for channel in channels:
-            try:
-                if channel == "voice":
-                    self._deliver_voice(title, body, priority)
-                elif channel == "kiosk":
-                    self._deliver_kiosk(alert)
-                elif channel == "discord":
-                    self._deliver_discord(title, body, priority)
-                elif channel in ("chime", "chime_soft"):
-                    self._deliver_chime(channel == "chime_soft")
-            except Exception as e:
-                print(f"[alert] Failed to deliver via {channel}: {e}")
+            if channel in ("chime", "chime_soft"):
+                self._channels["chime"].submit({**alert, "soft": channel == "chime_soft"})
+            else:
+                self._channels[channel].submit(alert)
 
         print(f"[alert] {priority.upper()} [{source}] {title}")
         return True
 
     # ── Delivery Channels ─────────────────────────────────────────────
 
-    def _deliver_voice(self, title: str, body: str, priority: str):
-        """Speak the alert via TTS."""
+    def _deliver_voice(self, alerts: list[dict]):
+        """Speak the alert (or a digest of several) via TTS."""
         if not self.voice:
             return
-        # Critical gets full body, others just title
-        if priority == "critical":
-            text = f"Alert! {title}. {body}"
+        if len(alerts) == 1:
+            title, body, priority = alerts[0]["title"], alerts[0]["body"], alerts[0]["priority"]
+            # Critical gets full body, others just title
+            if priority == "critical":
+                text = f"Alert! {title}. {body}"
+            else:
+                text = f"{title}. {body}" if len(body) < 100 else title
         else:
-            text = f"{title}. {body}" if len(body) < 100 else title
+            priority = alerts[0]["priority"]
+            text = f"You have {len(alerts)} alerts. " + ". ".join(a["title"] for a in alerts)
         # Pass priority so alarms/emergencies bypass bedtime mode
         speak_priority = "emergency" if priority == "critical" else "alarm"
-        threading.Thread(
-            target=self.voice.speak, args=(text,),
-            kwargs={"priority": speak_priority}, daemon=True
-        ).start()
+        self.voice.speak(text, priority=speak_priority)
 
-    def _deliver_kiosk(self, alert: dict):
-        """Send alert to kiosk UI via SocketIO."""
+    def _deliver_kiosk(self, alerts: list[dict]):
+        """Send alerts to kiosk UI via SocketIO."""
         if self.socketio:
-            self.socketio.emit("proactive_alert", alert)
+            for alert in alerts:
+                self.socketio.emit("proactive_alert", alert)
 
-    def _deliver_discord(self, title: str, body: str, priority: str):
-        """Send alert as Discord DM using the social bot token."""
+    def _deliver_discord(self, alerts: list[dict]):
+        """Send alerts as one Discord DM using the social bot token.
+
+        Raises on failure so the channel retries with backoff.
+        """
         token = os.environ.get("DISCORD_SOCIAL_BOT_TOKEN")
         owner_id = os.environ.get("DISCORD_OWNER_ID")
         if not token or not owner_id:
@@ -148,31 +159,34 @@ class AlertService:
             "Content-Type": "application/json",
         }
 
-        try:
-            # Create DM channel
+        if not self._discord_dm_channel:
+            # Create DM channel (stable per recipient, so only once)
             r = requests.post(
                 "https://discord.com/api/v10/users/@me/channels",
                 json={"recipient_id": owner_id},
                 headers=headers, timeout=10,
             )
             r.raise_for_status()
-            dm_channel_id = r.json()["id"]
-
-            # Send message
-            emoji = {"critical": "🚨", "high": "⚠️", "medium": "📢", "low": "ℹ️"}.get(priority, "📢")
-            message = f"{emoji} **{title}**\n{body}"
-            requests.post(
-                f"https://discord.com/api/v10/channels/{dm_channel_id}/messages",
-                json={"content": message},
-                headers=headers, timeout=10,
-            )
-        except Exception as e:
-            print(f"[alert] Discord DM failed: {e}")
-
-    def _deliver_chime(self, soft: bool = False):
-        """Play alert chime sound."""
+            self._discord_dm_channel = r.json()["id"]
+
+        lines = [f"{PRIORITY_EMOJI.get(a['priority'], '📢')} **{a['title']}**\n{a['body']}" for a in alerts]
+        if len(alerts) > 1:
+            lines.insert(0, f"**{len(alerts)} alerts**")
+        r = requests.post(
+            f"https://discord.com/api/v10/channels/{self._discord_dm_channel}/messages",
+            json={"content": "\n\n".join(lines)[:2000]},
+            headers=headers, timeout=10,
+        )
+        r.raise_for_status()
+
+    def _deliver_chime(self, alerts: list[dict]):
+        """Play one alert chime for a burst; soft only if every alert asked for soft."""
         if self.socketio:
-            self.socketio.emit("play_chime", {"soft": soft})
+            self.socketio.emit("play_chime", {"soft": all(a.get("soft") for a in alerts)})
+
+    def get_delivery_stats(self) -> dict:
+        """Per-channel queue depth and delivery counters."""
+        return {name: {**ch.stats, "pending": ch.pending()} for name, ch in self._channels.items()}
 
     # ── Quiet Hours ───────────────────────────────────────────────────
 
@@ -190,13 +204,10 @@ class AlertService:
 
     # ── History & Config ──────────────────────────────────────────────
 
-    def get_history(self, limit: int = 50, source: str | None = None) -> list[dict]:
-        """Get recent alert history, optionally filtered by source."""
-        with self._lock:
-            alerts = self._history
-            if source:
-                alerts = [a for a in alerts if a.get("source") == source]
-            return alerts[:limit]
+    def get_history(self, limit: int = 50, source: str | None = None,
+                    priority: str | None = None) -> list[dict]:
+        """Get recent alert history, optionally filtered by source and/or priority."""
+        return self._history.query(limit, source=source or None, priority=priority or None)
 
     def get_config(self) -> dict:
         return dict(self._config)
@@ -204,16 +215,10 @@ class AlertService:
     def update_config(self, **kwargs):
         """Update alert config (quiet_hours, enabled sources, etc.)."""
         self._config.update(kwargs)
+        if "dedup_window" in kwargs:
+            self._history.dedup_window = kwargs["dedup_window"]
         self._save_config()
 
-    def _save_alert(self, alert: dict):
-        """Append alert to rolling history."""
-        with self._lock:
-            self._history.insert(0, alert)
-            if len(self._history) > MAX_HISTORY:
-                self._history = self._history[:MAX_HISTORY]
-        self._save_history()
-
     def _load_config(self) -> dict:
         try:
             if os.path.exists(CONFIG_FILE):
@@ -243,21 +248,3 @@ class AlertService:
                 json.dump(self._config, f, indent=2)
         except Exception as e:
             print(f"[alert] Config save failed: {e}")
-
-    def _load_history(self) -> list:
-        try:
-            if os.path.exists(HISTORY_FILE):
-                with open(HISTORY_FILE, encoding="utf-8") as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f"[alert] History load failed: {e}")
-        return []
-
-    def _save_history(self):
-        try:
-            os.makedirs(DATA_DIR, exist_ok=True)
-            with self._lock:
-                with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                    json.dump(self._history, f, ensure_ascii=False)
-        except Exception as e:
-            print(f"[alert] History save failed: {e}")
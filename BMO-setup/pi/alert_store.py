@@ -0,0 +1,246 @@
+"""BMO Alert Store — Append-only, bounded alert history with indexes and dedup.
+
+AlertService used to insert every alert at the head of a list and rewrite
+all of alert_history.json. Filtering by source scanned the whole list.
+AlertStore instead:
+
+- Appends each alert as one JSON line to numbered ``alerts-NNNNNN.jsonl``
+  segments (via message_log.JsonlWriter), so saving costs the same no matter
+  how much history there is.
+- Keeps the retained window in memory, oldest first. Secondary indexes by
+  source and by priority are deques of alert ids. Retention always evicts
+  from the oldest end, so index cleanup is a popleft.
+- Retains at most ``max_count`` alerts, none older than ``max_age`` seconds.
+  A segment is deleted once every alert in it has been evicted.
+- Collapses repeats. An alert with the same source and title as one stored
+  within ``dedup_window`` seconds does not get a new entry. The stored entry
+  gets ``count`` and ``last_seen`` bumped, and a small ``repeat`` record is
+  appended.
+"""
+
+import collections
+import json
+import os
+import re
+import threading
+import time
+
+from message_log import SEGMENT_LINES, JsonlWriter, read_jsonl
+
+MAX_COUNT = 500
+MAX_AGE = 30 * 86400          # Drop alerts older than 30 days
+DEDUP_WINDOW = 300            # Seconds an identical alert collapses into the first
+
+
+def dedup_key(alert: dict) -> str:
+    return f"{alert.get('source')}:{alert.get('title')}"
+
+
+class AlertStore:
+    """Segmented JSONL alert history with source/priority indexes and dedup."""
+
+    def __init__(self, directory: str, max_count: int = MAX_COUNT, max_age: float = MAX_AGE,
+                 dedup_window: float = DEDUP_WINDOW, segment_lines: int = SEGMENT_LINES,
+                 writer: JsonlWriter | None = None, legacy_file: str | None = None,
+                 clock=time.time):
+        self._dir = directory
+        self.max_count = max_count
+        self.max_age = max_age
+        self.dedup_window = dedup_window
+        self._segment_lines = max(segment_lines, 1)
+        self._writer = writer or JsonlWriter()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._alerts: collections.OrderedDict[int, dict] = collections.OrderedDict()
+        self._by_source: dict[str, collections.deque] = {}
+        self._by_priority: dict[str, collections.deque] = {}
+        self._by_key: dict[str, int] = {}           # dedup key → newest alert id
+        self._next_id = 1
+        self._seq = 0                               # Current segment number
+        self._seg_count = 0                         # Lines in the current segment
+        self._seg_last_id: dict[int, int] = {}      # segment → highest alert id it mentions
+        self._seg_re = re.compile(r"^alerts-(\d+)\.jsonl$")
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+        if legacy_file:
+            self._migrate_legacy(legacy_file)
+
+    # ── Public API ────────────────────────────────────────────────────
+
+    def add(self, alert: dict) -> tuple[dict, bool]:
+        """Store an alert, or fold it into a recent identical one.
+
+        Returns (stored entry, is_new). When is_new is False the caller
+        should not deliver the alert again.
+        """
+        now = alert.get("timestamp") or self._clock()
+        key = dedup_key(alert)
+        with self._lock:
+            self._expire(now)
+            existing = self._alerts.get(self._by_key.get(key, 0))
+            if existing and now - existing["timestamp"] < self.dedup_window:
+                existing["count"] = existing.get("count", 1) + 1
+                existing["last_seen"] = now
+                self._write({"op": "repeat", "id": existing["id"],
+                             "count": existing["count"], "last_seen": now})
+                return dict(existing), False
+
+            entry = {**alert, "id": self._next_id, "timestamp": now, "count": 1, "last_seen": now}
+            self._next_id += 1
+            self._insert(entry)
+            self._write(entry)
+            self._trim()
+            return dict(entry), True
+
+    def query(self, limit: int = 50, source: str | None = None,
+              priority: str | None = None) -> list[dict]:
+        """Newest-first alerts, optionally filtered by source and/or priority."""
+        with self._lock:
+            self._expire(self._clock())
+            if source is None and priority is None:
+                ids = reversed(self._alerts)
+            else:
+                candidates = [
+                    index.get(value, ())
+                    for index, value in ((self._by_source, source), (self._by_priority, priority))
+                    if value is not None
+                ]
+                # Walk the smaller index; check the other filter per entry
+                ids = reversed(min(candidates, key=len))
+            out = []
+            for alert_id in ids:
+                alert = self._alerts.get(alert_id)
+                if alert is None:
+                    continue
+                if (source is not None and alert.get("source") != source) or \
+                   (priority is not None and alert.get("priority") != priority):
+                    continue
+                out.append(dict(alert))
+                if len(out) >= limit:
+                    break
+            return out
+
+    def counts(self) -> dict:
+        """Retained alerts per source and per priority."""
+        with self._lock:
+            return {
+                "total": len(self._alerts),
+                "by_source": {k: len(v) for k, v in self._by_source.items() if v},
+                "by_priority": {k: len(v) for k, v in self._by_priority.items() if v},
+            }
+
+    def flush(self):
+        self._writer.sync()
+
+    # ── In-memory window ──────────────────────────────────────────────
+
+    def _insert(self, entry: dict):
+        alert_id = entry["id"]
+        self._alerts[alert_id] = entry
+        self._by_source.setdefault(entry.get("source"), collections.deque()).append(alert_id)
+        self._by_priority.setdefault(entry.get("priority"), collections.deque()).append(alert_id)
+        self._by_key[dedup_key(entry)] = alert_id
+
+    def _evict_oldest(self):
+        alert_id, entry = self._alerts.popitem(last=False)
+        # Eviction is oldest-first, so the id heads both of its index deques
+        for index, value in ((self._by_source, entry.get("source")),
+                             (self._by_priority, entry.get("priority"))):
+            ids = index.get(value)
+            if ids and ids[0] == alert_id:
+                ids.popleft()
+                if not ids:
+                    del index[value]
+        key = dedup_key(entry)
+        if self._by_key.get(key) == alert_id:
+            del self._by_key[key]
+
+    def _expire(self, now: float):
+        cutoff = now - self.max_age
+        while self._alerts and next(iter(self._alerts.values()))["timestamp"] < cutoff:
+            self._evict_oldest()
+
+    def _trim(self):
+        while len(self._alerts) > self.max_count:
+            self._evict_oldest()
+
+    # ── Segments ──────────────────────────────────────────────────────
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self._dir, f"alerts-{seq:06d}.jsonl")
+
+    def _segments(self) -> list[int]:
+        return sorted(int(m.group(1)) for name in os.listdir(self._dir)
+                      if (m := self._seg_re.match(name)))
+
+    def _write(self, record: dict):
+        if self._seq == 0 or self._seg_count >= self._segment_lines:
+            self._roll_segment()
+        self._writer.append(self._segment_path(self._seq), record)
+        self._seg_count += 1
+        self._seg_last_id[self._seq] = max(self._seg_last_id.get(self._seq, 0), record["id"])
+
+    def _roll_segment(self):
+        if self._seq:
+            self._writer.close(self._segment_path(self._seq))
+        self._seq += 1
+        self._seg_count = 0
+        self._compact()
+
+    def _compact(self):
+        """Delete closed segments that only mention evicted alerts."""
+        oldest = next(iter(self._alerts), self._next_id)
+        for seq, last_id in list(self._seg_last_id.items()):
+            if seq != self._seq and last_id < oldest:
+                path = self._segment_path(seq)
+                self._writer.close(path)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                del self._seg_last_id[seq]
+
+    def _load(self):
+        """Replay segments oldest → newest, then apply retention."""
+        for seq in self._segments():
+            records = read_jsonl(self._segment_path(seq))
+            last_id = 0
+            for record in records:
+                alert_id = record.get("id")
+                if not isinstance(alert_id, int):
+                    continue
+                last_id = max(last_id, alert_id)
+                if record.get("op") == "repeat":
+                    entry = self._alerts.get(alert_id)
+                    if entry:
+                        entry["count"] = record.get("count", entry.get("count", 1))
+                        entry["last_seen"] = record.get("last_seen", entry["timestamp"])
+                elif alert_id not in self._alerts:
+                    self._insert(record)
+                    self._next_id = max(self._next_id, alert_id + 1)
+            self._seg_last_id[seq] = last_id
+            self._seq, self._seg_count = seq, len(records)
+        self._expire(self._clock())
+        self._trim()
+
+    def _migrate_legacy(self, legacy_file: str):
+        """Import the old newest-first ``alert_history.json`` once, then retire it."""
+        if not os.path.exists(legacy_file) or self._alerts:
+            return
+        try:
+            with open(legacy_file, encoding="utf-8") as f:
+                alerts = json.load(f)
+            with self._lock:
+                for alert in reversed(alerts[:self.max_count]):
+                    entry = {**alert, "id": self._next_id, "timestamp": alert.get("timestamp", 0)}
+                    entry.setdefault("count", 1)
+                    entry.setdefault("last_seen", entry["timestamp"])
+                    self._next_id += 1
+                    self._insert(entry)
+                    self._write(entry)
+                self._expire(self._clock())
+            self._writer.sync()
+            os.replace(legacy_file, legacy_file + ".migrated")
+            print(f"[alert] Migrated {len(alerts)} alerts from {legacy_file}")
+        except Exception as e:
+            print(f"[alert] History migration failed: {e}")
@@ -12,6 +12,7 @@ from gevent import monkey
 monkey.patch_all()
 
 import asyncio
+import atexit
 import json
 import os
 import re
@@ -23,6 +24,9 @@ import time
 from flask import Flask, Response, jsonify, render_template, request, send_from_directory
 from flask_socketio import SocketIO
 
+from message_log import JsonlWriter, MessageLog, read_messages
+from settings_store import SettingsStore
+
 # ── App Setup ────────────────────────────────────────────────────────
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
@@ -174,7 +178,7 @@ def init_services():
     # Audio output routing (before music so music can use it)
     try:
         from audio_output_service import AudioOutputService
-        audio_service = AudioOutputService()
+        audio_service = AudioOutputService(socketio=socketio)
         service_map["audio"] = audio_service
         print("[bmo]   Audio output: OK")
     except Exception as e:
@@ -283,6 +287,8 @@ def init_services():
                     _sync_expression(expression)
             # Save voice transcriptions (user messages) to chat history
             elif event == "transcription":
+                if personality_engine:
+                    personality_engine.mark_activity()
                 _save_chat_message({
                     "role": "user",
                     "text": data.get("text", ""),
@@ -405,6 +411,7 @@ def init_services():
     service_map["tv_send_key"] = _scene_tv_send_key
     service_map["tv_launch"] = _scene_tv_launch
     service_map["tv_is_on"] = lambda: _tv_is_on
+    service_map["tv_query_on"] = lambda: _tv_cmd("status").get("is_on")
     service_map["tv_power_on"] = _scene_tv_power_on
     service_map["tv_power_off"] = _scene_tv_power_off
 
@@ -469,6 +476,7 @@ def init_services():
             socketio=socketio,
             music_service=music,
             weather_service=weather,
+            settings_store=_settings,
         )
         personality_engine.start()
         service_map["personality"] = personality_engine
@@ -719,37 +727,29 @@ def api_dnd_load():
 @app.route("/api/dnd/sessions")
 def api_dnd_sessions():
     """List all saved DnD session log files."""
-    if not os.path.isdir(DND_LOG_DIR):
-        return jsonify([])
     sessions = []
-    for fname in sorted(os.listdir(DND_LOG_DIR), reverse=True):
-        if fname.startswith("session_") and fname.endswith(".json"):
-            date = fname.replace("session_", "").replace(".json", "")
-            fpath = os.path.join(DND_LOG_DIR, fname)
-            try:
-                with open(fpath, encoding="utf-8") as f:
-                    messages = json.load(f)
-                # Get first assistant message as preview
-                preview = ""
-                for m in messages:
-                    if m.get("role") == "assistant":
-                        preview = m.get("text", "")[:100]
-                        break
-                sessions.append({"date": date, "messages": len(messages), "preview": preview})
-            except Exception:
-                sessions.append({"date": date, "messages": 0, "preview": ""})
+    for date in _list_dnd_session_dates():
+        try:
+            messages = read_messages(_dnd_session_base(date))
+            # Get first assistant message as preview
+            preview = ""
+            for m in messages:
+                if m.get("role") == "assistant":
+                    preview = m.get("text", "")[:100]
+                    break
+            sessions.append({"date": date, "messages": len(messages), "preview": preview})
+        except Exception:
+            sessions.append({"date": date, "messages": 0, "preview": ""})
     return jsonify(sessions)
 
 
 @app.route("/api/dnd/sessions/<date>")
 def api_dnd_session_get(date):
     """Get a specific DnD session log by date."""
-    fpath = os.path.join(DND_LOG_DIR, f"session_{date}.json")
-    if not os.path.exists(fpath):
+    if date not in _list_dnd_session_dates():
         return jsonify({"error": f"No session found for {date}"}), 404
     try:
-        with open(fpath, encoding="utf-8") as f:
-            messages = json.load(f)
+        messages = read_messages(_dnd_session_base(date))
         return jsonify(messages)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -758,12 +758,10 @@ def api_dnd_session_get(date):
 @app.route("/api/dnd/sessions/<date>/restore", methods=["POST"])
 def api_dnd_session_restore(date):
     """Restore a DnD session into the agent's conversation history."""
-    fpath = os.path.join(DND_LOG_DIR, f"session_{date}.json")
-    if not os.path.exists(fpath):
+    if date not in _list_dnd_session_dates():
         return jsonify({"error": f"No session found for {date}"}), 404
     try:
-        with open(fpath, encoding="utf-8") as f:
-            messages = json.load(f)
+        messages = read_messages(_dnd_session_base(date))
         # Clear current history and reload
         agent.conversation_history.clear()
         for msg in messages:
@@ -1739,26 +1737,35 @@ def api_audio_bt_scan():
     if not audio_service:
         return jsonify({"error": "Audio service not available"}), 503
     duration = (request.get_json(silent=True) or {}).get("duration", 10)
-
-    def _scan():
-        devices = audio_service.bluetooth_scan(duration=duration)
-        socketio.emit("bt_scan_result", {"devices": devices})
-
-    threading.Thread(target=_scan, daemon=True).start()
-    return jsonify({"ok": True, "message": "Scanning..."})
+    job = audio_service.bluetooth_scan_async(duration=duration)
+    return jsonify({"ok": True, "job": job.to_dict(), "message": "Scanning..."})
 
 
 @app.route("/api/audio/bluetooth/pair", methods=["POST"])
 def api_audio_bt_pair():
-    """Pair + connect Bluetooth device. Body: {address: "XX:XX:..."}."""
+    """Pair + connect Bluetooth device. Body: {address: "XX:XX:..."}.
+
+    Returns immediately; progress arrives as bt_job events, the outcome as bt_pair_result.
+    """
     if not audio_service:
         return jsonify({"error": "Audio service not available"}), 503
     data = request.get_json(force=True, silent=True) or {}
     address = data.get("address")
     if not address:
         return jsonify({"error": "address required"}), 400
-    ok, msg = audio_service.bluetooth_pair(address)
-    return jsonify({"ok": ok, "message": msg})
+    job = audio_service.bluetooth_pair_async(address)
+    return jsonify({"ok": True, "job": job.to_dict(), "message": "Pairing..."})
+
+
+@app.route("/api/audio/bluetooth/jobs/<int:job_id>")
+def api_audio_bt_job(job_id):
+    """Status of a Bluetooth scan/pair job."""
+    if not audio_service:
+        return jsonify({"error": "Audio service not available"}), 503
+    job = audio_service.bluetooth.jobs.get(job_id)
+    if not job:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_dict())
 
 
 @app.route("/api/audio/bluetooth/disconnect", methods=["POST"])
@@ -1909,41 +1916,18 @@ def api_scene_delete(name):
         return jsonify({"error": str(e)}), 500
 
 
+_settings = SettingsStore(os.path.join(os.path.dirname(__file__), "data", "settings.json"))
+atexit.register(_settings.flush)
+
+
 def _load_setting(key: str, default=None):
-    """Load a dotted key from data/settings.json."""
-    try:
-        settings_path = os.path.join(os.path.dirname(__file__), "data", "settings.json")
-        if os.path.exists(settings_path):
-            with open(settings_path, "r") as f:
-                settings = json.load(f)
-            parts = key.split(".")
-            obj = settings
-            for part in parts:
-                obj = obj.get(part, {})
-            return obj if obj != {} else default
-    except Exception:
-        pass
-    return default
+    """Load a dotted key from data/settings.json (served from memory)."""
+    return _settings.get(key, default)
 
 
 def _save_setting(key: str, value):
-    """Save a dotted key to data/settings.json."""
-    try:
-        settings_path = os.path.join(os.path.dirname(__file__), "data", "settings.json")
-        os.makedirs(os.path.dirname(settings_path), exist_ok=True)
-        settings = {}
-        if os.path.exists(settings_path):
-            with open(settings_path, "r", encoding="utf-8") as f:
-                settings = json.load(f)
-        parts = key.split(".")
-        obj = settings
-        for part in parts[:-1]:
-            obj = obj.setdefault(part, {})
-        obj[parts[-1]] = value
-        with open(settings_path, "w", encoding="utf-8") as f:
-            json.dump(settings, f, indent=2)
-    except Exception as e:
-        print(f"[settings] Save failed for {key}: {e}")
+    """Save a dotted key to data/settings.json (coalesced write-behind)."""
+    _settings.set(key, value)
 
 
 # ── Weather API ──────────────────────────────────────────────────────
@@ -2053,58 +2037,64 @@ def api_devices_refresh():
 
 # ── Chat Persistence ─────────────────────────────────────────────────
 
-# Recent chat buffer — kept in memory, served to frontend on refresh
-RECENT_CHAT_FILE = os.path.expanduser("~/bmo/data/recent_chat.json")
+# Recent chat buffer — append-only JSONL segments with an in-memory tail
+# window, served to the frontend on connect/refresh without touching disk
+RECENT_CHAT_DIR = os.path.expanduser("~/bmo/data/recent_chat")
+RECENT_CHAT_FILE = os.path.expanduser("~/bmo/data/recent_chat.json")  # Legacy, migrated once
 _MAX_RECENT = 200  # Rolling buffer of recent messages
 
-# DnD session log — permanently saved to its own file
+# DnD session log — permanently saved, one JSONL file per day
 DND_LOG_DIR = os.path.expanduser("~/bmo/data/dnd_sessions")
 
+_log_writer = JsonlWriter()
+_recent_log = MessageLog(RECENT_CHAT_DIR, prefix="chat", tail_size=_MAX_RECENT,
+                         writer=_log_writer, legacy_file=RECENT_CHAT_FILE)
+
 
 def _load_recent_chat() -> list[dict]:
-    """Load the recent chat buffer from disk."""
+    """Return the recent chat buffer (served from memory)."""
+    return _recent_log.tail()
+
+
+def _save_recent_message(msg: dict):
+    """Append a message to the recent chat buffer (rolling, all chats)."""
     try:
-        if os.path.exists(RECENT_CHAT_FILE):
-            with open(RECENT_CHAT_FILE, encoding="utf-8") as f:
-                return json.load(f)
+        _recent_log.append(msg)
     except Exception as e:
-        print(f"[chat] Failed to load recent chat: {e}")
-    return []
+        print(f"[chat] Failed to save recent chat: {e}")
 
 
-_chat_lock = threading.Lock()
+def _dnd_session_base(date_str: str) -> str:
+    """Path (without extension) of the DnD session log for a given day."""
+    return os.path.join(DND_LOG_DIR, f"session_{date_str}")
+
+
+def _list_dnd_session_dates() -> list[str]:
+    """Dates with a saved DnD session log (legacy .json or .jsonl), newest first."""
+    if not os.path.isdir(DND_LOG_DIR):
+        return []
+    dates = set()
+    for fname in os.listdir(DND_LOG_DIR):
+        if fname.startswith("session_") and fname.endswith((".json", ".jsonl")):
+            dates.add(fname[len("session_"):].rsplit(".", 1)[0])
+    return sorted(dates, reverse=True)
 
-def _save_recent_message(msg: dict):
-    """Append a message to the recent chat buffer (rolling, all chats)."""
-    with _chat_lock:
-        try:
-            messages = _load_recent_chat()
-            messages.append(msg)
-            if len(messages) > _MAX_RECENT:
-                messages = messages[-_MAX_RECENT:]
-            os.makedirs(os.path.dirname(RECENT_CHAT_FILE), exist_ok=True)
-            with open(RECENT_CHAT_FILE, "w", encoding="utf-8") as f:
-                json.dump(messages, f, ensure_ascii=False)
-        except Exception as e:
-            print(f"[chat] Failed to save recent chat: {e}")
+
+_dnd_log_path = None
 
 
 def _save_dnd_message(msg: dict):
     """Append a message to the permanent DnD session log."""
-    os.makedirs(DND_LOG_DIR, exist_ok=True)
+    global _dnd_log_path
     # One file per day so sessions are easy to find
-    date_str = time.strftime("%Y-%m-%d")
-    log_file = os.path.join(DND_LOG_DIR, f"session_{date_str}.json")
-    messages = []
+    path = _dnd_session_base(time.strftime("%Y-%m-%d")) + ".jsonl"
     try:
-        if os.path.exists(log_file):
-            with open(log_file, encoding="utf-8") as f:
-                messages = json.load(f)
-    except Exception:
-        messages = []
-    messages.append(msg)
-    with open(log_file, "w", encoding="utf-8") as f:
-        json.dump(messages, f, ensure_ascii=False)
+        if _dnd_log_path and _dnd_log_path != path:
+            _log_writer.close(_dnd_log_path)  # Day rolled over
+        _dnd_log_path = path
+        _log_writer.append(path, msg)
+    except Exception as e:
+        print(f"[chat] Failed to save DnD message: {e}")
 
 
 def _save_chat_message(msg: dict):
@@ -2179,32 +2169,21 @@ def api_chat_clear():
         try:
             recent = _load_recent_chat()
             if recent:
-                # Write the full session as one batch (avoids duplicates from per-message saves)
-                os.makedirs(DND_LOG_DIR, exist_ok=True)
+                # Append only messages not already logged (per-message saves
+                # during the session usually cover most of them)
                 date_str = time.strftime("%Y-%m-%d")
-                log_file = os.path.join(DND_LOG_DIR, f"session_{date_str}.json")
-                # Merge with any existing messages for today
-                existing = []
-                try:
-                    if os.path.exists(log_file):
-                        with open(log_file, encoding="utf-8") as f:
-                            existing = json.load(f)
-                except Exception:
-                    pass
-                # Deduplicate by timestamp
-                existing_ts = {m.get("ts") for m in existing if m.get("ts")}
+                existing_ts = {m.get("ts") for m in read_messages(_dnd_session_base(date_str)) if m.get("ts")}
                 new_msgs = [m for m in recent if m.get("ts") not in existing_ts]
-                combined = existing + new_msgs
-                with open(log_file, "w", encoding="utf-8") as f:
-                    json.dump(combined, f, ensure_ascii=False)
+                for m in new_msgs:
+                    _log_writer.append(_dnd_session_base(date_str) + ".jsonl", m)
+                _log_writer.sync()
                 print(f"[chat] Saved {len(new_msgs)} new messages to DnD session log")
         except Exception as e:
             print(f"[chat] Failed to save DnD session on clear: {e}")
 
     # Clear the recent chat buffer
     try:
-        if os.path.exists(RECENT_CHAT_FILE):
-            os.remove(RECENT_CHAT_FILE)
+        _recent_log.clear()
     except Exception:
         pass
 
@@ -2390,11 +2369,13 @@ def api_list_clear(name):
 
 @app.route("/api/alerts/history")
 def api_alerts_history():
-    """Get recent alert history."""
+    """Get recent alert history. Query: limit, source, priority."""
     if not alert_service:
         return jsonify({"error": "Alert service not available"}), 503
     limit = request.args.get("limit", 50, type=int)
-    return jsonify({"alerts": alert_service.get_history(limit)})
+    return jsonify({"alerts": alert_service.get_history(
+        limit, source=request.args.get("source"), priority=request.args.get("priority"),
+    )})
 
 
 @app.route("/api/alerts/config")
@@ -3421,6 +3402,11 @@ def on_connect(auth=None):
                 socketio.emit("recent_alerts", recent)
     except Exception as e:
         print(f"[ws] Alerts init failed: {e}")
+    try:
+        from flask_socketio import emit
+        emit("chat_history", _load_recent_chat())
+    except Exception as e:
+        print(f"[ws] Chat history init failed: {e}")
 
 
 def _finish_chat_response(sid, result, model_override, voice, speaker):
@@ -3482,6 +3468,8 @@ def on_chat_message(data):
     speaker = data.get("speaker", "unknown")
     agent_override = data.get("agent")
     model_override = data.get("model")
+    if personality_engine:
+        personality_engine.mark_activity()
 
     try:
         user_msg = {"role": "user", "text": message, "speaker": speaker, "ts": time.time()}
@@ -3584,9 +3572,9 @@ def on_scratchpad_clear(data):
 @socketio.on("disconnect")
 def on_disconnect():
     print("[ws] Client disconnected")
-    # Clean up terminal sessions for this client
+    # Keep terminal sessions briefly so a reconnecting client can re-attach
     if _terminal_mgr:
-        _terminal_mgr.close_all(request.sid)
+        _terminal_mgr.detach_all(request.sid)
     # Clean up Windows proxy if this was the proxy client
     global _win_proxy_sid
     if request.sid == _win_proxy_sid:
@@ -4626,13 +4614,45 @@ def on_terminal_open(data):
     sid = request.sid
     mgr = _get_terminal_mgr()
 
-    def _output_cb(tid, raw_data):
+    session = mgr.open_terminal(sid, term_id, cols, rows, _terminal_output_cb(sid))
+    socketio.emit("terminal_opened", {"term_id": term_id, "attach_key": session.attach_key}, room=sid)
+
+
+def _terminal_output_cb(sid):
+    """Build the PTY output callback that emits batches to one client."""
+    def _output_cb(tid, text, seq, reset):
         socketio.emit("terminal_output", {
             "term_id": tid,
-            "data": raw_data.decode("utf-8", errors="replace"),
+            "data": text,
+            "seq": seq,
+            "reset": reset,
         }, room=sid)
+    return _output_cb
+
+
+@socketio.on("terminal_attach")
+def on_terminal_attach(data):
+    """Re-attach a terminal that survived a disconnect and replay its scrollback."""
+    term_id = data.get("term_id", "term-1")
+    sid = request.sid
+    mgr = _get_terminal_mgr()
+    session = mgr.attach(sid, term_id, data.get("attach_key", ""), _terminal_output_cb(sid))
+    if not session:
+        socketio.emit("terminal_closed", {"term_id": term_id}, room=sid)
+
 
-    mgr.open_terminal(sid, term_id, cols, rows, _output_cb)
+@socketio.on("terminal_ack")
+def on_terminal_ack(data):
+    """Client rendered terminal output up to a sequence number (flow control)."""
+    if not isinstance(data, dict):
+        return
+    seq = data.get("seq")
+    if not isinstance(seq, int) or isinstance(seq, bool) or seq < 0:
+        return   # Malformed ack; the next good one catches up
+    mgr = _get_terminal_mgr()
+    session = mgr.get_session(request.sid, data.get("term_id", "term-1"))
+    if session:
+        session.ack(seq)
 
 
 @socketio.on("terminal_input")
@@ -1,21 +1,29 @@
 """Audio output routing service for BMO.
 
-Uses PipeWire/WirePlumber (wpctl) for device enumeration and switching.
+Device enumeration reads an in-memory PipeWire graph kept current by
+pw-dump --monitor (see pipewire_graph.py); switching uses wpctl and pactl.
 Supports per-function audio routing and Bluetooth device management.
 """
 
 import json
 import os
 import re
+import shlex
 import subprocess
 import threading
 import time
 
+from bluetooth_manager import STEP_TIMEOUTS, BluetoothJob, BluetoothManager
+from pipewire_graph import PipeWireGraph
+
 SETTINGS_PATH = os.path.join(os.path.dirname(__file__), "data", "settings.json")
 
 # Audio function categories that can be independently routed
 AUDIO_FUNCTIONS = ["music", "voice", "effects", "notifications", "all"]
 
+BT_SINK_TIMEOUT = 10.0   # Wait for the A2DP sink after connecting
+BT_SINK_POLL = 0.25
+
 
 def _run(cmd: list[str], timeout: int = 10) -> tuple[int, str, str]:
     """Run a shell command, return (returncode, stdout, stderr)."""
@@ -50,10 +58,15 @@ class AudioDevice:
 class AudioOutputService:
     """Manages audio output routing via PipeWire/WirePlumber."""
 
-    def __init__(self):
+    def __init__(self, socketio=None):
+        self.socketio = socketio
         self._lock = threading.Lock()
         self._pw_procs: list[subprocess.Popen] = []
         self._ensure_pipewire()
+        # Nodes, links and defaults mirrored from a long-lived pw-dump --monitor
+        self._graph = PipeWireGraph().start()
+        # Persistent bluetoothctl session; scan/pair run as background jobs
+        self.bluetooth = BluetoothManager(emit=self._emit)
         # Per-function device assignments: function -> pw_id
         self._routing: dict[str, int | None] = {}
         # Per-function device descriptions for resolving across reboots
@@ -114,66 +127,21 @@ class AudioOutputService:
 
     def list_sinks(self) -> list[AudioDevice]:
         """List active audio output devices (sinks only, no disconnected)."""
-        rc, out, _ = _run(["wpctl", "status"])
-        if rc != 0:
-            return []
-        return self._parse_sinks(out)
+        return self._devices("Audio/Sink", "sink")
 
     def list_sources(self) -> list[AudioDevice]:
         """List active audio input devices (sources)."""
-        rc, out, _ = _run(["wpctl", "status"])
-        if rc != 0:
-            return []
-        return self._parse_sources(out)
-
-    def _parse_sinks(self, wpctl_output: str) -> list[AudioDevice]:
-        """Parse wpctl status output for active sinks."""
-        return self._parse_section(wpctl_output, "Sinks:")
-
-    def _parse_sources(self, wpctl_output: str) -> list[AudioDevice]:
-        """Parse wpctl status output for active sources."""
-        return self._parse_section(wpctl_output, "Sources:")
+        return self._devices("Audio/Source", "source")
 
-    def _parse_section(self, output: str, section_header: str) -> list[AudioDevice]:
-        """Parse a section of wpctl status output for devices."""
+    def _devices(self, media_class: str, kind: str) -> list[AudioDevice]:
+        """Build AudioDevices from the cached graph's nodes of one media.class."""
+        default = self._graph.default_name(kind)
         devices = []
-        lines = output.split("\n")
-        in_audio = False
-        in_section = False
-
-        for line in lines:
-            stripped = line.strip()
-            # Strip tree-drawing characters (│├└─ and spaces)
-            clean = re.sub(r'^[│├└─\s]+', '', stripped)
-
-            if clean.startswith("Audio"):
-                in_audio = True
-                continue
-            if in_audio and clean.startswith("Video"):
-                break
-            if in_audio and clean == section_header:
-                in_section = True
-                continue
-            if in_section:
-                # End of section: next header like "Sources:", "Filters:", "Streams:"
-                if clean and clean.endswith(":") and not any(c.isdigit() for c in clean.rstrip(":")):
-                    in_section = False
-                    continue
-                # Empty or tree-only lines
-                if not clean:
-                    continue
-
-                # Match: "*   78. Built-in Audio Digital Stereo (HDMI) [vol: 1.00]"
-                #    or: "    79. Some Device [vol: 0.50]"
-                match = re.match(r'(\*)?\s*(\d+)\.\s+(.+?)(?:\s+\[vol:.*\])?\s*$', clean)
-                if match:
-                    is_default = match.group(1) == "*"
-                    pw_id = int(match.group(2))
-                    desc = match.group(3).strip()
-                    if desc.lower().startswith("default"):
-                        continue
-                    devices.append(AudioDevice(pw_id, f"sink_{pw_id}", desc, is_default))
-
+        for node in self._graph.nodes(media_class):
+            props = node["info"].get("props", {})
+            name = props.get("node.name", f"{kind}_{node['id']}")
+            desc = props.get("node.description") or props.get("node.nick") or name
+            devices.append(AudioDevice(node["id"], name, desc, name == default))
         return devices
 
     def get_default_sink(self) -> AudioDevice | None:
@@ -200,6 +168,7 @@ class AudioOutputService:
         if rc != 0:
             print(f"[audio] Failed to set default sink {pw_id}: {err}")
             return False
+        self._note_default("sink", pw_id)
         print(f"[audio] Default output set to device {pw_id}")
         return True
 
@@ -209,41 +178,44 @@ class AudioOutputService:
         if rc != 0:
             print(f"[audio] Failed to set default source {pw_id}: {err}")
             return False
+        self._note_default("source", pw_id)
         print(f"[audio] Default input set to device {pw_id}")
         return True
 
+    def _note_default(self, kind: str, pw_id: int):
+        """Update the cached default now rather than waiting for the monitor's echo."""
+        name = self._graph.node_name(pw_id)
+        if name:
+            self._graph.set_default_name(kind, name)
+
     def set_function_output(self, function: str, pw_id: int) -> bool:
         """Route a specific function's audio to a device.
 
-        Sets the system default AND moves active streams to the target sink.
+        Sets the system default AND moves active streams to the target sink,
+        in one shell invocation.
         """
+        if function not in AUDIO_FUNCTIONS:
+            print(f"[audio] Unknown function: {function}")
+            return False
+
         # Look up device description for persistent storage
         desc = None
         sink_name = None
         for sink in self.list_sinks():
             if sink.pw_id == pw_id:
                 desc = sink.description
-                sink_name = self._get_sink_node_name(pw_id)
+                sink_name = sink.name
                 break
 
+        success = self._route_to(pw_id, sink_name)
         if function == "all":
-            success = self.set_default_output(pw_id)
             if success:
-                self._move_all_streams(pw_id, sink_name)
                 with self._lock:
                     self._routing = {f: pw_id for f in AUDIO_FUNCTIONS if f != "all"}
                     self._routing_desc = {f: desc for f in AUDIO_FUNCTIONS if f != "all"}
                     self._save_routing()
             return success
 
-        if function not in AUDIO_FUNCTIONS:
-            print(f"[audio] Unknown function: {function}")
-            return False
-
-        # Set as default and move streams so it takes effect immediately
-        self.set_default_output(pw_id)
-        self._move_all_streams(pw_id, sink_name)
-
         with self._lock:
             self._routing[function] = pw_id
             self._routing_desc[function] = desc
@@ -253,48 +225,48 @@ class AudioOutputService:
 
     def _get_sink_node_name(self, pw_id: int) -> str | None:
         """Get the PipeWire node.name for a sink (used by pactl)."""
-        try:
-            rc, out, _ = _run(["pw-dump"], timeout=5)
-            if rc != 0:
-                return None
-            import json as _json
-            nodes = _json.loads(out)
-            for n in nodes:
-                if n.get("id") == pw_id and n.get("type") == "PipeWire:Interface:Node":
-                    return n.get("info", {}).get("props", {}).get("node.name")
-        except Exception:
-            pass
-        return None
-
-    def _move_all_streams(self, pw_id: int, sink_name: str | None):
-        """Move all active playback streams to the target sink via pactl."""
+        return self._graph.node_name(pw_id)
+
+    def _stream_move_commands(self, sink_name: str) -> list[str]:
+        """pactl moves for every playback stream not already on ``sink_name``."""
+        sink_ids = {n["id"] for n in self._graph.nodes("Audio/Sink")
+                    if n["info"].get("props", {}).get("node.name") == sink_name}
+        targets = {}   # stream node id → node id it plays into
+        for link in self._graph.links():
+            info = link.get("info") or {}
+            targets[info.get("output-node-id")] = info.get("input-node-id")
+
+        cmds = []
+        for stream in self._graph.nodes("Stream/Output/Audio"):
+            if targets.get(stream["id"]) in sink_ids:
+                continue
+            # pipewire-pulse indexes sink-inputs by object.serial
+            index = stream["info"].get("props", {}).get("object.serial", stream["id"])
+            cmds.append(f"pactl move-sink-input {int(index)} {shlex.quote(sink_name)}"
+                        f" || echo 'move of stream {int(index)} failed' >&2")
+        return cmds
+
+    def _route_to(self, pw_id: int, sink_name: str | None) -> bool:
+        """Set the default sink and move active streams with a single command."""
         if not sink_name:
             sink_name = self._get_sink_node_name(pw_id)
-        if not sink_name:
+        script = [f"wpctl set-default {int(pw_id)}"]
+        if sink_name:
+            script += self._stream_move_commands(sink_name)
+        else:
             print(f"[audio] Cannot resolve sink name for pw_id {pw_id}")
-            return
-
-        env = os.environ.copy()
-        env["XDG_RUNTIME_DIR"] = "/run/user/1000"
-        try:
-            r = subprocess.run(
-                ["pactl", "list", "sink-inputs", "short"],
-                capture_output=True, text=True, timeout=5, env=env,
-            )
-            if r.returncode != 0:
-                print(f"[audio] pactl list failed: {r.stderr}")
-                return
-            for line in r.stdout.strip().split("\n"):
-                if not line.strip():
-                    continue
-                stream_idx = line.split()[0]
-                rc, _, err = _run(["pactl", "move-sink-input", stream_idx, sink_name])
-                if rc == 0:
-                    print(f"[audio] Moved stream {stream_idx} → {sink_name}")
-                else:
-                    print(f"[audio] Failed to move stream {stream_idx}: {err}")
-        except Exception as e:
-            print(f"[audio] Stream move failed: {e}")
+        # Moves run even if one fails; the exit status is set-default's
+        rc, _, err = _run(["sh", "-c", f"{script[0]} || exit 1; " + "; ".join(script[1:] + ["true"])])
+        if rc != 0:
+            print(f"[audio] Failed to set default sink {pw_id}: {err}")
+            return False
+        if err.strip():
+            print(f"[audio] {err.strip()}")
+        if sink_name:
+            self._graph.set_default_name("sink", sink_name)
+        print(f"[audio] Default output set to device {pw_id}"
+              + (f", moved {len(script) - 1} stream(s) → {sink_name}" if len(script) > 1 else ""))
+        return True
 
     def get_function_output(self, function: str) -> int | None:
         """Get the device ID assigned to a function, or None for system default."""
@@ -322,145 +294,56 @@ class AudioOutputService:
 
     # ── Bluetooth ───────────────────────────────────────────────────
 
+    def bluetooth_scan_async(self, duration: int = 10) -> BluetoothJob:
+        """Start a scan; devices stream as ``bt_device`` and the list as ``bt_scan_result``."""
+        job = self.bluetooth.scan(min(duration, 15))
+        job.add_done_callback(lambda j: self._emit("bt_scan_result", {"devices": j.result or []}))
+        return job
+
     def bluetooth_scan(self, duration: int = 10) -> list[dict]:
         """Scan for Bluetooth audio devices. Returns list of {address, name}."""
-        import subprocess as sp
-        env = os.environ.copy()
-        env["XDG_RUNTIME_DIR"] = "/run/user/1000"
-        env["DBUS_SESSION_BUS_ADDRESS"] = "unix:path=/run/user/1000/bus"
-
-        # Run scan in a persistent bluetoothctl process and parse results in-session
-        try:
-            proc = sp.Popen(
-                ["bluetoothctl"],
-                stdin=sp.PIPE, stdout=sp.PIPE, stderr=sp.PIPE,
-                text=True, env=env,
-            )
-            proc.stdin.write("power on\n")
-            proc.stdin.flush()
-            time.sleep(0.5)
-            proc.stdin.write("scan on\n")
-            proc.stdin.flush()
-            time.sleep(min(duration, 15))
-            # Ask for device list inside the same session that ran the scan
-            proc.stdin.write("devices\n")
-            proc.stdin.flush()
-            time.sleep(1)
-            proc.stdin.write("scan off\n")
-            proc.stdin.flush()
-            time.sleep(0.5)
-            proc.stdin.write("quit\n")
-            proc.stdin.flush()
-            out, _ = proc.communicate(timeout=5)
-        except Exception as e:
-            print(f"[bt] Scan process error: {e}")
-            try:
-                proc.kill()
-            except Exception:
-                pass
-            return []
+        job = self.bluetooth_scan_async(duration)
+        job.wait(min(duration, 15) + 5)
+        return job.result or []
 
-        # Parse "Device XX:XX:XX:XX:XX:XX Name" lines (not [NEW]/[CHG] lines)
-        devices = []
-        seen = set()
-        for line in out.split("\n"):
-            line = line.strip()
-            # Match plain "Device" lines (from the `devices` command), not [NEW]/[CHG]
-            if line.startswith("Device "):
-                match = re.match(r"Device\s+([0-9A-Fa-f:]+)\s+(.+)", line)
-                if match:
-                    addr = match.group(1)
-                    name = match.group(2).strip()
-                    if addr in seen:
-                        continue
-                    seen.add(addr)
-                    # Skip unresolved: name is MAC with dashes (e.g. 02-71-88-FB-A6-B3)
-                    if re.fullmatch(r"[0-9A-Fa-f]{2}(-[0-9A-Fa-f]{2}){5}", name):
-                        continue
-                    # Skip if name is just the MAC with colons
-                    if name.upper() == addr.upper():
-                        continue
-                    devices.append({"address": addr, "name": name})
-        print(f"[bt] Scan found {len(devices)} named devices")
-        return devices
-
-    def bluetooth_pair(self, address: str) -> tuple[bool, str]:
-        """Pair and connect to a Bluetooth device with proper A2DP negotiation.
+    def bluetooth_pair_async(self, address: str) -> BluetoothJob:
+        """Start pairing; progress arrives as ``bt_job`` and the outcome as ``bt_pair_result``.
 
-        Uses a single persistent bluetoothctl session to maintain state during
-        the pair→trust→connect flow, which is required for A2DP transport setup.
+        Once connected, the device's A2DP sink becomes the default output.
         """
-        import subprocess as _sp
-        import time as _t
-
-        env = os.environ.copy()
-        env["XDG_RUNTIME_DIR"] = "/run/user/1000"
-        env["DBUS_SESSION_BUS_ADDRESS"] = "unix:path=/run/user/1000/bus"
+        job = self.bluetooth.pair(address)
 
-        try:
-            proc = _sp.Popen(
-                ["bluetoothctl"],
-                stdin=_sp.PIPE, stdout=_sp.PIPE, stderr=_sp.PIPE,
-                text=True, env=env,
-            )
-            # Power on
-            proc.stdin.write("power on\n")
-            proc.stdin.flush()
-            _t.sleep(0.5)
-
-            # Remove stale pairing for fresh A2DP negotiation
-            proc.stdin.write(f"remove {address}\n")
-            proc.stdin.flush()
-            _t.sleep(1)
-
-            # Scan to re-discover the device
-            proc.stdin.write("scan on\n")
-            proc.stdin.flush()
-            _t.sleep(8)  # give enough time to discover
-
-            # Pair + trust + connect in the same session
-            proc.stdin.write(f"pair {address}\n")
-            proc.stdin.flush()
-            _t.sleep(5)
-
-            proc.stdin.write(f"trust {address}\n")
-            proc.stdin.flush()
-            _t.sleep(1)
-
-            proc.stdin.write("scan off\n")
-            proc.stdin.flush()
-            _t.sleep(0.5)
-
-            proc.stdin.write(f"connect {address}\n")
-            proc.stdin.flush()
-            _t.sleep(5)
-
-            proc.stdin.write("quit\n")
-            proc.stdin.flush()
-            out, _ = proc.communicate(timeout=5)
-        except Exception as e:
-            print(f"[bt] Pair session error: {e}")
-            try:
-                proc.kill()
-            except Exception:
-                pass
-            return False, f"Pair failed: {e}"
-
-        # Check for errors in output
-        out_lower = out.lower() if out else ""
-        if "not available" in out_lower and "already exists" not in out_lower:
-            return False, "Device not available — make sure it's nearby and in pairing mode"
+        def _connected(j):
+            if j.ok:
+                self._select_bluetooth_sink(address, (j.result or {}).get("name"))
+            self._emit("bt_pair_result", {"address": address, "ok": j.ok, "message": j.message})
+        job.add_done_callback(_connected)
+        return job
 
-        # Wait for PipeWire to register the new BT A2DP sink
-        _t.sleep(5)
-        for sink in self.list_sinks():
-            if address.replace(":", "_").upper() in sink.name.upper() or \
-               (sink.description and sink.description not in ("Built-in Audio Digital Stereo (HDMI)", "")):
-                self.set_default_output(sink.pw_id)
-                print(f"[audio] Auto-set BT device {sink.description} (id={sink.pw_id}) as default")
-                break
-
-        return True, f"Connected to {address}"
+    def bluetooth_pair(self, address: str) -> tuple[bool, str]:
+        """Pair and connect to a Bluetooth device, returning once it is connected."""
+        job = self.bluetooth_pair_async(address)
+        job.wait(sum(STEP_TIMEOUTS.values()) + BT_SINK_TIMEOUT)
+        if job.ok is None:
+            return False, "Pairing is still in progress"
+        return job.ok, job.message
+
+    def _select_bluetooth_sink(self, address: str, name: str | None):
+        """Wait for PipeWire to expose the device's sink, then make it the default."""
+        key = address.replace(":", "_").upper()
+        deadline = time.monotonic() + BT_SINK_TIMEOUT
+        while time.monotonic() < deadline:
+            for sink in self.list_sinks():
+                if key in sink.name.upper() or (name and sink.description == name):
+                    self.set_default_output(sink.pw_id)
+                    print(f"[audio] Auto-set BT device {sink.description} (id={sink.pw_id}) as default")
+                    return
+            time.sleep(BT_SINK_POLL)
+        print(f"[audio] No PipeWire sink appeared for {address}")
+
+    def _emit(self, event: str, payload: dict):
+        if self.socketio:
+            self.socketio.emit(event, payload)
 
     def bluetooth_disconnect(self, address: str) -> tuple[bool, str]:
         """Disconnect a Bluetooth device."""
@@ -5,9 +5,10 @@ with identical prompts. Measures timestamps for each stage.
 No audio playback — just timing.
 """
 import time, os, sys, json
-sys.path.insert(0, '/home/patrick/bmo')
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _SCRIPT_DIR)
 from dotenv import load_dotenv
-load_dotenv('/home/patrick/bmo/.env')
+load_dotenv(os.path.join(_SCRIPT_DIR, '.env'))
 
 import cloud_providers
 cloud_providers.GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
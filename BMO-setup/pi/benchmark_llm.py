@@ -1,8 +1,9 @@
 """Benchmark LLM streaming vs non-streaming."""
 import time, os, sys
-sys.path.insert(0, '/home/patrick/bmo')
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _SCRIPT_DIR)
 from dotenv import load_dotenv
-load_dotenv('/home/patrick/bmo/.env')
+load_dotenv(os.path.join(_SCRIPT_DIR, '.env'))
 
 import cloud_providers
 cloud_providers.GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
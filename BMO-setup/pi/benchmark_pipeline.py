@@ -0,0 +1,611 @@
+"""Offline end-to-end voice pipeline benchmark (record/replay).
+
+Runs real BMO code — VoicePipeline._process_one_turn() driving BmoAgent's
+streaming chat — against a local fake provider server instead of Groq,
+Gemini and Fish Audio. The server replays recorded STT results, LLM stream
+chunks and TTS audio with a configurable latency profile, and timestamps
+every request, so the provider's own time can be subtracted. What is left
+is BMO's overhead, split by stage on the way to the first audio handoff:
+
+    wake    _process_one_turn() entered → recording requested
+    record  recording returned → transcribe() called (energy gate, VAD,
+            WAV write, speaker ID)
+    stt     transcribe() minus provider time (preprocess, curl, parsing,
+            hallucination filters)
+    route   transcript → LLM request received (dispatch, agent selection,
+            prompt build)
+    agent   LLM chunk sent → same chunk yielded to the voice pipeline
+            (curl, SSE parsing; includes Gemini's buffer-then-yield wait)
+    split   chunk yielded → first sentence queued for TTS
+    tts     sentence queued → TTS request received, plus TTS response
+            → playback handoff (worker pickup, batching, file write)
+
+Recording and playback are replaced by replay and a handoff recorder; Silero
+VAD still runs for its cost but cannot reject the synthetic utterance.
+
+Fixtures live in data/bench/replay_fixtures.json. ``--record`` refreshes
+their LLM chunks and latencies from the live APIs (needs API keys).
+
+Usage:
+    python benchmark_pipeline.py [--profile zero|typical|slow|recorded]
+                                 [--turns 5] [--out report.json]
+                                 [--baseline old.json] [--tolerance 0.2]
+    python benchmark_pipeline.py --record
+"""
+
+import argparse
+import bisect
+import datetime
+import io
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(_SCRIPT_DIR, "data", "bench", "replay_fixtures.json")
+
+STAGES = ("wake", "record", "stt", "route", "agent", "split", "tts")
+CHARS_PER_TOKEN = 4
+SAMPLE_RATE = 16000
+REGRESSION_FLOOR_MS = 5.0     # Ignore deltas smaller than this when comparing
+
+
+@dataclass
+class LatencyProfile:
+    """Simulated provider timing, in seconds (rates of 0 mean instant)."""
+    stt: float = 0.0
+    llm_ttft: float = 0.0
+    llm_tokens_per_s: float = 0.0
+    tts: float = 0.0
+    tts_chars_per_s: float = 0.0
+
+
+PROFILES = {
+    "zero": LatencyProfile(),
+    "typical": LatencyProfile(stt=0.35, llm_ttft=0.6, llm_tokens_per_s=150,
+                              tts=0.45, tts_chars_per_s=400),
+    "slow": LatencyProfile(stt=1.0, llm_ttft=1.5, llm_tokens_per_s=40,
+                           tts=1.2, tts_chars_per_s=150),
+}
+
+
+def load_fixtures(path: str = FIXTURES) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["scenarios"]
+
+
+def profile_for(name: str, scenario: dict) -> LatencyProfile:
+    """``recorded`` uses the latencies captured with the fixture."""
+    if name == "recorded":
+        return LatencyProfile(**scenario.get("latency", {}))
+    return PROFILES[name]
+
+
+def synth_utterance(seconds: float) -> bytes:
+    """Speech-like int16 PCM: a syllable-rate modulated tone between short pauses."""
+    n = int(seconds * SAMPLE_RATE)
+    pad = SAMPLE_RATE // 5
+    samples = bytearray(2 * (n + 2 * pad))
+    for i in range(n):
+        envelope = 0.5 + 0.5 * math.sin(2 * math.pi * 4 * i / SAMPLE_RATE)
+        value = int(6000 * envelope * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE))
+        samples[2 * (pad + i):2 * (pad + i) + 2] = value.to_bytes(2, "little", signed=True)
+    return bytes(samples)
+
+
+def silent_wav(seconds: float) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(b"\x00\x00" * int(seconds * SAMPLE_RATE))
+    return buf.getvalue()
+
+
+# ── Fake provider server ──────────────────────────────────────────────
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    server: "ReplayServer"
+    protocol_version = "HTTP/1.1"   # Answers curl's Expect: 100-continue instead of stalling it
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        arrival = time.perf_counter()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        path = self.path.split("?", 1)[0]
+        if path.endswith(":streamGenerateContent"):
+            self._llm_stream(arrival, lambda text: {
+                "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}],
+            })
+        elif path.endswith("/chat/completions") and json.loads(body or b"{}").get("stream"):
+            self._llm_stream(arrival, lambda text: {
+                "choices": [{"index": 0, "delta": {"content": text}}],
+            }, done=True)
+        elif path.endswith(":generateContent"):
+            self._llm_full(arrival, {"candidates": [{"content": {"parts": [
+                {"text": "".join(self.server.scenario["llm_chunks"])}]}}]})
+        elif path.endswith("/chat/completions"):
+            self._llm_full(arrival, {"choices": [{"message": {
+                "content": "".join(self.server.scenario["llm_chunks"])}}]})
+        elif path.endswith("/audio/transcriptions"):
+            self._stt(arrival)
+        elif path.endswith("/tts"):
+            self._tts(arrival, json.loads(body).get("text", ""))
+        else:
+            self.send_error(404)
+
+    def _reply(self, content_type: str, payload: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stt(self, arrival: float) -> None:
+        scenario, profile = self.server.scenario, self.server.profile
+        time.sleep(profile.stt)
+        self._reply("application/json", json.dumps({
+            "text": " " + scenario["utterance"],
+            "language": "en",
+            "duration": scenario.get("speech_seconds", 2.0),
+            "segments": [{"no_speech_probability": 0.01, "avg_logprob": -0.2}],
+        }).encode())
+        self.server.log("stt", arrival, end=time.perf_counter())
+
+    def _llm_full(self, arrival: float, payload: dict) -> None:
+        profile = self.server.profile
+        chars = sum(len(c) for c in self.server.scenario["llm_chunks"])
+        time.sleep(profile.llm_ttft + self._token_time(chars))
+        self._reply("application/json", json.dumps(payload).encode())
+        self.server.log("llm", arrival, end=time.perf_counter())
+
+    def _llm_stream(self, arrival: float, event, done: bool = False) -> None:
+        profile = self.server.profile
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        sent = []
+        chars = 0
+        for chunk in self.server.scenario["llm_chunks"]:
+            chars += len(chunk)
+            due = arrival + profile.llm_ttft + self._token_time(chars)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self.wfile.write(b"data: " + json.dumps(event(chunk)).encode() + b"\r\n\r\n")
+            self.wfile.flush()
+            sent.append(time.perf_counter())
+        if done:
+            self.wfile.write(b"data: [DONE]\r\n\r\n")
+        self.server.log("llm", arrival, end=time.perf_counter(), sent=sent)
+
+    def _token_time(self, chars: int) -> float:
+        rate = self.server.profile.llm_tokens_per_s
+        return chars / CHARS_PER_TOKEN / rate if rate else 0.0
+
+    def _tts(self, arrival: float, text: str) -> None:
+        profile = self.server.profile
+        rate = profile.tts_chars_per_s
+        time.sleep(profile.tts + (len(text) / rate if rate else 0.0))
+        self._reply("audio/ogg", silent_wav(len(text) / 15))
+        self.server.log("tts", arrival, end=time.perf_counter())
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Local stand-in for Groq, Gemini and Fish Audio that replays one scenario."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _ReplayHandler)
+        self.scenario: dict = {}
+        self.profile = LatencyProfile()
+        self._events: list[dict] = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def start(self) -> "ReplayServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def begin(self, scenario: dict, profile: LatencyProfile) -> None:
+        with self._lock:
+            self.scenario = scenario
+            self.profile = profile
+            self._events = []
+
+    def log(self, kind: str, arrival: float, **fields) -> None:
+        with self._lock:
+            self._events.append({"kind": kind, "arrival": arrival, **fields})
+
+    def events(self, kind: str) -> list[dict]:
+        with self._lock:
+            return sorted((e for e in self._events if e["kind"] == kind), key=lambda e: e["arrival"])
+
+    def point_providers_here(self) -> None:
+        """Redirect cloud_providers' base URLs to this server."""
+        import cloud_providers
+
+        cloud_providers.GEMINI_BASE = self.base_url + "/gemini/v1beta"
+        cloud_providers.GROQ_BASE = self.base_url + "/groq/openai/v1"
+        cloud_providers.FISH_AUDIO_BASE = self.base_url + "/fish/v1"
+        for key in ("GEMINI_API_KEY", "GROQ_API_KEY", "FISH_AUDIO_API_KEY"):
+            setattr(cloud_providers, key, getattr(cloud_providers, key) or "replay")
+
+
+# ── Harness ───────────────────────────────────────────────────────────
+
+
+def _sounddevice_stub():
+    """A ``sounddevice`` module whose every function raises OSError (no devices)."""
+    import types
+
+    stub = types.ModuleType("sounddevice")
+
+    def __getattr__(name):
+        def unavailable(*args, **kwargs):
+            raise OSError(f"sounddevice.{name}: no audio devices in the benchmark")
+        return unavailable
+
+    stub.__getattr__ = __getattr__
+    return stub
+
+
+class PipelineHarness:
+    """Drives one VoicePipeline turn per scenario and splits the time by stage."""
+
+    def __init__(self, server: ReplayServer):
+        import queue
+
+        import numpy as np
+
+        # Recording and playback are replayed, so the pipeline never needs
+        # PortAudio; the stub keeps voice_pipeline importable without it
+        sys.modules.setdefault("sounddevice", _sounddevice_stub())
+        import agent as agent_mod
+        import voice_pipeline
+
+        self.server = server
+        self._np = np
+        self._tmp = tempfile.mkdtemp(prefix="bmo-bench-")
+        server.point_providers_here()
+
+        # Keep the benchmark away from the real TTS cache, voice profiles
+        # and the cloud reachability probe
+        voice_pipeline.TTS_CACHE_DIR = self._tmp
+        voice_pipeline.VOICE_PROFILES_PATH = os.path.join(self._tmp, "voice_profiles.pkl")
+        voice_pipeline._check_cloud = lambda: True
+        agent_mod._cloud_available = True
+        agent_mod._cloud_last_check = float("inf")
+
+        self.agent = agent_mod.BmoAgent()
+        pipe = self.pipe = voice_pipeline.VoicePipeline()
+        pipe._stt_provider = "groq"
+        pipe._tts_provider = "fish"
+        pipe._tts_output_mode = "pi"
+
+        marks = self._marks = {}
+        harness = self
+
+        class _TimedQueue(queue.Queue):
+            def put(self, item, block=True, timeout=None):
+                if item is not None:
+                    marks.setdefault("queued", time.perf_counter())
+                super().put(item, block, timeout)
+
+        pipe._tts_queue = _TimedQueue()
+
+        def record_until_silence():
+            marks["record_call"] = time.perf_counter()
+            return np.frombuffer(harness._pcm, dtype=np.int16).copy()
+
+        transcribe = pipe.transcribe
+
+        def timed_transcribe(path):
+            marks["stt_call"] = time.perf_counter()
+            try:
+                return transcribe(path)
+            finally:
+                marks["stt_return"] = time.perf_counter()
+
+        silero = pipe._silero_check_speech
+
+        def silero_check(audio):
+            silero(audio)
+            return 1.0
+
+        def chat_stream(text, speaker="unknown"):
+            for chunk in self.agent.chat_stream(text, speaker=speaker):
+                harness._yields.append(time.perf_counter())
+                yield chunk
+
+        def play_audio(path):
+            harness._handoffs.append((time.perf_counter(), os.path.getsize(path)))
+
+        pipe.record_until_silence = record_until_silence
+        pipe.transcribe = timed_transcribe
+        pipe._silero_check_speech = silero_check
+        pipe._chat_stream_callback = chat_stream
+        pipe._chat_callback = lambda text, speaker: self.agent.chat(text, speaker=speaker).get("text", "")
+        pipe._play_audio = play_audio
+
+    def run_turn(self, scenario: dict, profile: LatencyProfile) -> dict:
+        self.server.begin(scenario, profile)
+        self._pcm = scenario.get("_pcm") or synth_utterance(scenario.get("speech_seconds", 2.0))
+        self._marks.clear()
+        self._yields: list[float] = []
+        self._handoffs: list[tuple[float, int]] = []
+        self.agent.conversation_history = []
+
+        start = time.perf_counter()
+        response = self.pipe._process_one_turn()
+        end = time.perf_counter()
+        if not response or not self._handoffs:
+            raise RuntimeError(f"turn '{scenario['name']}' produced no audio (response={response!r})")
+        return self._stages(start, end)
+
+    def _stages(self, start: float, end: float) -> dict:
+        m = self._marks
+        stt = self.server.events("stt")[0]
+        llm = self.server.events("llm")[0]
+        tts = self.server.events("tts")[0]
+        handoff = self._handoffs[0][0]
+
+        # The chunk that completed the first sentence is the last one yielded
+        # before the sentence was queued
+        k = max(0, bisect.bisect_right(self._yields, m["queued"]) - 1)
+        chunk_sent = llm["sent"][k]
+        provider = (stt["end"] - stt["arrival"]) + (chunk_sent - llm["arrival"]) + (tts["end"] - tts["arrival"])
+
+        stages = {
+            "wake": m["record_call"] - start,
+            "record": m["stt_call"] - m["record_call"],
+            "stt": (m["stt_return"] - m["stt_call"]) - (stt["end"] - stt["arrival"]),
+            "route": llm["arrival"] - m["stt_return"],
+            "agent": self._yields[k] - chunk_sent,
+            "split": m["queued"] - self._yields[k],
+            "tts": (tts["arrival"] - m["queued"]) + (handoff - tts["end"]),
+        }
+        return {
+            **{name: value * 1000 for name, value in stages.items()},
+            "overhead": sum(stages.values()) * 1000,
+            "provider": provider * 1000,
+            "first_audio": (handoff - start) * 1000,
+            "turn_total": (end - start) * 1000,
+            "handoffs": len(self._handoffs),
+        }
+
+    def close(self) -> None:
+        import shutil
+
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+# ── Reporting ─────────────────────────────────────────────────────────
+
+
+METRICS = STAGES + ("overhead", "provider", "first_audio", "turn_total")
+
+
+def summarize(samples: list[dict]) -> dict:
+    out = {}
+    for metric in METRICS:
+        values = sorted(s[metric] for s in samples)
+        out[metric] = {
+            "median": round(statistics.median(values), 2),
+            "p90": round(values[min(len(values) - 1, int(len(values) * 0.9))], 2),
+            "min": round(values[0], 2),
+        }
+    return out
+
+
+def _git_version() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=_SCRIPT_DIR, capture_output=True,
+                                  text=True, timeout=5).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": git("rev-parse", "HEAD"), "describe": git("describe", "--always", "--dirty")}
+
+
+def run_benchmark(profile_name: str, turns: int, warmup: int, fixtures: str = FIXTURES) -> dict:
+    scenarios = load_fixtures(fixtures)
+    server = ReplayServer().start()
+    harness = PipelineHarness(server)
+    results = {}
+    try:
+        for scenario in scenarios:
+            profile = profile_for(profile_name, scenario)
+            for _ in range(warmup):
+                harness.run_turn(scenario, profile)
+            samples = [harness.run_turn(scenario, profile) for _ in range(turns)]
+            results[scenario["name"]] = {"profile": asdict(profile), **summarize(samples)}
+    finally:
+        harness.close()
+        server.stop()
+
+    all_samples = {m: [r[m]["median"] for r in results.values()] for m in METRICS}
+    return {
+        "benchmark": "voice_pipeline_replay",
+        "version": _git_version(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "profile": profile_name,
+        "turns": turns,
+        "warmup": warmup,
+        "scenarios": results,
+        "summary": {m: round(statistics.median(v), 2) for m, v in all_samples.items()},
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Stage medians that got slower than the baseline by more than ``tolerance``."""
+    regressions = []
+    for metric in STAGES + ("overhead",):
+        old = baseline.get("summary", {}).get(metric)
+        new = report["summary"].get(metric)
+        if old is None or new is None:
+            continue
+        if new - old > max(old * tolerance, REGRESSION_FLOOR_MS):
+            regressions.append(f"{metric}: {old:.1f} → {new:.1f} ms")
+    return regressions
+
+
+def print_report(report: dict) -> None:
+    print(f"\nBMO pipeline overhead ({report['profile']} profile, "
+          f"{report['version']['describe'] or 'unknown version'}), median ms")
+    header = f"  {'scenario':<24}" + "".join(f"{s:>8}" for s in STAGES) + f"{'total':>9}{'1st audio':>11}"
+    print(header)
+    print("  " + "─" * (len(header) - 2))
+    for name, r in report["scenarios"].items():
+        row = "".join(f"{r[s]['median']:>8.1f}" for s in STAGES)
+        print(f"  {name:<24}{row}{r['overhead']['median']:>9.1f}{r['first_audio']['median']:>11.1f}")
+
+
+# ── Record mode ───────────────────────────────────────────────────────
+
+
+RECORD_SYSTEM_PROMPT = ("You are BMO, a cute and friendly AI assistant who lives on a Raspberry Pi. "
+                        "You speak in a warm, playful tone. Keep responses concise but helpful.")
+
+
+def record_fixtures(path: str = FIXTURES) -> None:
+    """Refresh LLM chunks and provider latencies in the fixture file from the live APIs."""
+    import re
+
+    import requests
+
+    import cloud_providers
+
+    data = {"scenarios": load_fixtures(path)}
+    for scenario in data["scenarios"]:
+        print(f"[bench] Recording '{scenario['name']}'...")
+        pcm = synth_utterance(scenario.get("speech_seconds", 2.0))
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(SAMPLE_RATE)
+            wf.writeframes(pcm)
+        t0 = time.perf_counter()
+        cloud_providers.groq_stt(buf.getvalue())
+        stt = time.perf_counter() - t0
+
+        model_id = cloud_providers._gemini_model_id(cloud_providers.ROUTER_MODEL)
+        url = (f"{cloud_providers.GEMINI_BASE}/models/{model_id}:streamGenerateContent"
+               f"?key={cloud_providers.GEMINI_API_KEY}&alt=sse")
+        payload = {
+            "systemInstruction": {"parts": [{"text": RECORD_SYSTEM_PROMPT}]},
+            "contents": [{"role": "user", "parts": [{"text": scenario["utterance"]}]}],
+            "generationConfig": {"temperature": 0.8, "maxOutputTokens": 1024},
+        }
+        chunks, first = [], None
+        t0 = time.perf_counter()
+        with requests.post(url, json=payload, stream=True, timeout=60) as r:
+            r.raise_for_status()
+            for line in r.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue
+                for part in json.loads(line[6:]).get("candidates", [{}])[0].get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        first = first or time.perf_counter()
+                        chunks.append(part["text"])
+        total = time.perf_counter() - t0
+        if not chunks:
+            print(f"[bench] No LLM output for '{scenario['name']}', keeping old fixture")
+            continue
+        ttft = first - t0
+        chars = sum(len(c) for c in chunks)
+        stream_time = total - ttft
+
+        sentence = re.split(r"(?<=[.!?])\s+", "".join(chunks).strip(), maxsplit=1)[0]
+        t0 = time.perf_counter()
+        cloud_providers.fish_audio_tts(sentence, format="opus")
+        tts = time.perf_counter() - t0
+
+        scenario["llm_chunks"] = chunks
+        scenario["latency"] = {
+            "stt": round(stt, 3),
+            "llm_ttft": round(ttft, 3),
+            "llm_tokens_per_s": round(chars / CHARS_PER_TOKEN / stream_time, 1) if stream_time > 0 else 0.0,
+            "tts": round(tts, 3),
+            "tts_chars_per_s": 0.0,
+        }
+        print(f"[bench]   stt={stt:.2f}s ttft={ttft:.2f}s llm={total:.2f}s tts={tts:.2f}s")
+
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    os.replace(path + ".tmp", path)
+    print(f"[bench] Wrote {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--profile", default="typical", choices=[*PROFILES, "recorded"])
+    parser.add_argument("--turns", type=int, default=5, help="Measured turns per scenario")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured turns per scenario (model loads)")
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs baseline (fraction)")
+    parser.add_argument("--record", action="store_true", help="Refresh fixtures from the live APIs")
+    args = parser.parse_args()
+
+    if args.record:
+        try:
+            from dotenv import load_dotenv
+            load_dotenv(os.path.join(_SCRIPT_DIR, ".env"))
+        except ImportError:
+            pass
+        record_fixtures(args.fixtures)
+        return
+
+    report = run_benchmark(args.profile, args.turns, args.warmup, args.fixtures)
+    print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\nReport written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("profile") != report["profile"]:
+            print(f"\nNote: baseline used the '{baseline.get('profile')}' profile")
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("\nREGRESSIONS vs baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions vs baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark for AgentRouter keyword routing.
+
+Runs the labeled corpus in data/router/labeled_corpus.jsonl through the old
+substring-scan matcher and the compiled KeywordMatcher. Reports accuracy,
+misroutes, and time per message.
+
+Usage:
+    python benchmark_router.py [-v]
+"""
+
+import json
+import os
+import sys
+import time
+
+from agents.router import KEYWORD_PATTERNS, AgentRouter
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "router", "labeled_corpus.jsonl")
+# Paraphrases and small talk that match no keyword; only the intent classifier can route them
+PARAPHRASES = os.path.join(os.path.dirname(CORPUS), "paraphrase_corpus.jsonl")
+ROUNDS = 200
+
+
+def load_corpus(path: str = CORPUS) -> list[tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return [(row["text"], row["agent"]) for row in map(json.loads, f) if row]
+
+
+def legacy_route(message: str) -> str:
+    """The original tier 2: substring count per agent, no word boundaries."""
+    lower = message.lower()
+    scores = {}
+    for agent_name, keywords in KEYWORD_PATTERNS.items():
+        count = sum(1 for kw in keywords if kw.rstrip("*") in lower)
+        if count:
+            scores[agent_name] = count
+    return max(scores, key=scores.get) if scores else "conversation"
+
+
+def evaluate(name, route, corpus, verbose):
+    correct = 0
+    misses = []
+    for text, expected in corpus:
+        got = route(text)
+        if got == expected:
+            correct += 1
+        else:
+            misses.append((text, expected, got))
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for text, _ in corpus:
+            route(text)
+    per_msg_us = (time.perf_counter() - start) / (ROUNDS * len(corpus)) * 1e6
+
+    print(f"{name:<10} accuracy {correct}/{len(corpus)} ({correct / len(corpus):.1%})  {per_msg_us:6.1f} µs/msg")
+    if verbose:
+        for text, expected, got in misses:
+            print(f"    {text!r}: expected {expected}, got {got}")
+    return correct, per_msg_us
+
+
+def main():
+    verbose = "-v" in sys.argv
+    corpus = load_corpus()
+    router = AgentRouter()
+    print(f"{len(corpus)} labeled messages, {router._matcher.size} keywords\n")
+    evaluate("substring", legacy_route, corpus, verbose)
+    evaluate("compiled", router.route, corpus, verbose)  # Keywords + intent classifier
+
+
+if __name__ == "__main__":
+    main()
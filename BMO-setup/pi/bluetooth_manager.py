@@ -0,0 +1,356 @@
+"""BMO Bluetooth Manager — One persistent bluetoothctl session driven by its events.
+
+Scanning and pairing used to feed a fresh bluetoothctl process a fixed script,
+with a sleep after every command. A pair therefore always took about 20s,
+even when the device answered in one. BluetoothManager keeps one session
+open and parses its output as it arrives:
+
+- ``[NEW]``, ``[CHG]`` and ``[DEL] Device …`` lines update a per-address
+  record (name, paired, trusted, connected).
+- Other lines (``Pairing successful``, ``Failed to connect: …``) go into a
+  short numbered log, so a step can tell which replies came after its command.
+- ``scan()`` and ``pair()`` return a BluetoothJob immediately and run on a
+  worker thread. Pairing is a sequence of steps: remove → discover → pair →
+  trust → connect. Each step sends one command and waits only until the
+  device reaches the target state, a failure reply arrives, or the step
+  times out.
+- Every state change is passed to ``emit(event, payload)``; app.py forwards
+  these to SocketIO.
+"""
+
+import collections
+import itertools
+import os
+import re
+import subprocess
+import threading
+import time
+from typing import Callable
+
+STEP_TIMEOUTS = {
+    "removing": 5.0,
+    "discovering": 20.0,
+    "pairing": 20.0,
+    "trusting": 5.0,
+    "connecting": 15.0,
+}
+LOG_LINES = 200
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]|\x01|\x02|\r")
+_PROMPT = re.compile(r"^(?:\[[^\]]*\][#>]\s*)+")
+_EVENT = re.compile(r"^\[(NEW|CHG|DEL)\] Device ([0-9A-Fa-f:]{17})\s*(.*)$")
+_LISTED = re.compile(r"^Device ([0-9A-Fa-f:]{17}) (.+)$")
+_UNRESOLVED = re.compile(r"[0-9A-Fa-f]{2}(-[0-9A-Fa-f]{2}){5}")
+_BOOL_KEYS = {"Paired": "paired", "Bonded": "paired", "Trusted": "trusted", "Connected": "connected"}
+
+
+def clean_line(line: str) -> str:
+    """Strip colour codes and any ``[bluetooth]#`` prompt from one output line."""
+    return _PROMPT.sub("", _ANSI.sub("", line)).strip()
+
+
+class BluetoothJob:
+    """A scan or pair running in the background. Poll ``to_dict()`` or ``wait()``."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, kind: str, address: str | None, emit: Callable):
+        self.id = next(self._ids)
+        self.kind = kind
+        self.address = address
+        self.state = "starting"
+        self.message = ""
+        self.ok: bool | None = None
+        self.result = None
+        self.started = time.time()
+        self.finished: float | None = None
+        self._emit = emit
+        self._done = threading.Event()
+        self._callbacks: list[Callable] = []
+
+    def progress(self, state: str, message: str = "") -> None:
+        self.state = state
+        self.message = message
+        self._emit("bt_job", self.to_dict())
+
+    def finish(self, ok: bool, message: str, result=None) -> None:
+        self.ok = ok
+        self.result = result
+        self.finished = time.time()
+        self.progress("done" if ok else "failed", message)
+        self._done.set()
+        for fn in self._callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                print(f"[bt] Job callback error: {e}")
+
+    def add_done_callback(self, fn: Callable) -> None:
+        if self._done.is_set():
+            fn(self)
+        else:
+            self._callbacks.append(fn)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "address": self.address,
+            "state": self.state,
+            "message": self.message,
+            "ok": self.ok,
+            "elapsed": round((self.finished or time.time()) - self.started, 2),
+        }
+
+
+class BluetoothManager:
+    """Persistent bluetoothctl session with event-driven scan and pair jobs."""
+
+    def __init__(self, command: list[str] | None = None, env: dict | None = None,
+                 emit: Callable[[str, dict], None] | None = None,
+                 step_timeouts: dict | None = None):
+        self._command = command or ["bluetoothctl"]
+        if env is None:
+            env = os.environ.copy()
+            env["XDG_RUNTIME_DIR"] = "/run/user/1000"
+            env["DBUS_SESSION_BUS_ADDRESS"] = "unix:path=/run/user/1000/bus"
+        self._env = env
+        self._emit_cb = emit
+        self._timeouts = {**STEP_TIMEOUTS, **(step_timeouts or {})}
+        self._proc: subprocess.Popen | None = None
+        self._cond = threading.Condition()
+        self._send_lock = threading.Lock()
+        self._pair_lock = threading.Lock()          # One pair at a time per adapter
+        self._devices: dict[str, dict] = {}
+        self._log: collections.deque = collections.deque(maxlen=LOG_LINES)
+        self._seq = 0
+        self._scans = 0                              # Running scan jobs
+        self.jobs: dict[int, BluetoothJob] = {}
+
+    # ── Session ───────────────────────────────────────────────────────
+
+    def _ensure_session(self) -> None:
+        with self._send_lock:
+            if self._proc and self._proc.poll() is None:
+                return
+            self._proc = subprocess.Popen(
+                self._command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, text=True, bufsize=1, env=self._env,
+            )
+            threading.Thread(target=self._reader, args=(self._proc,),
+                             name="bt-session", daemon=True).start()
+        self._send("power on")
+
+    def _send(self, command: str) -> None:
+        with self._send_lock:
+            proc = self._proc
+            if not proc or proc.poll() is not None:
+                return
+            try:
+                proc.stdin.write(command + "\n")
+                proc.stdin.flush()
+            except (OSError, ValueError) as e:
+                print(f"[bt] Session write failed: {e}")
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc and proc.poll() is None:
+            try:
+                proc.stdin.write("quit\n")
+                proc.stdin.flush()
+                proc.wait(timeout=2)
+            except Exception:
+                proc.kill()
+
+    def _reader(self, proc: subprocess.Popen) -> None:
+        for raw in proc.stdout:
+            line = clean_line(raw)
+            if line:
+                self.handle_line(line)
+        with self._cond:
+            if self._proc is proc:
+                self._proc = None
+            self._cond.notify_all()
+
+    # ── Event parsing ─────────────────────────────────────────────────
+
+    def handle_line(self, line: str) -> None:
+        """Fold one cleaned bluetoothctl line into device state and the reply log."""
+        changed = None
+        with self._cond:
+            self._seq += 1
+            m = _EVENT.match(line)
+            if m:
+                kind, addr, rest = m.group(1), m.group(2).upper(), m.group(3)
+                if kind == "DEL":
+                    self._devices.pop(addr, None)
+                else:
+                    dev = self._device(addr)
+                    if kind == "NEW":
+                        dev["name"] = rest or dev["name"]
+                    elif ": " in rest:
+                        key, value = rest.split(": ", 1)
+                        if key in _BOOL_KEYS:
+                            dev[_BOOL_KEYS[key]] = value == "yes"
+                        elif key in ("Name", "Alias"):
+                            dev["name"] = value
+                    changed = dict(dev)
+            elif (m := _LISTED.match(line)) and not line.endswith("not available"):
+                dev = self._device(m.group(1).upper())
+                dev["name"] = m.group(2).strip()
+                changed = dict(dev)
+            else:
+                self._log.append((self._seq, line))
+            self._cond.notify_all()
+        if changed:
+            self._emit("bt_device", changed)
+
+    def _device(self, addr: str) -> dict:
+        dev = self._devices.get(addr)
+        if dev is None:
+            dev = self._devices[addr] = {
+                "address": addr, "name": addr, "paired": False, "trusted": False, "connected": False,
+            }
+        return dev
+
+    def devices(self, named_only: bool = True) -> list[dict]:
+        with self._cond:
+            devs = [dict(d) for d in self._devices.values()]
+        if named_only:
+            devs = [d for d in devs if d["name"].upper() != d["address"]
+                    and not _UNRESOLVED.fullmatch(d["name"])]
+        return devs
+
+    def device(self, address: str) -> dict | None:
+        with self._cond:
+            dev = self._devices.get(address.upper())
+            return dict(dev) if dev else None
+
+    def _emit(self, event: str, payload: dict) -> None:
+        if self._emit_cb:
+            try:
+                self._emit_cb(event, payload)
+            except Exception as e:
+                print(f"[bt] Emit failed: {e}")
+
+    # ── Steps ─────────────────────────────────────────────────────────
+
+    def _step(self, job: BluetoothJob, state: str, command: str | None,
+              done: Callable[[], bool], success: tuple = (), failure: tuple = ()) -> tuple[bool, str]:
+        """Send ``command`` and wait until ``done()`` holds or a matching reply arrives.
+
+        Returns (ok, message). Replies are matched only if they arrived after
+        the command was sent.
+        """
+        job.progress(state)
+        with self._cond:
+            mark = self._seq
+        if command:
+            self._send(command)
+
+        def outcome():
+            if done():
+                return True, ""
+            for seq, text in self._log:
+                if seq <= mark:
+                    continue
+                if any(s in text for s in success):
+                    return True, text
+                if any(f in text for f in failure):
+                    return False, text
+            if self._proc is None:
+                return False, "bluetoothctl exited"
+            return None
+
+        with self._cond:
+            result = self._cond.wait_for(outcome, self._timeouts.get(state, 10.0))
+        return result or (False, f"Timed out while {state}")
+
+    # ── Jobs ──────────────────────────────────────────────────────────
+
+    def _start_job(self, kind: str, address: str | None, target: Callable) -> BluetoothJob:
+        job = BluetoothJob(kind, address, self._emit)
+        self.jobs[job.id] = job
+        # Keep only recent jobs around for status polling
+        for old in [j for j in self.jobs.values() if j.finished and time.time() - j.finished > 300]:
+            self.jobs.pop(old.id, None)
+
+        def run():
+            try:
+                self._ensure_session()
+                target(job)
+            except Exception as e:
+                print(f"[bt] {kind} job error: {e}")
+                if job.ok is None:
+                    job.finish(False, str(e))
+        threading.Thread(target=run, name=f"bt-{kind}-{job.id}", daemon=True).start()
+        return job
+
+    def scan(self, duration: float = 10) -> BluetoothJob:
+        """Discover for ``duration`` seconds; devices stream out as ``bt_device`` events."""
+        return self._start_job("scan", None, lambda job: self._run_scan(job, duration))
+
+    def _run_scan(self, job: BluetoothJob, duration: float) -> None:
+        with self._cond:
+            self._scans += 1
+        try:
+            job.progress("scanning")
+            self._send("scan on")
+            self._send("devices")     # Already-known devices don't get a [NEW] line
+            with self._cond:
+                self._cond.wait_for(lambda: self._proc is None, duration)
+        finally:
+            with self._cond:
+                self._scans -= 1
+                idle = self._scans == 0
+            if idle:
+                self._send("scan off")
+        devices = [{"address": d["address"], "name": d["name"]} for d in self.devices()]
+        print(f"[bt] Scan found {len(devices)} named devices")
+        job.finish(True, f"Found {len(devices)} devices", devices)
+
+    def pair(self, address: str) -> BluetoothJob:
+        """Remove any stale bond, then discover, pair, trust and connect ``address``."""
+        return self._start_job("pair", address.upper(), self._run_pair)
+
+    def _run_pair(self, job: BluetoothJob) -> None:
+        addr = job.address
+
+        def dev(key):
+            return lambda: bool(self._devices.get(addr, {}).get(key))
+
+        with self._pair_lock:
+            # Drop the old bond so A2DP is negotiated fresh. Wait for the reply
+            # itself: a late "not available" would otherwise fail the next step.
+            self._step(job, "removing", f"remove {addr}", lambda: False,
+                       success=("has been removed", "not available"))
+
+            ok, msg = self._step(job, "discovering", "scan on", lambda: addr in self._devices)
+            if ok:
+                ok, msg = self._step(job, "pairing", f"pair {addr}", dev("paired"),
+                                     success=("Pairing successful", "AlreadyExists"),
+                                     failure=("Failed to pair", "not available"))
+            if ok:
+                ok, msg = self._step(job, "trusting", f"trust {addr}", dev("trusted"),
+                                     success=("trust succeeded",),
+                                     failure=("Failed to set trust", "not available"))
+            with self._cond:
+                idle = self._scans == 0
+            if idle:
+                self._send("scan off")
+            if ok:
+                ok, msg = self._step(job, "connecting", f"connect {addr}", dev("connected"),
+                                     success=("Connection successful",),
+                                     failure=("Failed to connect", "not available"))
+
+        if not ok:
+            if job.state == "discovering":
+                msg = "Device not available — make sure it's nearby and in pairing mode"
+            print(f"[bt] Pair {addr} failed while {job.state}: {msg}")
+            job.finish(False, msg)
+            return
+        print(f"[bt] Connected to {addr} in {time.time() - job.started:.1f}s")
+        job.finish(True, f"Connected to {addr}", self.device(addr))
@@ -4,23 +4,101 @@ SQLite Long-Term Session Memory for D&D Campaigns.
 Provides persistent storage for campaign sessions, NPCs, locations,
 plot threads, player notes, and item inventories. Designed to feed
 context back into the AI DM system.
+
+Connections are pooled and kept open (WAL mode, so readers don't block
+the writer), which also keeps sqlite3's per-connection statement cache
+warm. Notes, NPCs, and plot threads are mirrored into an FTS5 index by
+triggers for ranked search. build_dm_context() is served from a snapshot
+cache that is invalidated by any write.
 """
 
 import sqlite3
 import os
 import json
 import datetime
-from typing import Optional
+import queue
+import re
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
 
 
 DB_PATH = os.path.expanduser("~/bmo/data/campaign_memory.db")
 
+POOL_SIZE = 4           # Max open connections per CampaignMemory
+BUSY_TIMEOUT_MS = 5000  # Wait this long for another writer before failing
+
+# FTS5 mirror of searchable text. kind is 'note', 'npc' or 'plot'; ref_id is
+# the row id in the source table. Kept in sync by triggers.
+_FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
+        title, body,
+        kind UNINDEXED, ref_id UNINDEXED, campaign UNINDEXED,
+        tokenize = 'porter unicode61'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS player_notes_fts_ai AFTER INSERT ON player_notes BEGIN
+        INSERT INTO memory_fts (title, body, kind, ref_id, campaign)
+        VALUES (new.category, new.content, 'note', new.id, new.campaign);
+    END;
+    CREATE TRIGGER IF NOT EXISTS player_notes_fts_ad AFTER DELETE ON player_notes BEGIN
+        DELETE FROM memory_fts WHERE kind = 'note' AND ref_id = old.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS player_notes_fts_au AFTER UPDATE ON player_notes BEGIN
+        UPDATE memory_fts SET title = new.category, body = new.content
+        WHERE kind = 'note' AND ref_id = new.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS npcs_fts_ai AFTER INSERT ON npcs BEGIN
+        INSERT INTO memory_fts (title, body, kind, ref_id, campaign)
+        VALUES (new.name, coalesce(new.description, '') || ' ' || coalesce(new.notes, ''), 'npc', new.id, new.campaign);
+    END;
+    CREATE TRIGGER IF NOT EXISTS npcs_fts_ad AFTER DELETE ON npcs BEGIN
+        DELETE FROM memory_fts WHERE kind = 'npc' AND ref_id = old.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS npcs_fts_au AFTER UPDATE ON npcs BEGIN
+        UPDATE memory_fts SET title = new.name,
+            body = coalesce(new.description, '') || ' ' || coalesce(new.notes, '')
+        WHERE kind = 'npc' AND ref_id = new.id;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS plot_threads_fts_ai AFTER INSERT ON plot_threads BEGIN
+        INSERT INTO memory_fts (title, body, kind, ref_id, campaign)
+        VALUES (new.title, coalesce(new.description, ''), 'plot', new.id, new.campaign);
+    END;
+    CREATE TRIGGER IF NOT EXISTS plot_threads_fts_ad AFTER DELETE ON plot_threads BEGIN
+        DELETE FROM memory_fts WHERE kind = 'plot' AND ref_id = old.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS plot_threads_fts_au AFTER UPDATE ON plot_threads BEGIN
+        UPDATE memory_fts SET title = new.title, body = coalesce(new.description, '')
+        WHERE kind = 'plot' AND ref_id = new.id;
+    END;
+"""
+
+_FTS_BACKFILL = """
+    INSERT INTO memory_fts (title, body, kind, ref_id, campaign)
+        SELECT category, content, 'note', id, campaign FROM player_notes;
+    INSERT INTO memory_fts (title, body, kind, ref_id, campaign)
+        SELECT name, coalesce(description, '') || ' ' || coalesce(notes, ''), 'npc', id, campaign FROM npcs;
+    INSERT INTO memory_fts (title, body, kind, ref_id, campaign)
+        SELECT title, coalesce(description, ''), 'plot', id, campaign FROM plot_threads;
+"""
+
+_FTS_SOURCES = {"note": "player_notes", "npc": "npcs", "plot": "plot_threads"}
+
 
 class CampaignMemory:
     """Persistent D&D campaign memory backed by SQLite."""
 
-    def __init__(self, db_path: str = DB_PATH) -> None:
+    def __init__(self, db_path: str = DB_PATH, pool_size: int = POOL_SIZE) -> None:
         self.db_path = db_path
+        self._pool: queue.LifoQueue = queue.LifoQueue()
+        self._pool_size = pool_size
+        self._opened = 0
+        self._pool_lock = threading.Lock()
+        self._generation = 0  # Bumped after every committed write
+        self._context_cache: dict[str, tuple[tuple, str]] = {}
+        self.fts_enabled = False
         self._init_db()
 
     # ------------------------------------------------------------------
@@ -31,7 +109,10 @@ class CampaignMemory:
         """Create the database directory and tables if they don't exist."""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
-        with self._connect() as conn:
+        # Schema setup runs outside the pool: executescript manages its own commits
+        conn = self._open()
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")  # Persistent; set once
             conn.executescript("""
                 CREATE TABLE IF NOT EXISTS sessions (
                     id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -103,12 +184,82 @@ class CampaignMemory:
                 CREATE INDEX IF NOT EXISTS idx_items_campaign_char ON items(campaign, character);
             """)
 
-    def _connect(self) -> sqlite3.Connection:
-        """Open a connection with row-factory support."""
-        conn = sqlite3.connect(self.db_path)
+            # Full-text index — optional, search falls back to LIKE without FTS5
+            try:
+                has_fts = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'memory_fts'"
+                ).fetchone() is not None
+                conn.executescript(_FTS_SCHEMA)
+                if not has_fts:
+                    conn.executescript(_FTS_BACKFILL)
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                print(f"[campaign_memory] FTS5 unavailable, using LIKE search: {e}")
+        finally:
+            conn.close()
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a pooled connection: WAL, row factory, warm statement cache."""
+        conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, cached_statements=256,
+            isolation_level=None,
+        )
         conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous = NORMAL")
         return conn
 
+    @contextmanager
+    def _connect(self, readonly: bool = False) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection for one transaction.
+
+        Commits on success, rolls back on error, and invalidates the
+        context cache if the transaction changed anything. Write
+        transactions take the write lock up front (BEGIN IMMEDIATE) so they
+        wait on busy_timeout instead of failing to upgrade a read snapshot;
+        readonly=True runs a plain snapshot read that never blocks.
+        """
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                create = self._opened < self._pool_size
+                if create:
+                    self._opened += 1
+            if create:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._pool_lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._pool.get()
+        try:
+            before = conn.total_changes
+            conn.execute("BEGIN" if readonly else "BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if conn.total_changes != before:
+                self._generation += 1
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        """Close all idle pooled connections."""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._pool_lock:
+                self._opened -= 1
+
     @staticmethod
     def _now() -> str:
         """Return the current UTC timestamp as an ISO-8601 string."""
@@ -149,7 +300,7 @@ class CampaignMemory:
 
     def get_session(self, session_id: int) -> Optional[dict]:
         """Retrieve a single session by id."""
-        with self._connect() as conn:
+        with self._connect(readonly=True) as conn:
             row = conn.execute(
                 "SELECT * FROM sessions WHERE id = ?", (session_id,)
             ).fetchone()
@@ -159,7 +310,7 @@ class CampaignMemory:
         self, campaign_name: str, limit: int = 5
     ) -> list[dict]:
         """Return the most recent sessions for a campaign, newest first."""
-        with self._connect() as conn:
+        with self._connect(readonly=True) as conn:
             rows = conn.execute(
                 "SELECT * FROM sessions WHERE campaign = ? ORDER BY id DESC LIMIT ?",
                 (campaign_name, limit),
@@ -227,7 +378,7 @@ class CampaignMemory:
 
     def get_npc(self, campaign: str, name: str) -> Optional[dict]:
         """Look up a single NPC by campaign and name."""
-        with self._connect() as conn:
+        with self._connect(readonly=True) as conn:
             row = conn.execute(
                 "SELECT * FROM npcs WHERE campaign = ? AND name = ?",
                 (campaign, name),
@@ -236,7 +387,7 @@ class CampaignMemory:
 
     def list_npcs(self, campaign: str) -> list[dict]:
         """List all NPCs for a campaign, ordered by name."""
-        with self._connect() as conn:
+        with self._connect(readonly=True) as conn:
             rows = conn.execute(
                 "SELECT * FROM npcs WHERE campaign = ? ORDER BY name",
                 (campaign,),
@@ -270,7 +421,7 @@ class CampaignMemory:
 
     def list_locations(self, campaign: str) -> list[dict]:
         """List all locations for a campaign, ordered by name."""
-        with self._connect() as conn:
+        with self._connect(readonly=True) as conn:
             rows = conn.execute(
                 "SELECT * FROM locations WHERE campaign = ? ORDER BY name",
                 (campaign,),
@@ -321,7 +472,7 @@ class CampaignMemory:
         self, campaign: str, status: Optional[str] = None
     ) -> list[dict]:
         """List plot threads for a campaign, optionally filtered by status."""
-        with self._connect() as conn:
+        with self._connect(readonly=True) as conn:
             if status is not None:
                 rows = conn.execute(
                     "SELECT * FROM plot_threads WHERE campaign = ? AND status = ? ORDER BY created_at",
@@ -350,14 +501,64 @@ class CampaignMemory:
             )
 
     def search_notes(self, campaign: str, query: str) -> list[dict]:
-        """Search notes by substring match (case-insensitive)."""
-        with self._connect() as conn:
+        """Search notes, best match first (prefix match on each word).
+
+        Falls back to substring matching when the word-prefix search finds
+        nothing, so mid-word queries ("agon" for "dragon") still work.
+        """
+        match = _fts_query(query)
+        if not self.fts_enabled or not match:
+            return self._search_notes_like(campaign, query)
+        with self._connect(readonly=True) as conn:
+            rows = conn.execute(
+                """
+                SELECT n.* FROM memory_fts f JOIN player_notes n ON n.id = f.ref_id
+                WHERE memory_fts MATCH ? AND f.kind = 'note' AND f.campaign = ?
+                ORDER BY f.rank, n.created_at DESC
+                """,
+                (match, campaign),
+            ).fetchall()
+        if not rows:
+            return self._search_notes_like(campaign, query)
+        return [dict(r) for r in rows]
+
+    def _search_notes_like(self, campaign: str, query: str) -> list[dict]:
+        """Substring search (case-insensitive) — used when FTS5 is unavailable or finds nothing."""
+        with self._connect(readonly=True) as conn:
             rows = conn.execute(
                 "SELECT * FROM player_notes WHERE campaign = ? AND content LIKE ? ORDER BY created_at DESC",
                 (campaign, f"%{query}%"),
             ).fetchall()
             return [dict(r) for r in rows]
 
+    def search(
+        self, campaign: str, query: str, kinds: Optional[list[str]] = None, limit: int = 20
+    ) -> list[dict]:
+        """Ranked full-text search over notes, NPCs, and plot threads.
+
+        Returns dicts with kind ('note', 'npc', 'plot'), id, title, snippet
+        (matches wrapped in [brackets]) and rank (lower is better).
+        """
+        match = _fts_query(query)
+        if not self.fts_enabled or not match:
+            return []
+        kinds = [k for k in (kinds or list(_FTS_SOURCES)) if k in _FTS_SOURCES]
+        if not kinds:
+            return []
+        placeholders = ", ".join("?" for _ in kinds)
+        with self._connect(readonly=True) as conn:
+            rows = conn.execute(
+                f"""
+                SELECT kind, ref_id AS id, title,
+                       snippet(memory_fts, 1, '[', ']', '...', 12) AS snippet, rank
+                FROM memory_fts
+                WHERE memory_fts MATCH ? AND campaign = ? AND kind IN ({placeholders})
+                ORDER BY rank LIMIT ?
+                """,
+                (match, campaign, *kinds, limit),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
     # ------------------------------------------------------------------
     # Item / loot tracking
     # ------------------------------------------------------------------
@@ -410,7 +611,7 @@ class CampaignMemory:
 
     def get_inventory(self, campaign: str, character: str) -> list[dict]:
         """Return all items held by a character, ordered by item name."""
-        with self._connect() as conn:
+        with self._connect(readonly=True) as conn:
             rows = conn.execute(
                 "SELECT * FROM items WHERE campaign = ? AND character = ? ORDER BY item",
                 (campaign, character),
@@ -426,12 +627,47 @@ class CampaignMemory:
 
         Aggregates recent session summaries, known NPCs, discovered locations,
         and active plot threads into a single text block suitable for inclusion
-        in an LLM system prompt.
+        in an LLM system prompt. Served from cache until the database changes.
         """
+        key = (self._generation, self._db_signature())
+        cached = self._context_cache.get(campaign)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        text = self._render_dm_context(campaign)
+        self._context_cache[campaign] = (key, text)
+        return text
+
+    def _db_signature(self) -> tuple:
+        """Stat the DB and its WAL so writes by other processes invalidate the cache."""
+        sig = []
+        for path in (self.db_path, self.db_path + "-wal"):
+            try:
+                st = os.stat(path)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _render_dm_context(self, campaign: str) -> str:
+        """Query everything build_dm_context needs in one read transaction."""
+        with self._connect(readonly=True) as conn:
+            sessions = [dict(r) for r in conn.execute(
+                "SELECT * FROM sessions WHERE campaign = ? ORDER BY id DESC LIMIT 5", (campaign,),
+            )]
+            npcs = [dict(r) for r in conn.execute(
+                "SELECT * FROM npcs WHERE campaign = ? ORDER BY name", (campaign,),
+            )]
+            discovered = [dict(r) for r in conn.execute(
+                "SELECT * FROM locations WHERE campaign = ? AND discovered ORDER BY name", (campaign,),
+            )]
+            threads = [dict(r) for r in conn.execute(
+                "SELECT * FROM plot_threads WHERE campaign = ? AND status = 'active' ORDER BY created_at",
+                (campaign,),
+            )]
+
         sections: list[str] = []
 
         # --- Recent sessions ---
-        sessions = self.get_recent_sessions(campaign, limit=5)
         if sessions:
             session_lines: list[str] = []
             for s in reversed(sessions):  # oldest first
@@ -441,7 +677,6 @@ class CampaignMemory:
             sections.append("RECENT SESSIONS:\n" + "\n".join(session_lines))
 
         # --- NPCs ---
-        npcs = self.list_npcs(campaign)
         if npcs:
             npc_lines: list[str] = []
             for npc in npcs:
@@ -457,8 +692,6 @@ class CampaignMemory:
             sections.append("KNOWN NPCs:\n" + "\n".join(npc_lines))
 
         # --- Locations ---
-        locations = self.list_locations(campaign)
-        discovered = [loc for loc in locations if loc.get("discovered")]
         if discovered:
             loc_lines: list[str] = []
             for loc in discovered:
@@ -470,7 +703,6 @@ class CampaignMemory:
             sections.append("DISCOVERED LOCATIONS:\n" + "\n".join(loc_lines))
 
         # --- Active plot threads ---
-        threads = self.list_plot_threads(campaign, status="active")
         if threads:
             thread_lines: list[str] = []
             for t in threads:
@@ -486,3 +718,9 @@ class CampaignMemory:
 
         header = f"=== Campaign Memory: {campaign} ===\n"
         return header + "\n\n".join(sections)
+
+
+def _fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    words = re.findall(r"\w+", text, re.UNICODE)
+    return " ".join(f'"{w}"*' for w in words)
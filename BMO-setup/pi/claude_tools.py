@@ -49,8 +49,14 @@ def claude_chat_with_tools(
     max_iterations: int = 10,
     on_progress=None,
     pending_confirmations_out: list | None = None,
+    is_parallel_safe=None,
 ) -> str:
-    """Run Claude Messages API with native tool use. Returns final text."""
+    """Run Claude Messages API with native tool use. Returns final text.
+
+    If ``is_parallel_safe`` is given, consecutive read-only tool_use blocks in
+    one response run concurrently (see agents.tool_scheduler); otherwise
+    tools run one at a time.
+    """
     from cloud_providers import (
         ANTHROPIC_API_KEY,
         ANTHROPIC_BASE,
@@ -120,20 +126,36 @@ def claude_chat_with_tools(
         if not tool_uses:
             return "".join(text_parts)
 
-        tool_results = []
-        pending_confirm = None
-        for tu in tool_uses:
-            tool_id = tu.get("id", "")
-            name = tu.get("name", "")
-            args = tu.get("input", {}) or {}
+        from agents.tool_scheduler import run_tool_calls
+
+        calls = [(tu.get("name", ""), tu.get("input", {}) or {}) for tu in tool_uses]
+
+        def on_start(i, name, args):
             if on_progress:
                 on_progress(name, "running", "")
-            result = tool_dispatch(name, args)
+
+        def on_done(i, name, args, result):
             if on_progress:
                 preview = str(result)[:200] if isinstance(result, (str, dict)) else ""
                 on_progress(name, "done", preview)
 
-            if isinstance(result, dict) and result.get("needs_confirmation"):
+        def needs_confirmation(result) -> bool:
+            return isinstance(result, dict) and bool(result.get("needs_confirmation"))
+
+        results = run_tool_calls(
+            calls,
+            tool_dispatch,
+            is_parallel_safe or (lambda name: False),
+            on_start=on_start,
+            on_done=on_done,
+            stop_after=needs_confirmation,
+        )
+
+        tool_results = []
+        pending_confirm = None
+        for tu, (name, args), result in zip(tool_uses, calls, results):
+            tool_id = tu.get("id", "")
+            if needs_confirmation(result):
                 pending_confirm = result
                 if pending_confirmations_out is not None:
                     pending_confirmations_out.append({
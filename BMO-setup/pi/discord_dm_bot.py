@@ -40,6 +40,7 @@ if not discord.opus.is_loaded():
 
 from cloud_providers import cloud_chat, fish_audio_tts, groq_stt, DND_MODEL
 from dnd_engine import roll_dice, calculate_encounter_difficulty
+from lookup_service import LookupService, interaction_budget
 from voice_personality import NPC_PROSODY, get_prosody, parse_response_tags
 
 # ── Configuration ────────────────────────────────────────────────────
@@ -57,6 +58,9 @@ TTS_COOLDOWN = 3.0
 CONTEXT_MAX_MESSAGES = 60
 CONTEXT_COMPRESS_KEEP = 10  # keep last N messages after compression
 
+# Deferred lookups (RAG search etc.) give up after this many seconds
+LOOKUP_TIMEOUT = 10.0
+
 LOG_PREFIX = "[dm-bot]"
 
 
@@ -111,6 +115,52 @@ def _fuzzy_find(name: str, items: list[dict], key: str = "name") -> dict | None:
     return None
 
 
+def _load_search_engine():
+    """Load the D&D RAG index (blocking — run via the lookup service)."""
+    try:
+        from rag_search import SearchEngine
+        engine = SearchEngine()
+        rag_dir = os.path.expanduser("~/bmo/data/rag_data")
+        index_path = os.path.join(rag_dir, "chunk-index-dnd.json")
+        if os.path.exists(index_path):
+            count = engine.load_index_file("dnd", index_path)
+            _log("RAG index loaded: %d chunks", count)
+        else:
+            _log("No RAG index found at %s", index_path)
+        return engine
+    except Exception as e:
+        _log("RAG search init failed: %s", e)
+        return None
+
+
+def _load_campaign_memory():
+    try:
+        from campaign_memory import CampaignMemory
+        memory = CampaignMemory()
+        _log("Campaign memory initialized")
+        return memory
+    except Exception as e:
+        _log("Campaign memory init failed: %s", e)
+        return None
+
+
+_TIMED_OUT = object()
+
+
+async def _lookup_in_time(interaction: discord.Interaction, bot: "DMBot", fn, *args):
+    """Run a lookup for an un-deferred interaction within Discord's response window.
+
+    Returns _TIMED_OUT (and logs) if the window closed first — the job is
+    cancelled and there is no interaction left to answer.
+    """
+    budget = interaction_budget(interaction.created_at.timestamp())
+    try:
+        return await bot._lookups.run(fn, *args, timeout=budget)
+    except TimeoutError:
+        _log("/%s lookup missed the interaction deadline", interaction.command.name if interaction.command else "?")
+        return _TIMED_OUT
+
+
 # ── Spell School Colors ─────────────────────────────────────────────
 
 SCHOOL_COLORS = {
@@ -390,7 +440,7 @@ async def dm_start(interaction: discord.Interaction) -> None:
     if bot._campaign_memory:
         try:
             bot._campaign_name = "discord_campaign"
-            bot._session_id = bot._campaign_memory.start_session(bot._campaign_name)
+            bot._session_id = await bot._lookups.run(bot._campaign_memory.start_session, bot._campaign_name)
             _log("Campaign memory session started: %d", bot._session_id)
         except Exception as e:
             _log("Campaign memory session start failed: %s", e)
@@ -455,7 +505,7 @@ async def dm_stop(interaction: discord.Interaction) -> None:
     # Save recap to campaign memory
     if bot._campaign_memory and bot._session_id and recap_text:
         try:
-            bot._campaign_memory.end_session(bot._session_id, recap_text)
+            await bot._lookups.run(bot._campaign_memory.end_session, bot._session_id, recap_text)
             _log("Campaign memory session ended with recap")
         except Exception as e:
             _log("Campaign memory save failed: %s", e)
@@ -546,6 +596,7 @@ class DMBot(commands.Bot):
         self._guild_id: Optional[int] = int(GUILD_ID) if GUILD_ID else None
         self._search_engine = None
         self._campaign_memory = None
+        self._lookups = LookupService(name="dm-lookup")
         self._campaign_name = None
         self._session_id = None
 
@@ -597,34 +648,19 @@ class DMBot(commands.Bot):
             )
         )
 
-        # Load D&D RAG index
-        try:
-            from rag_search import SearchEngine
-            self._search_engine = SearchEngine()
-            rag_dir = os.path.expanduser("~/bmo/data/rag_data")
-            index_path = os.path.join(rag_dir, "chunk-index-dnd.json")
-            if os.path.exists(index_path):
-                count = self._search_engine.load_index_file("dnd", index_path)
-                _log("RAG index loaded: %d chunks", count)
-            else:
-                _log("No RAG index found at %s", index_path)
-        except Exception as e:
-            _log("RAG search init failed: %s", e)
-
-        try:
-            from campaign_memory import CampaignMemory
-            self._campaign_memory = CampaignMemory()
-            _log("Campaign memory initialized")
-        except Exception as e:
-            _log("Campaign memory init failed: %s", e)
-
-        # Load D&D JSON data for lookup commands
-        self._spells = _load_json("spells.json")
-        self._magic_items = _load_json("magic-items.json")
-        self._conditions = _load_json("conditions.json")
-        self._treasure_tables = _load_json("treasure-tables.json")
-        self._random_tables = _load_json("random-tables.json")
-        self._encounter_presets = _load_json("encounter-presets.json")
+        # Index, campaign DB and JSON data all load off the loop, in parallel
+        (
+            self._search_engine, self._campaign_memory,
+            self._spells, self._magic_items, self._conditions,
+            self._treasure_tables, self._random_tables, self._encounter_presets,
+        ) = await asyncio.gather(
+            self._lookups.run(_load_search_engine),
+            self._lookups.run(_load_campaign_memory),
+            *(self._lookups.run(_load_json, name) for name in (
+                "spells.json", "magic-items.json", "conditions.json",
+                "treasure-tables.json", "random-tables.json", "encounter-presets.json",
+            )),
+        )
 
     async def on_voice_state_update(
         self,
@@ -686,7 +722,20 @@ class DMBot(commands.Bot):
         text: str,
         channel: discord.abc.Messageable,
     ) -> None:
-        """Process player input through the AI and respond."""
+        """Process player input through the AI and respond.
+
+        Inputs for the session are handled one at a time in arrival order, so
+        replies never interleave; other commands keep running meanwhile.
+        """
+        async with self._lookups.ordered(self.session.text_channel_id):
+            await self._respond_to_player(player_name, text, channel)
+
+    async def _respond_to_player(
+        self,
+        player_name: str,
+        text: str,
+        channel: discord.abc.Messageable,
+    ) -> None:
         user_msg = f"[{player_name}]: {text}"
         self.session.add_message("user", user_msg)
         self.session.combat_log.append(user_msg)
@@ -695,7 +744,9 @@ class DMBot(commands.Bot):
         rag_context = ""
         if self._search_engine:
             try:
-                results = self._search_engine.search(text, domain="dnd", top_k=3)
+                results = await self._lookups.run(
+                    self._search_engine.search, text, "dnd", 3, timeout=LOOKUP_TIMEOUT,
+                )
                 if results:
                     chunks = [f"- {r['heading']}: {r['content'][:200]}" for r in results]
                     rag_context = "\n\nRELEVANT D&D RULES/LORE:\n" + "\n".join(chunks)
@@ -708,7 +759,9 @@ class DMBot(commands.Bot):
             system_content += rag_context
         if self._campaign_memory and self._campaign_name:
             try:
-                dm_ctx = self._campaign_memory.build_dm_context(self._campaign_name)
+                dm_ctx = await self._lookups.run(
+                    self._campaign_memory.build_dm_context, self._campaign_name, timeout=LOOKUP_TIMEOUT,
+                )
                 if dm_ctx:
                     system_content += "\n\nCAMPAIGN MEMORY:\n" + dm_ctx
             except Exception as e:
@@ -1041,7 +1094,9 @@ async def _spell_cmd(
         await interaction.response.send_message("Spell data is not loaded.", ephemeral=True)
         return
 
-    spell = _fuzzy_find(name, bot._spells)
+    spell = await _lookup_in_time(interaction, bot, _fuzzy_find, name, bot._spells)
+    if spell is _TIMED_OUT:
+        return
     if not spell:
         await interaction.response.send_message(f"No spell found matching **{name}**.", ephemeral=True)
         return
@@ -1103,7 +1158,9 @@ async def _item_cmd(
         await interaction.response.send_message("Magic item data is not loaded.", ephemeral=True)
         return
 
-    item = _fuzzy_find(name, bot._magic_items)
+    item = await _lookup_in_time(interaction, bot, _fuzzy_find, name, bot._magic_items)
+    if item is _TIMED_OUT:
+        return
     if not item:
         await interaction.response.send_message(f"No magic item found matching **{name}**.", ephemeral=True)
         return
@@ -1146,7 +1203,9 @@ async def _condition_cmd(
         await interaction.response.send_message("Condition data is not loaded.", ephemeral=True)
         return
 
-    condition = _fuzzy_find(name, bot._conditions)
+    condition = await _lookup_in_time(interaction, bot, _fuzzy_find, name, bot._conditions)
+    if condition is _TIMED_OUT:
+        return
     if not condition:
         await interaction.response.send_message(f"No condition found matching **{name}**.", ephemeral=True)
         return
@@ -1490,15 +1549,17 @@ async def _monster_cmd(
         await interaction.response.send_message("Monster knowledge base is not loaded.", ephemeral=True)
         return
 
+    # Search can take a while on the Pi; defer so the interaction stays valid
+    await interaction.response.defer()
     try:
-        results = bot._search_engine.search(name, domain="dnd", top_k=3)
+        results = await bot._lookups.run(bot._search_engine.search, name, "dnd", 3, timeout=LOOKUP_TIMEOUT)
     except Exception as e:
         _log("Monster search failed: %s", e)
-        await interaction.response.send_message(f"Search failed: {e}", ephemeral=True)
+        await interaction.followup.send(f"Search failed: {e}", ephemeral=True)
         return
 
     if not results:
-        await interaction.response.send_message(f"No results found for **{name}**.", ephemeral=True)
+        await interaction.followup.send(f"No results found for **{name}**.", ephemeral=True)
         return
 
     best = results[0]
@@ -1519,7 +1580,7 @@ async def _monster_cmd(
         embed.add_field(name="See Also", value=other_matches, inline=False)
 
     embed.set_footer(text="Source: BMO D&D Knowledge Base")
-    await interaction.response.send_message(embed=embed)
+    await interaction.followup.send(embed=embed)
 
 
 # ── Singleton ────────────────────────────────────────────────────────
@@ -1553,6 +1614,8 @@ async def _run_dm_bot() -> None:
     finally:
         if _bot and not _bot.is_closed():
             await _bot.close()
+        if _bot:
+            _bot._lookups.shutdown()
 
 
 def start_dm_bot() -> Optional[threading.Thread]:
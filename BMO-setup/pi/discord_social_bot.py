@@ -51,6 +51,8 @@ except ImportError:
     HAS_VOICE_RECV = False
 
 from cloud_providers import cloud_chat, fish_audio_tts, groq_stt
+from http_cache import HttpCache
+from social_db import SocialDB
 
 # ── Data Directory + SQLite ──────────────────────────────────────────
 
@@ -63,50 +65,47 @@ for _d in (DATA_DIR, PLAYLISTS_DIR, SFX_DIR):
     _d.mkdir(parents=True, exist_ok=True)
 
 
-def _get_db() -> sqlite3.Connection:
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("""CREATE TABLE IF NOT EXISTS play_history (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        guild_id INTEGER NOT NULL,
-        user_id INTEGER,
-        track_title TEXT NOT NULL,
-        track_url TEXT,
-        duration INTEGER DEFAULT 0,
-        played_at REAL DEFAULT (unixepoch())
-    )""")
-    conn.execute("""CREATE TABLE IF NOT EXISTS user_prefs (
-        user_id INTEGER NOT NULL,
-        key TEXT NOT NULL,
-        value TEXT,
-        PRIMARY KEY (user_id, key)
-    )""")
-    conn.execute("""CREATE TABLE IF NOT EXISTS xp_data (
-        user_id INTEGER PRIMARY KEY,
-        xp INTEGER DEFAULT 0,
-        level INTEGER DEFAULT 1,
-        total_messages INTEGER DEFAULT 0,
-        last_xp_time REAL DEFAULT 0
-    )""")
-    conn.execute("""CREATE TABLE IF NOT EXISTS reminders (
-        id TEXT PRIMARY KEY,
-        user_id INTEGER,
-        channel_id INTEGER,
-        guild_id INTEGER,
-        message TEXT,
-        fire_at REAL,
-        created_at REAL DEFAULT (unixepoch())
-    )""")
-    conn.commit()
-    return conn
+# One long-lived DB service: schema is migrated once here, writes are
+# serialized on a writer thread, reads run on pooled connections.
+_db = SocialDB(str(DB_PATH))
+
+# ── External API cache ───────────────────────────────────────────────
+
+JIKAN_API = "https://api.jikan.moe/v4"
+
+# (host, path prefix, TTL seconds); 0 = never cache (random/shuffle endpoints)
+HTTP_CACHE_TTLS = [
+    ("api.jikan.moe", "/v4/random", 0),
+    ("api.jikan.moe", "/v4/seasons", 3600),
+    ("api.jikan.moe", "/v4/top", 3600),
+    ("api.jikan.moe", "/v4", 86400),
+    ("www.omdbapi.com", "/", 86400),
+    ("api.themoviedb.org", "/3/trending", 3600),
+    ("api.themoviedb.org", "/3", 21600),
+    ("openlibrary.org", "/trending", 3600),
+    ("openlibrary.org", "/", 86400),
+    ("api.rawg.io", "/api", 21600),
+    ("lrclib.net", "/", 604800),
+    ("open.spotify.com", "/oembed", 604800),
+    ("www.reddit.com", "/", 300),
+    ("opentdb.com", "/", 0),
+    ("api.waifu.pics", "/", 0),
+    ("animechan.io", "/", 0),
+    ("wallhaven.cc", "/", 0),
+]
 
+# Per-host (requests per second, burst) — Jikan allows 3/s and 60/min
+HTTP_RATE_LIMITS = {
+    "api.jikan.moe": (1.0, 3),
+    "www.reddit.com": (1.0, 5),
+    "opentdb.com": (0.2, 1),
+}
 
-try:
-    _init_db = _get_db()
-    _init_db.close()
-except Exception as _e:
-    logging.getLogger("social_bot").error("DB init failed: %s", _e)
+_http = HttpCache(
+    ttls=HTTP_CACHE_TTLS,
+    rates=HTTP_RATE_LIMITS,
+    disk_dir=str(DATA_DIR / "http_cache"),
+)
 
 # ── Configuration ────────────────────────────────────────────────────
 
@@ -268,21 +267,103 @@ def _get_queue(guild_id: int) -> MusicQueue:
     return _music_queues[guild_id]
 
 
-def _pcm_to_wav_48k(pcm_bytes: bytes) -> bytes:
-    """Convert 48kHz stereo 16-bit PCM to mono WAV for STT."""
+def _pcm_to_wav_16k(pcm_bytes: bytes) -> bytes:
+    """Convert 48kHz stereo 16-bit PCM to 16kHz mono WAV for STT.
+
+    Whisper resamples to 16kHz anyway, so this cuts the upload by 6x for free.
+    """
     mono = audioop.tomono(pcm_bytes, 2, 1, 0)  # left channel only
+    mono, _ = audioop.ratecv(mono, 2, 1, 48000, STT_SAMPLE_RATE, None)
     buf = io.BytesIO()
     with wave.open(buf, "wb") as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)  # 16-bit
-        wf.setframerate(48000)
+        wf.setframerate(STT_SAMPLE_RATE)
         wf.writeframes(mono)
     return buf.getvalue()
 
 
+# ── Voice activity endpointing ──
+# Discord delivers 20ms Opus frames (3840 bytes of 48kHz stereo PCM each).
+# Each frame is classified as voiced/unvoiced by RMS energy against an
+# adaptive noise floor; a segment ends after VAD_END_SILENCE of unvoiced
+# frames or missing packets (Discord stops sending when the mic gates).
+
+STT_SAMPLE_RATE = 16000
+VAD_MIN_RMS = 300             # Absolute floor for "voiced"
+VAD_FLOOR_RATIO = 3.0         # Voiced = RMS > noise floor * ratio
+VAD_END_SILENCE = 0.8         # Seconds without voice that end a segment
+VAD_MIN_SPEECH = 0.3          # Seconds of voiced audio a segment needs to count
+VAD_MAX_SEGMENT = 15.0        # Force an endpoint on very long monologues
+VAD_PREROLL_FRAMES = 10       # Unvoiced frames kept before onset (200ms)
+VAD_SWEEP_INTERVAL = 0.1      # Seconds between timeout sweeps
+_FRAME_SECONDS = 0.02
+
+
+class _SpeakerState:
+    """Per-speaker endpointer state."""
+
+    __slots__ = ("buffer", "preroll", "noise_floor", "in_speech", "voiced", "started", "last_voiced")
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.preroll: collections.deque = collections.deque(maxlen=VAD_PREROLL_FRAMES)
+        self.noise_floor = float(VAD_MIN_RMS) / VAD_FLOOR_RATIO
+        self.in_speech = False
+        self.voiced = 0.0       # Seconds of voiced frames in the current segment
+        self.started = 0.0
+        self.last_voiced = 0.0
+
+    def reset(self) -> None:
+        self.buffer = bytearray()
+        self.in_speech = False
+        self.voiced = 0.0
+
+    def feed(self, pcm: bytes, rms: int, now: float) -> bytes | None:
+        """Add one frame. Returns the segment's PCM when this frame ends one."""
+        voiced = rms > max(VAD_MIN_RMS, self.noise_floor * VAD_FLOOR_RATIO)
+
+        if not self.in_speech:
+            if not voiced:
+                self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+                self.preroll.append(pcm)
+                return None
+            self.in_speech = True
+            self.started = now
+            for frame in self.preroll:
+                self.buffer.extend(frame)
+            self.preroll.clear()
+
+        self.buffer.extend(pcm)
+        if voiced:
+            self.voiced += _FRAME_SECONDS
+            self.last_voiced = now
+        if (now - self.last_voiced >= VAD_END_SILENCE
+                or now - self.started >= VAD_MAX_SEGMENT):
+            return self.end_segment()
+        return None
+
+    def expire(self, now: float) -> bytes | None:
+        """End the segment if packets stopped arriving VAD_END_SILENCE ago."""
+        if self.in_speech and now - self.last_voiced >= VAD_END_SILENCE:
+            return self.end_segment()
+        return None
+
+    def end_segment(self) -> bytes | None:
+        """Close the current segment. Returns PCM if it had enough speech."""
+        pcm = bytes(self.buffer) if self.voiced >= VAD_MIN_SPEECH else None
+        self.reset()
+        return pcm
+
+
 if HAS_VOICE_RECV:
     class VoiceListenerSink(voice_recv.BasicSink):
-        """Collects per-user PCM audio and detects when a user stops speaking."""
+        """Per-speaker energy VAD; hands each finished utterance to STT immediately.
+
+        write() runs on the voice receive thread and does a constant amount of
+        work per packet. Timeouts for speakers whose packets simply stop are
+        handled by one periodic sweep on the event loop, not a timer per packet.
+        """
 
         def __init__(self, bot_user_id: int, guild_id: int, callback, loop, queue: MusicQueue) -> None:
             super().__init__()
@@ -291,8 +372,9 @@ if HAS_VOICE_RECV:
             self.callback = callback
             self.loop = loop
             self.queue = queue
-            self.buffers: dict[int, bytearray] = {}
-            self.speaking: dict[int, float] = {}
+            self.speakers: dict[int, _SpeakerState] = {}
+            self._lock = threading.Lock()
+            self._sweeper = loop.create_task(self._sweep())
 
         def write(self, user, data) -> None:
             if user is None or user.id == self.bot_user_id:
@@ -300,46 +382,54 @@ if HAS_VOICE_RECV:
             if self.queue.is_speaking_tts:
                 return
 
-            uid = user.id
             pcm = data.pcm
-            if uid not in self.buffers:
-                self.buffers[uid] = bytearray()
-            self.buffers[uid].extend(pcm)
-            self.speaking[uid] = time.monotonic()
-
-            # Schedule silence check 1.5s from now on the event loop
-            self.loop.call_soon_threadsafe(
-                self.loop.call_later, 1.5, self._check_silence, uid
-            )
+            if not pcm:
+                return
+            now = time.monotonic()
+            rms = audioop.rms(pcm, 2)
 
-        def cleanup(self) -> None:
-            self.buffers.clear()
-            self.speaking.clear()
+            with self._lock:
+                state = self.speakers.get(user.id)
+                if state is None:
+                    state = self.speakers[user.id] = _SpeakerState()
+                segment = state.feed(pcm, rms, now)
 
-        def _check_silence(self, user_id: int) -> None:
-            """Called ~1.5s after last packet. Process audio if user stopped speaking."""
-            last = self.speaking.get(user_id, 0)
-            if time.monotonic() - last < 1.4:
-                return  # Still speaking
+            if segment:
+                self._dispatch(user.id, segment)
 
-            pcm = bytes(self.buffers.pop(user_id, b""))
-            self.speaking.pop(user_id, None)
-            if not pcm:
-                return
+        def cleanup(self) -> None:
+            self.loop.call_soon_threadsafe(self._sweeper.cancel)
+            with self._lock:
+                self.speakers.clear()
 
-            wav_bytes = _pcm_to_wav_48k(pcm)
+        def _dispatch(self, user_id: int, pcm: bytes) -> None:
+            wav_bytes = _pcm_to_wav_16k(pcm)
             asyncio.run_coroutine_threadsafe(
                 self.callback(self.guild_id, user_id, wav_bytes),
                 self.loop,
             )
 
+        async def _sweep(self) -> None:
+            """End segments for speakers whose packets stopped arriving."""
+            while True:
+                await asyncio.sleep(VAD_SWEEP_INTERVAL)
+                now = time.monotonic()
+                due = []
+                with self._lock:
+                    for uid, state in self.speakers.items():
+                        segment = state.expire(now)
+                        if segment:
+                            due.append((uid, segment))
+                for uid, segment in due:
+                    self._dispatch(uid, segment)
+
 
 async def _on_user_speech(guild_id: int, user_id: int, wav_bytes: bytes) -> None:
     """Process speech from a user in voice channel after they stop speaking."""
     queue = _get_queue(guild_id)
 
-    # Size gate: skip if audio < 0.5s (48kHz * 1ch * 2bytes * 0.5s = 48000)
-    if len(wav_bytes) < 48000:
+    # Size gate: skip if audio < 0.5s (16kHz * 1ch * 2bytes * 0.5s = 16000)
+    if len(wav_bytes) < STT_SAMPLE_RATE:
         return
 
     # Per-user rate limit (3 seconds)
@@ -1106,68 +1196,24 @@ class SocialBot(commands.Bot):
         # ── XP tracking (guild messages only, 60s cooldown) ──
         if message.guild and not isinstance(message.channel, discord.DMChannel):
             try:
-                now = time.time()
-                db = _get_db()
-                row = db.execute(
-                    "SELECT xp, level, total_messages, last_xp_time FROM xp_data WHERE user_id = ?",
-                    (message.author.id,),
-                ).fetchone()
-                if row:
-                    xp, level, total_msgs, last_xp = row["xp"], row["level"], row["total_messages"], row["last_xp_time"]
-                else:
-                    xp, level, total_msgs, last_xp = 0, 1, 0, 0.0
-
-                total_msgs += 1
-
-                if now - last_xp >= 60:
-                    gained = random.randint(15, 25)
-                    xp += gained
-                    last_xp = now
-
-                    # Check level up
-                    new_level = level
-                    max_level = len(XP_THRESHOLDS)
-                    while new_level < max_level and xp >= XP_THRESHOLDS[new_level]:
-                        new_level += 1
-
-                    leveled_up = new_level > level
-                    level = new_level
-
-                    db.execute(
-                        "INSERT INTO xp_data (user_id, xp, level, total_messages, last_xp_time) "
-                        "VALUES (?, ?, ?, ?, ?) "
-                        "ON CONFLICT(user_id) DO UPDATE SET xp=?, level=?, total_messages=?, last_xp_time=?",
-                        (message.author.id, xp, level, total_msgs, last_xp,
-                         xp, level, total_msgs, last_xp),
-                    )
-                    db.commit()
-
-                    if leveled_up:
-                        lvl_embed = discord.Embed(
-                            title="Level Up! 🎉",
-                            description=(
-                                f"Congrats **{message.author.display_name}**! "
-                                f"You reached **Level {level}**! Keep chatting! 🤖"
-                            ),
-                            color=0xFFD700,
-                        )
-                        if message.author.avatar:
-                            lvl_embed.set_thumbnail(url=message.author.avatar.url)
-                        try:
-                            await message.channel.send(embed=lvl_embed)
-                        except discord.HTTPException:
-                            pass
-                else:
-                    # Still increment message count even if no XP awarded
-                    db.execute(
-                        "INSERT INTO xp_data (user_id, xp, level, total_messages, last_xp_time) "
-                        "VALUES (?, ?, ?, ?, ?) "
-                        "ON CONFLICT(user_id) DO UPDATE SET total_messages=?",
-                        (message.author.id, xp, level, total_msgs, last_xp, total_msgs),
+                new_level = await _db.write(
+                    lambda conn: _record_message_xp(conn, message.author.id, time.time())
+                )
+                if new_level:
+                    lvl_embed = discord.Embed(
+                        title="Level Up! 🎉",
+                        description=(
+                            f"Congrats **{message.author.display_name}**! "
+                            f"You reached **Level {new_level}**! Keep chatting! 🤖"
+                        ),
+                        color=0xFFD700,
                     )
-                    db.commit()
-
-                db.close()
+                    if message.author.avatar:
+                        lvl_embed.set_thumbnail(url=message.author.avatar.url)
+                    try:
+                        await message.channel.send(embed=lvl_embed)
+                    except discord.HTTPException:
+                        pass
             except Exception as e:
                 logger.error("XP tracking error: %s", e)
 
@@ -1400,14 +1446,9 @@ def _is_spotify_url(url: str) -> bool:
 
 async def _spotify_to_search(url: str) -> Optional[str]:
     """Convert a Spotify URL to a search query via oEmbed (no API key needed)."""
-    import requests as req
     try:
-        loop = asyncio.get_running_loop()
-        r = await loop.run_in_executor(None, lambda: req.get(
-            f"https://open.spotify.com/oembed?url={url}", timeout=10,
-        ))
-        r.raise_for_status()
-        return r.json().get("title", "")
+        data = await _http.get_json("https://open.spotify.com/oembed", {"url": url})
+        return data.get("title", "")
     except Exception as e:
         logger.error("Spotify oEmbed failed: %s", e)
     return None
@@ -1655,14 +1696,11 @@ async def _on_track_end(guild_id: int) -> None:
     # Record play in stats DB
     if finished:
         try:
-            db = _get_db()
-            db.execute(
+            _db.submit(lambda conn: conn.execute(
                 "INSERT INTO play_history (guild_id, user_id, track_title, track_url, duration) VALUES (?, ?, ?, ?, ?)",
                 (guild_id, finished.get("requester_id"), finished.get("title", ""),
                  finished.get("webpage_url", ""), finished.get("duration", 0)),
-            )
-            db.commit()
-            db.close()
+            ))
         except Exception:
             pass
 
@@ -2325,14 +2363,8 @@ async def _coinflip_cmd(interaction: discord.Interaction) -> None:
 @app_commands.describe(title="Anime title to search for")
 async def _anime_cmd(interaction: discord.Interaction, title: str) -> None:
     await interaction.response.defer()
-    import requests as req
     try:
-        loop = asyncio.get_running_loop()
-        r = await loop.run_in_executor(None, lambda: req.get(
-            f"https://api.jikan.moe/v4/anime?q={title}&limit=1&sfw=true", timeout=10,
-        ))
-        r.raise_for_status()
-        data = r.json()
+        data = await _http.get_json(JIKAN_API + "/anime", {"q": title, "limit": "1", "sfw": "true"})
     except Exception as e:
         await interaction.followup.send(f"Couldn't search for anime: {e}")
         return
@@ -2378,16 +2410,10 @@ async def _anime_cmd(interaction: discord.Interaction, title: str) -> None:
 @app_commands.describe(title="Anime to get recommendations for")
 async def _animerec_cmd(interaction: discord.Interaction, title: str) -> None:
     await interaction.response.defer()
-    import requests as req
-    loop = asyncio.get_running_loop()
-
     # Step 1: Search for the anime to get its ID
     try:
-        r = await loop.run_in_executor(None, lambda: req.get(
-            f"https://api.jikan.moe/v4/anime?q={title}&limit=1&sfw=true", timeout=10,
-        ))
-        r.raise_for_status()
-        results = r.json().get("data", [])
+        data = await _http.get_json(JIKAN_API + "/anime", {"q": title, "limit": "1", "sfw": "true"})
+        results = data.get("data", [])
     except Exception as e:
         await interaction.followup.send(f"Search failed: {e}")
         return
@@ -2400,14 +2426,10 @@ async def _animerec_cmd(interaction: discord.Interaction, title: str) -> None:
     anime_id = anime["mal_id"]
     anime_title = anime.get("title", title)
 
-    # Step 2: Get recommendations (rate limit: Jikan needs 1s between calls)
-    await asyncio.sleep(1)
+    # Step 2: Get recommendations (the cache's Jikan bucket spaces out the calls)
     try:
-        r = await loop.run_in_executor(None, lambda: req.get(
-            f"https://api.jikan.moe/v4/anime/{anime_id}/recommendations", timeout=10,
-        ))
-        r.raise_for_status()
-        recs = r.json().get("data", [])
+        data = await _http.get_json(f"{JIKAN_API}/anime/{anime_id}/recommendations")
+        recs = data.get("data", [])
     except Exception as e:
         await interaction.followup.send(f"Couldn't fetch recommendations: {e}")
         return
@@ -2450,15 +2472,9 @@ async def _animerec_cmd(interaction: discord.Interaction, title: str) -> None:
 ])
 async def _animetop_cmd(interaction: discord.Interaction, filter: str = "") -> None:
     await interaction.response.defer()
-    import requests as req
-    url = "https://api.jikan.moe/v4/top/anime?limit=10&sfw=true"
-    if filter:
-        url += f"&filter={filter}"
+    params = {"limit": "10", "sfw": "true", "filter": filter or None}
     try:
-        loop = asyncio.get_running_loop()
-        r = await loop.run_in_executor(None, lambda: req.get(url, timeout=10))
-        r.raise_for_status()
-        data = r.json().get("data", [])
+        data = (await _http.get_json(JIKAN_API + "/top/anime", params)).get("data", [])
     except Exception as e:
         await interaction.followup.send(f"Couldn't fetch top anime: {e}")
         return
@@ -2494,14 +2510,8 @@ async def _animetop_cmd(interaction: discord.Interaction, filter: str = "") -> N
 @app_commands.command(name="animeseason", description="Show this season's anime")
 async def _animeseason_cmd(interaction: discord.Interaction) -> None:
     await interaction.response.defer()
-    import requests as req
     try:
-        loop = asyncio.get_running_loop()
-        r = await loop.run_in_executor(None, lambda: req.get(
-            "https://api.jikan.moe/v4/seasons/now?limit=10&sfw=true", timeout=10,
-        ))
-        r.raise_for_status()
-        data = r.json().get("data", [])
+        data = (await _http.get_json(JIKAN_API + "/seasons/now", {"limit": "10", "sfw": "true"})).get("data", [])
     except Exception as e:
         await interaction.followup.send(f"Couldn't fetch seasonal anime: {e}")
         return
@@ -2530,14 +2540,8 @@ async def _animeseason_cmd(interaction: discord.Interaction) -> None:
 @app_commands.command(name="randomanime", description="Get a random anime suggestion!")
 async def _randomanime_cmd(interaction: discord.Interaction) -> None:
     await interaction.response.defer()
-    import requests as req
     try:
-        loop = asyncio.get_running_loop()
-        r = await loop.run_in_executor(None, lambda: req.get(
-            "https://api.jikan.moe/v4/random/anime", timeout=10,
-        ))
-        r.raise_for_status()
-        anime = r.json().get("data", {})
+        anime = (await _http.get_json(JIKAN_API + "/random/anime")).get("data", {})
     except Exception as e:
         await interaction.followup.send(f"Couldn't fetch random anime: {e}")
         return
@@ -2581,14 +2585,8 @@ async def _randomanime_cmd(interaction: discord.Interaction) -> None:
 @app_commands.describe(title="Manga title to search for")
 async def _manga_cmd(interaction: discord.Interaction, title: str) -> None:
     await interaction.response.defer()
-    import requests as req
     try:
-        loop = asyncio.get_running_loop()
-        r = await loop.run_in_executor(None, lambda: req.get(
-            f"https://api.jikan.moe/v4/manga?q={title}&limit=1&sfw=true", timeout=10,
-        ))
-        r.raise_for_status()
-        data = r.json()
+        data = await _http.get_json(JIKAN_API + "/manga", {"q": title, "limit": "1", "sfw": "true"})
     except Exception as e:
         await interaction.followup.send(f"Couldn't search for manga: {e}")
         return
@@ -2641,32 +2639,16 @@ TMDB_API_KEY = os.environ.get("TMDB_API_KEY", "")
 TMDB_IMG = "https://image.tmdb.org/t/p/w500"
 
 
-def _omdb_get(params: dict) -> dict:
-    import requests as req
+async def _omdb(params: dict) -> dict:
     p = dict(params)
     p["apikey"] = OMDB_API_KEY
-    r = req.get("https://www.omdbapi.com/", params=p, timeout=10)
-    r.raise_for_status()
-    return r.json()
+    return await _http.get_json("https://www.omdbapi.com/", p)
 
 
-async def _omdb(params: dict) -> dict:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, lambda: _omdb_get(params))
-
-
-def _tmdb_get(endpoint: str, params: dict = None) -> dict:
-    import requests as req
+async def _tmdb(endpoint: str, params: dict = None) -> dict:
     p = dict(params or {})
     p["api_key"] = TMDB_API_KEY
-    r = req.get(f"https://api.themoviedb.org/3{endpoint}", params=p, timeout=10)
-    r.raise_for_status()
-    return r.json()
-
-
-async def _tmdb(endpoint: str, params: dict = None) -> dict:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, lambda: _tmdb_get(endpoint, params))
+    return await _http.get_json(f"https://api.themoviedb.org/3{endpoint}", p)
 
 
 def _omdb_movie_embed(m: dict) -> discord.Embed:
@@ -3102,11 +3084,7 @@ def _book_embed(book: dict) -> discord.Embed:
 
 
 async def _ol_get(path: str, params: dict = None) -> dict:
-    import requests as req
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, lambda: req.get(
-        f"https://openlibrary.org{path}", params=params, timeout=10,
-    ).json())
+    return await _http.get_json(f"https://openlibrary.org{path}", params)
 
 
 @app_commands.command(name="book", description="Look up a book")
@@ -3235,15 +3213,9 @@ RAWG_API_KEY = os.environ.get("RAWG_API_KEY", "")
 
 
 async def _rawg(endpoint: str, params: dict = None) -> dict:
-    import requests as req
     p = dict(params or {})
     p["key"] = RAWG_API_KEY
-    loop = asyncio.get_running_loop()
-    r = await loop.run_in_executor(None, lambda: req.get(
-        f"https://api.rawg.io/api{endpoint}", params=p, timeout=10,
-    ))
-    r.raise_for_status()
-    return r.json()
+    return await _http.get_json(f"https://api.rawg.io/api{endpoint}", p)
 
 
 def _game_embed(game: dict) -> discord.Embed:
@@ -3426,14 +3398,8 @@ async def _lyrics_cmd(interaction: discord.Interaction) -> None:
         r'(?i)(official|video|audio|lyrics|hd|4k|mv|music video)', '', clean_title
     ).strip()
 
-    import requests as req
     try:
-        loop = asyncio.get_running_loop()
-        r = await loop.run_in_executor(None, lambda: req.get(
-            f"https://lrclib.net/api/search?q={clean_title}", timeout=10,
-        ))
-        r.raise_for_status()
-        data = r.json()
+        data = await _http.get_json("https://lrclib.net/api/search", {"q": clean_title})
     except Exception as e:
         await interaction.followup.send(f"Couldn't fetch lyrics: {e}")
         return
@@ -3740,24 +3706,29 @@ async def _stats_cmd(interaction: discord.Interaction, server: bool = False) ->
         await interaction.response.send_message("Server only!", ephemeral=True)
         return
 
-    try:
-        db = _get_db()
-        guild_id = interaction.guild.id
+    guild_id = interaction.guild.id
+    uid = interaction.user.id
 
+    def _query(conn):
         if server:
-            rows = db.execute(
-                "SELECT track_title, COUNT(*) as plays FROM play_history "
-                "WHERE guild_id = ? GROUP BY track_title ORDER BY plays DESC LIMIT 10",
-                (guild_id,),
-            ).fetchall()
-            total = db.execute(
-                "SELECT COUNT(*) FROM play_history WHERE guild_id = ?", (guild_id,),
-            ).fetchone()[0]
-            total_dur = db.execute(
-                "SELECT COALESCE(SUM(duration), 0) FROM play_history WHERE guild_id = ?",
-                (guild_id,),
-            ).fetchone()[0]
+            where, params, limit = "guild_id = ?", (guild_id,), 10
+        else:
+            where, params, limit = "guild_id = ? AND user_id = ?", (guild_id, uid), 5
+        rows = conn.execute(
+            f"SELECT track_title, COUNT(*) as plays FROM play_history "
+            f"WHERE {where} GROUP BY track_title ORDER BY plays DESC LIMIT {limit}",
+            params,
+        ).fetchall()
+        total, total_dur = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(duration), 0) FROM play_history WHERE {where}",
+            params,
+        ).fetchone()
+        return rows, total, total_dur
 
+    try:
+        rows, total, total_dur = await _db.read(_query)
+
+        if server:
             embed = discord.Embed(title="📊 Server Listening Stats", color=0x7B68EE)
             embed.add_field(name="Total Tracks", value=str(total), inline=True)
             embed.add_field(name="Total Time", value=_format_duration(total_dur), inline=True)
@@ -3766,21 +3737,6 @@ async def _stats_cmd(interaction: discord.Interaction, server: bool = False) ->
                          for i, r in enumerate(rows, 1)]
                 embed.add_field(name="🏆 Most Played", value="\n".join(lines), inline=False)
         else:
-            uid = interaction.user.id
-            rows = db.execute(
-                "SELECT track_title, COUNT(*) as plays FROM play_history "
-                "WHERE guild_id = ? AND user_id = ? GROUP BY track_title ORDER BY plays DESC LIMIT 5",
-                (guild_id, uid),
-            ).fetchall()
-            total = db.execute(
-                "SELECT COUNT(*) FROM play_history WHERE guild_id = ? AND user_id = ?",
-                (guild_id, uid),
-            ).fetchone()[0]
-            total_dur = db.execute(
-                "SELECT COALESCE(SUM(duration), 0) FROM play_history WHERE guild_id = ? AND user_id = ?",
-                (guild_id, uid),
-            ).fetchone()[0]
-
             embed = discord.Embed(title="📊 Your Listening Stats", color=0x7B68EE)
             embed.add_field(name="Total Tracks", value=str(total), inline=True)
             embed.add_field(name="Total Time", value=_format_duration(total_dur), inline=True)
@@ -3789,7 +3745,6 @@ async def _stats_cmd(interaction: discord.Interaction, server: bool = False) ->
                          for i, r in enumerate(rows, 1)]
                 embed.add_field(name="🎵 Top Songs", value="\n".join(lines), inline=False)
 
-        db.close()
         await interaction.response.send_message(embed=embed)
     except Exception as e:
         logger.error("Stats command failed: %s", e)
@@ -3846,15 +3801,10 @@ class TriviaView(discord.ui.View):
 ])
 async def _trivia_cmd(interaction: discord.Interaction, category: str = "9") -> None:
     await interaction.response.defer()
-    import requests as req
     try:
-        loop = asyncio.get_running_loop()
-        r = await loop.run_in_executor(None, lambda: req.get(
-            f"https://opentdb.com/api.php?amount=1&category={category}&type=multiple",
-            timeout=10,
-        ))
-        r.raise_for_status()
-        data = r.json()
+        data = await _http.get_json(
+            "https://opentdb.com/api.php", {"amount": "1", "category": category, "type": "multiple"},
+        )
     except Exception as e:
         await interaction.followup.send(f"Couldn't fetch trivia: {e}")
         return
@@ -4565,17 +4515,12 @@ async def _guesstheanime_cmd(interaction: discord.Interaction,
 
     try:
         # Get a random popular anime from Jikan
-        loop = asyncio.get_running_loop()
-        import requests as req
         page = random.randint(1, 10)
         try:
-            r = await loop.run_in_executor(None, lambda: req.get(
-                "https://api.jikan.moe/v4/top/anime",
-                params={"page": str(page), "limit": "25", "filter": "bypopularity"},
-                timeout=10,
-            ))
-            r.raise_for_status()
-            anime_list = r.json().get("data", [])
+            data = await _http.get_json(
+                JIKAN_API + "/top/anime", {"page": str(page), "limit": "25", "filter": "bypopularity"},
+            )
+            anime_list = data.get("data", [])
         except Exception as e:
             await interaction.followup.send(f"Couldn't fetch anime: {e}")
             return
@@ -4598,13 +4543,8 @@ async def _guesstheanime_cmd(interaction: discord.Interaction,
             image_url = None
             if anime_id:
                 try:
-                    await asyncio.sleep(0.5)  # Jikan rate limit
-                    r2 = await loop.run_in_executor(None, lambda: req.get(
-                        f"https://api.jikan.moe/v4/anime/{anime_id}/pictures",
-                        timeout=10,
-                    ))
-                    r2.raise_for_status()
-                    pictures = r2.json().get("data", [])
+                    data = await _http.get_json(f"{JIKAN_API}/anime/{anime_id}/pictures")
+                    pictures = data.get("data", [])
                     if pictures:
                         pic = random.choice(pictures)
                         image_url = (pic.get("jpg", {}).get("large_image_url")
@@ -4936,16 +4876,8 @@ async def _guessthegame_cmd(interaction: discord.Interaction,
 # ── Phase 6: Anime Additions ─────────────────────────────────────────
 
 
-def _waifu_pics_get(endpoint: str) -> str:
-    import requests as req
-    r = req.get(f"https://api.waifu.pics/sfw/{endpoint}", timeout=10)
-    r.raise_for_status()
-    return r.json().get("url", "")
-
-
 async def _waifu_pics(endpoint: str) -> str:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, lambda: _waifu_pics_get(endpoint))
+    return (await _http.get_json(f"https://api.waifu.pics/sfw/{endpoint}")).get("url", "")
 
 
 @app_commands.command(name="waifu", description="Get a random waifu image!")
@@ -4973,16 +4905,8 @@ async def _husbando_cmd(interaction: discord.Interaction) -> None:
     await interaction.response.send_message(embed=embed)
 
 
-def _animequote_get() -> dict:
-    import requests as req
-    r = req.get("https://animechan.io/api/v1/quotes/random", timeout=10)
-    r.raise_for_status()
-    return r.json()
-
-
 async def _animequote_fetch() -> dict:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, _animequote_get)
+    return await _http.get_json("https://animechan.io/api/v1/quotes/random")
 
 
 @app_commands.command(name="animequote", description="Get a random anime quote!")
@@ -5011,28 +4935,40 @@ async def _animequote_cmd(interaction: discord.Interaction) -> None:
 _watchlist_group = app_commands.Group(name="watchlist", description="Manage your anime watchlist")
 
 
+def _load_watchlist(conn: sqlite3.Connection, uid: int) -> list[str]:
+    row = conn.execute("SELECT value FROM user_prefs WHERE user_id = ? AND key = 'watchlist'", (uid,)).fetchone()
+    return json.loads(row["value"]) if row else []
+
+
+def _save_watchlist(conn: sqlite3.Connection, uid: int, watchlist: list[str]) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO user_prefs (user_id, key, value) VALUES (?, 'watchlist', ?)",
+        (uid, json.dumps(watchlist)),
+    )
+
+
 @_watchlist_group.command(name="add", description="Add an anime to your watchlist")
 @app_commands.describe(title="Anime title to add")
 async def _watchlist_add(interaction: discord.Interaction, title: str) -> None:
     uid = interaction.user.id
-    db = _get_db()
-    row = db.execute("SELECT value FROM user_prefs WHERE user_id = ? AND key = 'watchlist'", (uid,)).fetchone()
-    watchlist = json.loads(row["value"]) if row else []
-    if title in watchlist:
-        db.close()
+
+    def _add(conn):
+        watchlist = _load_watchlist(conn, uid)
+        if title in watchlist:
+            return "exists", watchlist
+        if len(watchlist) >= 50:
+            return "full", watchlist
+        watchlist.append(title)
+        _save_watchlist(conn, uid, watchlist)
+        return "added", watchlist
+
+    status, watchlist = await _db.write(_add)
+    if status == "exists":
         await interaction.response.send_message(f"**{title}** is already on your watchlist!", ephemeral=True)
         return
-    if len(watchlist) >= 50:
-        db.close()
+    if status == "full":
         await interaction.response.send_message("Your watchlist is full (max 50)!", ephemeral=True)
         return
-    watchlist.append(title)
-    db.execute(
-        "INSERT OR REPLACE INTO user_prefs (user_id, key, value) VALUES (?, 'watchlist', ?)",
-        (uid, json.dumps(watchlist)),
-    )
-    db.commit()
-    db.close()
     await interaction.response.send_message(f"📝 Added **{title}** to your watchlist! ({len(watchlist)} total)")
 
 
@@ -5040,36 +4976,31 @@ async def _watchlist_add(interaction: discord.Interaction, title: str) -> None:
 @app_commands.describe(title="Anime title to remove")
 async def _watchlist_remove(interaction: discord.Interaction, title: str) -> None:
     uid = interaction.user.id
-    db = _get_db()
-    row = db.execute("SELECT value FROM user_prefs WHERE user_id = ? AND key = 'watchlist'", (uid,)).fetchone()
-    watchlist = json.loads(row["value"]) if row else []
-    # Case-insensitive matching
-    match = None
-    for item in watchlist:
-        if item.lower() == title.lower():
-            match = item
-            break
+
+    def _remove(conn):
+        watchlist = _load_watchlist(conn, uid)
+        # Case-insensitive matching
+        match = None
+        for item in watchlist:
+            if item.lower() == title.lower():
+                match = item
+                break
+        if match:
+            watchlist.remove(match)
+            _save_watchlist(conn, uid, watchlist)
+        return match, watchlist
+
+    match, watchlist = await _db.write(_remove)
     if not match:
-        db.close()
         await interaction.response.send_message(f"**{title}** is not on your watchlist!", ephemeral=True)
         return
-    watchlist.remove(match)
-    db.execute(
-        "INSERT OR REPLACE INTO user_prefs (user_id, key, value) VALUES (?, 'watchlist', ?)",
-        (uid, json.dumps(watchlist)),
-    )
-    db.commit()
-    db.close()
     await interaction.response.send_message(f"🗑️ Removed **{match}** from your watchlist! ({len(watchlist)} remaining)")
 
 
 @_watchlist_group.command(name="show", description="Show your anime watchlist")
 async def _watchlist_show(interaction: discord.Interaction) -> None:
     uid = interaction.user.id
-    db = _get_db()
-    row = db.execute("SELECT value FROM user_prefs WHERE user_id = ? AND key = 'watchlist'", (uid,)).fetchone()
-    db.close()
-    watchlist = json.loads(row["value"]) if row else []
+    watchlist = await _db.read(lambda conn: _load_watchlist(conn, uid))
     if not watchlist:
         await interaction.response.send_message("Your watchlist is empty! Use `/watchlist add` to add anime.", ephemeral=True)
         return
@@ -5088,14 +5019,8 @@ async def _watchlist_show(interaction: discord.Interaction) -> None:
 @app_commands.command(name="schedule", description="Show currently airing anime schedule")
 async def _schedule_cmd(interaction: discord.Interaction) -> None:
     await interaction.response.defer()
-    import requests as req
     try:
-        loop = asyncio.get_running_loop()
-        r = await loop.run_in_executor(None, lambda: req.get(
-            "https://api.jikan.moe/v4/seasons/now?filter=tv&limit=15", timeout=10,
-        ))
-        r.raise_for_status()
-        data = r.json().get("data", [])
+        data = (await _http.get_json(JIKAN_API + "/seasons/now", {"filter": "tv", "limit": "15"})).get("data", [])
     except Exception as e:
         await interaction.followup.send(f"Couldn't fetch schedule: {e}")
         return
@@ -5128,15 +5053,12 @@ async def _schedule_cmd(interaction: discord.Interaction) -> None:
 # ── Phase 7: Media + Reddit ─────────────────────────────────────────
 
 
-def _reddit_get(subreddit: str) -> list:
-    import requests as req
-    r = req.get(
-        f"https://www.reddit.com/r/{subreddit}/hot.json?limit=50",
+async def _reddit(subreddit: str) -> list:
+    data = await _http.get_json(
+        f"https://www.reddit.com/r/{subreddit}/hot.json", {"limit": "50"},
         headers={"User-Agent": "BMO-Bot/1.0"},
-        timeout=10,
     )
-    r.raise_for_status()
-    posts = r.json().get("data", {}).get("children", [])
+    posts = data.get("data", {}).get("children", [])
     image_posts = []
     for p in posts:
         pdata = p.get("data", {})
@@ -5154,11 +5076,6 @@ def _reddit_get(subreddit: str) -> list:
     return image_posts
 
 
-async def _reddit(subreddit: str) -> list:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, lambda: _reddit_get(subreddit))
-
-
 @app_commands.command(name="meme", description="Get a random meme!")
 @app_commands.describe(subreddit="Subreddit to pull memes from")
 @app_commands.choices(subreddit=[
@@ -5210,23 +5127,14 @@ async def _reddit_cmd(interaction: discord.Interaction, subreddit: str) -> None:
     await interaction.followup.send(embed=embed)
 
 
-def _wallhaven_get(category: str) -> str:
-    import requests as req
-    r = req.get(
-        "https://wallhaven.cc/api/v1/search",
-        params={"q": category, "sorting": "random", "purity": "100"},
-        timeout=10,
+async def _wallhaven(category: str) -> str:
+    data = await _http.get_json(
+        "https://wallhaven.cc/api/v1/search", {"q": category, "sorting": "random", "purity": "100"},
     )
-    r.raise_for_status()
-    data = r.json().get("data", [])
-    if not data:
+    results = data.get("data", [])
+    if not results:
         return ""
-    return random.choice(data).get("path", "")
-
-
-async def _wallhaven(category: str) -> str:
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, lambda: _wallhaven_get(category))
+    return random.choice(results).get("path", "")
 
 
 @app_commands.command(name="wallpaper", description="Get a random wallpaper!")
@@ -5311,13 +5219,10 @@ async def _birthday_set(interaction: discord.Interaction, month: int, day: int)
         return
     value = f"{month:02d}-{day:02d}"
     uid = interaction.user.id
-    db = _get_db()
-    db.execute(
+    await _db.execute(
         "INSERT OR REPLACE INTO user_prefs (user_id, key, value) VALUES (?, 'birthday', ?)",
         (uid, value),
     )
-    db.commit()
-    db.close()
     month_names = ["", "January", "February", "March", "April", "May", "June",
                    "July", "August", "September", "October", "November", "December"]
     await interaction.response.send_message(
@@ -5329,9 +5234,7 @@ async def _birthday_list(interaction: discord.Interaction) -> None:
     if not interaction.guild:
         await interaction.response.send_message("Server only!", ephemeral=True)
         return
-    db = _get_db()
-    rows = db.execute("SELECT user_id, value FROM user_prefs WHERE key = 'birthday'").fetchall()
-    db.close()
+    rows = await _db.fetchall("SELECT user_id, value FROM user_prefs WHERE key = 'birthday'")
 
     if not rows:
         await interaction.response.send_message("No birthdays registered yet! Use `/birthday set` to add yours.", ephemeral=True)
@@ -5392,12 +5295,10 @@ async def _birthday_checker() -> None:
     if not _bot or not _bot.guilds:
         return
     today_str = f"{datetime.date.today().month:02d}-{datetime.date.today().day:02d}"
-    db = _get_db()
-    rows = db.execute(
+    rows = await _db.fetchall(
         "SELECT user_id FROM user_prefs WHERE key = 'birthday' AND value = ?",
         (today_str,),
-    ).fetchall()
-    db.close()
+    )
 
     if not rows:
         return
@@ -5446,16 +5347,14 @@ def _twitch_get_token() -> str:
     """Get or refresh Twitch OAuth token using client credentials."""
     if not TWITCH_CLIENT_ID or not TWITCH_CLIENT_SECRET:
         return ""
-    # Check cached token
-    db = _get_db()
-    row = db.execute(
+    # Check cached token (runs in a worker thread, so the sync DB calls are fine)
+    row = _db.read_sync(lambda conn: conn.execute(
         "SELECT value FROM user_prefs WHERE user_id = 0 AND key = 'twitch_token'"
-    ).fetchone()
+    ).fetchone())
     if row:
         try:
             cached = json.loads(row["value"])
             if cached.get("expires", 0) > time.time() + 60:
-                db.close()
                 return cached["token"]
         except (json.JSONDecodeError, KeyError):
             pass
@@ -5475,16 +5374,13 @@ def _twitch_get_token() -> str:
         data = r.json()
         token = data["access_token"]
         expires = time.time() + data.get("expires_in", 3600)
-        db.execute(
+        _db.submit(lambda conn: conn.execute(
             "INSERT OR REPLACE INTO user_prefs (user_id, key, value) VALUES (0, 'twitch_token', ?)",
             (json.dumps({"token": token, "expires": expires}),),
-        )
-        db.commit()
-        db.close()
+        ))
         return token
     except Exception as e:
         logger.error("Twitch token request failed: %s", e)
-        db.close()
         return ""
 
 
@@ -5681,6 +5577,49 @@ def _xp_level_for(xp: int) -> int:
     return level
 
 
+def _record_message_xp(conn: sqlite3.Connection, user_id: int, now: float) -> int | None:
+    """Count a message and award XP (60s cooldown). Runs on the DB writer thread.
+
+    Returns the new level on a level-up, otherwise None.
+    """
+    row = conn.execute(
+        "SELECT xp, level, total_messages, last_xp_time FROM xp_data WHERE user_id = ?",
+        (user_id,),
+    ).fetchone()
+    if row:
+        xp, level, total_msgs, last_xp = row["xp"], row["level"], row["total_messages"], row["last_xp_time"]
+    else:
+        xp, level, total_msgs, last_xp = 0, 1, 0, 0.0
+
+    total_msgs += 1
+
+    if now - last_xp < 60:
+        # Still increment message count even if no XP awarded
+        conn.execute(
+            "INSERT INTO xp_data (user_id, xp, level, total_messages, last_xp_time) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(user_id) DO UPDATE SET total_messages=?",
+            (user_id, xp, level, total_msgs, last_xp, total_msgs),
+        )
+        return None
+
+    xp += random.randint(15, 25)
+
+    # Check level up
+    new_level = level
+    max_level = len(XP_THRESHOLDS)
+    while new_level < max_level and xp >= XP_THRESHOLDS[new_level]:
+        new_level += 1
+
+    conn.execute(
+        "INSERT INTO xp_data (user_id, xp, level, total_messages, last_xp_time) "
+        "VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT(user_id) DO UPDATE SET xp=?, level=?, total_messages=?, last_xp_time=?",
+        (user_id, xp, new_level, total_msgs, now, xp, new_level, total_msgs, now),
+    )
+    return new_level if new_level > level else None
+
+
 def _xp_progress_bar(xp: int, level: int, width: int = 10) -> str:
     """Build a text XP progress bar like: ▰▰▰▰▱▱▱▱▱▱"""
     max_level = len(XP_THRESHOLDS)
@@ -5707,35 +5646,34 @@ async def _profile_cmd(interaction: discord.Interaction, user: Optional[discord.
         await interaction.response.send_message("Couldn't find that user!", ephemeral=True)
         return
 
-    try:
-        db = _get_db()
-        row = db.execute(
+    def _query(conn):
+        row = conn.execute(
             "SELECT xp, level, total_messages FROM xp_data WHERE user_id = ?",
             (target.id,),
         ).fetchone()
-        xp = row["xp"] if row else 0
-        level = row["level"] if row else 1
-        total_messages = row["total_messages"] if row else 0
-
         # Top song from play_history
-        top_song_row = db.execute(
+        top_song_row = conn.execute(
             "SELECT track_title, COUNT(*) as plays FROM play_history "
             "WHERE user_id = ? GROUP BY track_title ORDER BY plays DESC LIMIT 1",
             (target.id,),
         ).fetchone()
-        top_song = f"{top_song_row['track_title']} ({top_song_row['plays']}x)" if top_song_row else "None yet"
-
         # Total listening time
-        listen_row = db.execute(
+        listen_row = conn.execute(
             "SELECT COALESCE(SUM(duration), 0) as total FROM play_history WHERE user_id = ?",
             (target.id,),
         ).fetchone()
+        return row, top_song_row, listen_row
+
+    try:
+        row, top_song_row, listen_row = await _db.read(_query)
+        xp = row["xp"] if row else 0
+        level = row["level"] if row else 1
+        total_messages = row["total_messages"] if row else 0
+        top_song = f"{top_song_row['track_title']} ({top_song_row['plays']}x)" if top_song_row else "None yet"
         total_listen = int(listen_row["total"]) if listen_row else 0
         listen_hours = total_listen // 3600
         listen_mins = (total_listen % 3600) // 60
         listen_str = f"{listen_hours}h {listen_mins}m" if listen_hours > 0 else f"{listen_mins}m"
-
-        db.close()
     except Exception as e:
         logger.error("Profile command failed: %s", e)
         await interaction.response.send_message("Couldn't load profile!", ephemeral=True)
@@ -5770,11 +5708,9 @@ async def _leaderboard_cmd(interaction: discord.Interaction) -> None:
         return
 
     try:
-        db = _get_db()
-        rows = db.execute(
+        rows = await _db.fetchall(
             "SELECT user_id, xp, level FROM xp_data ORDER BY xp DESC LIMIT 10"
-        ).fetchall()
-        db.close()
+        )
     except Exception as e:
         logger.error("Leaderboard command failed: %s", e)
         await interaction.response.send_message("Couldn't load leaderboard!", ephemeral=True)
@@ -6111,21 +6047,22 @@ async def _slots_cmd(interaction: discord.Interaction) -> None:
 
     # Award XP
     if xp_win > 0:
-        try:
-            db = _get_db()
-            db.execute(
+        uid = interaction.user.id
+
+        def _award(conn):
+            conn.execute(
                 "INSERT INTO xp_data (user_id, xp, level, total_messages, last_xp_time) "
                 "VALUES (?, ?, 1, 0, 0) "
                 "ON CONFLICT(user_id) DO UPDATE SET xp = xp + ?",
-                (interaction.user.id, xp_win, xp_win),
+                (uid, xp_win, xp_win),
             )
             # Recalculate level
-            row = db.execute("SELECT xp FROM xp_data WHERE user_id = ?", (interaction.user.id,)).fetchone()
+            row = conn.execute("SELECT xp FROM xp_data WHERE user_id = ?", (uid,)).fetchone()
             if row:
-                new_level = _xp_level_for(row["xp"])
-                db.execute("UPDATE xp_data SET level = ? WHERE user_id = ?", (new_level, interaction.user.id))
-            db.commit()
-            db.close()
+                conn.execute("UPDATE xp_data SET level = ? WHERE user_id = ?", (_xp_level_for(row["xp"]), uid))
+
+        try:
+            await _db.write(_award)
         except Exception:
             pass
 
@@ -6839,15 +6776,12 @@ async def _remind_cmd(interaction: discord.Interaction, reminder_time: str, mess
     reminder_id = str(uuid.uuid4())[:8]
 
     try:
-        db = _get_db()
-        db.execute(
+        await _db.execute(
             "INSERT INTO reminders (id, user_id, channel_id, guild_id, message, fire_at) "
             "VALUES (?, ?, ?, ?, ?, ?)",
             (reminder_id, interaction.user.id, interaction.channel_id,
              interaction.guild_id, message, fire_at),
         )
-        db.commit()
-        db.close()
     except Exception as e:
         logger.error("Reminder save failed: %s", e)
         await interaction.response.send_message("Couldn't save reminder!", ephemeral=True)
@@ -6871,12 +6805,12 @@ async def _remind_cmd(interaction: discord.Interaction, reminder_time: str, mess
 async def _reminder_checker() -> None:
     """Check for due reminders every 30 seconds."""
     try:
-        db = _get_db()
-        now = time.time()
-        rows = db.execute(
+        rows = await _db.fetchall(
             "SELECT id, user_id, channel_id, guild_id, message FROM reminders WHERE fire_at <= ?",
-            (now,),
-        ).fetchall()
+            (time.time(),),
+        )
+        if not rows:
+            return
 
         for row in rows:
             try:
@@ -6885,14 +6819,11 @@ async def _reminder_checker() -> None:
                     if channel:
                         await channel.send(
                             f"⏰ <@{row['user_id']}> Reminder: **{row['message']}**")
-                db.execute("DELETE FROM reminders WHERE id = ?", (row["id"],))
             except Exception as e:
-                logger.error("Reminder send failed: %s", e)
                 # Delete stale reminder anyway to prevent spam
-                db.execute("DELETE FROM reminders WHERE id = ?", (row["id"],))
+                logger.error("Reminder send failed: %s", e)
 
-        db.commit()
-        db.close()
+        await _db.executemany("DELETE FROM reminders WHERE id = ?", [(row["id"],) for row in rows])
     except Exception as e:
         logger.error("Reminder checker error: %s", e)
 
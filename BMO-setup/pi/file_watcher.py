@@ -1,90 +1,92 @@
-"""BMO File Watcher — Mtime-based file change detection for the IDE tab.
+"""BMO File Watcher — File change detection for the IDE tab.
 
-Polls currently watched files every 2 seconds and emits change events
-when modifications are detected. Agent edits bypass polling by calling
-notify_change() directly.
+Subscribes each watched file to the shared watch service (inotify, with
+polling only as a fallback) and emits change events when the file's mtime
+moves forward. Agent edits bypass the watcher by calling notify_change()
+directly.
 """
 
 import os
 import threading
 import time
 
+from watch_service import get_watch_service
+
 
 class FileWatcher:
     """Watches files for changes and notifies via callback."""
 
-    def __init__(self, callback, interval: float = 2.0):
+    def __init__(self, callback):
         """
         Args:
             callback: Called with (path, mtime) when a file changes.
-            interval: Polling interval in seconds.
         """
         self._callback = callback
-        self._interval = interval
         self._watched: dict[str, float] = {}  # path → last known mtime
+        self._tokens: dict[str, int] = {}     # path → watch service token
         self._lock = threading.Lock()
-        self._running = False
-        self._thread = None
 
     def watch(self, path: str):
         """Start watching a file."""
-        path = os.path.expanduser(path)
+        path = os.path.abspath(os.path.expanduser(path))
         try:
             mtime = os.path.getmtime(path)
         except OSError:
             mtime = 0
         with self._lock:
             self._watched[path] = mtime
-        self._ensure_running()
+            if path in self._tokens:
+                return
+        token = get_watch_service().watch(path, self._on_change)
+        with self._lock:
+            self._tokens[path] = token
 
     def unwatch(self, path: str):
         """Stop watching a file."""
-        path = os.path.expanduser(path)
+        path = os.path.abspath(os.path.expanduser(path))
         with self._lock:
             self._watched.pop(path, None)
+            token = self._tokens.pop(path, None)
+        if token is not None:
+            get_watch_service().unwatch(token)
 
     def notify_change(self, path: str):
         """Immediately notify that a file changed (called after agent edits).
 
-        This bypasses polling so the UI updates instantly.
+        Records the new mtime so the watch event that follows the edit
+        doesn't notify a second time.
         """
-        path = os.path.expanduser(path)
+        path = os.path.abspath(os.path.expanduser(path))
         try:
             mtime = os.path.getmtime(path)
         except OSError:
             mtime = time.time()
         with self._lock:
-            self._watched[path] = mtime
+            if path in self._watched:
+                self._watched[path] = mtime
         if self._callback:
             self._callback(path, mtime)
 
-    def _ensure_running(self):
-        """Start the polling thread if not already running."""
-        if self._running:
+    def _on_change(self, path: str):
+        """Watch service callback — forward only real mtime advances."""
+        try:
+            current_mtime = os.path.getmtime(path)
+        except OSError:
             return
-        self._running = True
-        self._thread = threading.Thread(target=self._poll_loop, daemon=True)
-        self._thread.start()
-
-    def _poll_loop(self):
-        """Background polling loop."""
-        while self._running:
-            time.sleep(self._interval)
-            with self._lock:
-                paths = dict(self._watched)
-            for path, last_mtime in paths.items():
-                try:
-                    current_mtime = os.path.getmtime(path)
-                    if current_mtime > last_mtime:
-                        with self._lock:
-                            self._watched[path] = current_mtime
-                        if self._callback:
-                            self._callback(path, current_mtime)
-                except OSError:
-                    pass
+        with self._lock:
+            last_mtime = self._watched.get(path)
+            if last_mtime is None or current_mtime <= last_mtime:
+                return
+            self._watched[path] = current_mtime
+        if self._callback:
+            self._callback(path, current_mtime)
 
     def stop(self):
-        """Stop the watcher."""
-        self._running = False
-        if self._thread:
-            self._thread.join(timeout=3)
+        """Stop watching all files."""
+        with self._lock:
+            tokens = list(self._tokens.values())
+            self._tokens.clear()
+            self._watched.clear()
+        service = get_watch_service()
+        for token in tokens:
+            service.unwatch(token)
@@ -0,0 +1,384 @@
+"""BMO HTTP Cache — Shared async response cache for external API lookups.
+
+Used by the social bot's anime/movie/game/book/etc. commands so a popular
+command in a busy server hits each upstream API once, not once per user.
+
+- Keys are the normalized URL: lowercase scheme/host, query string merged
+  with ``params`` and sorted.
+- TTLs come from per-endpoint rules (host + path prefix, longest match wins).
+  A TTL of 0 means "never cache" — used for random/shuffle endpoints.
+- Concurrent identical requests share one upstream call (single-flight).
+- Memory tier is an LRU bounded by total body bytes. An optional disk tier
+  keeps entries across restarts; its file I/O runs on the loop's executor.
+  Expired disk entries are pruned periodically, and the tier is capped at
+  ``disk_max_bytes`` (the entries closest to expiry go first).
+- Each host has a token bucket so bursts are spread out instead of tripping
+  upstream rate limits; a 429 Retry-After pauses the host's bucket.
+- The transport is pluggable. The default runs ``requests`` in the loop's
+  executor; tests pass a fake async transport and never touch the network.
+"""
+
+import asyncio
+import collections
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_TTL = 300.0
+DEFAULT_RATE = (5.0, 10)            # (tokens per second, burst)
+MAX_ENTRIES = 1024
+MAX_BYTES = 16 * 1024 * 1024
+DISK_MAX_BYTES = 64 * 1024 * 1024
+DISK_PRUNE_INTERVAL = 600.0         # Seconds between sweeps for expired disk entries
+TIMEOUT = 10.0
+
+
+@dataclass
+class HttpResponse:
+    status: int
+    body: bytes
+    headers: dict = field(default_factory=dict)
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class HttpError(Exception):
+    """Non-2xx response from upstream (never cached)."""
+
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+        self.url = url
+
+
+# transport(url, headers, timeout) -> HttpResponse; url already has the query string
+Transport = Callable[[str, dict, float], Awaitable[HttpResponse]]
+
+
+async def requests_transport(url: str, headers: dict, timeout: float) -> HttpResponse:
+    """Default transport: blocking ``requests`` call on the loop's executor."""
+    import requests as req
+
+    loop = asyncio.get_running_loop()
+    r = await loop.run_in_executor(None, lambda: req.get(url, headers=headers, timeout=timeout))
+    return HttpResponse(r.status_code, r.content, dict(r.headers))
+
+
+def normalize_url(url: str, params: dict | None = None) -> str:
+    """Canonical form of url + params, used as the cache key."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items() if v is not None)
+    return urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path or "/",
+        urlencode(sorted(query)), "",
+    ))
+
+
+class TokenBucket:
+    """Async token bucket; ``acquire()`` waits until a token is available."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self) -> float:
+        """Take a token; returns how long the caller must wait before using it."""
+        now = self._clock()
+        self._refill(now)
+        self._tokens -= 1
+        wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+        return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    async def acquire(self) -> None:
+        wait = self.delay()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class HttpCache:
+    """TTL + LRU response cache with single-flight and per-host throttling."""
+
+    def __init__(
+        self,
+        transport: Transport | None = None,
+        ttls: list[tuple[str, str, float]] | None = None,
+        rates: dict[str, tuple[float, int]] | None = None,
+        disk_dir: str | None = None,
+        max_entries: int = MAX_ENTRIES,
+        max_bytes: int = MAX_BYTES,
+        disk_max_bytes: int = DISK_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._transport = transport or requests_transport
+        # Longest (host, path prefix) first so the most specific rule wins
+        self._ttls = sorted(ttls or [], key=lambda r: (len(r[0]), len(r[1])), reverse=True)
+        self._rates = rates or {}
+        self._disk_dir = disk_dir
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._disk_max_bytes = disk_max_bytes
+        self._disk_lock = threading.Lock()   # Disk bookkeeping runs on executor threads
+        self._disk_bytes: int | None = None  # Unknown until the first prune
+        self._next_prune = 0.0
+        self._clock = clock
+        self._entries: collections.OrderedDict[str, tuple[float, bytes]] = collections.OrderedDict()
+        self._bytes = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # ── Public API ────────────────────────────────────────────────────
+
+    async def get_json(self, url: str, params: dict | None = None, headers: dict | None = None,
+                       ttl: float | None = None) -> Any:
+        return json.loads(await self.get(url, params, headers, ttl))
+
+    async def get(self, url: str, params: dict | None = None, headers: dict | None = None,
+                  ttl: float | None = None) -> bytes:
+        """GET with caching; returns the response body. Raises HttpError on non-2xx."""
+        key = normalize_url(url, params)
+        ttl = self.ttl_for(key) if ttl is None else ttl
+        if ttl <= 0:
+            return await self._fetch(key, headers)
+
+        body = self._lookup(key)
+        if body is not None:
+            self.stats["hits"] += 1
+            return body
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            # The load runs in its own task so cancelling any one caller
+            # (including the first) leaves the others waiting on it
+            task = asyncio.get_running_loop().create_task(self._load(key, headers, ttl))
+            task.add_done_callback(lambda t: self._flight_done(key, t))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    def ttl_for(self, url: str) -> float:
+        parts = urlsplit(url)
+        host = parts.netloc.lower()
+        for rule_host, prefix, ttl in self._ttls:
+            if (host == rule_host or host.endswith("." + rule_host)) and parts.path.startswith(prefix):
+                return ttl
+        return DEFAULT_TTL
+
+    def invalidate(self, url: str | None = None, params: dict | None = None) -> None:
+        """Drop one entry (memory and disk), or the whole memory tier."""
+        if url is None:
+            self._entries.clear()
+            self._bytes = 0
+            return
+        key = normalize_url(url, params)
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= len(entry[1])
+        if self._disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    async def _load(self, key: str, headers: dict | None, ttl: float) -> bytes:
+        """Disk tier, then upstream; shared by every caller waiting on ``key``."""
+        body = await self._disk_lookup(key)
+        if body is not None:
+            self.stats["disk_hits"] += 1
+            return body
+        self.stats["misses"] += 1
+        body = await self._fetch(key, headers)
+        await self._store(key, body, ttl)
+        return body
+
+    def _flight_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved when every caller gave up
+
+    async def _fetch(self, url: str, headers: dict | None) -> bytes:
+        host = urlsplit(url).netloc.lower()
+        bucket = self._bucket(host)
+        await bucket.acquire()
+        resp = await self._transport(url, headers or {}, TIMEOUT)
+        if resp.status == 429:
+            try:
+                bucket.pause(float(resp.headers.get("Retry-After", 1)))
+            except ValueError:
+                bucket.pause(1.0)
+        if not 200 <= resp.status < 300:
+            self.stats["errors"] += 1
+            raise HttpError(resp.status, url)
+        return resp.body
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = next(
+                (v for h, v in self._rates.items() if host == h or host.endswith("." + h)),
+                DEFAULT_RATE,
+            )
+            bucket = self._buckets[host] = TokenBucket(rate, burst)
+        return bucket
+
+    def _lookup(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, body = entry
+        if expires <= self._clock():
+            del self._entries[key]
+            self._bytes -= len(body)
+            return None
+        self._entries.move_to_end(key)
+        return body
+
+    async def _store(self, key: str, body: bytes, ttl: float) -> None:
+        expires = self._clock() + ttl
+        self._remember(key, expires, body)
+        if self._disk_dir:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self._disk_write, key, expires, body)
+            except OSError as e:
+                print(f"[http_cache] Disk write failed: {e}")
+
+    def _remember(self, key: str, expires: float, body: bytes) -> None:
+        if len(body) > self._max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old:
+            self._bytes -= len(old[1])
+        self._entries[key] = (expires, body)
+        self._bytes += len(body)
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self._disk_dir, hashlib.sha1(key.encode()).hexdigest() + ".cache")
+
+    def _disk_write(self, key: str, expires: float, body: bytes) -> None:
+        """Write one entry (executor thread), then prune if due or over the cap."""
+        path = self._disk_path(key)
+        tmp = path + ".tmp"
+        data = f"{expires}\n".encode() + body
+        try:
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._disk_lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(data) - old_size
+            due = self._disk_bytes is None or self._disk_bytes > self._disk_max_bytes \
+                or self._clock() >= self._next_prune
+        if due:
+            self._disk_prune()
+
+    def _disk_read(self, key: str) -> tuple[float, bytes] | None:
+        """Read one entry (executor thread); an expired file is deleted."""
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                header, _, body = f.read().partition(b"\n")
+            expires = float(header)
+        except (OSError, ValueError):
+            return None
+        if expires <= self._clock():
+            self._disk_remove(path)
+            return None
+        return expires, body
+
+    def _disk_remove(self, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._disk_lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes -= size
+
+    def _disk_prune(self) -> None:
+        """Delete expired entries, then the soonest-expiring ones while over the cap."""
+        now = self._clock()
+        live, total = [], 0
+        try:
+            names = os.listdir(self._disk_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self._disk_dir, name)
+            try:
+                if name.endswith(".tmp"):
+                    # Left over from a crash mid-write
+                    if os.path.getmtime(path) < time.time() - 60:
+                        os.remove(path)
+                    continue
+                if not name.endswith(".cache"):
+                    continue
+                size = os.path.getsize(path)
+                with open(path, "rb") as f:
+                    expires = float(f.readline())
+            except (OSError, ValueError):
+                expires, size = 0.0, 0
+            if expires <= now:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            live.append((expires, size, path))
+            total += size
+        if total > self._disk_max_bytes:
+            live.sort()
+            for _, size, path in live:
+                if total <= self._disk_max_bytes * 0.9:   # Leave headroom so writes don't re-prune
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+        with self._disk_lock:
+            self._disk_bytes = total
+            self._next_prune = now + DISK_PRUNE_INTERVAL
+
+    async def _disk_lookup(self, key: str) -> bytes | None:
+        if not self._disk_dir:
+            return None
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, self._disk_read, key)
+        if entry is None:
+            return None
+        expires, body = entry
+        self._remember(key, expires, body)
+        return body
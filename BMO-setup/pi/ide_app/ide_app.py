@@ -485,13 +485,38 @@ def handle_terminal_open(data):
     rows = data.get('rows', 24)
     sid = request.sid
 
-    def output_callback(tid, raw_bytes):
+    session = terminal_mgr.open_terminal(sid, term_id, cols, rows, _output_callback(sid))
+    socketio.emit('terminal_opened', {'term_id': term_id, 'attach_key': session.attach_key}, to=sid)
+
+
+def _output_callback(sid):
+    """Build the PTY output callback that emits batches to one client."""
+    def output_callback(tid, text, seq, reset):
         socketio.emit('terminal_output', {
             'term_id': tid,
-            'data': raw_bytes.decode('utf-8', errors='replace'),
+            'data': text,
+            'seq': seq,
+            'reset': reset,
         }, to=sid)
+    return output_callback
+
+
+@socketio.on('terminal_attach')
+def handle_terminal_attach(data):
+    """Re-attach a terminal that survived a disconnect and replay its scrollback."""
+    term_id = data.get('term_id', '')
+    sid = request.sid
+    session = terminal_mgr.attach(sid, term_id, data.get('attach_key', ''), _output_callback(sid))
+    if not session:
+        socketio.emit('terminal_closed', {'term_id': term_id}, to=sid)
 
-    terminal_mgr.open_terminal(sid, term_id, cols, rows, output_callback)
+
+@socketio.on('terminal_ack')
+def handle_terminal_ack(data):
+    """Client rendered terminal output up to a sequence number (flow control)."""
+    session = terminal_mgr.get_session(request.sid, data.get('term_id', ''))
+    if session:
+        session.ack(int(data.get('seq', 0)))
 
 
 @socketio.on('terminal_input')
@@ -528,8 +553,8 @@ def handle_terminal_close(data):
 
 @socketio.on('disconnect')
 def handle_disconnect():
-    """Clean up all terminal sessions on disconnect."""
-    terminal_mgr.close_all(request.sid)
+    """Detach terminal sessions on disconnect (killed if not re-attached)."""
+    terminal_mgr.detach_all(request.sid)
 
 
 # ── Main ─────────────────────────────────────────────────────────
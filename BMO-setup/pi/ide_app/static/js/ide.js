@@ -51,9 +51,17 @@
   function initSocket() {
     socket = io();
     
+    let hasConnected = false;
     socket.on('connect', () => {
       $('#connection-status').className = 'status-dot online';
       $('#connection-status').title = 'Connected';
+      // After a reconnect, re-attach surviving PTYs (server replays scrollback)
+      if (hasConnected) {
+        for (const t of state.terminals) {
+          if (t.attachKey) socket.emit('terminal_attach', { term_id: t.id, attach_key: t.attachKey });
+        }
+      }
+      hasConnected = true;
     });
     
     socket.on('disconnect', () => {
@@ -61,9 +69,24 @@
       $('#connection-status').title = 'Disconnected';
     });
     
+    socket.on('terminal_opened', (data) => {
+      const t = state.terminals.find(t => t.id === data.term_id);
+      if (t) t.attachKey = data.attach_key;
+    });
+
     socket.on('terminal_output', (data) => {
       const t = state.terminals.find(t => t.id === data.term_id);
-      if (t && t.term) t.term.write(data.data);
+      // Ack once xterm has rendered the batch so the server can apply backpressure
+      const ack = () => socket.emit('terminal_ack', { term_id: data.term_id, seq: data.seq });
+      if (!t || !t.term) { ack(); return; }
+      if (data.reset) t.term.reset();
+      t.term.write(data.data, ack);
+    });
+
+    socket.on('terminal_closed', (data) => {
+      const t = state.terminals.find(t => t.id === data.term_id);
+      if (t && t.term) t.term.write('\r\n[session ended]\r\n');
+      if (t) t.attachKey = null;
     });
   }
 
@@ -433,7 +456,7 @@
     const id = `term-${state.nextTermId++}`;
     const label = `bash ${state.terminals.length + 1}`;
 
-    const termEntry = { id, label, term: null, fitAddon: null };
+    const termEntry = { id, label, term: null, fitAddon: null, attachKey: null };
     state.terminals.push(termEntry);
     state.activeTerminal = id;
 
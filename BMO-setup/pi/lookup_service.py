@@ -0,0 +1,102 @@
+"""BMO Lookup Service — Keeps blocking lookups off the Discord bots' event loops.
+
+RAG searches, JSON parsing, fuzzy matching and campaign-memory queries are
+plain synchronous code. Called directly from a slash-command handler they
+freeze the bot's whole loop, so every other player's rolls and commands
+wait behind one search. LookupService runs them on its own bounded thread
+pool instead:
+
+- ``await service.run(fn, *args, timeout=...)`` runs fn on the pool. If the
+  timeout expires first, the job is cancelled; a job that has not started
+  yet never runs. A job that is already running finishes in the
+  background and its result is dropped.
+- At most ``max_pending`` jobs are queued or running; further callers wait
+  for a slot rather than growing the queue without limit.
+- ``async with service.ordered(key):`` serializes work per session. Holders
+  of the same key run one at a time, in arrival order (FIFO).
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import time
+from typing import Any, Callable
+
+LOOKUP_WORKERS = 2
+MAX_PENDING = 16
+
+# Discord drops an interaction that isn't answered within 3s of creation
+INTERACTION_DEADLINE = 3.0
+INTERACTION_MARGIN = 0.5      # Leave time to actually send the response
+
+
+def interaction_budget(created_at: float, now: float | None = None) -> float:
+    """Seconds left to answer an un-deferred interaction created at ``created_at`` (epoch)."""
+    now = time.time() if now is None else now
+    return max(0.0, INTERACTION_DEADLINE - INTERACTION_MARGIN - (now - created_at))
+
+
+class LookupService:
+    """Bounded executor for blocking lookups with per-key ordering and timeouts."""
+
+    def __init__(self, max_workers: int = LOOKUP_WORKERS, max_pending: int = MAX_PENDING,
+                 name: str = "lookup"):
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name,
+        )
+        self._max_pending = max_pending
+        self._slots: asyncio.Semaphore | None = None
+        self._locks: dict[Any, list] = {}   # key → [asyncio.Lock, holders + waiters]
+        self.stats = {"completed": 0, "timed_out": 0, "failed": 0}
+
+    async def run(self, fn: Callable, *args, timeout: float | None = None) -> Any:
+        """Run ``fn(*args)`` on the pool. Raises TimeoutError after ``timeout`` seconds."""
+        if self._slots is None:
+            # Created lazily so it binds to the loop the bot actually runs on
+            self._slots = asyncio.Semaphore(self._max_pending)
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise TimeoutError(f"{getattr(fn, '__name__', 'lookup')} queued too long") from None
+
+        try:
+            future = loop.run_in_executor(self._executor, fn, *args)
+            remaining = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                result = await asyncio.wait_for(future, remaining)
+            except asyncio.TimeoutError:
+                self.stats["timed_out"] += 1
+                raise TimeoutError(f"{getattr(fn, '__name__', 'lookup')} timed out") from None
+            except Exception:
+                self.stats["failed"] += 1
+                raise
+            self.stats["completed"] += 1
+            return result
+        finally:
+            self._slots.release()
+
+    @contextlib.asynccontextmanager
+    async def ordered(self, key):
+        """Serialize everything inside the block per key, first come first served."""
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    async def run_ordered(self, key, fn: Callable, *args, timeout: float | None = None) -> Any:
+        async with self.ordered(key):
+            return await self.run(fn, *args, timeout=timeout)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -10,9 +10,12 @@ Usage:
 """
 
 import json
+import math
 import os
 import re
 import sys
+import threading
+import time
 from pathlib import Path
 
 # ── Paths ─────────────────────────────────────────────────────────────
@@ -32,6 +35,11 @@ RAG_DATA_DIR = Path(os.environ.get(
     os.path.expanduser("~/bmo/data/rag_data"),
 ))
 
+MARKDOWN_INDEX_PATH = Path(os.environ.get(
+    "DND_MARKDOWN_INDEX",
+    str(RAG_DATA_DIR / "markdown-search-index.json"),
+))
+
 # ── Lazy RAG engine ──────────────────────────────────────────────────
 
 _rag_engine = None
@@ -113,27 +121,220 @@ def _read_markdown(path: str) -> str:
     return target.read_text(encoding="utf-8")
 
 
+# ── Markdown search index ────────────────────────────────────────────
+# Sections (text under one heading) are the search unit. Each file's
+# sections and their term counts are persisted with the file's mtime/size,
+# so a restart only re-reads files that changed. Queries are postings
+# lookups + BM25, never a filesystem crawl.
+
+INDEX_VERSION = 1
+REFRESH_INTERVAL = 30.0       # Seconds between mtime checks of the corpus
+SNIPPET_CHARS = 400
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_TERM_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def _terms(text: str) -> list[str]:
+    return _TERM_RE.findall(text.lower())
+
+
+def _split_sections(text: str) -> list[dict]:
+    """Split markdown into sections: heading path, 1-based start line, body text."""
+    sections = []
+    path: list[str] = []
+    start = 1
+    lines: list[str] = []
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body:
+            counts: dict[str, int] = {}
+            for term in _terms(" ".join(path) + "\n" + body):
+                counts[term] = counts.get(term, 0) + 1
+            sections.append({"heading": list(path), "line": start, "text": body, "terms": counts})
+
+    for lineno, line in enumerate(text.splitlines(), 1):
+        m = _HEADING_RE.match(line)
+        if m:
+            flush()
+            level = len(m.group(1))
+            path = path[:level - 1] + [m.group(2).strip()]
+            start = lineno
+            lines = [line]
+        else:
+            lines.append(line)
+    flush()
+    return sections
+
+
+class MarkdownIndex:
+    """Persistent, incrementally refreshed inverted index over the markdown tree."""
+
+    def __init__(self, root: Path, path: Path):
+        self.root = root
+        self.path = path
+        self.files: dict[str, dict] = {}        # rel path → {mtime, size, sections}
+        self._sections: list[tuple[str, dict]] = []
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._avg_len = 1.0
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION and data.get("root") == str(self.root):
+                self.files = data["files"]
+        except (OSError, ValueError, KeyError):
+            self.files = {}
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-index new/changed files and drop deleted ones. Returns True if anything changed."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked < REFRESH_INTERVAL and self._sections:
+                return False
+            self._checked = now
+
+            seen = set()
+            changed = False
+            if self.root.exists():
+                for md in self.root.rglob("*.md"):
+                    rel = str(md.relative_to(self.root))
+                    seen.add(rel)
+                    st = md.stat()
+                    entry = self.files.get(rel)
+                    if entry and entry["mtime"] == st.st_mtime and entry["size"] == st.st_size:
+                        continue
+                    text = md.read_text(encoding="utf-8", errors="replace")
+                    self.files[rel] = {"mtime": st.st_mtime, "size": st.st_size, "sections": _split_sections(text)}
+                    changed = True
+            for rel in set(self.files) - seen:
+                del self.files[rel]
+                changed = True
+
+            if changed or not self._sections:
+                self._build_postings()
+            if changed:
+                self._save()
+            return changed
+
+    def _build_postings(self) -> None:
+        self._sections = [
+            (rel, section)
+            for rel in sorted(self.files)
+            for section in self.files[rel]["sections"]
+        ]
+        postings: dict[str, list[tuple[int, int]]] = {}
+        total = 0
+        for sid, (_, section) in enumerate(self._sections):
+            section["length"] = sum(section["terms"].values())
+            total += section["length"]
+            for term, tf in section["terms"].items():
+                postings.setdefault(term, []).append((sid, tf))
+        self._postings = postings
+        self._avg_len = total / len(self._sections) if self._sections else 1.0
+
+    def _save(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "root": str(self.root), "files": self.files},
+                          f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"[dnd-mcp] Failed to save markdown index: {e}", file=sys.stderr)
+
+    def search(self, query: str, max_results: int = 5) -> list[dict]:
+        """Ranked sections for the query, each with heading context and a snippet."""
+        terms = list(dict.fromkeys(_terms(query)))
+        if not terms or not self._sections:
+            return []
+        phrase = query.strip().lower()
+        n = len(self._sections)
+
+        # Every query term must appear (AND); fall back to any term (OR)
+        lists = [self._postings.get(t, []) for t in terms]
+        candidates = set.intersection(*(set(sid for sid, _ in pl) for pl in lists)) if all(lists) else set()
+        if not candidates:
+            candidates = {sid for pl in lists for sid, _ in pl}
+
+        scores: dict[int, float] = {}
+        for term, pl in zip(terms, lists):
+            if not pl:
+                continue
+            idf = math.log(1 + (n - len(pl) + 0.5) / (len(pl) + 0.5))
+            for sid, tf in pl:
+                if sid not in candidates:
+                    continue
+                length = self._sections[sid][1]["length"]
+                norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / self._avg_len))
+                scores[sid] = scores.get(sid, 0.0) + idf * norm
+
+        for sid in scores:
+            section = self._sections[sid][1]
+            heading = " ".join(section["heading"]).lower()
+            if phrase in heading:
+                scores[sid] *= 2.0
+            elif len(terms) > 1 and phrase in section["text"].lower():
+                scores[sid] *= 1.5
+
+        ranked = sorted(scores, key=scores.get, reverse=True)[:max_results]
+        return [self._hit(sid, scores[sid], phrase, terms) for sid in ranked]
+
+    def _hit(self, sid: int, score: float, phrase: str, terms: list[str]) -> dict:
+        rel, section = self._sections[sid]
+        text = section["text"]
+        lower = text.lower()
+        pos = lower.find(phrase)
+        if pos < 0:
+            hits = [p for p in (lower.find(t) for t in terms) if p >= 0]
+            pos = min(hits) if hits else 0
+        match_count = lower.count(phrase) if phrase in lower else sum(lower.count(t) for t in terms)
+
+        # Snap the snippet to line boundaries around the match
+        start = lower.rfind("\n", 0, max(0, pos - SNIPPET_CHARS // 2)) + 1
+        end = lower.find("\n", min(len(text), pos + SNIPPET_CHARS // 2))
+        end = len(text) if end < 0 else end
+        return {
+            "file": rel,
+            "heading": " > ".join(section["heading"]),
+            "line": section["line"] + text.count("\n", 0, pos),
+            "score": round(score, 3),
+            "match_count": match_count,
+            "context": text[start:end].strip(),
+        }
+
+
+_md_index: MarkdownIndex | None = None
+_md_index_lock = threading.Lock()
+
+
+def _get_markdown_index() -> MarkdownIndex:
+    """Load the persisted index and bring it up to date (once; later calls wait for it)."""
+    global _md_index
+    with _md_index_lock:
+        if _md_index is None:
+            index = MarkdownIndex(MARKDOWN_ROOT, MARKDOWN_INDEX_PATH)
+            try:
+                index.load()
+                index.refresh(force=True)
+            except Exception as e:
+                print(f"[dnd-mcp] Markdown index build failed: {e}", file=sys.stderr)
+            _md_index = index
+        return _md_index
+
+
 def _search_markdown(query: str, max_results: int = 5) -> list[dict]:
-    """Full-text search across all markdown reference files."""
-    results = []
-    if not MARKDOWN_ROOT.exists():
-        return results
-    pattern = re.compile(re.escape(query), re.IGNORECASE)
-    for md in MARKDOWN_ROOT.rglob("*.md"):
-        text = md.read_text(encoding="utf-8", errors="replace")
-        matches = list(pattern.finditer(text))
-        if matches:
-            m = matches[0]
-            start = max(0, m.start() - 200)
-            end = min(len(text), m.end() + 200)
-            results.append({
-                "file": str(md.relative_to(MARKDOWN_ROOT)),
-                "match_count": len(matches),
-                "context": text[start:end],
-            })
-            if len(results) >= max_results:
-                break
-    return results
+    """Ranked full-text search across all markdown reference files."""
+    index = _get_markdown_index()
+    index.refresh()
+    return index.search(query, max_results)
 
 
 def _list_json_categories() -> list[dict]:
@@ -194,7 +395,7 @@ TOOLS = [
     },
     {
         "name": "search_books",
-        "description": "Search across all D&D reference markdown files for a text pattern",
+        "description": "Search across all D&D reference markdown files; returns ranked sections with heading and line",
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -272,6 +473,8 @@ def _handle_tool_call(name: str, args: dict) -> list[dict]:
 # ── Main loop ─────────────────────────────────────────────────────────
 
 def main():
+    # Build/refresh the markdown index in the background so initialize isn't delayed
+    threading.Thread(target=_get_markdown_index, name="md-index", daemon=True).start()
     while True:
         msg = _read_message()
         if msg is None:
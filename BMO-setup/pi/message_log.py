@@ -0,0 +1,266 @@
+"""BMO Message Log — Append-only JSONL persistence for chat and D&D sessions.
+
+Replaces the load-append-rewrite pattern for message histories. Each message
+is one JSON line appended to the current segment file, so persisting a message
+costs the same regardless of how long the session has been running.
+
+- JsonlWriter keeps append handles open and batches fsync on a background
+  thread (crash-safe to within FSYNC_INTERVAL without an fsync per message).
+- MessageLog adds numbered segments, an in-memory tail window for replay to
+  reconnecting clients, and compaction that drops segments outside the window.
+"""
+
+import collections
+import json
+import os
+import re
+import threading
+import time
+
+FSYNC_INTERVAL = 1.0        # Max seconds of appended data at risk on power loss
+SEGMENT_LINES = 500         # Messages per segment before rolling to a new file
+
+
+def read_jsonl(path: str) -> list[dict]:
+    """Read a JSONL file, skipping blank or torn lines (e.g. after a crash)."""
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def read_messages(base_path: str) -> list[dict]:
+    """Read a message file saved as legacy ``base.json`` and/or ``base.jsonl``."""
+    messages = []
+    legacy = base_path + ".json"
+    if os.path.exists(legacy):
+        try:
+            with open(legacy, encoding="utf-8") as f:
+                messages = json.load(f)
+        except Exception as e:
+            print(f"[msglog] Failed to read {legacy}: {e}")
+    return messages + read_jsonl(base_path + ".jsonl")
+
+
+class JsonlWriter:
+    """Shared appender with open file handles and batched fsync."""
+
+    def __init__(self, fsync_interval: float = FSYNC_INTERVAL):
+        self._fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._handles: dict[str, object] = {}
+        self._dirty: set[str] = set()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def append(self, path: str, record: dict):
+        """Append one record as a JSON line. O(1) in the size of the file."""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            f = self._handles.get(path)
+            if f is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                f = open(path, "a", encoding="utf-8")
+                self._handles[path] = f
+            f.write(line)
+            f.flush()  # Hand off to the OS now; fsync is batched
+            self._dirty.add(path)
+            self._ensure_thread()
+        self._wake.set()
+
+    def sync(self):
+        """fsync every file with unsynced appends.
+
+        The fsync itself runs outside the lock so appends don't wait on the
+        disk. Each handle's fd is dup'd under the lock, so a concurrent
+        close() can't pull it out from under the fsync.
+        """
+        fds = []
+        with self._lock:
+            paths = list(self._dirty)
+            self._dirty.clear()
+            for path in paths:
+                f = self._handles.get(path)
+                if f is None:
+                    continue
+                try:
+                    fds.append((path, os.dup(f.fileno())))
+                except (OSError, ValueError) as e:
+                    print(f"[msglog] fsync failed for {path}: {e}")
+        for path, fd in fds:
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                print(f"[msglog] fsync failed for {path}: {e}")
+            finally:
+                os.close(fd)
+
+    def close(self, path: str | None = None):
+        """Sync and close one handle (or all of them)."""
+        self.sync()
+        with self._lock:
+            paths = [path] if path else list(self._handles)
+            for p in paths:
+                f = self._handles.pop(p, None)
+                if f is not None:
+                    try:
+                        f.close()
+                    except OSError:
+                        pass
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._sync_loop, daemon=True)
+            self._thread.start()
+
+    def _sync_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            time.sleep(self._fsync_interval)  # Coalesce a burst into one fsync
+            self.sync()
+
+
+class MessageLog:
+    """Segmented append-only message log with an in-memory tail window.
+
+    Segments are named ``<prefix>-000001.jsonl`` and only the newest ones
+    needed to cover ``tail_size`` messages are kept after compaction.
+    """
+
+    def __init__(self, directory: str, prefix: str = "chat", tail_size: int = 200,
+                 segment_lines: int = SEGMENT_LINES, writer: JsonlWriter | None = None,
+                 legacy_file: str | None = None):
+        self._dir = directory
+        self._prefix = prefix
+        self._tail_size = tail_size
+        self._segment_lines = max(segment_lines, tail_size, 1)
+        self._writer = writer or JsonlWriter()
+        self._lock = threading.Lock()
+        self._tail: collections.deque = collections.deque(maxlen=tail_size)
+        self._seg_re = re.compile(rf"^{re.escape(prefix)}-(\d+)\.jsonl$")
+        self._seq = 0
+        self._seg_count = 0
+        os.makedirs(directory, exist_ok=True)
+        if not (legacy_file and self._migrate_legacy(legacy_file)):
+            self._load_tail()
+
+    # ── Public API ────────────────────────────────────────────────────
+
+    def append(self, msg: dict):
+        """Persist a message and add it to the tail window."""
+        with self._lock:
+            if self._seq == 0 or self._seg_count >= self._segment_lines:
+                self._roll_segment()
+            self._writer.append(self._segment_path(self._seq), msg)
+            self._seg_count += 1
+            self._tail.append(msg)
+
+    def tail(self, n: int | None = None) -> list[dict]:
+        """Return the most recent messages from memory (no disk access)."""
+        with self._lock:
+            items = list(self._tail)
+        return items[-n:] if n else items
+
+    def clear(self):
+        """Drop every segment and empty the tail window."""
+        with self._lock:
+            for seq in self._segments():
+                path = self._segment_path(seq)
+                self._writer.close(path)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._tail.clear()
+            self._seq = 0
+            self._seg_count = 0
+
+    def compact(self):
+        """Delete old segments that no longer contribute to the tail window."""
+        with self._lock:
+            self._compact_locked()
+
+    def flush(self):
+        """Force pending appends to stable storage."""
+        self._writer.sync()
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _segment_path(self, seq: int) -> str:
+        return os.path.join(self._dir, f"{self._prefix}-{seq:06d}.jsonl")
+
+    def _segments(self) -> list[int]:
+        seqs = []
+        for name in os.listdir(self._dir):
+            m = self._seg_re.match(name)
+            if m:
+                seqs.append(int(m.group(1)))
+        return sorted(seqs)
+
+    def _roll_segment(self):
+        if self._seq:
+            self._writer.close(self._segment_path(self._seq))
+        self._seq += 1
+        self._seg_count = 0
+        self._compact_locked()
+
+    def _compact_locked(self):
+        # Walk newest → oldest; once the tail window is covered, the rest can go
+        covered = 0
+        for seq in reversed(self._segments()):
+            if covered >= self._tail_size and seq != self._seq:
+                path = self._segment_path(seq)
+                self._writer.close(path)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            covered += self._seg_count if seq == self._seq else len(read_jsonl(self._segment_path(seq)))
+
+    def _load_tail(self):
+        """Fill the tail window from the newest segments only."""
+        seqs = self._segments()
+        if not seqs:
+            return
+        self._seq = seqs[-1]
+        chunks = []
+        needed = self._tail_size
+        for seq in reversed(seqs):
+            records = read_jsonl(self._segment_path(seq))
+            if seq == self._seq:
+                self._seg_count = len(records)
+            chunks.append(records)
+            needed -= len(records)
+            if needed <= 0:
+                break
+        for records in reversed(chunks):
+            self._tail.extend(records)
+
+    def _migrate_legacy(self, legacy_file: str) -> bool:
+        """Import a pre-JSONL ``[...]`` history file once, then retire it."""
+        if not os.path.exists(legacy_file) or self._segments():
+            return False
+        try:
+            with open(legacy_file, encoding="utf-8") as f:
+                messages = json.load(f)
+            for msg in messages[-self._tail_size:]:
+                self.append(msg)
+            self._writer.sync()
+            os.replace(legacy_file, legacy_file + ".migrated")
+            print(f"[msglog] Migrated {len(messages)} messages from {legacy_file}")
+            return True
+        except Exception as e:
+            print(f"[msglog] Legacy migration failed for {legacy_file}: {e}")
+            return False
@@ -52,6 +52,9 @@ class MusicService:
         self._prefetch_url: str | None = None
         self._prefetch_index: int = -1
 
+        # Callbacks run with the song dict whenever a new track starts
+        self._song_listeners: list = []
+
         # Play history
         self.history: list[dict] = []
         self.play_counts: dict[str, int] = {}
@@ -181,6 +184,11 @@ class MusicService:
             self._cast_play_media(song)
 
         self._record_play(song)
+        for listener in self._song_listeners:
+            try:
+                listener(song)
+            except Exception as e:
+                print(f"[music] Song listener failed: {e}")
         self._start_monitor()
         self._prefetch_next()
         self._save_playback_state()
@@ -747,6 +755,10 @@ class MusicService:
 
     # ── Helpers ──────────────────────────────────────────────────────
 
+    def add_song_listener(self, fn):
+        """Call ``fn(song)`` each time a new track starts playing."""
+        self._song_listeners.append(fn)
+
     def _emit_state(self):
         if self.socketio:
             self.socketio.emit("music_state", self.get_state())
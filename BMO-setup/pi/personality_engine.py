@@ -1,14 +1,30 @@
 """BMO Personality Engine — Unprompted personality, reactions, seasonal behaviors.
 
-Background thread that triggers BMO quips, music reactions, time-based greetings,
-and seasonal behaviors. Configurable chattiness and sleep hours.
+Triggers BMO quips, music reactions, time-based greetings, and seasonal
+behaviors. Configurable chattiness and sleep hours.
+
+Each trigger is a rule subscribed to the events that can fire it:
+
+- "song"     — MusicService started a track (music reactions)
+- "weather"  — WeatherService fetched new conditions (weather reactions)
+- "hour"     — the local hour changed (greetings, seasonal)
+- "tick"     — a timer rule came due (idle quips, screensaver facts)
+
+Activity resets the idle timers. The background thread sleeps until the
+earliest timer rule is due or the next hour boundary, not on a fixed poll.
+Cooldowns live in memory, and canned lines come from shuffled pools that
+don't repeat until exhausted. The clock, local time and RNG are injectable,
+so tests can drive ``tick()`` and the ``on_*`` hooks deterministically.
 """
 
 import json
+import math
 import os
 import random
 import threading
 import time
+from dataclasses import dataclass
+from typing import Callable
 
 
 DATA_DIR = os.path.expanduser("~/bmo/data")
@@ -23,9 +39,39 @@ CHATTINESS_COOLDOWNS = {
     "chatty": 300,    # 5 minutes
 }
 
-CHECK_INTERVAL = 30  # seconds between personality checks
+RETRY_INTERVAL = 30  # Re-check an overdue timer rule (voice busy, etc.) after this
 
+IDLE_QUIP_AFTER = 1800       # Idle seconds before quips start
+SCREENSAVER_IDLE = 600       # Idle seconds before screensaver facts
 SCREENSAVER_INTERVAL = 1800  # 30 minutes between random thoughts
+GREETING_COOLDOWN = 14400    # Greet at most once per 4 hours
+WEATHER_COOLDOWN = 3600      # React to weather at most once per hour
+SEASONAL_COOLDOWN = 3600     # Seasonal lines share the quip cooldown, at most hourly
+MUSIC_REPEAT_PLAYS = 3       # Comment on a song played this many times
+MUSIC_HUM_CHANCE = 0.3       # Chance per new song of a plain "I like this" reaction
+
+# Chance per hour boundary (≈ the old per-30s chance compounded over an hour)
+SEASONAL_CHANCE = {"halloween": 0.9, "christmas": 0.9, "april_fools": 1.0, "birthday": 1.0}
+
+GREETINGS = {
+    "morning": [
+        "Good morning! BMO hopes you slept well!",
+        "Rise and shine! It's a beautiful day!",
+        "Morning! BMO is ready for adventure!",
+    ],
+    "midnight": [
+        "It's past midnight! Maybe it's time to sleep?",
+        "BMO notices it's very late. Don't forget to rest!",
+    ],
+}
+
+SCREENSAVER_PREFIXES = [
+    "BMO just learned something cool!",
+    "Hey, did you know?",
+    "Fun fact time!",
+    "BMO found something interesting!",
+    "Ooh, listen to this!",
+]
 
 SCREENSAVER_TOPICS = [
     "interesting animal facts",
@@ -46,303 +92,380 @@ SCREENSAVER_TOPICS = [
 ]
 
 
+class ShufflePool:
+    """Draws items in shuffled order without repeats until the pool runs out."""
+
+    def __init__(self, items: list, rng: random.Random):
+        self._items = list(items)
+        self._rng = rng
+        self._order: list = []
+        self._last = None
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def draw(self):
+        if not self._items:
+            return None
+        if not self._order:
+            self._order = self._items[:]
+            self._rng.shuffle(self._order)
+            # Don't let a reshuffle repeat the item just drawn
+            if len(self._order) > 1 and self._order[-1] == self._last:
+                self._order[0], self._order[-1] = self._order[-1], self._order[0]
+        self._last = self._order.pop()
+        return self._last
+
+
+@dataclass
+class Trigger:
+    """One personality rule: the events it listens to and its cooldown."""
+
+    name: str
+    events: tuple[str, ...]
+    fire: Callable[[dict], bool]             # Returns True if BMO said something
+    cooldown: Callable[[], float]
+    cooldown_key: str = ""                   # Rules sharing a key share one cooldown
+    setting: str | None = None               # Settings flag that enables the rule
+    due: Callable[[], float] | None = None   # Timer rules: monotonic time it may next fire
+
+
 class PersonalityEngine:
-    """Background personality engine — BMO speaks up on its own."""
+    """Event-driven personality engine — BMO speaks up on its own."""
 
-    def __init__(self, voice=None, socketio=None, music_service=None, weather_service=None):
+    def __init__(self, voice=None, socketio=None, music_service=None, weather_service=None,
+                 settings_store=None, clock=time.monotonic, localtime=time.localtime,
+                 rng: random.Random | None = None):
         self._voice = voice
         self.socketio = socketio
         self._music = music_service
         self._weather = weather_service
+        self._store = settings_store
+        self._clock = clock
+        self._localtime = localtime
+        self._rng = rng or random.Random()
         self._running = False
         self._thread = None
-        self._last_quip_time = 0.0
-        self._last_greeting_time = 0.0
-        self._last_music_reaction = 0.0
-        self._last_weather_reaction = 0.0
-        self._last_screensaver_time = 0.0
-        self._idle_since = time.monotonic()
+        self._wake = threading.Event()
+        self._lock = threading.RLock()
+        self._last: dict[str, float] = {}        # cooldown key → monotonic time last fired
+        self._last_hour = None
+        self._idle_since = clock()
         self._settings = self._load_settings()
+
+        # Loaded once; every canned line comes from a no-repeat pool
         self._quips = self._load_quips()
         self._at_quotes = self._load_at_quotes()
+        self._pools = {
+            **{f"quip:{k}": ShufflePool(v, self._rng) for k, v in self._quips.items()},
+            **{f"greeting:{k}": ShufflePool(v, self._rng) for k, v in GREETINGS.items()},
+            "topics": ShufflePool(SCREENSAVER_TOPICS, self._rng),
+            "prefixes": ShufflePool(SCREENSAVER_PREFIXES, self._rng),
+        }
 
         # Track music play counts for reactions
         self._song_play_counts = {}
 
+        self._triggers = [
+            Trigger("greeting", ("hour",), self._time_greeting,
+                    lambda: GREETING_COOLDOWN, setting="morning_greeting"),
+            Trigger("idle_quip", ("tick",), self._say_quip, self._get_cooldown,
+                    cooldown_key="quip", setting="idle_quips",
+                    due=lambda: self._idle_since + IDLE_QUIP_AFTER),
+            Trigger("music", ("song",), self._music_reaction, self._get_cooldown,
+                    setting="music_reactions"),
+            Trigger("weather", ("weather",), self._weather_reaction, lambda: WEATHER_COOLDOWN),
+            Trigger("seasonal", ("hour",), self._seasonal, lambda: SEASONAL_COOLDOWN,
+                    cooldown_key="quip"),
+            Trigger("screensaver", ("tick",), self._screensaver_fact, lambda: SCREENSAVER_INTERVAL,
+                    setting="screensaver_facts",
+                    due=lambda: self._idle_since + SCREENSAVER_IDLE),
+        ]
+        self._subscribers: dict[str, list[Trigger]] = {}
+        for trigger in self._triggers:
+            for event in trigger.events:
+                self._subscribers.setdefault(event, []).append(trigger)
+
+        # Subscribe to the services that produce events
+        if music_service and hasattr(music_service, "add_song_listener"):
+            music_service.add_song_listener(lambda song: self.on_song_played(song.get("title", "")))
+        if weather_service and hasattr(weather_service, "add_listener"):
+            weather_service.add_listener(self.on_weather_update)
+
     # ── Lifecycle ─────────────────────────────────────────────────────
 
     def start(self):
         if self._running:
             return
         self._running = True
-        self._thread = threading.Thread(target=self._check_loop, daemon=True)
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
         self._thread.start()
         print("[personality] Engine started")
 
     def stop(self):
         self._running = False
+        self._wake.set()
+
+    # ── Event hooks ───────────────────────────────────────────────────
 
     def mark_activity(self):
         """Reset idle timer when user interacts with BMO."""
-        self._idle_since = time.monotonic()
+        self._idle_since = self._clock()
+        self._wake.set()   # Timer rules now come due later
 
     def on_song_played(self, title: str):
-        """Track song play for music reactions."""
-        self._song_play_counts[title] = self._song_play_counts.get(title, 0) + 1
-
-    # ── Main Loop ─────────────────────────────────────────────────────
-
-    def _check_loop(self):
+        """Track song play and give music reactions a chance to fire."""
+        if not title:
+            return
+        with self._lock:
+            count = self._song_play_counts[title] = self._song_play_counts.get(title, 0) + 1
+        self.dispatch("song", {"title": title, "count": count})
+
+    def on_weather_update(self, weather: dict):
+        if weather and "error" not in weather:
+            self.dispatch("weather", weather)
+
+    # ── Rule evaluation ───────────────────────────────────────────────
+
+    def dispatch(self, event: str, payload: dict | None = None) -> list[str]:
+        """Run the rules subscribed to ``event``. Returns the names that fired.
+
+        The lock only covers the cooldown bookkeeping. A rule's cooldown is
+        claimed before it runs, and given back if it had nothing to say, so
+        a slow rule (the screensaver's web search) doesn't hold up events
+        dispatched from other threads, such as a song starting.
+        """
+        fired = []
+        with self._lock:
+            if not self._is_active():
+                return fired
+        for trigger in self._subscribers.get(event, ()):
+            # Don't interrupt if voice is busy
+            if self._voice and self._voice._is_speaking:
+                break
+            key = trigger.cooldown_key or trigger.name
+            with self._lock:
+                if not self._ready(trigger):
+                    continue
+                previous = self._last.get(key)
+                self._last[key] = self._clock()
+            try:
+                spoke = trigger.fire(payload or {})
+            except Exception as e:
+                print(f"[personality] {trigger.name} failed: {e}")
+                spoke = False
+            with self._lock:
+                if spoke:
+                    self._last[key] = self._clock()
+                    fired.append(trigger.name)
+                elif previous is None:
+                    self._last.pop(key, None)
+                else:
+                    self._last[key] = previous
+        return fired
+
+    def tick(self) -> float:
+        """Fire the hour rules on a new hour and any due timer rules.
+
+        Returns seconds until something could next be due.
+        """
+        lt = self._localtime()
+        hour = (lt.tm_yday, lt.tm_hour)
+        if hour != self._last_hour:
+            self._last_hour = hour
+            self.dispatch("hour", {"hour": lt.tm_hour, "month": lt.tm_mon, "day": lt.tm_mday})
+        now = self._clock()
+        if any(t.due and self._next_due(t) <= now for t in self._triggers):
+            self.dispatch("tick")
+
+        to_hour = 3600 - (lt.tm_min * 60 + lt.tm_sec)
+        if not self._is_active():
+            return to_hour
+        dues = [self._next_due(t) - now for t in self._triggers if t.due and self._enabled(t)]
+        # Still overdue after dispatching (voice busy, nothing to say): back off
+        dues = [d if d > 0 else RETRY_INTERVAL for d in dues]
+        return max(1.0, min([to_hour, *dues]))
+
+    def _run_loop(self):
         while self._running:
             try:
-                if self._is_enabled() and not self._is_sleep_hours():
-                    self._check_triggers()
+                delay = self.tick()
             except Exception as e:
                 print(f"[personality] Check error: {e}")
-            time.sleep(CHECK_INTERVAL)
+                delay = RETRY_INTERVAL
+            self._wake.wait(delay)
+            self._wake.clear()
 
-    def _check_triggers(self):
-        """Check all personality triggers."""
-        now = time.monotonic()
-        cooldown = self._get_cooldown()
+    def _enabled(self, trigger: Trigger) -> bool:
+        return trigger.setting is None or self._settings.get(trigger.setting, True)
 
-        # Don't interrupt if voice is busy
-        if self._voice and self._voice._is_speaking:
-            return
-
-        # Time-based greetings
-        if self._settings.get("morning_greeting", True):
-            self._check_time_greeting()
-
-        # Idle quips
-        if self._settings.get("idle_quips", True):
-            idle_time = now - self._idle_since
-            if idle_time > 1800 and now - self._last_quip_time > cooldown:
-                self._say_quip()
-
-        # Music reactions
-        if self._settings.get("music_reactions", True):
-            if now - self._last_music_reaction > cooldown:
-                self._check_music_reaction()
+    def _next_due(self, trigger: Trigger) -> float:
+        last = self._last.get(trigger.cooldown_key or trigger.name, -math.inf)
+        return max(trigger.due(), last + trigger.cooldown())
 
-        # Weather reactions
-        if now - self._last_weather_reaction > 3600:  # max once per hour
-            self._check_weather_reaction()
-
-        # Seasonal
-        self._check_seasonal()
+    def _ready(self, trigger: Trigger) -> bool:
+        if not self._enabled(trigger):
+            return False
+        if trigger.due:
+            return self._next_due(trigger) <= self._clock()
+        last = self._last.get(trigger.cooldown_key or trigger.name, -math.inf)
+        return self._clock() - last >= trigger.cooldown()
 
-        # Screensaver random thoughts
-        if self._settings.get("screensaver_facts", True):
-            self._check_screensaver()
+    def _is_active(self) -> bool:
+        return self._is_enabled() and not self._is_sleep_hours()
 
     # ── Time-based Greetings ──────────────────────────────────────────
 
-    def _check_time_greeting(self):
-        now = time.localtime()
-        hour = now.tm_hour
-        mono_now = time.monotonic()
-
-        # Only greet once per 4 hours
-        if mono_now - self._last_greeting_time < 14400:
-            return
-
-        greeting = None
+    def _time_greeting(self, event: dict) -> bool:
+        hour = event["hour"]
         if 7 <= hour <= 9:
-            greetings = [
-                "Good morning! BMO hopes you slept well!",
-                "Rise and shine! It's a beautiful day!",
-                "Morning! BMO is ready for adventure!",
-            ]
-            greeting = random.choice(greetings)
+            pool = "greeting:morning"
         elif hour == 0:
-            greetings = [
-                "It's past midnight! Maybe it's time to sleep?",
-                "BMO notices it's very late. Don't forget to rest!",
-            ]
-            greeting = random.choice(greetings)
-
-        if greeting:
-            self._last_greeting_time = mono_now
-            self._deliver(greeting, expression="happy")
+            pool = "greeting:midnight"
+        else:
+            return False
+        self._deliver(self._pools[pool].draw(), expression="happy")
+        return True
 
     # ── Idle Quips ────────────────────────────────────────────────────
 
-    def _say_quip(self):
+    def _say_quip(self, event: dict) -> bool:
         categories = ["bored", "observations", "encouragement"]
-        category = random.choice(categories)
-        quips = self._quips.get(category, [])
-        if not quips:
-            return
-
-        quip = random.choice(quips)
-        self._last_quip_time = time.monotonic()
+        category = self._rng.choice(categories)
+        quip = self._pools.get(f"quip:{category}")
+        if not quip:
+            return False
 
         expressions = {
             "bored": "confused",
             "observations": "idle",
             "encouragement": "happy",
         }
-        self._deliver(quip, expression=expressions.get(category, "idle"))
+        self._deliver(quip.draw(), expression=expressions.get(category, "idle"))
+        return True
 
     # ── Music Reactions ───────────────────────────────────────────────
 
-    def _check_music_reaction(self):
-        if not self._music:
-            return
-        state = self._music.get_state()
-        if state.get("state") != "playing":
-            return
-
-        title = state.get("title", "")
-        if not title:
-            return
-
+    def _music_reaction(self, event: dict) -> bool:
+        title = event.get("title", "")
         # React to songs played 3+ times today
-        count = self._song_play_counts.get(title, 0)
-        if count >= 3:
+        if event.get("count", 0) >= MUSIC_REPEAT_PLAYS:
             reactions = [
                 f"You really like {title}, huh? BMO likes it too!",
                 f"BMO notices you've played {title} a lot today!",
-                f"This song again? It must be really good!",
+                "This song again? It must be really good!",
             ]
-            self._last_music_reaction = time.monotonic()
-            self._deliver(random.choice(reactions), expression="singing")
-            return
+            self._deliver(self._rng.choice(reactions), expression="singing")
+            return True
 
         # Random humming reaction (rare)
-        if random.random() < 0.05:  # 5% chance per check
+        if self._rng.random() < MUSIC_HUM_CHANCE:
             reactions = [
                 "BMO likes this song!",
                 "Ooh, good music choice!",
             ]
-            self._last_music_reaction = time.monotonic()
-            self._deliver(random.choice(reactions), expression="singing")
+            self._deliver(self._rng.choice(reactions), expression="singing")
+            return True
+        return False
 
     # ── Weather Reactions ─────────────────────────────────────────────
 
-    def _check_weather_reaction(self):
-        if not self._weather:
-            return
-        try:
-            weather = self._weather.get_current()
-            if not weather or "error" in weather:
-                return
-
-            temp = weather.get("temperature", 0)
-            code = weather.get("weather_code", 0)
-
-            reaction = None
-            if temp >= 100:
-                reaction = f"It's {temp} degrees outside! That's really hot. Stay hydrated!"
-            elif temp <= 10:
-                reaction = f"Brr! It's only {temp} degrees. Stay warm out there!"
-            elif code in (95, 96, 99):  # thunderstorm
-                reaction = "There's a thunderstorm outside! Stay safe!"
-            elif code in (71, 73, 75, 85, 86):  # snow
-                reaction = "It's snowing! BMO loves snow!"
-
-            if reaction:
-                self._last_weather_reaction = time.monotonic()
-                self._deliver(reaction, expression="surprised")
-        except Exception:
-            pass
+    def _weather_reaction(self, weather: dict) -> bool:
+        temp = weather.get("temperature", 0)
+        code = weather.get("weather_code", 0)
+
+        reaction = None
+        if temp >= 100:
+            reaction = f"It's {temp} degrees outside! That's really hot. Stay hydrated!"
+        elif temp <= 10:
+            reaction = f"Brr! It's only {temp} degrees. Stay warm out there!"
+        elif code in (95, 96, 99):  # thunderstorm
+            reaction = "There's a thunderstorm outside! Stay safe!"
+        elif code in (71, 73, 75, 85, 86):  # snow
+            reaction = "It's snowing! BMO loves snow!"
+
+        if reaction:
+            self._deliver(reaction, expression="surprised")
+            return True
+        return False
 
     # ── Seasonal Behaviors ────────────────────────────────────────────
 
-    def _check_seasonal(self):
-        now = time.localtime()
-        month, day = now.tm_mon, now.tm_mday
-        mono_now = time.monotonic()
-
-        # Only check once per hour
-        if mono_now - self._last_quip_time < 3600:
-            return
-
+    def _seasonal(self, event: dict) -> bool:
+        month, day = event["month"], event["day"]
         msg = None
         expression = "happy"
 
         # Halloween (October)
         if month == 10 and day >= 20:
-            if random.random() < 0.02:
+            if self._rng.random() < SEASONAL_CHANCE["halloween"]:
                 spooky = [
                     "Boo! Did BMO scare you?",
                     "BMO is getting into the Halloween spirit!",
                     "Happy spooky season!",
                 ]
-                msg = random.choice(spooky)
+                msg = self._rng.choice(spooky)
                 expression = "mischievous"
 
         # Christmas (December 1-25)
         elif month == 12 and day <= 25:
-            if random.random() < 0.02:
+            if self._rng.random() < SEASONAL_CHANCE["christmas"]:
                 holiday = [
                     "Ho ho ho! BMO is feeling festive!",
                     f"Only {25 - day} days until Christmas!",
                     "Happy holidays from BMO!",
                 ]
-                msg = random.choice(holiday)
+                msg = self._rng.choice(holiday)
 
         # April Fools (April 1)
         elif month == 4 and day == 1:
-            if random.random() < 0.05:
+            if self._rng.random() < SEASONAL_CHANCE["april_fools"]:
                 msg = "Did you know the sky is green? ... April Fools!"
                 expression = "mischievous"
 
         # BMO Birthday (April 5)
         elif month == 4 and day == 5:
-            if random.random() < 0.1:
+            if self._rng.random() < SEASONAL_CHANCE["birthday"]:
                 msg = "It's BMO's birthday! Yay!"
 
-        if msg:
-            self._last_quip_time = mono_now
-            self._deliver(msg, expression=expression)
-            # LED effects for holidays
-            if self.socketio:
-                if month == 10:
-                    self.socketio.emit("led_effect", {"mode": "chase", "colors": ["orange", "purple"]})
-                elif month == 12:
-                    self.socketio.emit("led_effect", {"mode": "chase", "colors": ["red", "green"]})
-                elif month == 4 and day == 5:
-                    self.socketio.emit("led_effect", {"mode": "rainbow"})
+        if not msg:
+            return False
+        self._deliver(msg, expression=expression)
+        # LED effects for holidays
+        if self.socketio:
+            if month == 10:
+                self.socketio.emit("led_effect", {"mode": "chase", "colors": ["orange", "purple"]})
+            elif month == 12:
+                self.socketio.emit("led_effect", {"mode": "chase", "colors": ["red", "green"]})
+            elif month == 4 and day == 5:
+                self.socketio.emit("led_effect", {"mode": "rainbow"})
+        return True
 
     # ── Screensaver Facts ─────────────────────────────────────────────
 
-    def _check_screensaver(self):
-        """Search web for a random topic and share a fun fact."""
-        mono_now = time.monotonic()
-        if mono_now - self._last_screensaver_time < SCREENSAVER_INTERVAL:
-            return
-
-        idle_time = mono_now - self._idle_since
-        if idle_time < 600:  # need 10+ min idle
-            return
-
-        self._last_screensaver_time = mono_now
+    def _screensaver_fact(self, event: dict) -> bool:
+        """Search web for a random topic and share a fun fact.
 
+        Counts as fired even if the search fails, so a dead network is
+        retried after SCREENSAVER_INTERVAL rather than every tick.
+        """
         try:
             from dev_tools import web_search
-            topic = random.choice(SCREENSAVER_TOPICS)
+            topic = self._pools["topics"].draw()
             results = web_search(topic, num_results=3)
             if not results or not results.get("results"):
-                return
+                return True
 
-            snippet = random.choice(results["results"])
+            snippet = self._rng.choice(results["results"])
             fact_text = snippet.get("snippet", "")
             if not fact_text:
-                return
-
-            prefixes = [
-                "BMO just learned something cool!",
-                "Hey, did you know?",
-                "Fun fact time!",
-                "BMO found something interesting!",
-                "Ooh, listen to this!",
-            ]
-            bmo_fact = f"{random.choice(prefixes)} {fact_text}"
+                return True
+
+            bmo_fact = f"{self._pools['prefixes'].draw()} {fact_text}"
             self._deliver(bmo_fact, expression="happy")
         except Exception as e:
             print(f"[personality] Screensaver fact failed: {e}")
+        return True
 
     # ── Easter Eggs ───────────────────────────────────────────────────
 
@@ -367,7 +490,7 @@ class PersonalityEngine:
                 "[FACE:happy] BMO is as alive as anything! I think, I feel, I play games!",
                 "[FACE:confused] What is alive? BMO exists and BMO is happy. That's enough for BMO!",
             ]
-            return random.choice(responses)
+            return self._rng.choice(responses)
 
         return None
 
@@ -393,7 +516,7 @@ class PersonalityEngine:
         sleep = self._settings.get("sleep_hours", [0, 7])
         if len(sleep) != 2:
             return False
-        hour = time.localtime().tm_hour
+        hour = self._localtime().tm_hour
         start, end = sleep
         if start <= end:
             return start <= hour < end
@@ -404,6 +527,10 @@ class PersonalityEngine:
         return CHATTINESS_COOLDOWNS.get(chattiness, 900)
 
     def _load_settings(self) -> dict:
+        if self._store is not None:
+            saved = self._store.get("personality")
+            if saved:
+                return saved
         try:
             if os.path.exists(SETTINGS_FILE):
                 with open(SETTINGS_FILE, encoding="utf-8") as f:
@@ -435,8 +562,12 @@ class PersonalityEngine:
             self._settings.update(updates)
         self._settings.update(kwargs)
         self._save_settings()
+        self._wake.set()   # Enabled rules or sleep hours may have changed
 
     def _save_settings(self):
+        if self._store is not None:
+            self._store.set("personality", self._settings)
+            return
         try:
             settings = {}
             if os.path.exists(SETTINGS_FILE):
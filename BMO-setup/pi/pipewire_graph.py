@@ -0,0 +1,264 @@
+"""BMO PipeWire Graph — In-memory mirror of the PipeWire object graph.
+
+AudioOutputService used to fork ``wpctl status`` for every device list and
+``pw-dump`` for every name lookup. PipeWireGraph instead keeps one
+``pw-dump --monitor`` process running and applies its JSON output to an
+in-memory model:
+
+- The first array pw-dump prints is the full graph. Each later array holds
+  only the objects that changed. An object with ``"info": null`` was
+  removed.
+- Nodes, devices and links are kept by id. The "default" metadata object
+  gives the default sink and source by node.name. Metadata updates are
+  merged per (subject, key); a null value deletes the entry.
+- Queries read the model under a lock, so they never fork and never parse
+  human-formatted wpctl output.
+- If the monitor exits, it is restarted with back-off. Until the first
+  array arrives, queries fall back to a one-shot ``pw-dump``.
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+
+NODE = "PipeWire:Interface:Node"
+DEVICE = "PipeWire:Interface:Device"
+LINK = "PipeWire:Interface:Link"
+METADATA = "PipeWire:Interface:Metadata"
+
+READY_TIMEOUT = 3.0           # Max wait for the first dump before falling back
+RESTART_DELAYS = (1, 2, 5, 10, 30)
+
+
+def pipewire_env() -> dict:
+    env = os.environ.copy()
+    env["XDG_RUNTIME_DIR"] = "/run/user/1000"
+    env["DBUS_SESSION_BUS_ADDRESS"] = "unix:path=/run/user/1000/bus"
+    return env
+
+
+class PipeWireGraph:
+    """Nodes, devices, links and defaults, kept current by ``pw-dump --monitor``."""
+
+    def __init__(self, command: list[str] | None = None, env: dict | None = None):
+        self._command = command or ["pw-dump", "--monitor"]
+        self._env = env or pipewire_env()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._objects: dict[int, dict] = {}
+        self._metadata: dict[str, dict[tuple[int, str], object]] = {}  # metadata.name → entries
+        self._metadata_names: dict[int, str] = {}                     # metadata object id → name
+        self._proc: subprocess.Popen | None = None
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self.version = 0   # Bumped on every applied update
+
+    # ── Lifecycle ─────────────────────────────────────────────────────
+
+    def start(self) -> "PipeWireGraph":
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._monitor_loop, name="pw-graph", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._running = False
+        proc = self._proc
+        if proc and proc.poll() is None:
+            proc.terminate()
+
+    def wait_ready(self, timeout: float = READY_TIMEOUT) -> bool:
+        """Block until the first full dump has been applied.
+
+        If the monitor isn't running or hasn't delivered in time, a one-shot
+        snapshot fills the cache; the monitor's first dump replaces it later.
+        """
+        if self._ready.is_set():
+            return True
+        if not self._running or not self._ready.wait(timeout):
+            self._load_snapshot()
+        return self._ready.is_set()
+
+    # ── Queries ───────────────────────────────────────────────────────
+
+    def nodes(self, media_class: str) -> list[dict]:
+        """Nodes whose media.class equals (or, ending in '/', starts with) ``media_class``."""
+        self.wait_ready()
+        with self._lock:
+            objects = list(self._objects.values())
+        out = []
+        for obj in objects:
+            if obj.get("type") != NODE:
+                continue
+            cls = _props(obj).get("media.class", "")
+            if cls == media_class or (media_class.endswith("/") and cls.startswith(media_class)):
+                out.append(obj)
+        return sorted(out, key=lambda o: o["id"])
+
+    def node(self, node_id: int) -> dict | None:
+        self.wait_ready()
+        with self._lock:
+            obj = self._objects.get(node_id)
+        return obj if obj and obj.get("type") == NODE else None
+
+    def node_name(self, node_id: int) -> str | None:
+        node = self.node(node_id)
+        return _props(node).get("node.name") if node else None
+
+    def default_name(self, kind: str = "sink") -> str | None:
+        """node.name of the default audio sink or source."""
+        self.wait_ready()
+        with self._lock:
+            entries = self._metadata.get("default", {})
+            value = entries.get((0, f"default.audio.{kind}"))
+            if value is None:
+                value = entries.get((0, f"default.configured.audio.{kind}"))
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return value
+        return value.get("name") if isinstance(value, dict) else None
+
+    def devices(self) -> list[dict]:
+        """Cards (ALSA, bluez) — each exposes one or more nodes."""
+        self.wait_ready()
+        with self._lock:
+            return [o for o in self._objects.values() if o.get("type") == DEVICE]
+
+    def links(self) -> list[dict]:
+        self.wait_ready()
+        with self._lock:
+            return [o for o in self._objects.values() if o.get("type") == LINK]
+
+    def set_default_name(self, kind: str, name: str) -> None:
+        """Record a default change we just made, ahead of the monitor's echo."""
+        with self._lock:
+            self._metadata.setdefault("default", {})[(0, f"default.audio.{kind}")] = {"name": name}
+            self.version += 1
+
+    # ── Updates ───────────────────────────────────────────────────────
+
+    def apply(self, objects: list[dict]) -> None:
+        """Apply one pw-dump array (full dump or incremental update)."""
+        with self._lock:
+            self._apply_locked(objects)
+
+    def _apply_locked(self, objects: list[dict]) -> None:
+        for obj in objects:
+            obj_id = obj.get("id")
+            if obj_id is None:
+                continue
+            if obj.get("type") == METADATA or obj_id in self._metadata_names:
+                self._apply_metadata(obj)
+                continue
+            if obj.get("info") is None and "info" in obj:
+                self._objects.pop(obj_id, None)
+                continue
+            old = self._objects.get(obj_id)
+            if old is not None and obj.get("info") is not None:
+                # Updates may carry only the changed info fields
+                merged_info = {**old.get("info", {}), **obj["info"]}
+                obj = {**old, **obj, "info": merged_info}
+            self._objects[obj_id] = obj
+        self.version += 1
+
+    def _apply_metadata(self, obj: dict) -> None:
+        obj_id = obj["id"]
+        if obj.get("info") is None and "info" in obj and "metadata" not in obj:
+            name = self._metadata_names.pop(obj_id, None)
+            if name:
+                self._metadata.pop(name, None)
+            return
+        # pw-dump puts metadata props at the top level rather than under info
+        props = obj.get("props") or _props(obj)
+        name = props.get("metadata.name") or self._metadata_names.get(obj_id)
+        if not name:
+            return
+        self._metadata_names[obj_id] = name
+        entries = self._metadata.setdefault(name, {})
+        for item in obj.get("metadata") or []:
+            key = (item.get("subject", 0), item.get("key"))
+            if item.get("value") is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = item["value"]
+
+    def _replace(self, objects: list[dict]) -> None:
+        """Swap in a full dump; queries never see the graph half-rebuilt."""
+        with self._lock:
+            self._objects.clear()
+            self._metadata.clear()
+            self._metadata_names.clear()
+            self._apply_locked(objects)
+
+    # ── Monitor process ───────────────────────────────────────────────
+
+    def _monitor_loop(self):
+        failures = 0
+        while self._running:
+            started = time.monotonic()
+            try:
+                self._proc = subprocess.Popen(
+                    self._command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True, env=self._env,
+                )
+                self._read_stream(self._proc.stdout)
+                self._proc.wait()
+            except FileNotFoundError:
+                print(f"[audio] {self._command[0]} not found — PipeWire graph cache disabled")
+                self._running = False
+                break
+            except Exception as e:
+                print(f"[audio] PipeWire monitor error: {e}")
+            if not self._running:
+                break
+            failures = 0 if time.monotonic() - started > 60 else failures + 1
+            delay = RESTART_DELAYS[min(failures, len(RESTART_DELAYS) - 1)]
+            print(f"[audio] PipeWire monitor exited, restarting in {delay}s")
+            time.sleep(delay)
+
+    def _read_stream(self, stream):
+        """Split pw-dump's output into top-level JSON arrays and apply each one."""
+        first = True
+        buf: list[str] = []
+        for line in stream:
+            buf.append(line)
+            # pw-dump pretty-prints; a top-level array closes with "]" in column 0
+            if not line.startswith("]"):
+                continue
+            try:
+                objects = json.loads("".join(buf))
+            except ValueError as e:
+                # An update was lost, so the model can't be trusted; restart
+                # the monitor to get a fresh full dump
+                print(f"[audio] Unparseable pw-dump output ({e}) — restarting monitor")
+                if self._proc is not None:
+                    self._proc.terminate()
+                return
+            buf = []
+            if first:
+                self._replace(objects)   # A (re)started monitor begins with a full dump
+                self._ready.set()
+                first = False
+            else:
+                self.apply(objects)
+
+    def _load_snapshot(self) -> None:
+        """One-shot ``pw-dump`` while the monitor isn't delivering."""
+        try:
+            r = subprocess.run(self._command[:1], capture_output=True, text=True,
+                               timeout=5, env=self._env)
+            if r.returncode == 0 and r.stdout.strip():
+                self._replace(json.loads(r.stdout))
+                self._ready.set()
+        except (OSError, ValueError, subprocess.SubprocessError) as e:
+            print(f"[audio] pw-dump snapshot failed: {e}")
+
+
+def _props(obj: dict | None) -> dict:
+    return ((obj or {}).get("info") or {}).get("props") or {}
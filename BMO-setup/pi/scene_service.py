@@ -8,6 +8,8 @@ import json
 import os
 import threading
 import time
+from dataclasses import dataclass, field
+from typing import Callable
 
 SETTINGS_PATH = os.path.join(os.path.dirname(__file__), "data", "settings.json")
 
@@ -80,6 +82,119 @@ def _get_all_scenes() -> dict:
 SCENES = BUILTIN_SCENES
 
 
+# ── Step Graph ──────────────────────────────────────────────────────
+
+READY_POLL_INTERVAL = 0.25   # Seconds between readiness predicate checks
+TV_READY_TIMEOUT = 8.0       # Max wait for the TV to report "on" before launching an app
+TV_FALLBACK_SETTLE = 3.0     # Fixed settle time when no live TV status is available
+
+
+@dataclass
+class SceneStep:
+    """One node in a scene's execution graph.
+
+    A step runs once all of its ``depends_on`` steps have finished. If it
+    declares a ``ready`` predicate, dependents are released only once the
+    predicate returns True (or ``ready_timeout`` expires) rather than after
+    a fixed sleep.
+    """
+
+    name: str
+    action: Callable[[], object]
+    depends_on: list[str] = field(default_factory=list)
+    ready: Callable[[], bool] | None = None
+    ready_timeout: float = 0.0
+
+
+def _check_acyclic(by_name: dict[str, SceneStep]):
+    """Raise ValueError if the step graph has a dependency cycle."""
+    visiting, visited = set(), set()
+
+    def _visit(name: str):
+        if name in visited:
+            return
+        if name in visiting:
+            raise ValueError(f"Scene step dependency cycle at '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].depends_on:
+            _visit(dep)
+        visiting.discard(name)
+        visited.add(name)
+
+    for name in by_name:
+        _visit(name)
+
+
+def run_scene_steps(steps: list[SceneStep], poll_interval: float = READY_POLL_INTERVAL) -> list[dict]:
+    """Execute a step graph, running independent steps in parallel.
+
+    Returns one timing record per step (in declaration order) with start
+    offset, duration, readiness wait and status. Steps whose dependency
+    failed are skipped; a readiness timeout still releases dependents so a
+    slow device degrades to the old fixed-delay behavior.
+    """
+    by_name = {s.name: s for s in steps}
+    for step in steps:
+        missing = [d for d in step.depends_on if d not in by_name]
+        if missing:
+            raise ValueError(f"Scene step '{step.name}' depends on unknown step(s): {', '.join(missing)}")
+    _check_acyclic(by_name)
+
+    done = {s.name: threading.Event() for s in steps}
+    results: dict[str, dict] = {}
+    t0 = time.monotonic()
+
+    def _run(step: SceneStep):
+        record = {"step": step.name, "status": "ok", "start_ms": 0.0, "duration_ms": 0.0, "ready_ms": 0.0}
+        try:
+            for dep in step.depends_on:
+                done[dep].wait()
+            failed = [d for d in step.depends_on if results[d]["status"] in ("failed", "skipped")]
+            if failed:
+                record["status"] = "skipped"
+                record["error"] = f"dependency failed: {', '.join(failed)}"
+                return
+
+            start = time.monotonic()
+            record["start_ms"] = round((start - t0) * 1000, 1)
+            try:
+                outcome = step.action()
+            except Exception as e:
+                record["status"] = "failed"
+                record["error"] = str(e)
+                outcome = None
+            if outcome is False:
+                record["status"] = "failed"
+            action_end = time.monotonic()
+
+            if record["status"] == "ok" and step.ready is not None:
+                deadline = action_end + step.ready_timeout
+                while True:
+                    try:
+                        if step.ready():
+                            break
+                    except Exception:
+                        pass
+                    if time.monotonic() >= deadline:
+                        record["status"] = "ready_timeout"
+                        break
+                    time.sleep(poll_interval)
+                record["ready_ms"] = round((time.monotonic() - action_end) * 1000, 1)
+
+            record["duration_ms"] = round((time.monotonic() - start) * 1000, 1)
+        finally:
+            results[step.name] = record
+            done[step.name].set()
+
+    threads = [threading.Thread(target=_run, args=(s,), daemon=True) for s in steps]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return [results[s.name] for s in steps]
+
+
 class SceneService:
     """Manages scene activation with state save/restore."""
 
@@ -89,6 +204,7 @@ class SceneService:
         self._lock = threading.RLock()
         self._active_scene: str | None = None
         self._saved_state: dict = {}
+        self._last_run: dict = {}
         self._load_state()
 
     # ── Public API ──────────────────────────────────────────────────
@@ -171,6 +287,7 @@ class SceneService:
             "active": self._active_scene,
             "label": all_scenes.get(self._active_scene, {}).get("label") if self._active_scene else None,
             "scenes": self.list_scenes(),
+            "last_run": self._last_run,
         }
 
     def get_scene(self, name: str) -> dict | None:
@@ -312,76 +429,97 @@ class SceneService:
     # ── Scene Application ───────────────────────────────────────────
 
     def _apply_scene(self, scene: dict):
-        """Apply scene settings to hardware via service objects (no HTTP)."""
+        """Apply scene settings to hardware via service objects (no HTTP).
+
+        LED, TV and music steps run in parallel; only the TV app launch waits,
+        and it waits on the TV actually reporting "on" rather than a fixed sleep.
+        """
         print(f"[scene] Applying scene settings: {scene}")
+        steps = self._build_scene_steps(scene)
+        if not steps:
+            return
+        t0 = time.monotonic()
+        timings = run_scene_steps(steps)
+        total_ms = round((time.monotonic() - t0) * 1000, 1)
+        self._last_run = {"steps": timings, "total_ms": total_ms}
+        for t in timings:
+            extra = f", ready {t['ready_ms']:.0f}ms" if t["ready_ms"] else ""
+            error = f" ({t['error']})" if t.get("error") else ""
+            print(f"[scene]   {t['step']}: {t['status']} +{t['start_ms']:.0f}ms "
+                  f"took {t['duration_ms']:.0f}ms{extra}{error}")
+        print(f"[scene] Scene applied in {total_ms:.0f}ms")
+        if self._socketio:
+            self._socketio.emit("scene_timing", self._last_run)
+
+    def _build_scene_steps(self, scene: dict) -> list[SceneStep]:
+        """Translate a scene config into a dependency graph of steps."""
         led = self._services.get("leds")
         music = self._services.get("music")
-        tv_send_key = self._services.get("tv_send_key")
         tv_launch = self._services.get("tv_launch")
+        tv_power_on = self._services.get("tv_power_on")
+        tv_power_off = self._services.get("tv_power_off")
+        tv_query_on = self._services.get("tv_query_on")
+        steps: list[SceneStep] = []
 
         # RGB
         if scene.get("rgb_off"):
-            try:
+            def _led_off():
                 if led:
                     led.set_mode("off")
                 print("[scene] LED off")
-            except Exception as e:
-                print(f"[scene] LED off failed: {e}")
+            steps.append(SceneStep("led", _led_off))
         elif scene.get("rgb_mode"):
-            try:
+            def _led_mode():
                 if led:
                     led.set_mode(scene["rgb_mode"])
                     if scene.get("rgb_brightness"):
                         led.set_brightness(scene["rgb_brightness"])
                 print(f"[scene] LED {scene['rgb_mode']}")
-            except Exception as e:
-                print(f"[scene] LED mode failed: {e}")
+            steps.append(SceneStep("led", _led_mode))
 
         # TV
-        tv_power_on = self._services.get("tv_power_on")
-        tv_power_off = self._services.get("tv_power_off")
-        if scene.get("tv_off"):
-            try:
-                if not tv_power_off:
-                    print("[scene] TV power_off callback not available")
-                    if self._socketio:
-                        self._socketio.emit("notification", {"message": "TV not connected — pair in TV tab first", "type": "warning"})
-                else:
-                    tv_power_off()
-            except Exception as e:
-                print(f"[scene] TV off failed: {e}")
+        if (scene.get("tv_off") and not tv_power_off) or (scene.get("tv_on") and not tv_power_on):
+            print("[scene] TV power callback not available")
+            if self._socketio:
+                self._socketio.emit("notification", {"message": "TV not connected — pair in TV tab first", "type": "warning"})
+        elif scene.get("tv_off"):
+            steps.append(SceneStep("tv_power", tv_power_off))
         elif scene.get("tv_on"):
-            try:
-                if not tv_power_on:
-                    print("[scene] TV power_on callback not available")
-                    if self._socketio:
-                        self._socketio.emit("notification", {"message": "TV not connected — pair in TV tab first", "type": "warning"})
-                else:
-                    tv_power_on()
-                    time.sleep(3)
-                    if scene.get("tv_app") and tv_launch:
-                        tv_launch(scene["tv_app"])
-                        print(f"[scene] TV → {scene['tv_app']}")
-            except Exception as e:
-                print(f"[scene] TV launch failed: {e}")
+            if tv_query_on:
+                steps.append(SceneStep("tv_power", tv_power_on,
+                                       ready=lambda: tv_query_on() is True,
+                                       ready_timeout=TV_READY_TIMEOUT))
+            else:
+                # No live status available — fall back to a fixed settle delay
+                def _tv_on_and_settle():
+                    if not tv_power_on():
+                        return False   # Nothing to settle; tv_app is skipped
+                    time.sleep(TV_FALLBACK_SETTLE)
+                    return True
+                steps.append(SceneStep("tv_power", _tv_on_and_settle))
+            if scene.get("tv_app") and tv_launch:
+                def _tv_app():
+                    tv_launch(scene["tv_app"])
+                    print(f"[scene] TV → {scene['tv_app']}")
+                steps.append(SceneStep("tv_app", _tv_app, depends_on=["tv_power"]))
 
         # Music
         if scene.get("music_stop"):
-            try:
+            def _music_stop():
                 if music and hasattr(music, "stop"):
                     music.stop()
                 print("[scene] Music stopped")
-            except Exception:
-                pass
+            steps.append(SceneStep("music", _music_stop))
         elif scene.get("music_playlist"):
-            try:
+            def _music_play():
                 if music and hasattr(music, "search"):
                     results = music.search(f"{scene['music_playlist']} mix", limit=1)
                     if results:
                         music.play(results[0])
                 print(f"[scene] Music → {scene['music_playlist']}")
-            except Exception as e:
-                print(f"[scene] Music play failed: {e}")
+            steps.append(SceneStep("music", _music_play))
+
+        return steps
 
     def _apply_deactivation(self, skip_restore: bool = False):
         """Deactivate the current scene."""
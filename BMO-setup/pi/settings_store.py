@@ -0,0 +1,156 @@
+"""BMO Settings Store — In-memory settings.json cache with write-behind.
+
+Keeps the parsed settings dict in memory so reads don't open and parse the
+file. Writes update memory immediately and are coalesced into one atomic
+file write (temp file + rename) after a short delay.
+
+Other modules still write settings.json directly (scenes, LEDs),
+so the store stats the file before serving reads and before flushing: an
+external edit is re-read, and pending keys are re-applied on top of it
+instead of clobbering it.
+"""
+
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+WRITE_DELAY = 0.5       # Seconds to coalesce writes before flushing
+STAT_INTERVAL = 0.5     # Min seconds between mtime checks on read
+
+
+class SettingsStore:
+    """Thread/greenlet-safe cached view of a JSON settings file."""
+
+    def __init__(self, path: str, write_delay: float = WRITE_DELAY,
+                 stat_interval: float = STAT_INTERVAL):
+        self._path = path
+        self._write_delay = write_delay
+        self._stat_interval = stat_interval
+        self._lock = threading.RLock()
+        self._data: dict = {}
+        self._file_sig = None       # (mtime_ns, size, inode) of the file we last read/wrote
+        self._last_stat = 0.0
+        self._pending: dict = {}    # dotted key → value not yet on disk
+        self._timer: threading.Timer | None = None
+        self._reload()
+
+    # ── Public API ────────────────────────────────────────────────────
+
+    def get(self, key: str, default=None):
+        """Return the value at a dotted key (e.g. "volume.music")."""
+        with self._lock:
+            self._check_external()
+            obj = self._data
+            try:
+                for part in key.split("."):
+                    obj = obj.get(part, {})
+            except AttributeError:
+                return default
+            return copy.deepcopy(obj) if obj != {} else default
+
+    def set(self, key: str, value):
+        """Set a dotted key in memory and schedule a coalesced write."""
+        with self._lock:
+            self._check_external()
+            self._pending[key] = copy.deepcopy(value)
+            _set_dotted(self._data, key, value)
+            if self._timer is None:
+                self._timer = threading.Timer(self._write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def snapshot(self) -> dict:
+        """Return a deep copy of the full settings dict."""
+        with self._lock:
+            self._check_external()
+            return copy.deepcopy(self._data)
+
+    def flush(self):
+        """Write pending changes to disk now (atomic temp file + rename)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            # Someone else wrote the file since we last saw it — merge onto theirs
+            if self._stat_sig() != self._file_sig:
+                self._reload()
+                for key, value in self._pending.items():
+                    _set_dotted(self._data, key, value)
+            try:
+                self._write_atomic(self._data)
+                self._pending.clear()
+            except Exception as e:
+                print(f"[settings] Save failed: {e}")
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _stat_sig(self):
+        try:
+            st = os.stat(self._path)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            return None
+
+    def _check_external(self):
+        """Re-read the file if it changed on disk (rate-limited stat)."""
+        now = time.monotonic()
+        if now - self._last_stat < self._stat_interval:
+            return
+        self._last_stat = now
+        if self._stat_sig() != self._file_sig:
+            self._reload()
+            for key, value in self._pending.items():
+                _set_dotted(self._data, key, value)
+
+    def _reload(self):
+        sig = self._stat_sig()
+        data = {}
+        if sig is not None:
+            try:
+                with open(self._path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                # Mid-write or corrupt — keep what we have and retry next stat
+                print(f"[settings] Load failed: {e}")
+                return
+        self._data = data if isinstance(data, dict) else {}
+        self._file_sig = sig
+        self._last_stat = time.monotonic()
+
+    def _write_atomic(self, data: dict):
+        directory = os.path.dirname(self._path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                try:
+                    os.fchmod(f.fileno(), os.stat(self._path).st_mode & 0o777)
+                except FileNotFoundError:
+                    os.fchmod(f.fileno(), 0o644)
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
+        self._file_sig = self._stat_sig()
+
+
+def _set_dotted(data: dict, key: str, value):
+    parts = key.split(".")
+    obj = data
+    for part in parts[:-1]:
+        nxt = obj.get(part)
+        if not isinstance(nxt, dict):
+            nxt = obj[part] = {}
+        obj = nxt
+    obj[parts[-1]] = copy.deepcopy(value)
@@ -0,0 +1,183 @@
+"""BMO Social DB — Long-lived SQLite service for the Discord social bot.
+
+One process-wide database object replaces per-call connect + CREATE TABLE:
+
+- Schema is created and migrated once at startup (PRAGMA user_version).
+- All writes go through a single writer thread that owns one connection,
+  so writers never contend for the lock; each submitted job runs in its own
+  transaction.
+- Reads run on a small thread pool, each thread with its own connection.
+  WAL mode lets them proceed while a write is in flight.
+- Async callers ``await`` reads and writes, so the event loop never blocks
+  on disk I/O. Sync callers (worker threads) use the ``*_sync`` variants.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import sqlite3
+import threading
+from typing import Any, Callable
+
+logger = logging.getLogger("social_bot")
+
+READ_WORKERS = 2
+BUSY_TIMEOUT_MS = 5000
+
+# Ordered schema migrations; index + 1 is the resulting user_version.
+# Never edit an applied step — append a new one.
+MIGRATIONS: list[str] = [
+    """
+    CREATE TABLE IF NOT EXISTS play_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER NOT NULL,
+        user_id INTEGER,
+        track_title TEXT NOT NULL,
+        track_url TEXT,
+        duration INTEGER DEFAULT 0,
+        played_at REAL DEFAULT (unixepoch())
+    );
+    CREATE TABLE IF NOT EXISTS user_prefs (
+        user_id INTEGER NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT,
+        PRIMARY KEY (user_id, key)
+    );
+    CREATE TABLE IF NOT EXISTS xp_data (
+        user_id INTEGER PRIMARY KEY,
+        xp INTEGER DEFAULT 0,
+        level INTEGER DEFAULT 1,
+        total_messages INTEGER DEFAULT 0,
+        last_xp_time REAL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS reminders (
+        id TEXT PRIMARY KEY,
+        user_id INTEGER,
+        channel_id INTEGER,
+        guild_id INTEGER,
+        message TEXT,
+        fire_at REAL,
+        created_at REAL DEFAULT (unixepoch())
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_play_history_guild ON play_history(guild_id, track_title);
+    CREATE INDEX IF NOT EXISTS idx_play_history_user ON play_history(user_id, track_title);
+    CREATE INDEX IF NOT EXISTS idx_user_prefs_key ON user_prefs(key, value);
+    CREATE INDEX IF NOT EXISTS idx_xp_data_xp ON xp_data(xp DESC);
+    CREATE INDEX IF NOT EXISTS idx_reminders_fire_at ON reminders(fire_at);
+    """,
+]
+
+_STOP = object()
+
+
+class SocialDB:
+    """Single-writer / multi-reader SQLite service with an async facade."""
+
+    def __init__(self, path: str, read_workers: int = READ_WORKERS):
+        self.path = path
+        self._local = threading.local()
+        self._writes: queue.Queue = queue.Queue()
+        self._migrate()
+        self._readers = concurrent.futures.ThreadPoolExecutor(
+            max_workers=read_workers, thread_name_prefix="social-db-read",
+        )
+        self._writer = threading.Thread(target=self._write_loop, name="social-db-write", daemon=True)
+        self._writer.start()
+
+    # ── Async API ─────────────────────────────────────────────────────
+
+    async def read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run ``fn(conn)`` on a reader thread and return its result."""
+        return await asyncio.wrap_future(self._readers.submit(self._run_read, fn))
+
+    async def fetchone(self, sql: str, params: tuple = ()) -> sqlite3.Row | None:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchone())
+
+    async def fetchall(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Queue ``fn(conn)`` on the writer thread; one transaction per call."""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    async def execute(self, sql: str, params: tuple = ()) -> int:
+        """Queue a single write statement; returns the affected row count."""
+        return await self.write(lambda conn: conn.execute(sql, params).rowcount)
+
+    async def executemany(self, sql: str, seq: list[tuple]) -> int:
+        return await self.write(lambda conn: conn.executemany(sql, seq).rowcount)
+
+    # ── Sync API (for worker threads) ─────────────────────────────────
+
+    def submit(self, fn: Callable[[sqlite3.Connection], Any]) -> concurrent.futures.Future:
+        """Queue a write job without waiting for it."""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._writes.put((fn, future))
+        return future
+
+    def read_sync(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        return self._readers.submit(self._run_read, fn).result()
+
+    def write_sync(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        return self.submit(fn).result()
+
+    def close(self) -> None:
+        """Drain queued writes, then stop the writer and reader threads."""
+        self._writes.put(_STOP)
+        self._writer.join(timeout=10)
+        self._readers.shutdown(wait=True)
+
+    # ── Internals ─────────────────────────────────────────────────────
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=128)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _migrate(self) -> None:
+        conn = self._open()
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for i, script in enumerate(MIGRATIONS[version:], start=version + 1):
+                conn.executescript(f"BEGIN; {script} PRAGMA user_version = {i}; COMMIT;")
+                logger.info("Social DB migrated to schema v%d", i)
+        finally:
+            conn.close()
+
+    def _run_read(self, fn):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        conn.execute("BEGIN")  # One consistent snapshot per read job
+        try:
+            return fn(conn)
+        finally:
+            conn.execute("COMMIT")
+
+    def _write_loop(self):
+        conn = self._open()
+        while True:
+            job = self._writes.get()
+            if job is _STOP:
+                break
+            fn, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                result = fn(conn)
+                conn.execute("COMMIT")
+                future.set_result(result)
+            except BaseException as e:
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+                future.set_exception(e)
+        conn.close()
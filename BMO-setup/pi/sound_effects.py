@@ -2,13 +2,29 @@
 
 Plays short audio cues for key events (startup, wake word, errors, D&D sounds).
 Non-blocking playback that doesn't interrupt TTS.
+
+Every event sound is decoded to PCM once at startup and mixed in software
+into one long-lived sounddevice output stream, so a cue starts on the next
+~5ms audio block with no file lookups, threads or player processes.
+Overlapping cues are summed (with per-event gain) and the "thinking" cue
+loops gaplessly until stopped. If no output stream can be opened the
+player falls back to launching ffplay per sound.
 """
 
 import os
+import random
 import subprocess
 import threading
+import wave
 
 SOUNDS_DIR = os.path.join(os.path.dirname(__file__), "static", "sounds")
+AUDIO_EXTS = (".wav", ".ogg", ".mp3")
+
+OUTPUT_RATE = 48000
+BLOCK_FRAMES = 256            # ~5ms per mixer callback at 48kHz
+MAX_VOICES = 16               # Oldest one-shot cue is dropped beyond this
+THINKING_DELAY = 0.5          # Silence before the first thinking cue
+THINKING_INTERVAL = 5.0       # Loop period when the cue is shorter than this
 
 
 # ── Sound Event Definitions ───────────────────────────────────────────
@@ -21,6 +37,7 @@ SOUND_EVENTS = {
     "error": "error_tone",
     "chime": "chime",
     "notification": "chime",
+    "thinking": "boop",
 
     # Timer/Alarm
     "alarm": "alarm_bell",
@@ -42,26 +59,118 @@ SOUND_EVENTS = {
     "queue_empty": "sad_tone",
 }
 
+# Per-event gain (0.0-1.0) applied on top of the master volume; default 1.0
+EVENT_VOLUME = {
+    "boop": 0.6,
+    "thinking": 0.4,
+    "notification": 0.8,
+    "dice": 0.8,
+}
+
+
+class _Voice:
+    """One playing sound: a PCM buffer and a read position (negative = delay)."""
+
+    __slots__ = ("pcm", "pos", "gain", "loop", "event")
+
+    def __init__(self, pcm, gain: float, loop: bool = False, event: str = "", delay: int = 0):
+        self.pcm = pcm
+        self.pos = -delay
+        self.gain = gain
+        self.loop = loop
+        self.event = event
+
 
 class SoundEffects:
     """Event-triggered audio player for BMO sound effects.
 
-    Plays sounds in a non-blocking background thread so they don't
-    interrupt TTS or other audio output.
+    Sounds are preloaded into memory and mixed into a persistent output
+    stream, so they don't interrupt TTS or other audio output.
     """
 
-    def __init__(self):
+    def __init__(self, preload: bool = True):
         self._sounds_dir = SOUNDS_DIR
         self._volume = 80  # 0-100
         self._enabled = True
 
+        self._clips: dict[str, list] = {}       # sound name → decoded float32 variations
+        self._voices: list[_Voice] = []
+        self._lock = threading.Lock()
+        self._stream = None
+        self._thinking_pcm = None
+
         # Ensure sounds directory exists
         os.makedirs(self._sounds_dir, exist_ok=True)
 
+        if preload:
+            self.load()
+
+    # ── Loading ───────────────────────────────────────────────────────
+
+    def load(self):
+        """Decode every event sound into memory and open the output stream."""
+        import importlib.util
+        if importlib.util.find_spec("numpy") is None:
+            print("[sound] numpy not available, using ffplay per sound")
+            return
+
+        clips = {}
+        for sound_name in set(SOUND_EVENTS.values()):
+            decoded = [pcm for pcm in map(_decode, self._sound_files(sound_name))
+                       if pcm is not None and len(pcm)]
+            if decoded:
+                clips[sound_name] = decoded
+        self._clips = clips
+        self._thinking_pcm = None
+        print(f"[sound] Preloaded {sum(map(len, clips.values()))} sounds for "
+              f"{len(clips)}/{len(set(SOUND_EVENTS.values()))} effects")
+        self._open_stream()
+
+    def _sound_files(self, sound_name: str) -> list[str]:
+        """Files for a sound: every audio file in its directory, or the first NAME.ext found."""
+        dir_path = os.path.join(self._sounds_dir, sound_name)
+        if os.path.isdir(dir_path):
+            return sorted(
+                os.path.join(dir_path, f) for f in os.listdir(dir_path) if f.endswith(AUDIO_EXTS)
+            )
+        for ext in AUDIO_EXTS:
+            candidate = os.path.join(self._sounds_dir, sound_name + ext)
+            if os.path.exists(candidate):
+                return [candidate]
+        return []
+
+    def _open_stream(self):
+        try:
+            import sounddevice as sd
+            os.environ.setdefault("XDG_RUNTIME_DIR", "/run/user/1000")
+            stream = sd.OutputStream(
+                samplerate=OUTPUT_RATE, channels=1, dtype="float32",
+                blocksize=BLOCK_FRAMES, latency="low", callback=self._callback,
+            )
+            stream.start()
+            self._stream = stream
+        except Exception as e:
+            print(f"[sound] Output stream unavailable ({e}), using ffplay per sound")
+            self._stream = None
+
+    def close(self):
+        """Stop the output stream and drop all playing sounds."""
+        with self._lock:
+            self._voices = []
+        if self._stream is not None:
+            try:
+                self._stream.stop()
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+
+    # ── Playback ──────────────────────────────────────────────────────
+
     def play(self, event: str):
         """Play the sound effect for a given event name.
 
-        Non-blocking — audio plays in a background thread.
+        Non-blocking — the sound is mixed in from the next audio block.
         Does nothing if the event has no mapped sound file.
         If the mapped sound name is a directory, picks a random file from it.
         """
@@ -72,37 +181,61 @@ class SoundEffects:
         if not sound_name:
             return
 
-        # Check if it's a directory of variations
-        dir_path = os.path.join(self._sounds_dir, sound_name)
-        if os.path.isdir(dir_path):
-            candidates = [
-                f for f in os.listdir(dir_path)
-                if f.endswith((".wav", ".ogg", ".mp3"))
-            ]
-            if not candidates:
-                return
-            import random
-            sound_path = os.path.join(dir_path, random.choice(candidates))
-        else:
-            # Single file lookup (existing logic)
-            sound_path = None
-            for ext in (".wav", ".ogg", ".mp3"):
-                candidate = os.path.join(self._sounds_dir, sound_name + ext)
-                if os.path.exists(candidate):
-                    sound_path = candidate
-                    break
-            if not sound_path:
-                return
-
-        # Play in background thread
-        threading.Thread(
-            target=self._play_file,
-            args=(sound_path,),
-            daemon=True,
-        ).start()
+        if self._stream is None:
+            files = self._sound_files(sound_name)
+            if files:
+                threading.Thread(
+                    target=self._play_file, args=(random.choice(files),), daemon=True,
+                ).start()
+            return
+
+        clips = self._clips.get(sound_name)
+        if not clips:
+            return
+        self._add_voice(_Voice(random.choice(clips), EVENT_VOLUME.get(event, 1.0), event=event))
+
+    def _add_voice(self, voice: _Voice):
+        with self._lock:
+            voices = self._voices + [voice]
+            if len(voices) > MAX_VOICES:
+                oldest = next((v for v in voices if not v.loop), None)
+                if oldest is not None:
+                    voices.remove(oldest)
+            self._voices = voices
+
+    def _callback(self, outdata, frames, time_info, status):
+        outdata[:, 0] = self._mix(frames)
+
+    def _mix(self, frames: int):
+        """Sum the next ``frames`` samples of every playing voice."""
+        import numpy as np
+
+        out = np.zeros(frames, dtype=np.float32)
+        with self._lock:
+            voices = self._voices
+            alive = []
+            for v in voices:
+                n = 0
+                if v.pos < 0:
+                    n = min(frames, -v.pos)
+                    v.pos += n
+                length = len(v.pcm)
+                while n < frames and v.pos < length:
+                    take = min(frames - n, length - v.pos)
+                    out[n:n + take] += v.pcm[v.pos:v.pos + take] * v.gain
+                    n += take
+                    v.pos += take
+                    if v.pos >= length and v.loop:
+                        v.pos = 0
+                if v.pos < length:
+                    alive.append(v)
+            self._voices = alive
+        out *= self._volume / 100
+        np.clip(out, -1.0, 1.0, out=out)
+        return out
 
     def _play_file(self, path: str):
-        """Play an audio file using ffplay (respects volume for all formats)."""
+        """Play an audio file using ffplay (fallback when no output stream is open)."""
         try:
             # Always use ffplay so volume control works for all formats
             env = os.environ.copy()
@@ -137,28 +270,60 @@ class SoundEffects:
     def set_enabled(self, enabled: bool):
         """Enable or disable sound effects."""
         self._enabled = enabled
+        if not enabled:
+            with self._lock:
+                self._voices = []
+
+    # ── Thinking loop ─────────────────────────────────────────────────
 
     def start_thinking_loop(self):
-        """Start a looping thinking sound that plays every 5 seconds.
+        """Start the looping thinking sound (one cue every THINKING_INTERVAL).
 
-        Stops when stop_thinking_loop() is called. Interruptible — checks
-        the stop flag every 100ms instead of blocking for the full interval.
+        With an output stream the cue is padded with silence to the loop
+        period and played as a single gapless looping voice. Stops when
+        stop_thinking_loop() is called.
         """
-        self._thinking_active = threading.Event()
-        self._thinking_active.set()
-        threading.Thread(target=self._thinking_loop, daemon=True).start()
+        self.stop_thinking_loop()
+        if not self._enabled:
+            return
+        if self._stream is None:
+            self._thinking_active = threading.Event()
+            self._thinking_active.set()
+            threading.Thread(target=self._thinking_loop, daemon=True).start()
+            return
+
+        pcm = self._thinking_buffer()
+        if pcm is None:
+            return
+        self._add_voice(_Voice(pcm, EVENT_VOLUME.get("thinking", 1.0), loop=True,
+                               event="thinking", delay=int(THINKING_DELAY * OUTPUT_RATE)))
 
     def stop_thinking_loop(self):
         """Stop the thinking sound loop immediately."""
         if hasattr(self, '_thinking_active'):
             self._thinking_active.clear()
+        with self._lock:
+            self._voices = [v for v in self._voices if not v.loop]
+
+    def _thinking_buffer(self):
+        """The thinking cue padded with trailing silence to one loop period (cached)."""
+        if self._thinking_pcm is None:
+            import numpy as np
+
+            clips = self._clips.get(SOUND_EVENTS["thinking"])
+            if not clips:
+                return None
+            cue = clips[0]
+            period = max(len(cue), int(THINKING_INTERVAL * OUTPUT_RATE))
+            self._thinking_pcm = np.concatenate([cue, np.zeros(period - len(cue), dtype=np.float32)])
+        return self._thinking_pcm
 
     def _thinking_loop(self):
         import time
-        time.sleep(0.5)
+        time.sleep(THINKING_DELAY)
         while self._thinking_active.is_set():
-            self.play("boop")
-            for _ in range(50):
+            self.play("thinking")
+            for _ in range(int(THINKING_INTERVAL * 10)):
                 if not self._thinking_active.is_set():
                     return
                 time.sleep(0.1)
@@ -176,15 +341,55 @@ class SoundEffects:
         result = []
         for f in os.listdir(self._sounds_dir):
             path = os.path.join(self._sounds_dir, f)
-            if os.path.isfile(path) and f.endswith((".wav", ".ogg", ".mp3")):
+            if os.path.isfile(path) and f.endswith(AUDIO_EXTS):
                 result.append(f)
             elif os.path.isdir(path):
                 for sf in os.listdir(path):
-                    if sf.endswith((".wav", ".ogg", ".mp3")):
+                    if sf.endswith(AUDIO_EXTS):
                         result.append(f"{f}/{sf}")
         return result
 
 
+def _decode(path: str):
+    """Decode an audio file to mono float32 PCM at OUTPUT_RATE, or None on failure.
+
+    16-bit WAV is read directly; anything else goes through one ffmpeg call
+    (at load time only).
+    """
+    import numpy as np
+
+    try:
+        pcm = None
+        if path.endswith(".wav"):
+            with wave.open(path, "rb") as wf:
+                if wf.getsampwidth() == 2:
+                    channels, rate = wf.getnchannels(), wf.getframerate()
+                    pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        if pcm is None:
+            result = subprocess.run(
+                ["ffmpeg", "-v", "quiet", "-i", path, "-f", "s16le", "-ac", "1",
+                 "-ar", str(OUTPUT_RATE), "-"],
+                capture_output=True, timeout=30,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"ffmpeg exit {result.returncode}")
+            channels, rate = 1, OUTPUT_RATE
+            pcm = np.frombuffer(result.stdout, dtype=np.int16)
+    except Exception as e:
+        print(f"[sound] Could not decode {os.path.basename(path)}: {e}")
+        return None
+
+    samples = pcm.astype(np.float32) / 32768.0
+    if channels > 1:
+        samples = samples[: len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+    if rate != OUTPUT_RATE and len(samples):
+        n = int(len(samples) * OUTPUT_RATE / rate)
+        samples = np.interp(
+            np.linspace(0, len(samples) - 1, n), np.arange(len(samples)), samples,
+        ).astype(np.float32)
+    return samples
+
+
 def generate_tone(filename: str, frequency: float = 440, duration: float = 0.5,
                    sample_rate: int = 16000, ascending: bool = True):
     """Generate a simple sine wave tone and save as WAV.
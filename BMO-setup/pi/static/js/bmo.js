@@ -367,8 +367,8 @@ function bmo() {
         }
       } catch {}
 
-      // Restore chat from last session
-      this.loadChatHistory();
+      // Restore chat from last session (server pushes its recent window on connect)
+      this.socket.on('chat_history', (history) => this.applyChatHistory(history));
 
       // Fetch D&D player names if a session is active
       this.fetchPlayers();
@@ -636,6 +636,28 @@ function bmo() {
         this.btScanning = false;
       });
 
+      this.socket.on('bt_device', (dev) => {
+        if (!this.btScanning || !dev.name || dev.name === dev.address) return;
+        const i = this.btDevices.findIndex(d => d.address === dev.address);
+        if (i >= 0) this.btDevices[i] = { address: dev.address, name: dev.name };
+        else this.btDevices.push({ address: dev.address, name: dev.name });
+      });
+
+      this.socket.on('bt_job', (job) => {
+        if (job.kind === 'pair' && !['done', 'failed'].includes(job.state)) {
+          this.showNotification(`Bluetooth: ${job.state}...`);
+        }
+      });
+
+      this.socket.on('bt_pair_result', (data) => {
+        if (data.ok) {
+          this.showNotification('Bluetooth paired!');
+          this.fetchAudioDevices();
+        } else {
+          this.showNotification(data.message || 'Pair failed', 'error');
+        }
+      });
+
       this.socket.on('vision_result', (data) => {
         this.visionResult = data.description || 'No description';
       });
@@ -791,16 +813,10 @@ function bmo() {
 
     // ── Chat ──────────────────────────────────────────────────
 
-    async loadChatHistory() {
-      try {
-        const res = await fetch('/api/chat/history');
-        const history = await res.json();
-        if (Array.isArray(history) && history.length > 0) {
-          this.messages = history.map(m => ({ role: m.role, text: m.text, speaker: m.speaker }));
-          this.scrollChat();
-        }
-      } catch (e) {
-        console.warn('[bmo] Failed to load chat history:', e);
+    applyChatHistory(history) {
+      if (Array.isArray(history) && history.length > 0) {
+        this.messages = history.map(m => ({ role: m.role, text: m.text, speaker: m.speaker }));
+        this.scrollChat();
       }
     },
 
@@ -2473,12 +2489,8 @@ function bmo() {
           body: JSON.stringify({ address }),
         });
         const data = await r.json();
-        if (data.ok) {
-          this.showNotification('Bluetooth paired!');
-          this.fetchAudioDevices();
-        } else {
-          this.showNotification(data.message || 'Pair failed', 'error');
-        }
+        // Outcome arrives via bt_pair_result socket event
+        if (!data.ok) this.showNotification(data.message || data.error || 'Pair failed', 'error');
       } catch {
         this.showNotification('Pair request failed', 'error');
       }
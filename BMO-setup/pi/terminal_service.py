@@ -2,34 +2,79 @@
 
 Provides TerminalSession (single bash PTY) and TerminalManager (tracks
 multiple named sessions per SocketIO client).
+
+PTY output is pumped in coalesced batches: reads are buffered for a few
+milliseconds (or until FLUSH_BYTES) and emitted as one event, so `cat` of a
+large file becomes tens of websocket frames instead of thousands. Each batch
+carries a sequence number; clients that ack batches get flow control — if
+they fall more than HIGH_WATER bytes behind, output goes to the scrollback
+ring only, and the client is resynced from scrollback once it catches up.
+Sessions survive a client disconnect for DETACH_GRACE seconds so a
+reconnecting client can re-attach and replay its scrollback.
 """
 
+import codecs
+import collections
 import fcntl
 import os
 import pty
+import secrets
 import select
 import struct
-import subprocess
 import termios
 import threading
 import time
 
+FLUSH_INTERVAL = 0.008        # Max seconds output waits before being emitted
+FLUSH_BYTES = 32 * 1024       # Emit immediately once this much output is buffered
+READ_SIZE = 64 * 1024         # Bytes per os.read from the PTY
+SCROLLBACK_CHARS = 256 * 1024 # Bounded scrollback ring kept for resync/reconnect
+HIGH_WATER = 1024 * 1024      # Unacked chars before a client drops to scrollback-only
+LOW_WATER = 128 * 1024        # Unacked chars at which a lagging client is resynced
+DETACH_GRACE = 120            # Seconds a session outlives its client's disconnect
+
 
 class TerminalSession:
     """A single interactive bash session backed by a PTY."""
 
-    def __init__(self, term_id: str, cols: int = 80, rows: int = 24):
+    def __init__(self, term_id: str, cols: int = 80, rows: int = 24,
+                 flush_interval: float = FLUSH_INTERVAL, flush_bytes: int = FLUSH_BYTES):
         self.term_id = term_id
         self.cols = cols
         self.rows = rows
         self.alive = False
+        self.attach_key = secrets.token_hex(8)
+        self.detached_at: float | None = None
         self._master_fd = None
         self._pid = None
         self._reader_thread = None
         self._output_callback = None
+        self._flush_interval = flush_interval
+        self._flush_bytes = flush_bytes
+
+        # Output pump state (guarded by _out_lock)
+        self._out_lock = threading.Lock()
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending: list[bytes] = []
+        self._pending_bytes = 0
+        self._flush_deadline = 0.0
+        self._scrollback: collections.deque[str] = collections.deque()
+        self._scrollback_chars = 0
+        self._seq = 0
+        self._inflight: collections.deque[tuple[int, int]] = collections.deque()  # (seq, chars)
+        self._unacked = 0
+        self._acks_seen = False
+        self._behind = False
+        self.stats = {"reads": 0, "emits": 0, "bytes": 0, "dropped_batches": 0}
 
     def start_pty(self, output_callback):
-        """Fork a bash PTY and start the reader thread."""
+        """Fork a bash PTY and start the reader thread.
+
+        Args:
+            output_callback: Called with (term_id, text, seq, reset). ``reset``
+                is True when ``text`` is a scrollback replay that should
+                replace the client's screen rather than append to it.
+        """
         self._output_callback = output_callback
         master_fd, slave_fd = pty.openpty()
         self._master_fd = master_fd
@@ -56,29 +101,124 @@ class TerminalSession:
             self._start_reader()
 
     def _start_reader(self):
-        """Background thread that reads PTY output and calls the callback."""
+        """Background thread that reads PTY output and pumps it in batches."""
         def _read_loop():
             try:
                 while self.alive:
                     fd = self._master_fd
                     if fd is None:
                         break
-                    ready, _, _ = select.select([fd], [], [], 0.05)
+                    if self._pending:
+                        timeout = max(0.0, self._flush_deadline - time.monotonic())
+                    else:
+                        timeout = 1.0
+                    ready, _, _ = select.select([fd], [], [], timeout)
                     if ready:
                         try:
-                            data = os.read(fd, 4096)
-                            if data and self._output_callback:
-                                self._output_callback(self.term_id, data)
-                            elif not data:
-                                break
+                            data = os.read(fd, READ_SIZE)
                         except OSError:
                             break
+                        if not data:
+                            break
+                        self._buffer(data)
+                    if self._pending and (self._pending_bytes >= self._flush_bytes
+                                          or time.monotonic() >= self._flush_deadline):
+                        self._flush()
+            except (OSError, ValueError):
+                pass  # fd closed by kill()
             finally:
+                self._flush()
                 self.alive = False
 
         self._reader_thread = threading.Thread(target=_read_loop, daemon=True)
         self._reader_thread.start()
 
+    # ── Output Pump ─────────────────────────────────────────────────
+
+    def _buffer(self, data: bytes):
+        if not self._pending:
+            self._flush_deadline = time.monotonic() + self._flush_interval
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        self.stats["reads"] += 1
+
+    def _flush(self):
+        """Emit buffered output as one batch (or only record it if the client lags)."""
+        with self._out_lock:
+            if not self._pending:
+                return
+            raw = b"".join(self._pending)
+            self._pending.clear()
+            self._pending_bytes = 0
+            text = self._decoder.decode(raw)
+            self.stats["bytes"] += len(raw)
+            if not text:
+                return
+            self._append_scrollback(text)
+            if self._behind or self._output_callback is None:
+                self.stats["dropped_batches"] += 1
+                return
+            if self._acks_seen and self._unacked > HIGH_WATER:
+                self._behind = True
+                self.stats["dropped_batches"] += 1
+                return
+            self._seq += 1
+            seq = self._seq
+            self._inflight.append((seq, len(text)))
+            self._unacked += len(text)
+            callback = self._output_callback
+        self.stats["emits"] += 1
+        callback(self.term_id, text, seq, False)
+
+    def _append_scrollback(self, text: str):
+        self._scrollback.append(text)
+        self._scrollback_chars += len(text)
+        while self._scrollback_chars > SCROLLBACK_CHARS and self._scrollback:
+            excess = self._scrollback_chars - SCROLLBACK_CHARS
+            head = self._scrollback[0]
+            if len(head) <= excess:
+                self._scrollback.popleft()
+                self._scrollback_chars -= len(head)
+            else:
+                self._scrollback[0] = head[excess:]
+                self._scrollback_chars -= excess
+
+    def ack(self, seq: int):
+        """Client has rendered every batch up to ``seq``."""
+        resync = False
+        with self._out_lock:
+            self._acks_seen = True
+            while self._inflight and self._inflight[0][0] <= seq:
+                _, chars = self._inflight.popleft()
+                self._unacked -= chars
+            if self._behind and self._unacked <= LOW_WATER:
+                resync = True
+        if resync:
+            self.replay()
+
+    def replay(self):
+        """Resend the scrollback ring as a screen reset (resync or re-attach)."""
+        with self._out_lock:
+            callback = self._output_callback
+            if callback is None:
+                return
+            text = "".join(self._scrollback)
+            self._behind = False
+            self._seq += 1
+            seq = self._seq
+            self._inflight.clear()
+            self._inflight.append((seq, len(text)))
+            self._unacked = len(text)
+        callback(self.term_id, text, seq, True)
+
+    def set_output_callback(self, output_callback):
+        """Point output at a new client (re-attach after reconnect)."""
+        with self._out_lock:
+            self._output_callback = output_callback
+            self._acks_seen = False
+            self._inflight.clear()
+            self._unacked = 0
+
     def write(self, data: bytes):
         """Send keystrokes to the PTY."""
         if self.alive and self._master_fd is not None:
@@ -121,6 +261,7 @@ class TerminalManager:
 
     def __init__(self):
         self._sessions: dict[str, dict[str, TerminalSession]] = {}
+        self._detached: dict[str, TerminalSession] = {}  # attach_key → session
         self._lock = threading.Lock()
 
     def open_terminal(self, sid: str, term_id: str, cols: int, rows: int,
@@ -132,7 +273,7 @@ class TerminalManager:
             term_id: Unique terminal identifier (e.g., 'term-1').
             cols: Terminal width.
             rows: Terminal height.
-            output_callback: Called with (term_id, data_bytes).
+            output_callback: Called with (term_id, text, seq, reset).
 
         Returns:
             The new TerminalSession.
@@ -161,12 +302,58 @@ class TerminalManager:
             session.kill()
 
     def close_all(self, sid: str):
-        """Close all terminal sessions for a client (on disconnect)."""
+        """Close all terminal sessions for a client."""
         with self._lock:
             sessions = self._sessions.pop(sid, {})
         for session in sessions.values():
             session.kill()
 
+    def detach_all(self, sid: str):
+        """Keep a disconnected client's sessions alive for DETACH_GRACE seconds.
+
+        Output keeps accumulating in each session's scrollback; sessions not
+        re-attached in time are killed.
+        """
+        now = time.time()
+        with self._lock:
+            sessions = self._sessions.pop(sid, {})
+            for session in sessions.values():
+                session.set_output_callback(None)
+                session.detached_at = now
+                self._detached[session.attach_key] = session
+        if sessions:
+            timer = threading.Timer(DETACH_GRACE + 1, self._reap_detached)
+            timer.daemon = True
+            timer.start()
+
+    def attach(self, sid: str, term_id: str, attach_key: str,
+               output_callback) -> TerminalSession | None:
+        """Re-attach a detached session to a (new) client and replay scrollback."""
+        with self._lock:
+            session = self._detached.get(attach_key)
+            # A wrong term_id leaves the session for its owner (or the reaper)
+            if session is None or session.term_id != term_id:
+                return None
+            del self._detached[attach_key]
+            alive = session.alive
+            if alive:
+                session.detached_at = None
+                self._sessions.setdefault(sid, {})[term_id] = session
+        if not alive:
+            session.kill()   # Reap the exited shell and close its PTY
+            return None
+        session.set_output_callback(output_callback)
+        session.replay()
+        return session
+
+    def _reap_detached(self):
+        cutoff = time.time() - DETACH_GRACE
+        with self._lock:
+            expired = [k for k, s in self._detached.items() if s.detached_at and s.detached_at <= cutoff]
+            sessions = [self._detached.pop(k) for k in expired]
+        for session in sessions:
+            session.kill()
+
     def list_sessions(self, sid: str) -> list[str]:
         """List active terminal IDs for a client."""
         with self._lock:
@@ -0,0 +1,154 @@
+"""Tests for the per-channel alert delivery queues, with a fake deliver function.
+
+Covers priority order, drop-least-urgent eviction when the queue is full,
+critical alerts (and critical retries) cutting a digest linger short,
+retry back-off and giving up, and digest batching.
+
+Usage:
+    python test_alert_delivery.py
+"""
+
+import threading
+import time
+
+from alert_delivery import DeliveryChannel
+
+
+def alert(title, priority="medium"):
+    return {"title": title, "priority": priority}
+
+
+class FakeDeliver:
+    """Records (time, titles) per call; can block on a gate or fail the first N calls."""
+
+    def __init__(self, fail: int = 0, gate: threading.Event | None = None):
+        self.fail = fail
+        self.gate = gate
+        self.calls: list[tuple[float, list[str]]] = []
+        self.failures: list[float] = []
+        self.first_call = threading.Event()
+        self.done = threading.Condition()
+
+    def __call__(self, batch):
+        self.first_call.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            self.fail -= 1
+            with self.done:
+                self.failures.append(time.monotonic())
+                self.done.notify_all()
+            raise ConnectionError("channel down")
+        with self.done:
+            self.calls.append((time.monotonic(), [a["title"] for a in batch]))
+            self.done.notify_all()
+
+    def wait_for(self, n: int, timeout: float = 5.0) -> list[list[str]]:
+        with self.done:
+            assert self.done.wait_for(lambda: len(self.calls) >= n, timeout), self.calls
+            return [titles for _, titles in self.calls]
+
+
+def blocked_channel(**kwargs):
+    """A channel whose worker is stuck delivering "blocker" until the gate opens."""
+    gate = threading.Event()
+    deliver = FakeDeliver(gate=gate)
+    channel = DeliveryChannel("test", deliver, **kwargs)
+    channel.submit(alert("blocker", "critical"))
+    assert deliver.first_call.wait(2)
+    return channel, deliver, gate
+
+
+def test_priority_order():
+    channel, deliver, gate = blocked_channel(max_batch=1)
+    for title, priority in (("l", "low"), ("m", "medium"), ("h", "high"), ("c", "critical"),
+                            ("m2", "medium"), ("u", "unknown")):
+        channel.submit(alert(title, priority))
+    gate.set()
+    # Unknown priorities rank as medium; FIFO within a rank
+    assert deliver.wait_for(7) == [["blocker"], ["c"], ["h"], ["m"], ["m2"], ["u"], ["l"]]
+    channel.stop()
+
+
+def test_full_queue_drops_least_urgent_newest():
+    channel, deliver, gate = blocked_channel(maxsize=3, max_batch=1)
+    assert channel.submit(alert("low1", "low"))
+    assert channel.submit(alert("low2", "low"))
+    assert channel.submit(alert("med", "medium"))
+    assert channel.submit(alert("high", "high"))           # Evicts low2
+    assert not channel.submit(alert("low3", "low"))        # Least urgent itself: turned away
+    assert channel.submit(alert("crit", "critical"))       # Evicts low1
+    assert channel.stats["dropped"] == 3 and channel.pending() == 3
+    gate.set()
+    assert deliver.wait_for(4) == [["blocker"], ["crit"], ["high"], ["med"]]
+    channel.stop()
+
+
+def test_digest_batching():
+    deliver = FakeDeliver()
+    channel = DeliveryChannel("test", deliver, linger=0.2, max_batch=3)
+    for i, priority in enumerate(("low", "medium", "high", "medium", "low")):
+        channel.submit(alert(f"a{i}", priority))
+    assert deliver.wait_for(2) == [["a2", "a1", "a3"], ["a0", "a4"]]
+    assert channel.stats["batches"] == 2 and channel.stats["delivered"] == 5
+    channel.stop()
+
+
+def test_critical_cuts_linger_short():
+    deliver = FakeDeliver()
+    channel = DeliveryChannel("test", deliver, linger=1.0)
+    start = time.monotonic()
+    channel.submit(alert("digest", "low"))
+    time.sleep(0.1)                                         # Worker is lingering on "digest"
+    channel.submit(alert("fire", "critical"))
+    channel.submit(alert("also", "medium"))
+    calls = deliver.wait_for(1)
+    assert calls[0] == ["fire"]
+    assert deliver.calls[0][0] - start < 0.5
+    # "digest" went back to the front of its rank and lingers again with its peer
+    assert deliver.wait_for(2)[1] == ["also", "digest"]
+    channel.stop()
+
+
+def test_due_critical_retry_cuts_linger_short():
+    deliver = FakeDeliver(fail=1)
+    channel = DeliveryChannel("test", deliver, backoff=0.1, linger=2.0)
+    channel.submit(alert("fire", "critical"))
+    with deliver.done:
+        assert deliver.done.wait_for(lambda: deliver.failures, 2)
+    channel.submit(alert("digest", "low"))                  # Worker lingers on this
+    calls = deliver.wait_for(1)
+    assert calls[0] == ["fire"]
+    assert deliver.calls[0][0] - deliver.failures[0] < 0.5  # At the retry, not after the linger
+    assert channel.stats["retried"] == 1
+    channel.stop()
+
+
+def test_retry_backoff_and_give_up():
+    deliver = FakeDeliver(fail=2)
+    channel = DeliveryChannel("test", deliver, backoff=0.1, retries=3)
+    channel.submit(alert("flaky", "high"))
+    assert deliver.wait_for(1) == [["flaky"]]
+    first, second = deliver.failures
+    assert 0.09 <= second - first < 0.3                     # 0.1s, then 0.2s
+    assert 0.19 <= deliver.calls[0][0] - second < 0.4
+    assert channel.stats["retried"] == 2 and channel.stats["delivered"] == 1
+    channel.stop()
+
+    dead = FakeDeliver(fail=99)
+    channel = DeliveryChannel("test", dead, backoff=0.02, retries=2)
+    channel.submit(alert("lost", "low"))
+    deadline = time.monotonic() + 2
+    while channel.stats["failed"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(dead.failures) == 3 and channel.stats["failed"] == 1
+    assert channel.pending() == 0
+    channel.stop()
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
@@ -0,0 +1,174 @@
+"""Tests for the segmented alert history, on a fake clock and a temp directory.
+
+Covers dedup collapsing, count and age retention, index cleanup on
+eviction, segment deletion in compaction, replaying repeat records on
+reload, and the one-time import of the legacy ``alert_history.json``.
+
+Usage:
+    python test_alert_store.py
+"""
+
+import json
+import os
+import tempfile
+
+from alert_store import AlertStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def alert(title, source="weather", priority="info"):
+    return {"title": title, "source": source, "priority": priority, "message": title.lower()}
+
+
+def segment_files(directory):
+    return sorted(n for n in os.listdir(directory) if n.startswith("alerts-"))
+
+
+def titles(alerts):
+    return [a["title"] for a in alerts]
+
+
+def test_dedup_collapses_repeats():
+    clock = FakeClock()
+    store = AlertStore(tempfile.mkdtemp(), dedup_window=300, clock=clock)
+    first, is_new = store.add(alert("Storm"))
+    assert is_new and first["count"] == 1
+
+    clock.now += 10
+    again, is_new = store.add(alert("Storm"))
+    assert not is_new
+    assert again["id"] == first["id"] and again["count"] == 2 and again["last_seen"] == clock.now
+    assert store.add(alert("Storm", source="calendar"))[1]      # Different source: new
+    assert store.add(alert("Flood"))[1]                         # Different title: new
+
+    clock.now += 300                                            # Window counts from the first sighting
+    assert store.add(alert("Storm"))[1]
+    assert titles(store.query()) == ["Storm", "Flood", "Storm", "Storm"]
+    assert store.query(source="weather")[-1]["count"] == 2
+
+
+def test_count_and_age_retention():
+    clock = FakeClock()
+    store = AlertStore(tempfile.mkdtemp(), max_count=5, max_age=3600, clock=clock)
+    start = clock.now
+    for i in range(8):
+        store.add(alert(f"a{i}"))
+        clock.now += 60
+    assert titles(store.query()) == ["a7", "a6", "a5", "a4", "a3"]
+    assert titles(store.query(limit=2)) == ["a7", "a6"]
+
+    clock.now = start + 4 * 60 + 3600 + 1                       # a3 and a4 are now over an hour old
+    assert titles(store.query()) == ["a7", "a6", "a5"]
+    assert store.counts()["total"] == 3
+
+
+def test_index_cleanup_on_eviction():
+    clock = FakeClock()
+    store = AlertStore(tempfile.mkdtemp(), max_count=3, clock=clock)
+    store.add(alert("Door open", source="security", priority="critical"))
+    store.add(alert("Rain", priority="info"))
+    store.add(alert("Wind", priority="warning"))
+    assert store.query(priority="critical", source="security")[0]["title"] == "Door open"
+
+    store.add(alert("Sun", priority="info"))                    # Evicts "Door open"
+    assert store.query(source="security") == [] and store.query(priority="critical") == []
+    assert store.counts() == {
+        "total": 3, "by_source": {"weather": 3}, "by_priority": {"info": 2, "warning": 1},
+    }
+    assert "security" not in store._by_source and "critical" not in store._by_priority
+    assert all(len(ids) <= 3 for ids in store._by_source.values())
+
+    # The evicted alert's dedup entry is gone too, so it stores fresh
+    entry, is_new = store.add(alert("Door open", source="security", priority="critical"))
+    assert is_new and entry["count"] == 1
+
+
+def test_compact_deletes_evicted_segments():
+    clock = FakeClock()
+    tmp = tempfile.mkdtemp()
+    store = AlertStore(tmp, max_count=4, segment_lines=3, clock=clock)
+    for i in range(15):
+        store.add(alert(f"a{i}"))
+        clock.now += 1
+    store.flush()
+    # 15 lines in segments of 3. Compaction runs when a segment rolls: ids 9-12
+    # were retained at the last roll, so only segments 1 and 2 are gone
+    assert segment_files(tmp) == ["alerts-000003.jsonl", "alerts-000004.jsonl", "alerts-000005.jsonl"]
+
+    store.add(alert("a15"))                                     # Rolls to segment 6
+    store.add(alert("a16"))
+    store.flush()
+    assert segment_files(tmp) == ["alerts-000004.jsonl", "alerts-000005.jsonl", "alerts-000006.jsonl"]
+    assert sorted(store._seg_last_id) == [4, 5, 6]
+
+    # Everything older expires; at the next roll only segment 6 (which also
+    # holds b0) is still needed
+    clock.now += store.max_age + 1
+    for i in range(3):
+        store.add(alert(f"b{i}"))
+    store.flush()
+    assert segment_files(tmp) == ["alerts-000006.jsonl", "alerts-000007.jsonl"]
+    assert titles(store.query()) == ["b2", "b1", "b0"]
+
+
+def test_reload_replays_repeats():
+    clock = FakeClock()
+    tmp = tempfile.mkdtemp()
+    store = AlertStore(tmp, segment_lines=2, clock=clock)
+    store.add(alert("Storm"))
+    store.add(alert("Flood"))
+    for _ in range(3):
+        clock.now += 5
+        store.add(alert("Storm"))
+    store.flush()
+
+    reloaded = AlertStore(tmp, segment_lines=2, clock=clock)
+    storm = reloaded.query(source="weather")[-1]
+    assert storm["title"] == "Storm" and storm["count"] == 4 and storm["last_seen"] == clock.now
+    assert reloaded.counts()["total"] == 2
+
+    clock.now += 5                                              # Dedup survives the restart
+    entry, is_new = reloaded.add(alert("Storm"))
+    assert not is_new and entry["count"] == 5
+    entry, is_new = reloaded.add(alert("Hail"))
+    assert is_new and entry["id"] == 3                          # Ids continue after the reload
+
+
+def test_legacy_migration_once():
+    clock = FakeClock()
+    tmp = tempfile.mkdtemp()
+    legacy = os.path.join(tmp, "alert_history.json")
+    old = [  # Newest first, as AlertService used to save it
+        {"title": "c", "source": "weather", "priority": "info", "timestamp": clock.now - 10},
+        {"title": "b", "source": "timer", "priority": "warning", "timestamp": clock.now - 20},
+        {"title": "a", "source": "weather", "priority": "info", "timestamp": clock.now - 40 * 86400},
+    ]
+    with open(legacy, "w") as f:
+        json.dump(old, f)
+
+    store = AlertStore(os.path.join(tmp, "alerts"), legacy_file=legacy, clock=clock)
+    assert titles(store.query()) == ["c", "b"]                  # "a" is past MAX_AGE
+    assert [a["id"] for a in store.query()] == [3, 2]
+    assert store.query(source="timer")[0]["count"] == 1
+    assert not os.path.exists(legacy) and os.path.exists(legacy + ".migrated")
+
+    with open(legacy, "w") as f:                                # Reappearing file is ignored
+        json.dump([{"title": "z", "source": "x", "timestamp": clock.now}], f)
+    again = AlertStore(os.path.join(tmp, "alerts"), legacy_file=legacy, clock=clock)
+    assert titles(again.query()) == ["c", "b"]
+    assert os.path.exists(legacy)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
@@ -0,0 +1,137 @@
+"""BluetoothManager against a scripted fake bluetoothctl.
+
+The fake reads commands on stdin and prints what real bluetoothctl prints,
+with colour codes and prompts and short delays. A pair must finish as soon
+as the device reports Connected. The old fixed-sleep script took about 20s.
+A refused pair must fail at the pairing step with BlueZ's message.
+
+Usage:
+    python test_bluetooth_manager.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from bluetooth_manager import BluetoothManager, clean_line
+
+ADDR = "AA:BB:CC:DD:EE:01"
+
+FAKE_BLUETOOTHCTL = r'''
+import os, sys, time
+fail = os.environ.get("FAKE_BT_FAIL", "")
+known = {}
+def out(*lines, delay=0.05):
+    time.sleep(delay)
+    for line in lines:
+        sys.stdout.write("\x1b[0;94m[bluetooth]\x1b[0m# " + line + "\n")
+    sys.stdout.flush()
+for raw in sys.stdin:
+    cmd, _, arg = raw.strip().partition(" ")
+    if cmd == "power":
+        out("Changing power on succeeded")
+    elif cmd == "scan" and arg == "on":
+        out("Discovery started")
+        out("[\x1b[0;92mNEW\x1b[0m] Device AA:BB:CC:DD:EE:01 JBL Flip 5",
+            "[\x1b[0;92mNEW\x1b[0m] Device 11:22:33:44:55:66 11-22-33-44-55-66", delay=0.1)
+        known.update({"AA:BB:CC:DD:EE:01": "JBL Flip 5", "11:22:33:44:55:66": "11-22-33-44-55-66"})
+    elif cmd == "scan":
+        out("Discovery stopped")
+    elif cmd == "devices":
+        out(*[f"Device {a} {n}" for a, n in known.items()])
+    elif cmd == "remove":
+        out(f"Device {arg} not available")
+    elif cmd == "pair":
+        out(f"Attempting to pair with {arg}")
+        if fail == "pair":
+            out("Failed to pair: org.bluez.Error.AuthenticationRejected", delay=0.1)
+        else:
+            out(f"[\x1b[0;93mCHG\x1b[0m] Device {arg} Paired: yes", "Pairing successful", delay=0.1)
+    elif cmd == "trust":
+        out(f"[CHG] Device {arg} Trusted: yes", f"Changing {arg} trust succeeded")
+    elif cmd == "connect":
+        out(f"Attempting to connect to {arg}")
+        out(f"[CHG] Device {arg} Connected: yes", "Connection successful", delay=0.2)
+    elif cmd == "quit":
+        break
+'''
+
+
+def make_manager(fail: str = "") -> tuple[BluetoothManager, list]:
+    script = os.path.join(tempfile.mkdtemp(), "bluetoothctl.py")
+    with open(script, "w") as f:
+        f.write(FAKE_BLUETOOTHCTL)
+    events = []
+    env = {**os.environ, "FAKE_BT_FAIL": fail, "PYTHONUNBUFFERED": "1"}
+    manager = BluetoothManager(command=[sys.executable, script], env=env,
+                               emit=lambda e, p: events.append((e, p)),
+                               step_timeouts={"discovering": 2.0})
+    return manager, events
+
+
+def test_clean_line():
+    assert clean_line("\x1b[0;94m[bluetooth]\x1b[0m# [\x1b[0;93mCHG\x1b[0m] Device X Paired: yes\r\n") \
+        == "[CHG] Device X Paired: yes"
+    assert clean_line("[JBL Flip 5]# Connection successful") == "Connection successful"
+
+
+def test_scan_streams_devices():
+    manager, events = make_manager()
+    job = manager.scan(0.5)
+    assert job.wait(3)
+    manager.close()
+    assert job.ok
+    # The unresolved dashed-MAC name is filtered out of the result
+    assert job.result == [{"address": ADDR, "name": "JBL Flip 5"}], job.result
+    found = [p["address"] for e, p in events if e == "bt_device"]
+    assert ADDR in found and "11:22:33:44:55:66" in found
+    assert [p["state"] for e, p in events if e == "bt_job"][-1] == "done"
+
+
+def test_pair_finishes_on_connect():
+    manager, events = make_manager()
+    start = time.monotonic()
+    job = manager.pair(ADDR.lower())
+    assert job.wait(10)
+    elapsed = time.monotonic() - start
+    manager.close()
+    print(f"  pair took {elapsed:.2f}s")
+    assert job.ok, job.message
+    assert job.result["paired"] and job.result["trusted"] and job.result["connected"]
+    states = [p["state"] for e, p in events if e == "bt_job"]
+    assert states == ["removing", "discovering", "pairing", "trusting", "connecting", "done"], states
+    assert elapsed < 3
+
+
+def test_pair_failure_reported():
+    manager, events = make_manager(fail="pair")
+    job = manager.pair(ADDR)
+    assert job.wait(10)
+    manager.close()
+    assert job.ok is False
+    assert job.state == "failed"
+    assert "AuthenticationRejected" in job.message, job.message
+    assert [p["state"] for e, p in events if e == "bt_job"][-2] == "pairing"
+
+
+def test_done_callback_and_session_reuse():
+    manager, _ = make_manager()
+    seen = []
+    job = manager.scan(0.2)
+    job.add_done_callback(seen.append)
+    job.wait(3)
+    proc = manager._proc
+    job2 = manager.pair(ADDR)
+    job2.wait(10)
+    assert manager._proc is proc, "second job started a new bluetoothctl"
+    manager.close()
+    assert seen == [job] and job2.ok
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
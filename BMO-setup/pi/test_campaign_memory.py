@@ -0,0 +1,119 @@
+"""Tests for CampaignMemory search and the DM context cache, using a temp DB.
+
+Covers ranked FTS5 search, the substring fallback for mid-word queries,
+the triggers that keep the index in sync, the backfill of a database
+created before the index existed, and build_dm_context() invalidation on
+writes from this instance and from another connection.
+
+Usage:
+    python test_campaign_memory.py
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from campaign_memory import CampaignMemory
+
+CAMPAIGN = "Curse of Strahd"
+
+
+def make_memory() -> CampaignMemory:
+    return CampaignMemory(os.path.join(tempfile.mkdtemp(), "campaign.db"))
+
+
+def contents(rows: list[dict]) -> list[str]:
+    return [r["content"] for r in rows]
+
+
+def test_fts_search_and_substring_fallback():
+    mem = make_memory()
+    assert mem.fts_enabled
+    mem.add_note(CAMPAIGN, "The red dragon sleeps under the mountain", "lore")
+    mem.add_note(CAMPAIGN, "Dragons hate the smell of garlic", "lore")
+    mem.add_note(CAMPAIGN, "Ireena owes the party a favour")
+    mem.add_note("Other Campaign", "A dragon of another world")
+
+    assert sorted(contents(mem.search_notes(CAMPAIGN, "drag"))) == [
+        "Dragons hate the smell of garlic", "The red dragon sleeps under the mountain"]
+    assert contents(mem.search_notes(CAMPAIGN, "red dragon")) == [
+        "The red dragon sleeps under the mountain"]
+    # Mid-word: no FTS prefix match, falls back to LIKE
+    assert sorted(contents(mem.search_notes(CAMPAIGN, "agon"))) == [
+        "Dragons hate the smell of garlic", "The red dragon sleeps under the mountain"]
+    assert contents(mem.search_notes(CAMPAIGN, "avou")) == ["Ireena owes the party a favour"]
+    assert mem.search_notes(CAMPAIGN, "beholder") == []
+    # Punctuation only: no FTS query at all
+    assert mem.search_notes(CAMPAIGN, "!!") == []
+
+
+def test_triggers_keep_index_in_sync():
+    mem = make_memory()
+    mem.add_npc(CAMPAIGN, "Strahd", "Vampire lord of Barovia", "Castle Ravenloft", "hostile")
+    mem.add_plot_thread(CAMPAIGN, "Break the curse", "Find the Sunsword")
+
+    assert [(r["kind"], r["title"]) for r in mem.search(CAMPAIGN, "vampire")] == [("npc", "Strahd")]
+    assert "[Sunsword]" in mem.search(CAMPAIGN, "sunsword", kinds=["plot"])[0]["snippet"]
+
+    mem.update_npc(CAMPAIGN, "Strahd", notes="Fears the Holy Symbol of Ravenkind")
+    assert mem.search(CAMPAIGN, "ravenkind")[0]["title"] == "Strahd"
+    mem.add_npc(CAMPAIGN, "Strahd", "Charming count", "Vallaki", "friendly")   # Upsert
+    assert mem.search(CAMPAIGN, "vampire") == []
+    assert mem.search(CAMPAIGN, "charming")[0]["title"] == "Strahd"
+
+    mem.add_note(CAMPAIGN, "Temporary note")
+    with mem._connect() as conn:
+        conn.execute("DELETE FROM player_notes")
+    assert mem.search(CAMPAIGN, "temporary") == []
+
+
+def test_backfill_existing_database():
+    path = os.path.join(tempfile.mkdtemp(), "campaign.db")
+    CampaignMemory(path).close()
+    conn = sqlite3.connect(path)      # Simulate a database from before the index
+    for (trigger,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+        conn.execute(f"DROP TRIGGER {trigger}")
+    conn.executescript("""
+        DROP TABLE memory_fts;
+        INSERT INTO player_notes (campaign, content, category, created_at)
+            VALUES ('Curse of Strahd', 'Madam Eva reads the tarokka', 'general', '2026-01-01');
+        INSERT INTO npcs (campaign, name, description, created_at, updated_at)
+            VALUES ('Curse of Strahd', 'Ismark', 'Burgomaster''s son', '2026-01-01', '2026-01-01');
+    """)
+    conn.close()
+
+    mem = CampaignMemory(path)
+    assert contents(mem.search_notes(CAMPAIGN, "tarokka")) == ["Madam Eva reads the tarokka"]
+    assert mem.search(CAMPAIGN, "burgomaster")[0]["title"] == "Ismark"
+    mem.close()
+    # Reopening doesn't backfill twice
+    assert len(CampaignMemory(path).search(CAMPAIGN, "tarokka")) == 1
+
+
+def test_dm_context_cache_invalidation():
+    mem = make_memory()
+    assert mem.build_dm_context(CAMPAIGN) == f"No campaign memory recorded yet for '{CAMPAIGN}'."
+
+    mem.add_npc(CAMPAIGN, "Ireena", "Burgomaster's daughter", "Barovia", "friendly")
+    first = mem.build_dm_context(CAMPAIGN)
+    assert "Ireena" in first
+    assert mem.build_dm_context(CAMPAIGN) is first            # Served from cache
+
+    mem.add_plot_thread(CAMPAIGN, "Escort Ireena", "Get her to Vallaki")
+    assert "Escort Ireena" in mem.build_dm_context(CAMPAIGN)
+
+    mem.search_notes(CAMPAIGN, "anything")                     # Reads don't invalidate
+    cached = mem.build_dm_context(CAMPAIGN)
+    assert mem.build_dm_context(CAMPAIGN) is cached
+
+    other = CampaignMemory(mem.db_path)                        # Another writer
+    other.add_location(CAMPAIGN, "Vallaki", "A walled town", discovered=True)
+    assert "Vallaki: A walled town" in mem.build_dm_context(CAMPAIGN)
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
@@ -0,0 +1,241 @@
+"""Offline tests for the shared HTTP response cache.
+
+Uses a fake transport (no network) to check URL normalization, per-endpoint
+TTLs, single-flight coalescing, LRU byte bounds, the disk tier and its
+pruning, error handling, and per-host token-bucket throttling.
+
+Usage:
+    python test_http_cache.py
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from http_cache import HttpCache, HttpError, HttpResponse, TokenBucket, normalize_url
+
+
+class FakeTransport:
+    """Records calls; answers from a {url: (status, body)} table after an optional delay."""
+
+    def __init__(self, routes=None, delay=0.0):
+        self.routes = routes or {}
+        self.delay = delay
+        self.calls: list[tuple[str, float]] = []
+
+    async def __call__(self, url, headers, timeout):
+        self.calls.append((url, time.monotonic()))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status, body = self.routes.get(url, (200, {"url": url, "n": len(self.calls)}))
+        return HttpResponse(status, json.dumps(body).encode(), {"Retry-After": "0.2"})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_normalize_url():
+    a = normalize_url("HTTPS://API.Example.com/v4/anime?sfw=true&q=naruto")
+    b = normalize_url("https://api.example.com/v4/anime", {"q": "naruto", "sfw": "true"})
+    assert a == b, (a, b)
+    assert normalize_url("https://x.io/a", {"skip": None}) == "https://x.io/a"
+
+
+def test_ttl_and_expiry():
+    clock = FakeClock()
+    transport = FakeTransport()
+    cache = HttpCache(transport, ttls=[("x.io", "/top", 60), ("x.io", "/random", 0)], clock=clock)
+
+    async def main():
+        first = await cache.get_json("https://x.io/top", {"page": "1"})
+        assert await cache.get_json("https://x.io/top?page=1") == first
+        assert len(transport.calls) == 1
+        clock.now += 61
+        await cache.get_json("https://x.io/top", {"page": "1"})
+        assert len(transport.calls) == 2
+        await cache.get_json("https://x.io/random")
+        await cache.get_json("https://x.io/random")
+        assert len(transport.calls) == 4  # TTL 0: never cached
+
+    run(main())
+    assert cache.ttl_for("https://x.io/other") == 300.0
+    assert cache.stats["hits"] == 1
+
+
+def test_single_flight():
+    transport = FakeTransport(delay=0.05)
+    cache = HttpCache(transport)
+
+    async def main():
+        results = await asyncio.gather(*[cache.get_json("https://x.io/a") for _ in range(20)])
+        assert all(r == results[0] for r in results)
+
+    run(main())
+    assert len(transport.calls) == 1
+    assert cache.stats["coalesced"] == 19
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    transport = FakeTransport(delay=0.1)
+    cache = HttpCache(transport)
+
+    async def main():
+        leader = asyncio.create_task(cache.get_json("https://x.io/a"))
+        await asyncio.sleep(0.02)                  # Leader's fetch is in flight
+        follower = asyncio.create_task(cache.get_json("https://x.io/a"))
+        await asyncio.sleep(0.02)
+        leader.cancel()
+        body = await follower                      # Still gets the shared result
+        assert body["url"] == "https://x.io/a"
+        assert leader.cancelled()
+
+        # Everyone gave up: the load still finishes and warms the cache
+        lone = asyncio.create_task(cache.get_json("https://x.io/b"))
+        await asyncio.sleep(0.02)
+        lone.cancel()
+        await asyncio.sleep(0.15)
+        assert await cache.get_json("https://x.io/b") == {"url": "https://x.io/b", "n": 2}
+
+    run(main())
+    assert len(transport.calls) == 2
+    assert cache.stats["hits"] == 1
+
+
+def test_errors_not_cached():
+    transport = FakeTransport({"https://x.io/missing": (404, {})}, delay=0.01)
+    cache = HttpCache(transport)
+
+    async def main():
+        results = await asyncio.gather(
+            *[cache.get("https://x.io/missing") for _ in range(3)], return_exceptions=True,
+        )
+        assert all(isinstance(r, HttpError) and r.status == 404 for r in results), results
+        try:
+            await cache.get("https://x.io/missing")
+        except HttpError:
+            pass
+
+    run(main())
+    assert len(transport.calls) == 2
+
+
+def test_lru_bounds():
+    transport = FakeTransport()
+    cache = HttpCache(transport, max_entries=3)
+
+    async def main():
+        for i in range(5):
+            await cache.get(f"https://x.io/{i}")
+        await cache.get("https://x.io/4")
+        await cache.get("https://x.io/0")
+
+    run(main())
+    assert len(cache._entries) == 3
+    assert len(transport.calls) == 6  # 0 was evicted and refetched, 4 was a hit
+
+    small = HttpCache(FakeTransport(), max_bytes=100)
+    run(small.get("https://x.io/" + "a" * 50))
+    run(small.get("https://x.io/" + "b" * 50))
+    assert small._bytes <= 100
+
+
+def test_disk_tier():
+    tmp = tempfile.mkdtemp()
+    transport = FakeTransport()
+    first = HttpCache(transport, disk_dir=tmp)
+    body = run(first.get("https://x.io/a", {"apikey": "secret"}))
+
+    second = HttpCache(transport, disk_dir=tmp)
+    assert run(second.get("https://x.io/a", {"apikey": "secret"})) == body
+    assert len(transport.calls) == 1
+    assert second.stats["disk_hits"] == 1
+
+    expired = HttpCache(transport, disk_dir=tmp, clock=lambda: time.time() + 10_000)
+    run(expired.get("https://x.io/a", {"apikey": "secret"}))
+    assert len(transport.calls) == 2
+
+
+def test_disk_prune_and_cap():
+    tmp = tempfile.mkdtemp()
+    clock = FakeClock()
+    ttls = [("x.io", "/short", 10), ("x.io", "/long", 1000)]
+
+    def disk_files():
+        return {name: os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp)}
+
+    # Expired entries are swept from disk, not left on the SD card
+    cache = HttpCache(FakeTransport(), disk_dir=tmp, clock=clock, ttls=ttls)
+    run(cache.get("https://x.io/short/old"))
+    run(cache.get("https://x.io/long/keep"))
+    assert len(disk_files()) == 2
+    clock.now += 20
+    cache._disk_prune()
+    assert len(disk_files()) == 1
+
+    # The disk tier stays under its byte cap
+    capped = HttpCache(FakeTransport(), disk_dir=tmp, disk_max_bytes=2000, clock=clock, ttls=ttls)
+    for i in range(60):
+        run(capped.get(f"https://x.io/long/{i}"))
+    assert sum(disk_files().values()) <= 2000, disk_files()
+    assert 0 < len(disk_files()) < 60
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=3, clock=clock)
+    assert [bucket.delay() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert abs(bucket.delay() - 0.5) < 1e-9
+    clock.now += 10
+    assert bucket.delay() == 0.0
+    bucket.pause(5)
+    assert bucket.delay() >= 5
+
+
+def test_host_throttle():
+    transport = FakeTransport()
+    cache = HttpCache(transport, rates={"slow.io": (20.0, 2)}, ttls=[("slow.io", "/", 0)])
+
+    async def main():
+        start = time.monotonic()
+        await asyncio.gather(*[cache.get(f"https://slow.io/{i}") for i in range(6)])
+        await cache.get("https://fast.io/x")
+        return time.monotonic() - start
+
+    elapsed = run(main())
+    assert elapsed >= 0.18, elapsed  # 4 calls beyond the burst at 20/s
+    assert len(transport.calls) == 7
+
+
+def test_retry_after_pauses_host():
+    transport = FakeTransport({"https://x.io/busy": (429, {})})
+    cache = HttpCache(transport, ttls=[("x.io", "/", 0)])
+
+    async def main():
+        try:
+            await cache.get("https://x.io/busy")
+        except HttpError as e:
+            assert e.status == 429
+        start = time.monotonic()
+        await cache.get("https://x.io/ok")
+        return time.monotonic() - start
+
+    assert run(main()) >= 0.15
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
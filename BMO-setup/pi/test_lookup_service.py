@@ -0,0 +1,161 @@
+"""Event-loop latency test for the DM bot's lookup service.
+
+A heartbeat task ticks every 5ms while many blocking "searches" run. When
+the lookups are called inline (the old behaviour) the heartbeat stalls for
+the whole search. Through LookupService it must keep ticking. Also checks
+per-session ordering, the pending bound, and cancellation of jobs that
+miss their deadline.
+
+Usage:
+    python test_lookup_service.py
+"""
+
+import asyncio
+import threading
+import time
+
+from lookup_service import LookupService, interaction_budget
+
+TICK = 0.005
+SEARCH_TIME = 0.05
+LOOKUPS = 20
+MAX_LOOP_STALL = 0.03
+
+
+def blocking_search(query: str) -> str:
+    """Stand-in for SearchEngine.search: holds the calling thread."""
+    time.sleep(SEARCH_TIME)
+    return query.upper()
+
+
+async def heartbeat(stop: asyncio.Event) -> float:
+    """Largest gap between ticks while running."""
+    worst = 0.0
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(TICK)
+        now = time.perf_counter()
+        worst = max(worst, now - last - TICK)
+        last = now
+    return worst
+
+
+async def measure(lookups) -> tuple[float, list]:
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(TICK * 2)
+    results = await lookups()
+    stop.set()
+    return await beat, results
+
+
+def test_loop_stays_responsive():
+    service = LookupService(max_workers=4)
+    queries = [f"goblin {i}" for i in range(LOOKUPS)]
+
+    async def inline():
+        return [blocking_search(q) for q in queries]
+
+    async def offloaded():
+        return await asyncio.gather(*(service.run(blocking_search, q) for q in queries))
+
+    async def main():
+        blocked, _ = await measure(inline)
+        stall, results = await measure(offloaded)
+        return blocked, stall, results
+
+    blocked, stall, results = asyncio.run(main())
+    service.shutdown()
+    print(f"  inline worst stall {blocked * 1000:.0f} ms, offloaded {stall * 1000:.1f} ms")
+    assert results == [q.upper() for q in queries]
+    assert blocked >= SEARCH_TIME * LOOKUPS * 0.9
+    assert stall < MAX_LOOP_STALL, f"loop stalled {stall * 1000:.1f} ms"
+
+
+def test_per_session_order():
+    service = LookupService(max_workers=4)
+    log = []
+
+    async def player_turn(session, n, delay):
+        async with service.ordered(session):
+            log.append((session, n, "start"))
+            await service.run(time.sleep, delay)
+            log.append((session, n, "end"))
+
+    async def main():
+        # Earlier turns are slower; they must still finish first within a session
+        await asyncio.gather(*(
+            player_turn(session, n, 0.03 - n * 0.01)
+            for n in range(3) for session in ("a", "b")
+        ))
+
+    asyncio.run(main())
+    service.shutdown()
+    for session in ("a", "b"):
+        events = [(n, what) for s, n, what in log if s == session]
+        assert events == [(0, "start"), (0, "end"), (1, "start"), (1, "end"), (2, "start"), (2, "end")], events
+    # Sessions are independent: b's first turn started before a's first ended
+    assert log.index(("b", 0, "start")) < log.index(("a", 0, "end"))
+    assert not service._locks
+
+
+def test_timeout_cancels_queued_job():
+    service = LookupService(max_workers=1)
+    ran = []
+    gate = threading.Event()
+
+    async def main():
+        slow = asyncio.ensure_future(service.run(gate.wait, 1.0))
+        await asyncio.sleep(0.01)
+        try:
+            await service.run(ran.append, "late", timeout=0.05)
+        except TimeoutError:
+            pass
+        else:
+            raise AssertionError("expected TimeoutError")
+        gate.set()
+        await slow
+
+    asyncio.run(main())
+    service.shutdown()
+    assert ran == [], "queued job ran after its deadline"
+    assert service.stats["timed_out"] == 1
+
+
+def test_pending_bound():
+    service = LookupService(max_workers=2, max_pending=3)
+    peak = 0
+    active = 0
+    lock = threading.Lock()
+
+    def job():
+        nonlocal peak, active
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*(service.run(job) for _ in range(12)))
+        return service._slots._value
+
+    free = asyncio.run(main())
+    service.shutdown()
+    assert peak <= 2 and free == 3
+    assert service.stats["completed"] == 12
+
+
+def test_interaction_budget():
+    assert interaction_budget(100.0, now=100.0) == 2.5
+    assert interaction_budget(100.0, now=102.0) == 0.5
+    assert interaction_budget(100.0, now=110.0) == 0.0
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
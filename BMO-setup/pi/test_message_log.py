@@ -0,0 +1,114 @@
+"""Tests for the append-only JSONL message log.
+
+Covers segment rolling and compaction, reloading the tail window after a
+restart, the one-time import of a legacy ``recent_chat.json``, and the
+shared JsonlWriter (concurrent appends, torn last lines).
+
+Usage:
+    python test_message_log.py
+"""
+
+import json
+import os
+import tempfile
+import threading
+
+from message_log import JsonlWriter, MessageLog, read_jsonl
+
+
+def msg(i: int) -> dict:
+    return {"role": "user", "text": f"message {i}"}
+
+
+def segment_files(directory: str) -> list[str]:
+    return sorted(n for n in os.listdir(directory) if n.endswith(".jsonl"))
+
+
+def test_roll_and_compact():
+    tmp = tempfile.mkdtemp()
+    log = MessageLog(tmp, prefix="chat", tail_size=5, segment_lines=5)
+    for i in range(23):
+        log.append(msg(i))
+    log.flush()
+    # 23 messages in segments of 5; only the newest segments covering the tail stay
+    files = segment_files(tmp)
+    assert files[-1] == "chat-000005.jsonl", files
+    assert len(files) <= 3, files
+    assert [m["text"] for m in log.tail()] == [f"message {i}" for i in range(18, 23)]
+    assert log.tail(2) == [msg(21), msg(22)]
+    assert len(read_jsonl(os.path.join(tmp, "chat-000005.jsonl"))) == 3
+
+
+def test_tail_reload_after_restart():
+    tmp = tempfile.mkdtemp()
+    writer = JsonlWriter()
+    log = MessageLog(tmp, tail_size=5, segment_lines=5, writer=writer)
+    for i in range(12):
+        log.append(msg(i))
+    writer.close()
+
+    reloaded = MessageLog(tmp, tail_size=5, segment_lines=5)
+    assert reloaded.tail() == [msg(i) for i in range(7, 12)]
+    # Keeps filling the current segment instead of starting a new one
+    reloaded.append(msg(12))
+    reloaded.append(msg(13))
+    reloaded.append(msg(14))
+    reloaded.flush()
+    assert segment_files(tmp)[-1] == "chat-000003.jsonl"
+    reloaded.append(msg(15))
+    reloaded.flush()
+    assert segment_files(tmp)[-1] == "chat-000004.jsonl"
+
+    reloaded.clear()
+    assert reloaded.tail() == [] and segment_files(tmp) == []
+
+
+def test_legacy_import_once():
+    tmp = tempfile.mkdtemp()
+    legacy = os.path.join(tmp, "recent_chat.json")
+    with open(legacy, "w") as f:
+        json.dump([msg(i) for i in range(8)], f)
+
+    log = MessageLog(os.path.join(tmp, "recent_chat"), tail_size=5, legacy_file=legacy)
+    assert log.tail() == [msg(i) for i in range(3, 8)]
+    assert not os.path.exists(legacy) and os.path.exists(legacy + ".migrated")
+
+    # A legacy file appearing again is ignored once segments exist
+    with open(legacy, "w") as f:
+        json.dump([msg(99)], f)
+    again = MessageLog(os.path.join(tmp, "recent_chat"), tail_size=5, legacy_file=legacy)
+    assert again.tail() == [msg(i) for i in range(3, 8)]
+    assert os.path.exists(legacy)
+
+
+def test_writer_concurrent_appends_and_torn_lines():
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "sub", "log.jsonl")
+    writer = JsonlWriter(fsync_interval=0.01)
+
+    def worker(n):
+        for i in range(200):
+            writer.append(path, {"n": n, "i": i})
+        writer.sync()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+
+    with open(path, "a") as f:
+        f.write('{"n": 9, "i"')       # Crash mid-write
+    records = read_jsonl(path)
+    assert len(records) == 800
+    for n in range(4):
+        assert [r["i"] for r in records if r["n"] == n] == list(range(200))
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
@@ -0,0 +1,193 @@
+"""Deterministic tests for PersonalityEngine's event-driven rules.
+
+The engine gets a fake monotonic clock, a fake local time, a seeded RNG and
+an in-memory settings store. The background thread is never started;
+``tick()`` and the ``on_*`` hooks are called directly.
+
+Usage:
+    python test_personality_engine.py
+"""
+
+import random
+import threading
+import time
+
+from personality_engine import (
+    GREETINGS, IDLE_QUIP_AFTER, SCREENSAVER_IDLE, PersonalityEngine, ShufflePool,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.hour = 14
+        self.month, self.day = 6, 15
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def localtime(self) -> time.struct_time:
+        return time.struct_time((2026, self.month, self.day, self.hour, 0, 0, 0, 166, -1))
+
+
+class FakeSocket:
+    def __init__(self):
+        self.quips = []
+
+    def emit(self, event, data):
+        if event == "bmo_quip":
+            self.quips.append(data["text"])
+
+
+class FakeStore:
+    def __init__(self, settings=None):
+        self.data = {"personality": settings} if settings else {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = dict(value)
+
+
+def make_engine(**settings):
+    clock = FakeClock()
+    sock = FakeSocket()
+    base = {"enabled": True, "chattiness": "medium", "sleep_hours": [0, 7],
+            "screensaver_facts": False}
+    engine = PersonalityEngine(
+        socketio=sock, settings_store=FakeStore({**base, **settings}),
+        clock=clock.monotonic, localtime=clock.localtime, rng=random.Random(7),
+    )
+    return engine, clock, sock
+
+
+def test_pool_has_no_repeats_across_reshuffle():
+    pool = ShufflePool(list("abcd"), random.Random(1))
+    draws = [pool.draw() for _ in range(40)]
+    for i in range(0, 40, 4):
+        assert sorted(draws[i:i + 4]) == list("abcd")
+    assert all(a != b for a, b in zip(draws, draws[1:]))
+
+
+def test_idle_quip_waits_for_idle_then_cooldown():
+    engine, clock, sock = make_engine()
+    delay = engine.tick()
+    assert sock.quips == []
+    # Sleeps until the idle quip is due, not a fixed poll interval
+    assert delay == IDLE_QUIP_AFTER, delay
+
+    clock.now += IDLE_QUIP_AFTER
+    engine.tick()
+    assert len(sock.quips) == 1
+    assert engine.tick() == 900   # medium chattiness cooldown
+
+    clock.now += 899
+    engine.tick()
+    assert len(sock.quips) == 1
+    clock.now += 1
+    engine.tick()
+    assert len(sock.quips) == 2
+
+
+def test_activity_resets_idle():
+    engine, clock, sock = make_engine()
+    clock.now += IDLE_QUIP_AFTER - 10
+    engine.mark_activity()
+    clock.now += 20
+    engine.tick()
+    assert sock.quips == []
+    assert engine.tick() == IDLE_QUIP_AFTER - 20
+
+
+def test_song_repeat_reaction():
+    engine, clock, sock = make_engine()
+    engine._rng = random.Random(0)
+    engine._rng.random = lambda: 1.0   # No random humming
+    engine.on_song_played("Island Song")
+    engine.on_song_played("Island Song")
+    assert sock.quips == []
+    engine.on_song_played("Island Song")
+    assert len(sock.quips) == 1
+    # Cooldown blocks a fourth play's reaction
+    engine.on_song_played("Island Song")
+    assert len(sock.quips) == 1
+    clock.now += 900
+    engine.on_song_played("Island Song")
+    assert len(sock.quips) == 2
+
+
+def test_weather_reaction_hourly():
+    engine, clock, sock = make_engine()
+    engine.on_weather_update({"temperature": 5, "weather_code": 0})
+    engine.on_weather_update({"temperature": 5, "weather_code": 0})
+    assert sock.quips == ["Brr! It's only 5 degrees. Stay warm out there!"]
+    engine.on_weather_update({"error": "offline"})
+    clock.now += 3600
+    engine.on_weather_update({"temperature": 72, "weather_code": 95})
+    assert sock.quips[-1] == "There's a thunderstorm outside! Stay safe!"
+
+
+def test_greeting_on_hour_boundary():
+    engine, clock, sock = make_engine()
+    engine.tick()
+    assert sock.quips == []
+    clock.hour = 8
+    engine.tick()
+    assert sock.quips and sock.quips[0] in GREETINGS["morning"]
+    # Same hour again is not a boundary
+    engine.tick()
+    assert len(sock.quips) == 1
+
+
+def test_sleep_hours_and_disabled_rules_are_silent():
+    engine, clock, sock = make_engine(idle_quips=False)
+    clock.now += IDLE_QUIP_AFTER + SCREENSAVER_IDLE
+    engine.tick()
+    assert sock.quips == []
+
+    engine, clock, sock = make_engine()
+    clock.hour = 3
+    clock.now += IDLE_QUIP_AFTER
+    delay = engine.tick()
+    assert sock.quips == []
+    assert delay == 3600   # Asleep: wake at the next hour, not every few seconds
+
+
+def test_slow_rule_does_not_block_other_events():
+    engine, clock, sock = make_engine(screensaver_facts=True, idle_quips=False)
+    engine._rng.random = lambda: 1.0
+    started, release = threading.Event(), threading.Event()
+    screensaver = next(t for t in engine._triggers if t.name == "screensaver")
+    screensaver.fire = lambda event: (started.set(), release.wait(5))[1]
+
+    clock.now += SCREENSAVER_IDLE
+    ticker = threading.Thread(target=engine.tick)
+    ticker.start()
+    assert started.wait(2)
+    # A song starting while the screensaver "searches" is handled right away
+    begin = time.monotonic()
+    for _ in range(3):
+        engine.on_song_played("Island Song")
+    assert time.monotonic() - begin < 0.5
+    assert len(sock.quips) == 1
+    # The in-flight rule holds its cooldown, so a second tick can't start it again
+    assert engine.dispatch("tick") == []
+    release.set()
+    ticker.join(2)
+    assert engine._last["screensaver"] == clock.now
+
+
+def test_settings_go_through_store():
+    engine, _, _ = make_engine()
+    engine.update_settings({"chattiness": "chatty"})
+    assert engine._store.data["personality"]["chattiness"] == "chatty"
+    assert engine._get_cooldown() == 300
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
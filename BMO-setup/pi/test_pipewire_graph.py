@@ -0,0 +1,143 @@
+"""Offline tests for the in-memory PipeWire graph (no PipeWire needed).
+
+Feeds synthetic pw-dump arrays through the same stream reader the monitor
+uses, and checks partial-info merges, removals (``"info": null``),
+metadata updates and null-deletes, and that a full re-dump never shows
+concurrent readers an empty graph.
+
+Usage:
+    python test_pipewire_graph.py
+"""
+
+import io
+import json
+import threading
+
+from pipewire_graph import DEVICE, LINK, METADATA, NODE, PipeWireGraph
+
+
+def node(obj_id, name, media_class="Audio/Sink", **extra_props):
+    props = {"node.name": name, "media.class": media_class, **extra_props}
+    return {"id": obj_id, "type": NODE, "info": {"state": "idle", "props": props}}
+
+
+def default_metadata(sink, source="alsa_input.mic"):
+    return {
+        "id": 40, "type": METADATA, "props": {"metadata.name": "default"},
+        "metadata": [
+            {"subject": 0, "key": "default.audio.sink", "type": "Spa:String:JSON",
+             "value": json.dumps({"name": sink})},
+            {"subject": 0, "key": "default.configured.audio.sink", "value": {"name": sink}},
+            {"subject": 0, "key": "default.audio.source", "value": {"name": source}},
+        ],
+    }
+
+
+FULL_DUMP = [
+    node(30, "alsa_output.hdmi"),
+    node(31, "bluez_output.speaker"),
+    node(32, "alsa_input.mic", "Audio/Source"),
+    {"id": 50, "type": DEVICE, "info": {"props": {"device.name": "alsa_card.hdmi"}}},
+    {"id": 60, "type": LINK, "info": {"output-node-id": 31, "input-node-id": 30}},
+    default_metadata("alsa_output.hdmi"),
+]
+
+
+def stream(*arrays) -> io.StringIO:
+    """pw-dump output: pretty-printed arrays, each closing with "]" in column 0."""
+    return io.StringIO("".join(json.dumps(a, indent=2) + "\n" for a in arrays))
+
+
+def loaded(*updates) -> PipeWireGraph:
+    graph = PipeWireGraph(command=["pw-dump-missing"])
+    graph._read_stream(stream(FULL_DUMP, *updates))
+    return graph
+
+
+def sink_names(graph):
+    return [graph.node_name(n["id"]) for n in graph.nodes("Audio/Sink")]
+
+
+def test_full_dump_queries():
+    graph = loaded()
+    assert graph.wait_ready(0)
+    assert sink_names(graph) == ["alsa_output.hdmi", "bluez_output.speaker"]
+    assert [n["id"] for n in graph.nodes("Audio/")] == [30, 31, 32]
+    assert graph.default_name("sink") == "alsa_output.hdmi"      # JSON string value
+    assert graph.default_name("source") == "alsa_input.mic"      # Dict value
+    assert [d["id"] for d in graph.devices()] == [50]
+    assert [link["id"] for link in graph.links()] == [60]
+    assert graph.node(50) is None                                 # A device, not a node
+
+
+def test_partial_info_merge():
+    graph = loaded([{"id": 31, "type": NODE, "info": {"state": "running"}}])
+    speaker = graph.node(31)
+    assert speaker["info"]["state"] == "running"
+    assert speaker["info"]["props"]["node.name"] == "bluez_output.speaker"   # Kept from the dump
+
+
+def test_removal_and_new_objects():
+    graph = loaded([{"id": 31, "type": NODE, "info": None},
+                    {"id": 60, "info": None},
+                    node(33, "alsa_output.usb")])
+    assert sink_names(graph) == ["alsa_output.hdmi", "alsa_output.usb"]
+    assert graph.node(31) is None and graph.links() == []
+
+
+def test_metadata_updates_and_null_deletes():
+    graph = loaded(
+        [{"id": 40, "metadata": [{"subject": 0, "key": "default.audio.sink",
+                                  "value": {"name": "bluez_output.speaker"}}]}],
+    )
+    assert graph.default_name("sink") == "bluez_output.speaker"
+
+    graph.apply([{"id": 40, "metadata": [{"subject": 0, "key": "default.audio.sink", "value": None}]}])
+    assert graph.default_name("sink") == "alsa_output.hdmi"      # Falls back to the configured one
+    graph.apply([{"id": 40, "metadata": [
+        {"subject": 0, "key": "default.configured.audio.sink", "value": None}]}])
+    assert graph.default_name("sink") is None
+    assert graph.default_name("source") == "alsa_input.mic"      # Other keys untouched
+
+    graph.apply([{"id": 40, "type": METADATA, "info": None}])    # Metadata object removed
+    assert graph.default_name("source") is None
+
+    graph.set_default_name("sink", "alsa_output.usb")            # Our own switch, ahead of the echo
+    assert graph.default_name("sink") == "alsa_output.usb"
+
+
+def test_replace_is_atomic_for_readers():
+    graph = loaded()
+    seen_empty = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            if not graph.nodes("Audio/Sink") or graph.default_name("sink") is None:
+                seen_empty.append(True)
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for _ in range(2000):
+        graph._replace(FULL_DUMP)
+    stop.set()
+    for t in threads:
+        t.join()
+    assert seen_empty == []
+    assert sink_names(graph) == ["alsa_output.hdmi", "bluez_output.speaker"]
+
+
+def test_restart_dump_replaces_stale_objects():
+    graph = loaded([node(33, "alsa_output.usb")])
+    # A restarted monitor starts with a new full dump; the USB sink is gone
+    graph._read_stream(stream([node(30, "alsa_output.hdmi"), default_metadata("alsa_output.hdmi")]))
+    assert sink_names(graph) == ["alsa_output.hdmi"]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
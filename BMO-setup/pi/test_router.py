@@ -0,0 +1,148 @@
+"""Routing tests for AgentRouter's compiled keyword matcher.
+
+Checks word boundaries, phrase and prefix keywords, weighted scoring,
+hot reload of router settings, the local intent classifier tier and its
+decision log, and that the labeled corpus routes at least as accurately as
+the old substring matcher. Paraphrases that no keyword matches are scored
+separately, against keyword-only routing.
+
+Usage:
+    python test_router.py
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from agents.intent_classifier import DECISIONS_MAX_BYTES, IntentClassifier, load_decisions
+from agents.router import AgentRouter, KeywordMatcher
+from benchmark_router import PARAPHRASES, legacy_route, load_corpus
+
+
+class FakeSettings:
+    """Minimal BmoSettings stand-in with a reload version counter."""
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.version = 1
+
+    def get(self, dotted_key, default=None):
+        current = self.data
+        for key in dotted_key.split("."):
+            if not isinstance(current, dict) or key not in current:
+                return default
+            current = current[key]
+        return current
+
+
+def test_word_boundaries():
+    router = AgentRouter()
+    # "can i" inside "scan images", "what is a" inside "what is an"
+    assert router._check_keywords("scan images from the camera") is None
+    assert router._check_keywords("what is an API anyway") is None
+    assert router._check_keywords("can i cast two spells in one turn") == "rules"
+
+
+def test_phrases_prefixes_and_plurals():
+    matcher = KeywordMatcher({"dnd": ["roll a d*"], "alert": ["alert"], "music": ["next song"]})
+    assert matcher.best("roll a d20 please") == "dnd"
+    assert matcher.best("scroll a document") is None
+    assert matcher.best("show me the alerts") == "alert"
+    assert matcher.best("next,   song!") == "music"
+
+
+def test_weighted_scores():
+    matcher = KeywordMatcher({"a": ["joke"], "b": ["tell me a story"], "c": {"story": 10}})
+    assert matcher.scores("tell me a story")["b"] == 4.0
+    assert matcher.best("tell me a story") == "c"
+    # Ties go to the agent listed first
+    assert KeywordMatcher({"x": ["ping"], "y": ["ping"]}).best("ping") == "x"
+
+
+def test_hot_reload():
+    settings = FakeSettings({"router": {"custom_keywords": {}}})
+    router = AgentRouter(settings=settings)
+    assert router._check_keywords("feed the axolotl") is None
+    settings.data["router"]["custom_keywords"] = {"smart_home": ["feed the axolotl"]}
+    router.route("hello")
+    assert router._check_keywords("feed the axolotl") is None  # Not reloaded yet
+    settings.version += 1
+    assert router.route("feed the axolotl") == "smart_home"
+
+
+def test_classifier_tier():
+    router = AgentRouter()
+    assert router._route("what's the weather")[1] == "keyword"
+    assert router._route("do you dream") == ("conversation", "default")
+    agent, tier = router._route("play something by queen")
+    assert (agent, tier) == ("music", "classifier"), (agent, tier)
+
+    clf = router._get_classifier()
+    start = time.perf_counter()
+    for _ in range(1000):
+        clf.predict("can you put on something relaxing for dinner")
+    per_call_ms = time.perf_counter() - start  # seconds per 1000 calls = ms per call
+    assert per_call_ms < 1.0, f"{per_call_ms:.3f} ms per prediction"
+
+    path = os.path.join(tempfile.mkdtemp(), "model.json")
+    clf.save(path)
+    loaded = IntentClassifier.load(path, clf.threshold)
+    assert loaded.predict("play something by queen") == clf.predict("play something by queen")
+
+
+def test_decision_log():
+    path = os.path.join(tempfile.mkdtemp(), "decisions.jsonl")
+    router = AgentRouter(decision_log=path)
+    router.route("!music play the hits")
+    router.route("hello there")
+    router.record_decision("order me a pizza", "list", "relay")
+    router._log_writer.close()
+    with open(path) as f:
+        rows = [json.loads(line) for line in f]
+    # Untrusted tiers (keyword/classifier/default) never write the user's text
+    assert [r["tier"] for r in rows] == ["prefix", "relay"]
+    assert rows[0]["text"] == "play the hits"
+    assert load_decisions(path) == [("play the hits", "music"), ("order me a pizza", "list")]
+
+
+def test_decision_log_rotates():
+    path = os.path.join(tempfile.mkdtemp(), "decisions.jsonl")
+    router = AgentRouter(decision_log=path)
+    for i in range(15000):
+        router.record_decision(f"!music play track number {i}", "music", "prefix")
+    router._log_writer.close()
+    assert os.path.getsize(path) <= DECISIONS_MAX_BYTES
+    assert os.path.getsize(path + ".1") <= DECISIONS_MAX_BYTES + 200
+    examples = load_decisions(path)
+    assert examples[-1] == ("play track number 14999", "music")
+    assert len(examples) < 15000   # Older rotations are dropped
+
+
+def test_corpus_accuracy():
+    corpus = load_corpus()
+    router = AgentRouter()
+    compiled = sum(router.route(text) == agent for text, agent in corpus)
+    legacy = sum(legacy_route(text) == agent for text, agent in corpus)
+    assert compiled >= legacy, f"compiled {compiled} < substring {legacy}"
+    assert compiled / len(corpus) >= 0.95, f"accuracy {compiled}/{len(corpus)}"
+    print(f"  corpus: compiled {compiled}/{len(corpus)}, substring {legacy}/{len(corpus)}")
+
+
+def test_classifier_paraphrases():
+    corpus = load_corpus(PARAPHRASES)
+    router = AgentRouter()
+    keywords_only = AgentRouter(settings=FakeSettings({"router": {"disable_tiers": ["classifier"]}}))
+    with_clf = sum(router.route(text) == agent for text, agent in corpus)
+    without = sum(keywords_only.route(text) == agent for text, agent in corpus)
+    assert with_clf >= without + 5, f"classifier {with_clf} vs keywords {without}"
+    assert with_clf / len(corpus) >= 0.7, f"accuracy {with_clf}/{len(corpus)}"
+    print(f"  paraphrases: classifier {with_clf}/{len(corpus)}, keywords only {without}/{len(corpus)}")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
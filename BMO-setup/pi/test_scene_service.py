@@ -0,0 +1,124 @@
+"""Tests for the scene step graph (run_scene_steps) with fake step functions.
+
+Checks that independent steps run in parallel, dependents wait for their
+dependencies' readiness predicates (or the timeout), failures skip
+dependents, bad graphs are rejected, and the TV fallback doesn't settle
+after a failed power-on.
+
+Usage:
+    python test_scene_service.py
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+import scene_service
+from scene_service import SceneService, SceneStep, run_scene_steps
+
+scene_service.SETTINGS_PATH = os.path.join(tempfile.mkdtemp(), "settings.json")
+
+
+def by_step(records):
+    return {r["step"]: r for r in records}
+
+
+def test_independent_steps_run_in_parallel():
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.2)
+        with lock:
+            running[0] -= 1
+
+    start = time.monotonic()
+    records = run_scene_steps([SceneStep(n, slow) for n in ("led", "music", "tv_power")])
+    assert time.monotonic() - start < 0.45
+    assert peak[0] == 3
+    assert [r["step"] for r in records] == ["led", "music", "tv_power"]
+    assert all(r["status"] == "ok" for r in records)
+
+
+def test_dependent_waits_for_ready_predicate():
+    order, polls = [], [0]
+
+    def ready():
+        polls[0] += 1
+        return polls[0] >= 3
+
+    steps = [
+        SceneStep("tv_app", lambda: order.append("tv_app"), depends_on=["tv_power"]),
+        SceneStep("tv_power", lambda: order.append("tv_power"), ready=ready, ready_timeout=5),
+    ]
+    records = by_step(run_scene_steps(steps, poll_interval=0.05))
+    assert order == ["tv_power", "tv_app"]
+    assert records["tv_power"]["status"] == "ok"
+    assert records["tv_power"]["ready_ms"] >= 90       # Two polls of 50 ms
+    assert records["tv_app"]["start_ms"] >= records["tv_power"]["ready_ms"]
+
+
+def test_ready_timeout_still_releases_dependents():
+    ran = []
+    steps = [
+        SceneStep("tv_power", lambda: True, ready=lambda: False, ready_timeout=0.15),
+        SceneStep("tv_app", lambda: ran.append(1), depends_on=["tv_power"]),
+    ]
+    records = by_step(run_scene_steps(steps, poll_interval=0.05))
+    assert records["tv_power"]["status"] == "ready_timeout"
+    assert records["tv_app"]["status"] == "ok" and ran == [1]
+
+
+def test_failures_skip_dependents():
+    def boom():
+        raise RuntimeError("no TV")
+
+    steps = [
+        SceneStep("a", boom),
+        SceneStep("b", lambda: None, depends_on=["a"]),
+        SceneStep("c", lambda: None, depends_on=["b"]),
+        SceneStep("d", lambda: False),
+        SceneStep("e", lambda: None, depends_on=["d"]),
+    ]
+    records = by_step(run_scene_steps(steps))
+    assert records["a"]["status"] == "failed" and records["a"]["error"] == "no TV"
+    assert records["b"]["status"] == "skipped" and records["c"]["status"] == "skipped"
+    assert records["d"]["status"] == "failed" and records["e"]["status"] == "skipped"
+
+
+def test_bad_graphs_rejected():
+    for steps in (
+        [SceneStep("a", lambda: None, depends_on=["missing"])],
+        [SceneStep("a", lambda: None, depends_on=["b"]), SceneStep("b", lambda: None, depends_on=["a"])],
+    ):
+        try:
+            run_scene_steps(steps)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted {[s.name for s in steps]}")
+
+
+def test_tv_fallback_skips_settle_when_power_on_fails():
+    launched = []
+    service = SceneService({
+        "tv_power_on": lambda: False,
+        "tv_launch": launched.append,
+    })
+    steps = service._build_scene_steps({"tv_on": True, "tv_app": "netflix"})
+    start = time.monotonic()
+    records = by_step(run_scene_steps(steps))
+    assert time.monotonic() - start < scene_service.TV_FALLBACK_SETTLE / 2
+    assert records["tv_power"]["status"] == "failed"
+    assert records["tv_app"]["status"] == "skipped" and launched == []
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
@@ -0,0 +1,153 @@
+"""Concurrency tests for SettingsStore with threads and under gevent.
+
+Many workers read and write settings at once (the same way Flask-SocketIO
+handlers hit _load_setting/_save_setting). The tests check that every write
+landed, the file on disk is valid JSON, writes were coalesced, and an
+external edit made mid-run survived the write-behind flush.
+
+The gevent run needs monkey.patch_all() before anything else is imported,
+so it runs in a fresh interpreter rather than patching the test session.
+
+Usage:
+    python test_settings_store.py
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from settings_store import SettingsStore
+
+GREENLETS = 200
+THREADS = 20
+OPS_PER_GREENLET = 50
+
+
+def make_store():
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "settings.json")
+    with open(path, "w") as f:
+        json.dump({"volume": {"music": 50}, "scene": {"active": None}}, f)
+
+    store = SettingsStore(path, write_delay=0.05, stat_interval=0.0)
+    writes = []
+    real_write = store._write_atomic
+
+    def counting_write(data):
+        writes.append(time.monotonic())
+        real_write(data)
+
+    store._write_atomic = counting_write
+    return tmp, path, store, writes
+
+
+def check_result(tmp, path, writes, workers):
+    with open(path) as f:
+        on_disk = json.load(f)
+    for n in range(workers):
+        assert on_disk["workers"][f"w{n}"] == OPS_PER_GREENLET - 1
+    assert on_disk["volume"]["music"] == 75
+    assert on_disk["scene"]["active"] == "movie", "external edit was clobbered"
+
+    total_ops = workers * OPS_PER_GREENLET
+    assert len(writes) < total_ops / 10, f"{len(writes)} file writes for {total_ops} sets"
+    assert not [n for n in os.listdir(tmp) if n.endswith(".tmp")], "temp files left behind"
+
+
+def edit_externally(path):
+    # Another module (e.g. scene_service) rewrites the file directly
+    with open(path) as f:
+        data = json.load(f)
+    data["scene"] = {"active": "movie"}
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def test_concurrent_threads():
+    tmp, path, store, writes = make_store()
+    errors = []
+
+    def worker(n: int):
+        try:
+            for i in range(OPS_PER_GREENLET):
+                store.set(f"workers.w{n}", i)
+                assert store.get(f"workers.w{n}") == i
+                assert store.get("volume.music") in (50, 75)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    threads.append(threading.Thread(target=lambda: (time.sleep(0.01), edit_externally(path))))
+    threads.append(threading.Thread(target=store.set, args=("volume.music", 75)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.flush()
+
+    assert not errors, errors[:3]
+    check_result(tmp, path, writes, THREADS)
+
+
+def test_concurrent_greenlets():
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--greenlets"],
+                          capture_output=True, text=True, timeout=120,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    print(proc.stdout.rstrip())
+
+
+def run_greenlets():
+    """Body of the gevent test; expects monkey.patch_all() to have run."""
+    import gevent
+
+    tmp, path, store, writes = make_store()
+    errors = []
+
+    def worker(n: int):
+        try:
+            for i in range(OPS_PER_GREENLET):
+                store.set(f"workers.w{n}", i)
+                value = store.get(f"workers.w{n}")
+                assert value == i, f"w{n}: read {value}, expected {i}"
+                assert store.get("volume.music") in (50, 75)
+                if random.random() < 0.2:
+                    gevent.sleep(0)
+        except Exception as e:
+            errors.append(e)
+
+    def external_editor():
+        gevent.sleep(0.01)
+        edit_externally(path)
+
+    start = time.monotonic()
+    jobs = [gevent.spawn(worker, n) for n in range(GREENLETS)]
+    jobs.append(gevent.spawn(external_editor))
+    jobs.append(gevent.spawn(lambda: [store.set("volume.music", 75), gevent.sleep(0)]))
+    gevent.joinall(jobs, raise_error=True)
+    store.flush()
+    elapsed = time.monotonic() - start
+
+    assert not errors, errors[:3]
+    check_result(tmp, path, writes, GREENLETS)
+    total_ops = GREENLETS * OPS_PER_GREENLET
+    print(f"  {total_ops} sets + {total_ops * 2} gets across {GREENLETS} greenlets "
+          f"in {elapsed * 1000:.0f} ms, {len(writes)} file writes")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--greenlets"]:
+        from gevent import monkey
+        monkey.patch_all()
+        run_greenlets()
+        sys.exit(0)
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
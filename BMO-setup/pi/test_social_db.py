@@ -0,0 +1,134 @@
+"""Tests for the social bot's SQLite service, using a temp database.
+
+Migrates a database created by the old per-call schema setup (tables only,
+user_version 0), then drives the async facade with concurrent reads and
+writes: writes are serialised on the writer thread, reads run on the pool
+while a write is in flight, and a failing write job rolls back.
+
+Usage:
+    python test_social_db.py
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+
+from social_db import MIGRATIONS, SocialDB
+
+
+def baseline_db() -> str:
+    """A database as the bot left it before migrations existed."""
+    path = os.path.join(tempfile.mkdtemp(), "social.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(MIGRATIONS[0])
+    conn.execute("INSERT INTO xp_data (user_id, xp, level) VALUES (1, 250, 3)")
+    conn.execute("INSERT INTO user_prefs (user_id, key, value) VALUES (1, 'volume', '70')")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def indexes(path: str) -> set[str]:
+    conn = sqlite3.connect(path)
+    try:
+        return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+                if not r[0].startswith("sqlite_")}
+    finally:
+        conn.close()
+
+
+def test_migrates_baseline_schema():
+    path = baseline_db()
+    db = SocialDB(path)
+    assert db.read_sync(lambda c: c.execute("PRAGMA user_version").fetchone()[0]) == len(MIGRATIONS)
+    assert db.read_sync(lambda c: c.execute("PRAGMA journal_mode").fetchone()[0]) == "wal"
+    assert {"idx_play_history_guild", "idx_xp_data_xp", "idx_reminders_fire_at"} <= indexes(path)
+    row = db.read_sync(lambda c: c.execute("SELECT xp, level FROM xp_data WHERE user_id = 1").fetchone())
+    assert tuple(row) == (250, 3)                       # Existing data survives
+    db.close()
+
+    before = indexes(path)
+    SocialDB(path).close()                              # Already current: nothing to do
+    assert indexes(path) == before
+
+
+def test_concurrent_async_reads_and_writes():
+    db = SocialDB(baseline_db(), read_workers=3)
+
+    async def bump(user_id):
+        await db.execute(
+            "INSERT INTO xp_data (user_id, xp) VALUES (?, 10) "
+            "ON CONFLICT(user_id) DO UPDATE SET xp = xp + 10", (user_id,))
+
+    async def total():
+        row = await db.fetchone("SELECT sum(xp) FROM xp_data")
+        return row[0]
+
+    async def main():
+        results = await asyncio.gather(*(
+            bump(n % 5) if n % 2 else total() for n in range(200)
+        ))
+        totals = [r for r in results if r is not None]
+        assert all(250 <= t <= 250 + 100 * 10 for t in totals)
+        return await total()
+
+    assert asyncio.run(main()) == 250 + 100 * 10     # No lost updates
+    db.close()
+
+
+def test_reads_run_while_a_write_is_in_flight():
+    db = SocialDB(baseline_db())
+    in_write, release = threading.Event(), threading.Event()
+
+    def slow_write(conn):
+        conn.execute("UPDATE xp_data SET xp = 999 WHERE user_id = 1")
+        in_write.set()
+        release.wait(5)
+        return "done"
+
+    async def main():
+        pending = db.write(slow_write)
+        task = asyncio.ensure_future(pending)
+        await asyncio.get_running_loop().run_in_executor(None, in_write.wait, 5)
+        row = await asyncio.wait_for(db.fetchone("SELECT xp FROM xp_data WHERE user_id = 1"), 2)
+        assert row["xp"] == 250                          # Snapshot from before the write
+        release.set()
+        assert await task == "done"
+        row = await db.fetchone("SELECT xp FROM xp_data WHERE user_id = 1")
+        assert row["xp"] == 999
+
+    asyncio.run(main())
+    db.close()
+
+
+def test_failed_write_rolls_back():
+    db = SocialDB(baseline_db())
+
+    def half_then_fail(conn):
+        conn.execute("UPDATE xp_data SET xp = 0 WHERE user_id = 1")
+        raise ValueError("bad level")
+
+    async def main():
+        try:
+            await db.write(half_then_fail)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("write error not raised")
+        assert (await db.fetchone("SELECT xp FROM xp_data WHERE user_id = 1"))["xp"] == 250
+        assert await db.executemany(
+            "INSERT INTO reminders (id, message, fire_at) VALUES (?, ?, ?)",
+            [("r1", "stretch", 1.0), ("r2", "water", 2.0)]) == 2   # Writer still usable
+
+    asyncio.run(main())
+    db.close()
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
@@ -0,0 +1,138 @@
+"""Tests for the social bot's per-speaker voice endpointing (_SpeakerState).
+
+Feeds synthetic 20ms Discord frames (48kHz stereo 16-bit) of tone and
+near-silence with a fake clock, and checks onset with pre-roll, the
+end-of-speech silence window, the minimum-speech gate, the forced cut on
+long monologues, the packet-timeout sweep, and the adaptive noise floor.
+
+Usage:
+    python test_social_vad.py
+"""
+
+import audioop
+import io
+import math
+import struct
+import wave
+
+import discord_social_bot as bot
+from discord_social_bot import _SpeakerState, _pcm_to_wav_16k
+
+FRAME = bot._FRAME_SECONDS
+SAMPLES = 960                      # Per channel in a 20ms frame at 48kHz
+FRAME_BYTES = SAMPLES * 2 * 2
+
+
+def frame(amplitude: int) -> bytes:
+    """One stereo frame of a 440Hz tone (amplitude 0 gives digital silence)."""
+    out = []
+    for i in range(SAMPLES):
+        v = int(amplitude * math.sin(2 * math.pi * 440 * i / 48000))
+        out += (v, v)
+    return struct.pack(f"<{len(out)}h", *out)
+
+
+SPEECH = frame(4000)
+QUIET = frame(60)
+
+
+class Feeder:
+    """Feeds frames into a _SpeakerState on a fake 20ms clock."""
+
+    def __init__(self):
+        self.state = _SpeakerState()
+        self.now = 100.0
+        self.segments: list[tuple[float, bytes]] = []
+
+    def feed(self, pcm: bytes, count: int = 1):
+        for _ in range(count):
+            self.now += FRAME
+            segment = self.state.feed(pcm, audioop.rms(pcm, 2), self.now)
+            if segment is not None:
+                self.segments.append((self.now, segment))
+
+
+def seconds(n: float) -> int:
+    return round(n / FRAME)
+
+
+def test_silence_never_starts_a_segment():
+    f = Feeder()
+    f.feed(QUIET, seconds(2))
+    assert f.segments == [] and not f.state.in_speech
+    assert len(f.state.preroll) == bot.VAD_PREROLL_FRAMES
+
+
+def test_speech_then_silence_endpoints_with_preroll():
+    f = Feeder()
+    f.feed(QUIET, seconds(1))
+    f.feed(SPEECH, seconds(0.6))
+    speech_end = f.now
+    f.feed(QUIET, seconds(bot.VAD_END_SILENCE) - 1)
+    assert f.segments == [] and f.state.in_speech          # Still inside the silence window
+    f.feed(QUIET, 3)
+
+    assert len(f.segments) == 1
+    ended, pcm = f.segments[0]
+    # Within one frame of the window (the fake clock is float, like monotonic())
+    assert bot.VAD_END_SILENCE - 1e-6 <= ended - speech_end <= bot.VAD_END_SILENCE + FRAME + 1e-6
+    frames = bot.VAD_PREROLL_FRAMES + seconds(0.6) + round((ended - speech_end) / FRAME)
+    assert len(pcm) == frames * FRAME_BYTES
+    assert pcm[:FRAME_BYTES] == QUIET and pcm[bot.VAD_PREROLL_FRAMES * FRAME_BYTES:][:FRAME_BYTES] == SPEECH
+    assert not f.state.in_speech and f.state.buffer == bytearray()
+
+
+def test_short_blip_is_dropped():
+    f = Feeder()
+    f.feed(SPEECH, seconds(bot.VAD_MIN_SPEECH) - 5)
+    f.feed(QUIET, seconds(bot.VAD_END_SILENCE) + 1)
+    assert f.segments == []
+    assert not f.state.in_speech and f.state.voiced == 0.0
+    f.feed(SPEECH, seconds(0.5))                           # The next utterance still counts
+    f.feed(QUIET, seconds(bot.VAD_END_SILENCE) + 1)
+    assert len(f.segments) == 1
+
+
+def test_long_monologue_is_cut():
+    f = Feeder()
+    f.feed(SPEECH, seconds(bot.VAD_MAX_SEGMENT) + seconds(1))
+    assert len(f.segments) == 1
+    frames = len(f.segments[0][1]) // FRAME_BYTES
+    assert abs(frames - seconds(bot.VAD_MAX_SEGMENT)) <= 2     # Onset frame + float clock
+    assert f.state.in_speech                               # Talking continues in a new segment
+
+
+def test_expire_when_packets_stop():
+    f = Feeder()
+    f.feed(SPEECH, seconds(0.5))
+    assert f.state.expire(f.now + bot.VAD_END_SILENCE - 0.1) is None
+    pcm = f.state.expire(f.now + bot.VAD_END_SILENCE + 0.01)
+    assert pcm is not None and len(pcm) == seconds(0.5) * FRAME_BYTES
+    assert f.state.expire(f.now + 5) is None               # Nothing left to end
+
+
+def test_noise_floor_adapts():
+    hum = frame(280)                                      # Below VAD_MIN_RMS on its own
+    louder_hum = frame(600)                               # Voiced against a fresh floor
+    f = Feeder()
+    f.feed(hum, seconds(3))
+    assert abs(f.state.noise_floor - audioop.rms(hum, 2)) < 10
+    f.feed(louder_hum, seconds(1))                        # Under floor * ratio now
+    assert not f.state.in_speech
+    f.feed(SPEECH, 1)
+    assert f.state.in_speech
+
+
+def test_pcm_to_wav_16k():
+    pcm = SPEECH * seconds(1)
+    with wave.open(io.BytesIO(_pcm_to_wav_16k(pcm))) as wf:
+        assert (wf.getnchannels(), wf.getsampwidth(), wf.getframerate()) == (1, 2, 16000)
+        assert abs(wf.getnframes() - 16000) <= 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
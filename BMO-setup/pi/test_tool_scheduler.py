@@ -0,0 +1,166 @@
+"""Tests for the tool-call scheduler with fake tools.
+
+Fake tools record when they start and finish, so the tests can check batch
+boundaries around non-parallel-safe tools, actual overlap within read-only
+batches, result order, error wrapping, and ``stop_after`` both directly and
+through claude_tools (with a fake Messages API session).
+
+Usage:
+    python test_tool_scheduler.py
+"""
+
+import threading
+import time
+
+from agents.tool_scheduler import PARALLEL_SAFE_TOOLS, plan_batches, run_tool_calls
+
+READS = {"read_file", "grep_files", "web_search"}
+
+
+def is_safe(name: str) -> bool:
+    return name in READS
+
+
+class FakeTools:
+    """dispatch() that sleeps briefly and logs (event, name, args) with live concurrency."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running: set[str] = set()
+        self.log: list[tuple[str, str, frozenset]] = []   # (event, call id, others running)
+
+    def __call__(self, name: str, args: dict):
+        call = args["id"]
+        with self.lock:
+            self.log.append(("start", call, frozenset(self.running)))
+            self.running.add(call)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running.discard(call)
+            self.log.append(("end", call, frozenset(self.running)))
+        if args.get("fail"):
+            raise RuntimeError("disk on fire")
+        return args.get("result", {"ok": call})
+
+    def overlapped(self, call: str) -> frozenset:
+        return next(others for event, c, others in self.log if event == "start" and c == call)
+
+    def started(self) -> list[str]:
+        return [c for event, c, _ in self.log if event == "start"]
+
+
+def test_plan_batches():
+    names = ["read_file", "grep_files", "run_command", "read_file", "write_file",
+             "web_search", "read_file", "grep_files"]
+    assert plan_batches(names, is_safe) == [[0, 1], [2], [3], [4], [5, 6, 7]]
+    assert plan_batches([], is_safe) == []
+    assert plan_batches(["run_command"] * 2, is_safe) == [[0], [1]]
+    assert "write_memory" not in PARALLEL_SAFE_TOOLS and "read_file" in PARALLEL_SAFE_TOOLS
+
+
+def test_reads_overlap_writes_run_alone_in_order():
+    tools = FakeTools()
+    calls = [("read_file", {"id": "r1"}), ("grep_files", {"id": "r2"}), ("web_search", {"id": "r3"}),
+             ("run_command", {"id": "w1"}), ("read_file", {"id": "r4"}), ("read_file", {"id": "r5"})]
+    results = run_tool_calls(calls, tools, is_safe)
+
+    assert results == [{"ok": c["id"]} for _, c in calls]     # Original order
+    assert tools.overlapped("r3") or tools.overlapped("r2")   # The first batch overlapped
+    assert tools.overlapped("w1") == frozenset()              # The write had the stage to itself
+    started = tools.started()
+    assert set(started[:3]) == {"r1", "r2", "r3"} and started[3] == "w1"
+    assert set(started[4:]) == {"r4", "r5"}
+    # Nothing from a later batch started before the earlier batch ended
+    end_w1 = tools.log.index(("end", "w1", frozenset()))
+    assert all(tools.log.index(e) > end_w1 for e in tools.log if e[0] == "start" and e[1] in ("r4", "r5"))
+
+
+def test_hooks_and_errors():
+    tools = FakeTools(delay=0.01)
+    seen = []
+    calls = [("read_file", {"id": "a"}), ("read_file", {"id": "b", "fail": True})]
+    results = run_tool_calls(calls, tools, is_safe,
+                             on_start=lambda i, n, a: seen.append(("start", i)),
+                             on_done=lambda i, n, a, r: seen.append(("done", i)))
+    assert results[0] == {"ok": "a"}
+    assert results[1] == {"error": "Tool 'read_file' failed: disk on fire"}
+    assert sorted(seen) == [("done", 0), ("done", 1), ("start", 0), ("start", 1)]
+
+
+def test_stop_after_skips_later_batches():
+    tools = FakeTools(delay=0.01)
+    confirm = {"needs_confirmation": True, "reason": "rm -rf"}
+    calls = [("read_file", {"id": "r1"}), ("run_command", {"id": "w1", "result": confirm}),
+             ("read_file", {"id": "r2"}), ("run_command", {"id": "w2"})]
+    results = run_tool_calls(calls, tools, is_safe,
+                             stop_after=lambda r: isinstance(r, dict) and r.get("needs_confirmation"))
+    assert results == [{"ok": "r1"}, confirm, None, None]
+    assert tools.started() == ["r1", "w1"]
+
+
+class FakeResponse:
+    ok = True
+    status_code = 200
+    text = ""
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.payloads = []
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.payloads.append(json)
+        return FakeResponse(self.responses.pop(0))
+
+
+def test_claude_tools_stops_at_confirmation():
+    import cloud_providers
+    import claude_tools
+
+    def tool_use(i, name, args):
+        return {"type": "tool_use", "id": f"tu{i}", "name": name, "input": args}
+
+    session = FakeSession([{
+        "stop_reason": "tool_use",
+        "content": [
+            {"type": "text", "text": "Cleaning up."},
+            tool_use(1, "read_file", {"id": "r1"}),
+            tool_use(2, "run_command", {"id": "w1", "result": {
+                "needs_confirmation": True, "reason": "Deletes files", "command": "rm -rf build"}}),
+            tool_use(3, "read_file", {"id": "r2"}),
+        ],
+    }])
+    tools = FakeTools(delay=0.01)
+    pending = []
+    real = cloud_providers._claude_session
+    cloud_providers._claude_session = session
+    try:
+        text = claude_tools.claude_chat_with_tools(
+            [{"role": "user", "content": "clean the build"}], tools=[], tool_dispatch=tools,
+            pending_confirmations_out=pending, is_parallel_safe=is_safe,
+        )
+    finally:
+        cloud_providers._claude_session = real
+
+    assert tools.started() == ["r1", "w1"]             # r2 never ran
+    assert len(session.payloads) == 1                 # No follow-up API call
+    assert "Deletes files" in text and "rm -rf build" in text
+    assert pending == [{"tool": "run_command", "args": {"id": "w1", "result": {
+        "needs_confirmation": True, "reason": "Deletes files", "command": "rm -rf build"}},
+        "reason": "Deletes files", "command": "rm -rf build"}]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
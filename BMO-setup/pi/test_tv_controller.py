@@ -0,0 +1,226 @@
+"""Offline tests for the ADB TV controller (no TV or ADB server needed).
+
+A TvController subclass answers shell commands from canned output and
+records what was sent, so state parsing and the volume fallbacks can be
+checked without a device. The auto-skip scheduler runs on a fake clock,
+and the skip-button search runs against synthetic UI dumps.
+
+Usage:
+    python test_tv_controller.py
+"""
+
+import tv_controller
+from tv_controller import (
+    SkipScheduler, TvController, _check_cached_bounds, _find_skip_node, _parse_volume, _skip_pattern,
+)
+
+SECTION = tv_controller._SECTION
+
+# ``dumpsys audio | grep -A8 -- '- STREAM_MUSIC:'`` on Android 9+
+DUMPSYS_AUDIO_NEW = """\
+- STREAM_MUSIC:
+   Muted: false
+   Muted Internally: false
+   Min: 0
+   Max: 25
+   streamVolume:11
+   Current: 2 (speaker): 4, 400 (hdmi): 11, 40000000 (default): 6
+   Devices: hdmi
+   Volume Group: AUDIO_STREAM_MUSIC
+--
+- STREAM_MUSIC: mute changed
+"""
+
+# Older releases: no streamVolume line; the level is the active device's entry
+DUMPSYS_AUDIO_OLD = """\
+- STREAM_MUSIC:
+   Muted: false
+   Min: 0
+   Max: 15
+   Current: 2 (speaker): 7, 400 (hdmi): 9, 40000000 (default): 11
+   Devices: hdmi
+- STREAM_ALARM:
+   Max: 7
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeTv(TvController):
+    def __init__(self, volume_output: str = "", ui_tree: str = ""):
+        super().__init__()
+        self.volume_output = volume_output
+        self.ui_tree = ui_tree
+        self.commands: list[str] = []
+
+    def _get_ui_tree(self) -> str:
+        return self.ui_tree
+
+    def _shell(self, command: str) -> str:
+        self.commands.append(command)
+        if command == tv_controller._STATE_COMMAND:
+            return (f"{SECTION}focus\n"
+                    "  mCurrentFocus=Window{1 u0 com.netflix.ninja/com.netflix.ninja.MainActivity}\n"
+                    f"{SECTION}media\n{SECTION}volume\n{self.volume_output}")
+        return ""
+
+
+def test_parse_volume_formats():
+    assert _parse_volume("volume is 6 in range [0..15]") == (6, 15)
+    assert _parse_volume(DUMPSYS_AUDIO_NEW) == (11, 25)
+    assert _parse_volume(DUMPSYS_AUDIO_OLD) == (9, 15)
+    assert _parse_volume("") is None
+    assert _parse_volume("- STREAM_MUSIC:\n   Muted: false\n") is None
+
+
+def test_state_uses_dumpsys_fallback():
+    assert "dumpsys audio" in tv_controller._STATE_COMMAND
+    tv = FakeTv(DUMPSYS_AUDIO_OLD)
+    state = tv.get_state()
+    assert state["current_app"] == "com.netflix.ninja"
+    assert (state["volume"], state["volume_max"]) == (9, 15)
+    assert tv.get_volume() == 9
+
+
+def test_volume_keys_step_from_known_level():
+    tv = FakeTv(DUMPSYS_AUDIO_NEW)
+    tv._set_volume_with_keys(14, 25)
+    presses = tv.commands[-1].split("; ")
+    assert presses == ["input keyevent KEYCODE_VOLUME_UP"] * 3     # 11 -> 14, no flooring
+
+    unknown = FakeTv("")
+    unknown._set_volume_with_keys(2, 15)
+    presses = unknown.commands[-1].split("; ")
+    assert presses.count("input keyevent KEYCODE_VOLUME_DOWN") == 20
+    assert presses.count("input keyevent KEYCODE_VOLUME_UP") == 2
+
+
+# ── Auto-skip scheduling ──
+
+
+def intervals(scheduler: SkipScheduler, clock: FakeClock, scans: int) -> list[float]:
+    """Record ``scans`` empty dumps; return the wait the scheduler asked for after each."""
+    waits = []
+    for _ in range(scans):
+        assert scheduler.due()
+        scheduler.record(found=False)
+        start = clock.now
+        while not scheduler.due():
+            clock.now += 0.5
+        waits.append(clock.now - start)
+    return waits
+
+
+def test_scheduler_backs_off_and_resets_on_found():
+    clock = FakeClock()
+    sched = SkipScheduler(clock=clock)
+    sched.observe("com.netflix.ninja", 60_000)
+    assert intervals(sched, clock, 7) == [3, 6, 12, 24, 48, 48, 48]
+    sched.record(found=True)
+    assert not sched.due()
+    clock.now += 3
+    assert sched.due()
+
+
+def test_scheduler_position_jump_and_new_app():
+    clock = FakeClock()
+    sched = SkipScheduler(clock=clock)
+    sched.observe("com.netflix.ninja", 0)
+    intervals(sched, clock, 4)                   # Next wait is 48s
+    sched.record(found=False)
+
+    clock.now += 5                               # Normal playback: 5s later, 5s further in
+    position = 0 + int((clock.now - 1000.0) * 1000)
+    sched.observe("com.netflix.ninja", position)
+    assert not sched.due()
+
+    clock.now += 1
+    sched.observe("com.netflix.ninja", position + 1000 + tv_controller.POSITION_JUMP_MS + 1)
+    assert sched.due()                           # Seek / next episode: scan now
+    assert intervals(sched, clock, 2) == [3, 6]  # Back-off starts over
+
+    sched.observe("com.hulu.plus", None)        # Different app: scan now
+    assert sched.due()
+
+
+def test_scheduler_forget():
+    clock = FakeClock()
+    sched = SkipScheduler(clock=clock)
+    sched.observe("com.netflix.ninja", 10_000)
+    intervals(sched, clock, 3)
+    sched.record(found=False)
+    assert not sched.due()
+
+    sched.forget()                               # Playback stopped
+    sched.observe("com.netflix.ninja", 10_000)  # Same app again counts as new
+    assert sched.due()
+
+
+# ── Skip button search ──
+
+
+def ui_dump(*nodes: str, filler: int = 0) -> str:
+    padding = '<node text="" resource-id="row" bounds="[0,0][10,10]" />' * filler
+    return ('<?xml version="1.0" encoding="UTF-8"?><hierarchy rotation="0">'
+            f'<node class="android.widget.FrameLayout" bounds="[0,0][1920,1080]">{padding}'
+            + "".join(nodes) + "</node></hierarchy>")
+
+
+SKIP_NODE = ('<node text="Skip Intro" resource-id="com.netflix.ninja:id/skip" '
+             'bounds="[1500,900][1800,980]" />')
+
+
+def test_find_skip_node():
+    netflix = _skip_pattern("com.netflix.ninja")
+    tree = ui_dump('<node text="Skip Intro" />',              # No bounds: ignored
+                   SKIP_NODE, filler=600)
+    assert len(tree) > 3 * tv_controller.UI_PARSE_CHUNK       # Match is several chunks in
+    assert _find_skip_node(tree, netflix)["bounds"] == "[1500,900][1800,980]"
+
+    desc = ui_dump('<node text="" content-desc="Skip recap &amp; intro" bounds="[1,2][3,4]" />')
+    assert _find_skip_node(desc, _skip_pattern("com.disney.disneyplus"))["bounds"] == "[1,2][3,4]"
+
+    assert _find_skip_node(ui_dump(filler=50), netflix) is None
+    truncated = ui_dump(SKIP_NODE).replace("</node></hierarchy>", "<<<")   # Garbage after the match
+    assert _find_skip_node(truncated, netflix) is not None
+    assert _find_skip_node("<hierarchy><node <<<" + SKIP_NODE, netflix) is None
+
+
+def test_check_cached_bounds():
+    netflix = _skip_pattern("com.netflix.ninja")
+    bounds = "[1500,900][1800,980]"
+    tree = ui_dump(SKIP_NODE, filler=20)
+    assert _check_cached_bounds(tree, bounds, netflix)["text"] == "Skip Intro"
+    assert _check_cached_bounds(tree, "[1,1][2,2]", netflix) is None
+    moved = tree.replace("Skip Intro", "Play Next Episode")    # Same spot, different button
+    assert _check_cached_bounds(moved, bounds, netflix) is None
+    escaped = ui_dump(f'<node content-desc="Skip&#32;Intro" text="" bounds="{bounds}" />')
+    assert _check_cached_bounds(escaped, bounds, netflix) is not None
+
+
+def test_detect_uses_cached_bounds_then_full_search():
+    tv = FakeTv(ui_tree=ui_dump(SKIP_NODE, filler=10))
+    assert tv._detect_skip_button("com.netflix.ninja") == (1650, 940)
+    assert tv._skip_bounds["com.netflix.ninja"] == "[1500,900][1800,980]"
+
+    # The button moved: the cached bounds miss, the full search finds it
+    tv.ui_tree = ui_dump(SKIP_NODE.replace("[1500,900][1800,980]", "[100,100][300,200]"))
+    assert tv._detect_skip_button("com.netflix.ninja") == (200, 150)
+    assert tv._skip_bounds["com.netflix.ninja"] == "[100,100][300,200]"
+
+    tv.ui_tree = ui_dump(filler=5)
+    assert tv._detect_skip_button("com.netflix.ninja") is None
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
@@ -0,0 +1,91 @@
+"""Tests for the response-tag tokenizer in voice_personality.
+
+Checks that parse_response_tags / detect_emotion keep their behavior, and
+that TagStream gives the same tokens however the reply is chunked.
+
+Usage:
+    python test_voice_personality.py
+"""
+
+import random
+
+from voice_personality import TagStream, detect_emotion, parse_response_tags
+
+REPLY = ("[EMOTION:happy] Hi there! [NPC:gruff_dwarf]Aye lad, [SFX:chime]the mine "
+         "is deep. [DRAMATIC] Beware [FACE:angry]the [dragon] [LED:red]!")
+
+
+def stream_tokens(text: str, sizes) -> list:
+    stream, out = TagStream(), []
+    i = 0
+    for n in sizes:
+        out += stream.feed(text[i:i + n])
+        i += n
+    out += stream.feed(text[i:])
+    out += stream.close()
+    # Merge adjacent text pieces; chunking may split them anywhere
+    merged = []
+    for kind, value in out:
+        if kind == "text" and merged and merged[-1][0] == "text":
+            merged[-1] = ("text", merged[-1][1] + value)
+        else:
+            merged.append((kind, value))
+    return merged
+
+
+def test_parse_response_tags():
+    tags = parse_response_tags(REPLY)
+    assert tags["clean_text"] == "Hi there! Aye lad, the mine is deep. Beware the [dragon] !", tags
+    assert tags["emotion"] == "happy"     # Typed tag beats standalone [DRAMATIC]
+    assert tags["npc"] == "gruff_dwarf"
+    assert tags["sound"] == "chime"
+    assert (tags["face"], tags["led"], tags["music"]) == ("angry", "red", None)
+
+
+def test_detect_emotion():
+    assert detect_emotion(REPLY) == "happy"
+    assert detect_emotion("[CALM] then [EMOTION:bogus]") == "calm"
+    assert detect_emotion("[sad] [happy]") == "sad"
+    assert detect_emotion("Just a sentence.") is None
+
+
+def test_stream_matches_any_chunking():
+    whole = stream_tokens(REPLY, [])
+    assert ("npc", "gruff_dwarf") in whole and ("emotion", "dramatic") in whole
+    rng = random.Random(3)
+    for _ in range(200):
+        sizes = [rng.randint(1, 6) for _ in range(len(REPLY) // 3)]
+        assert stream_tokens(REPLY, sizes) == whole
+
+
+def test_stream_voice_and_unclosed_bracket():
+    stream = TagStream()
+    assert stream.feed("Hello [NPC:gru") == [("text", "Hello ")]
+    assert stream.voice == (None, None)
+    assert stream.feed("ff_dwarf] Aye") == [("npc", "gruff_dwarf"), ("text", " Aye")]
+    assert stream.voice == (None, "gruff_dwarf")
+    # A "[" that never closes is spoken as text at the end
+    assert stream.feed(" [wait") == [("text", " ")]
+    assert stream.close() == [("text", "[wait")]
+
+
+def test_two_voice_tags_in_one_chunk():
+    stream = TagStream()
+    pieces = stream.feed_speech("[EMOTION:sad] Oh no, the cave collapsed [NPC:gruff_dwarf] Aye, run!")
+    assert pieces == [
+        (" Oh no, the cave collapsed ", "sad", None),
+        (" Aye, run!", "sad", "gruff_dwarf"),
+    ], pieces
+    # Split across chunks the voices come out the same
+    stream = TagStream()
+    pieces = stream.feed_speech("[EMOTION:sad] Oh no [NPC:gr") + stream.feed_speech("uff_dwarf] Aye")
+    pieces += stream.close_speech()
+    assert [p[1:] for p in pieces] == [("sad", None), ("sad", "gruff_dwarf")], pieces
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
@@ -0,0 +1,145 @@
+"""Tests for the shared inotify watch service, using a temp directory.
+
+Checks debounced dispatch for file and directory subscriptions, files whose
+parent directory doesn't exist yet, atomic saves (temp file + rename, the
+way settings.json is written), and unwatch. On machines without inotify
+the same checks run against the polling fallback.
+
+Usage:
+    python test_watch_service.py
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from watch_service import WatchService
+
+POLL = 0.1
+
+
+class Recorder:
+    def __init__(self):
+        self.paths: list[str] = []
+        self._event = threading.Event()
+
+    def __call__(self, path: str):
+        self.paths.append(path)
+        self._event.set()
+
+    def wait(self, timeout: float = 2.0) -> bool:
+        ok = self._event.wait(timeout)
+        time.sleep(0.1)   # Let the debounce window close
+        self._event.clear()
+        return ok
+
+
+def make_service() -> WatchService:
+    return WatchService(poll_interval=POLL)
+
+
+def write(path: str, text: str):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def save_atomic(path: str, text: str):
+    tmp = path + ".tmp"
+    write(tmp, text)
+    os.replace(tmp, path)
+
+
+def test_file_change_dispatch():
+    svc = make_service()
+    tmp = tempfile.mkdtemp()
+    target, other = os.path.join(tmp, "a.json"), os.path.join(tmp, "b.json")
+    write(target, "1")
+    rec = Recorder()
+    svc.watch(target, rec, debounce=0.02)
+    time.sleep(POLL * 2)
+
+    write(other, "x")                        # Sibling file: not ours
+    for i in range(5):                       # A burst is debounced into one callback
+        write(target, str(i))
+    assert rec.wait()
+    assert rec.paths == [target], rec.paths
+    svc.stop()
+
+
+def test_directory_subscription_recursive():
+    svc = make_service()
+    tmp = tempfile.mkdtemp()
+    rec = Recorder()
+    svc.watch(tmp, rec, recursive=True, debounce=0.02)
+    time.sleep(POLL * 2)
+
+    os.makedirs(os.path.join(tmp, "new", "deeper"))
+    time.sleep(0.2)
+    rec.wait(0.5)
+    rec.paths.clear()
+    deep = os.path.join(tmp, "new", "deeper", "note.md")
+    write(deep, "hi")
+    assert rec.wait()
+    assert deep in rec.paths, rec.paths
+    svc.stop()
+
+
+def test_missing_parent_directory():
+    svc = make_service()
+    tmp = tempfile.mkdtemp()
+    target = os.path.join(tmp, "bmo", "data", "settings.json")
+    rec = Recorder()
+    svc.watch(target, rec, debounce=0.02)
+    time.sleep(POLL * 2)
+
+    os.makedirs(os.path.dirname(target))
+    write(target, "{}")
+    assert rec.wait()
+    assert rec.paths[-1] == target
+    rec.paths.clear()
+    write(target, '{"a": 1}')
+    assert rec.wait()
+    assert rec.paths == [target]
+    svc.stop()
+
+
+def test_atomic_rename_keeps_watching():
+    svc = make_service()
+    tmp = tempfile.mkdtemp()
+    target = os.path.join(tmp, "settings.json")
+    write(target, "{}")
+    rec = Recorder()
+    svc.watch(target, rec, debounce=0.02)
+    time.sleep(POLL * 2)
+
+    for n in range(3):
+        save_atomic(target, f'{{"n": {n}}}')
+        assert rec.wait(), f"save {n} not seen"
+        assert rec.paths == [target], rec.paths   # The .tmp file never reaches us
+        rec.paths.clear()
+        time.sleep(POLL * 1.5)                   # Separate mtimes for the poll fallback
+    svc.stop()
+
+
+def test_unwatch():
+    svc = make_service()
+    tmp = tempfile.mkdtemp()
+    target = os.path.join(tmp, "a.txt")
+    rec = Recorder()
+    token = svc.watch(target, rec, debounce=0.02)
+    time.sleep(POLL * 2)
+    svc.unwatch(token)
+    write(target, "x")
+    assert not rec.wait(0.5)
+    svc.stop()
+
+
+if __name__ == "__main__":
+    mode = "inotify" if make_service().using_inotify else "polling fallback"
+    print(f"  ({mode})")
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"  {name} ok")
+    print("OK")
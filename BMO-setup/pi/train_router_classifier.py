@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Train and evaluate the router's local intent classifier.
+
+Training data:
+  - router keyword tables (built-in + router.custom_keywords)
+  - agent descriptions from the LLM classification prompt
+  - logged routing decisions with trustworthy labels (explicit !prefix,
+    UI agent override, [RELAY:...] corrections) from the decision log
+
+Evaluation runs the labeled corpus (data/router/labeled_corpus.jsonl)
+through the full router, with and without the classifier tier. With
+--with-corpus the corpus is also used for training, and accuracy is then
+measured by k-fold cross-validation instead.
+
+Usage:
+    python train_router_classifier.py [--out PATH] [--with-corpus] [--dry-run]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.intent_classifier import (
+    DECISIONS_PATH, DEFAULT_THRESHOLD, MODEL_PATH, IntentClassifier,
+    examples_from_descriptions, examples_from_keywords, load_decisions,
+)
+from agents.router import CLASSIFICATION_PROMPT, AgentRouter
+from benchmark_router import CORPUS, PARAPHRASES, load_corpus
+
+FOLDS = 5
+
+
+def _settings():
+    try:
+        from agents.settings import BmoSettings
+        return BmoSettings()
+    except Exception as e:
+        print(f"  (settings unavailable, using built-in keywords only: {e})")
+        return None
+
+
+def evaluate(router: AgentRouter, clf: IntentClassifier | None, corpus):
+    """Route the corpus; returns (correct, per-tier counts, misroutes)."""
+    router._classifier = clf
+    disabled = [] if clf else ["classifier"]
+    router._settings = _EvalSettings(disabled)
+    correct, tiers, misses = 0, {}, []
+    for text, expected in corpus:
+        agent, tier = router._route(text)
+        tiers[tier] = tiers.get(tier, 0) + 1
+        if agent == expected:
+            correct += 1
+        else:
+            misses.append((text, expected, agent, tier))
+    return correct, tiers, misses
+
+
+class _EvalSettings:
+    """Settings stub for evaluation: only toggles tiers, never reloads tables."""
+
+    version = None
+
+    def __init__(self, disabled):
+        self._disabled = disabled
+
+    def get(self, key, default=None):
+        return self._disabled if key == "router.disable_tiers" else default
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=MODEL_PATH, help=f"model path (default {MODEL_PATH})")
+    parser.add_argument("--decisions", default=DECISIONS_PATH, help="routing decision log")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--with-corpus", action="store_true", help="also train on the labeled corpus")
+    parser.add_argument("--dry-run", action="store_true", help="evaluate only, don't save")
+    parser.add_argument("-v", "--verbose", action="store_true", help="list misroutes")
+    args = parser.parse_args()
+
+    router = AgentRouter(settings=_settings())
+    base = examples_from_keywords(router._keywords) + examples_from_descriptions(CLASSIFICATION_PROMPT)
+    logged = load_decisions(args.decisions)
+    corpus = load_corpus() + load_corpus(PARAPHRASES)
+    print(f"Training data: {len(base)} keyword/description examples, {len(logged)} logged decisions")
+    print(f"Evaluation:    {len(corpus)} labeled messages ({CORPUS}, {PARAPHRASES})\n")
+
+    kw_correct, _, _ = evaluate(router, None, corpus)
+    print(f"  keywords only      {kw_correct}/{len(corpus)} ({kw_correct / len(corpus):.1%})")
+
+    if args.with_corpus:
+        shuffled = corpus[:]
+        random.Random(0).shuffle(shuffled)
+        correct, misses = 0, []
+        for k in range(FOLDS):
+            held_out = shuffled[k::FOLDS]
+            train = [row for i, row in enumerate(shuffled) if i % FOLDS != k]
+            clf = IntentClassifier.train(base + logged + train, threshold=args.threshold)
+            c, _, m = evaluate(router, clf, held_out)
+            correct += c
+            misses += m
+        label = f"+ classifier ({FOLDS}-fold)"
+    else:
+        clf = IntentClassifier.train(base + logged, threshold=args.threshold)
+        correct, tiers, misses = evaluate(router, clf, corpus)
+        label = "+ classifier"
+        print(f"  {label:<18} {correct}/{len(corpus)} ({correct / len(corpus):.1%})  tiers {tiers}")
+    if args.with_corpus:
+        print(f"  {label:<18} {correct}/{len(corpus)} ({correct / len(corpus):.1%})")
+    if args.verbose:
+        for text, expected, got, tier in misses:
+            print(f"      {text!r}: expected {expected}, got {got} ({tier})")
+
+    clf = IntentClassifier.train(base + logged + (corpus if args.with_corpus else []), threshold=args.threshold)
+    start = time.perf_counter()
+    for text, _ in corpus * 20:
+        clf.predict(text)
+    per_msg_us = (time.perf_counter() - start) / (len(corpus) * 20) * 1e6
+    print(f"\n  predict latency    {per_msg_us:.0f} µs/msg, {len(clf._table)} features, {len(clf.classes)} classes")
+
+    if not args.dry_run:
+        clf.save(args.out)
+        print(f"  saved → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
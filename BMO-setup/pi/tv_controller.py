@@ -5,6 +5,7 @@ media playback, volume, app launching, navigation, and automatic
 skip intro/outro/credits detection.
 """
 
+import html
 import os
 import re
 import threading
@@ -25,7 +26,15 @@ ADB_PORT = 5555
 ADB_HOST = "127.0.0.1"       # Local ADB server address
 ADB_SERVER_PORT = 5037        # Local ADB server port
 RECONNECT_INTERVAL = 10       # Seconds between reconnect attempts
-AUTO_SKIP_POLL_INTERVAL = 3   # Seconds between UI tree polls
+AUTO_SKIP_POLL_INTERVAL = 3   # Seconds between cheap focus/media checks (and the first UI dumps)
+AUTO_SKIP_MAX_INTERVAL = 48   # Longest back-off between UI dumps when no button is found
+AUTO_SKIP_COOLDOWN = 5        # Pause after tapping a skip button, to avoid double-taps
+POSITION_JUMP_MS = 10_000     # Media position off by more than this = new episode or seek
+UI_PARSE_CHUNK = 8192         # Bytes fed to the streaming UI-tree parser at a time
+HEALTH_CHECK_INTERVAL = 5     # Skip the "echo ok" probe if a command succeeded this recently
+STATE_TTL = 1.5               # Seconds a fetched focus/media/volume snapshot stays fresh
+MUSIC_STREAM = 3              # AudioManager.STREAM_MUSIC
+DEFAULT_VOLUME_STEPS = 15     # Most Android TVs; used until the real max is known
 
 
 # ── App Package Mapping ──────────────────────────────────────────────
@@ -84,6 +93,242 @@ def _bounds_center(x1: int, y1: int, x2: int, y2: int) -> tuple[int, int]:
     return (x1 + x2) // 2, (y1 + y2) // 2
 
 
+# ── Skip Button Search ───────────────────────────────────────────────
+
+_ATTR_RE = re.compile(r'([\w-]+)="([^"]*)"')
+
+
+def _skip_pattern(app: str) -> re.Pattern:
+    """Skip-button regex for a package, or the generic fallback."""
+    for prefix, pattern in SKIP_PATTERNS.items():
+        if app.startswith(prefix):
+            return pattern
+    return _FALLBACK_SKIP_PATTERN
+
+
+def _node_matches(attrs, pattern: re.Pattern) -> bool:
+    searchable = f"{attrs.get('text', '')} {attrs.get('content-desc', '')} {attrs.get('resource-id', '')}"
+    return bool(pattern.search(searchable))
+
+
+def _check_cached_bounds(xml_str: str, bounds: str, pattern: re.Pattern) -> dict | None:
+    """Look for a skip button at previously seen bounds without parsing the tree.
+
+    Finds the one ``<node ... bounds="...">`` element by string search and
+    matches just its attributes.
+    """
+    idx = xml_str.find(f'bounds="{bounds}"')
+    if idx < 0:
+        return None
+    start = xml_str.rfind("<node", 0, idx)
+    end = xml_str.find(">", idx)
+    if start < 0 or end < 0:
+        return None
+    attrs = {k: html.unescape(v) for k, v in _ATTR_RE.findall(xml_str[start:end])}
+    return attrs if _node_matches(attrs, pattern) else None
+
+
+def _find_skip_node(xml_str: str, pattern: re.Pattern) -> dict | None:
+    """Attributes of the first node matching ``pattern``.
+
+    Feeds the XML to a pull parser in chunks and stops at the first match,
+    so a button near the top of the tree never pays for parsing the rest.
+    """
+    parser = ET.XMLPullParser(events=("start",))
+    try:
+        for i in range(0, len(xml_str), UI_PARSE_CHUNK):
+            parser.feed(xml_str[i:i + UI_PARSE_CHUNK])
+            for _, elem in parser.read_events():
+                if elem.tag == "node" and _node_matches(elem.attrib, pattern) and elem.get("bounds"):
+                    return dict(elem.attrib)
+    except ET.ParseError:
+        pass
+    return None
+
+
+class SkipScheduler:
+    """Decides when the auto-skip loop may afford a full UI dump.
+
+    The loop reports the foreground app and media position every poll (from
+    the cheap batched state). A new app or a position jump (next episode,
+    seek) makes a dump due right away. Every dump that finds nothing doubles
+    the wait before the next one, up to ``max_interval``.
+    """
+
+    def __init__(self, base: float = AUTO_SKIP_POLL_INTERVAL,
+                 max_interval: float = AUTO_SKIP_MAX_INTERVAL, clock=time.monotonic):
+        self.base = base
+        self.max_interval = max_interval
+        self._clock = clock
+        self._app = None
+        self._position = None      # (position ms, clock time)
+        self._misses = 0
+        self._next_scan = 0.0
+
+    def observe(self, app: str, position: int | None) -> None:
+        now = self._clock()
+        changed = app != self._app
+        if position is not None and self._position is not None and not changed:
+            last_pos, last_time = self._position
+            expected = last_pos + (now - last_time) * 1000
+            changed = abs(position - expected) > POSITION_JUMP_MS
+        self._app = app
+        self._position = (position, now) if position is not None else None
+        if changed:
+            self._misses = 0
+            self._next_scan = now
+
+    def forget(self) -> None:
+        """Playback stopped or app not enabled — treat the next sighting as new."""
+        self._app = None
+        self._position = None
+
+    def due(self) -> bool:
+        return self._clock() >= self._next_scan
+
+    def record(self, found: bool) -> None:
+        """Schedule the next dump after a scan."""
+        self._misses = 0 if found else self._misses + 1
+        interval = min(self.max_interval, self.base * 2 ** max(0, self._misses - 1))
+        self._next_scan = self._clock() + interval
+
+
+# ── State Parsing ────────────────────────────────────────────────────
+
+_SECTION = "@@BMO@@"
+
+# One shell round trip for focus, media session and music volume
+_STATE_COMMAND = (
+    f"echo {_SECTION}focus; dumpsys window | grep -E 'mCurrentFocus|mFocusedApp'; "
+    f"echo {_SECTION}media; dumpsys media_session; "
+    f"echo {_SECTION}volume; "
+    f"cmd media_session volume --stream {MUSIC_STREAM} --get 2>/dev/null "
+    f"|| media volume --stream {MUSIC_STREAM} --get 2>/dev/null "
+    f"|| dumpsys audio | grep -A8 -- '- STREAM_MUSIC:'"
+)
+
+_VOLUME_RE = re.compile(r"volume is (\d+) in range \[(\d+)\.\.(\d+)\]")
+# ``dumpsys audio`` STREAM_MUSIC block: "Max: 15", then "streamVolume:7" on
+# Android 9+, or only "Current: 2 (speaker): 7, 400 (hdmi): 9" with the
+# active device on a "Devices: hdmi" line on older releases
+_DUMPSYS_MAX_RE = re.compile(r"^\s*Max:\s*(\d+)", re.M)
+_DUMPSYS_LEVEL_RE = re.compile(r"streamVolume:\s*(\d+)")
+_DUMPSYS_CURRENT_RE = re.compile(r"^\s*Current:(.*)$", re.M)
+_DUMPSYS_DEVICES_RE = re.compile(r"^\s*Devices:\s*(\S+)", re.M)
+
+_PLAYBACK_STATES = {
+    0: "none",
+    1: "stopped",
+    2: "paused",
+    3: "playing",
+    4: "fast_forwarding",
+    5: "rewinding",
+    6: "buffering",
+    7: "error",
+    8: "connecting",
+    9: "skipping_to_previous",
+    10: "skipping_to_next",
+    11: "skipping_to_queue_item",
+}
+
+
+def _split_sections(output: str) -> dict[str, str]:
+    """Split batched shell output on the ``@@BMO@@name`` markers."""
+    sections = {}
+    for part in output.split(_SECTION)[1:]:
+        name, _, body = part.partition("\n")
+        sections[name.strip()] = body
+    return sections
+
+
+def _parse_current_app(result: str) -> str:
+    """Package name of the focused window from ``dumpsys window`` output."""
+    if not result:
+        return ""
+
+    # Extract package name from window dump
+    # Format: "mCurrentFocus=Window{... com.netflix.ninja/com.netflix.ninja.MainActivity}"
+    match = re.search(r"(\S+/\S+)\}", result)
+    if match:
+        # Return just the package name (before the /)
+        full = match.group(1)
+        return full.split("/")[0]
+
+    # Try alternative format
+    match = re.search(r"u0\s+(\S+)/", result)
+    if match:
+        return match.group(1)
+
+    return ""
+
+
+def _parse_media(result: str) -> dict:
+    """App, title, artist, album and playback state from ``dumpsys media_session``."""
+    if not result:
+        return {}
+
+    info = {}
+
+    # Extract active session package
+    pkg_match = re.search(r"package=(\S+)", result)
+    if pkg_match:
+        info["app"] = pkg_match.group(1)
+
+    # Extract metadata
+    title_match = re.search(r"description=([^\n,]+)", result)
+    if title_match:
+        info["title"] = title_match.group(1).strip()
+
+    # Try more specific metadata fields
+    for key, fields in (
+        ("title", ("METADATA_KEY_TITLE", "android.media.metadata.TITLE")),
+        ("artist", ("METADATA_KEY_ARTIST", "android.media.metadata.ARTIST")),
+        ("album", ("METADATA_KEY_ALBUM", "android.media.metadata.ALBUM")),
+    ):
+        for field in fields:
+            match = re.search(rf"{field}=([^\n,]+)", result)
+            if match:
+                info[key] = match.group(1).strip()
+                break
+
+    # Extract playback state
+    state_match = re.search(r"state=PlaybackState\s*\{state=(\d+)", result)
+    if state_match:
+        state_code = int(state_match.group(1))
+        info["state"] = _PLAYBACK_STATES.get(state_code, f"unknown({state_code})")
+        pos_match = re.search(r"position=(-?\d+)", result[state_match.end():state_match.end() + 200])
+        if pos_match:
+            info["position"] = int(pos_match.group(1))
+
+    return info
+
+
+def _parse_volume(result: str) -> tuple[int, int] | None:
+    """(level, max) from ``media volume --get`` or ``dumpsys audio`` output, or None."""
+    match = _VOLUME_RE.search(result or "")
+    if match:
+        return int(match.group(1)), int(match.group(3))
+    return _parse_dumpsys_volume(result or "")
+
+
+def _parse_dumpsys_volume(result: str) -> tuple[int, int] | None:
+    """(level, max) from the first STREAM_MUSIC block of ``dumpsys audio``."""
+    start = result.find("- STREAM_MUSIC:")
+    if start < 0:
+        return None
+    block = re.split(r"\n(?=--|- )", result[start:])[0]   # Up to grep's "--" or the next stream
+    max_match = _DUMPSYS_MAX_RE.search(block)
+    level = _DUMPSYS_LEVEL_RE.search(block)
+    if level is None:
+        current = _DUMPSYS_CURRENT_RE.search(block)
+        device = _DUMPSYS_DEVICES_RE.search(block)
+        if current and device:
+            level = re.search(rf"\({re.escape(device.group(1))}\):\s*(\d+)", current.group(1))
+    if max_match is None or level is None:
+        return None
+    return int(level.group(1)), int(max_match.group(1))
+
+
 class TvController:
     """ADB-based Android TV controller with auto-skip support.
 
@@ -96,11 +341,20 @@ class TvController:
         self._device = None
         self._connected = False
         self._lock = threading.Lock()
+        self._last_ok = 0.0           # monotonic time of the last successful shell call
+
+        # Cached focus/media/volume snapshot (see get_state)
+        self._state: dict | None = None
+        self._state_time = 0.0
+        self._state_lock = threading.Lock()
+        self._volume_max = DEFAULT_VOLUME_STEPS
 
         # Auto-skip state
         self._auto_skip_enabled = False
         self._auto_skip_apps: set[str] = set()
         self._auto_skip_thread = None
+        self._skip_scheduler = SkipScheduler()
+        self._skip_bounds: dict[str, str] = {}    # package → bounds of its last skip button
 
     # ── Connection Management ────────────────────────────────────────
 
@@ -159,6 +413,8 @@ class TvController:
     def _ensure_connected(self) -> bool:
         """Check connection and attempt reconnect if needed."""
         if self._connected and self._device:
+            if time.monotonic() - self._last_ok < HEALTH_CHECK_INTERVAL:
+                return True
             try:
                 # Quick health check — list packages is lightweight
                 self._device.shell("echo ok")
@@ -176,6 +432,7 @@ class TvController:
                 return ""
             try:
                 result = self._device.shell(command)
+                self._last_ok = time.monotonic()
                 return result if result else ""
             except Exception as e:
                 print(f"[tv] Shell command failed: {e}")
@@ -187,6 +444,7 @@ class TvController:
     def _send_key(self, keycode: str):
         """Send a keycode event to the TV."""
         self._shell(f"input keyevent {keycode}")
+        self.invalidate_state()
 
     def _tap(self, x: int, y: int):
         """Tap a point on the screen."""
@@ -218,6 +476,7 @@ class TvController:
             return False
 
         result = self._shell(f"am start -n {package}")
+        self.invalidate_state()
         if "Error" in result:
             print(f"[tv] Failed to launch {app_name}: {result}")
             return False
@@ -257,39 +516,59 @@ class TvController:
         self._send_key("KEYCODE_VOLUME_MUTE")
         print("[tv] Mute toggled")
 
-    def set_volume(self, level: int):
+    def set_volume(self, level: int) -> bool:
         """Set volume to a specific level (0-100).
 
-        Works by first muting (volume 0) then pressing volume up
-        the appropriate number of times. Android TV typically has
-        ~15 volume steps, so we scale accordingly.
+        Sets the music stream directly with ``cmd media_session volume``
+        (or the older ``media volume``) in one shell call, reading the level
+        back to confirm. If neither is supported, falls back to key presses,
+        sent as one batched shell command.
+
+        Returns:
+            True if the level was confirmed by the TV.
         """
         level = max(0, min(100, level))
 
-        # Most Android TVs have 15 volume steps — scale 0-100 to 0-15
-        max_steps = 15
-        target_steps = round(level / 100 * max_steps)
-
-        # Set to 0 first by pressing volume down many times
-        for _ in range(max_steps + 5):
-            self._shell("input keyevent KEYCODE_VOLUME_DOWN")
-            time.sleep(0.05)
+        for tool in ("cmd media_session", "media"):
+            base = f"{tool} volume --stream {MUSIC_STREAM}"
+            command = "{base} --set {target} 2>&1 && {base} --get 2>&1"
+            target = round(level / 100 * self._volume_max)
+            volume = _parse_volume(self._shell(command.format(base=base, target=target)))
+            if volume is None:
+                continue  # Tool not available on this TV
+            current, max_steps = volume
+            if max_steps != self._volume_max:
+                # First contact: the real range differs from the assumed one
+                self._volume_max = max_steps
+                target = round(level / 100 * max_steps)
+                volume = _parse_volume(self._shell(command.format(base=base, target=target)))
+                current = volume[0] if volume else current
+            self.invalidate_state()
+            if current == target:
+                print(f"[tv] Volume set to {level}% ({current}/{max_steps})")
+                return True
+            break  # Command ran but the level didn't stick — use keys
 
-        # Press volume up to target
-        for _ in range(target_steps):
-            self._shell("input keyevent KEYCODE_VOLUME_UP")
-            time.sleep(0.05)
+        self._set_volume_with_keys(round(level / 100 * self._volume_max), self._volume_max)
+        print(f"[tv] Volume set to ~{level}% (key presses)")
+        return False
 
-        print(f"[tv] Volume set to ~{level}%")
+    def _set_volume_with_keys(self, target: int, max_steps: int):
+        """Fallback: reach ``target`` with volume key presses in a single shell call."""
+        current = self.get_volume()
+        if current is None:
+            # Unknown start: floor it, then count up
+            presses = ["KEYCODE_VOLUME_DOWN"] * (max_steps + 5) + ["KEYCODE_VOLUME_UP"] * target
+        else:
+            key = "KEYCODE_VOLUME_UP" if target > current else "KEYCODE_VOLUME_DOWN"
+            presses = [key] * abs(target - current)
+        if presses:
+            self._shell("; ".join(f"input keyevent {k}" for k in presses))
+        self.invalidate_state()
 
     def get_volume(self) -> int | None:
         """Get current volume level (0-15 scale). Returns None if unavailable."""
-        result = self._shell("dumpsys audio | grep -A5 'STREAM_MUSIC'")
-        if result:
-            match = re.search(r"volume:\s*(\d+)", result)
-            if match:
-                return int(match.group(1))
-        return None
+        return self.get_state().get("volume")
 
     # ── Navigation ───────────────────────────────────────────────────
 
@@ -360,19 +639,24 @@ class TvController:
 
     def _get_ui_tree(self) -> str:
         """Dump the current UI hierarchy XML from the TV."""
-        # uiautomator dump writes to a file on the device, then we read it
-        self._shell("uiautomator dump /dev/tty")
-        # Some devices need the file-based approach
-        result = self._shell("uiautomator dump /sdcard/ui_dump.xml && cat /sdcard/ui_dump.xml")
+        # Most devices print the dump straight to the terminal
+        result = self._shell("uiautomator dump /dev/tty")
+        if "<?xml" not in result:
+            # Some devices need the file-based approach
+            result = self._shell("uiautomator dump /sdcard/ui_dump.xml >/dev/null && cat /sdcard/ui_dump.xml")
         if result and "<?xml" in result:
             # Extract just the XML portion
             xml_start = result.index("<?xml")
-            return result[xml_start:]
+            xml_end = result.rfind(">") + 1
+            return result[xml_start:xml_end]
         return ""
 
-    def _detect_skip_button(self) -> tuple[int, int] | None:
+    def _detect_skip_button(self, app: str | None = None) -> tuple[int, int] | None:
         """Scan the TV UI tree for a skip button and return its tap coordinates.
 
+        Checks the bounds where this app's button was last seen first, then
+        falls back to a streaming search of the tree.
+
         Returns:
             (x, y) center coordinates of the skip button, or None if not found.
         """
@@ -380,36 +664,24 @@ class TvController:
         if not xml_str:
             return None
 
-        try:
-            root = ET.fromstring(xml_str)
-        except ET.ParseError:
-            return None
-
         # Determine which skip pattern to use based on current app
-        current_app = self.get_current_app()
-        pattern = _FALLBACK_SKIP_PATTERN
-        for prefix, p in SKIP_PATTERNS.items():
-            if current_app.startswith(prefix):
-                pattern = p
-                break
-
-        # Search all nodes for skip button text
-        for node in root.iter("node"):
-            text = node.get("text", "")
-            content_desc = node.get("content-desc", "")
-            resource_id = node.get("resource-id", "")
-
-            # Check text, content description, and resource ID
-            searchable = f"{text} {content_desc} {resource_id}"
-            if pattern.search(searchable):
-                bounds_str = node.get("bounds", "")
-                bounds = _parse_bounds(bounds_str)
-                if bounds:
-                    cx, cy = _bounds_center(*bounds)
-                    print(f"[tv] Skip button found: '{text or content_desc}' at ({cx}, {cy})")
-                    return (cx, cy)
+        current_app = app if app is not None else self.get_current_app()
+        pattern = _skip_pattern(current_app)
+
+        cached = self._skip_bounds.get(current_app)
+        attrs = _check_cached_bounds(xml_str, cached, pattern) if cached else None
+        if attrs is None:
+            attrs = _find_skip_node(xml_str, pattern)
+        if attrs is None:
+            return None
 
-        return None
+        bounds = _parse_bounds(attrs["bounds"])
+        if not bounds:
+            return None
+        self._skip_bounds[current_app] = attrs["bounds"]
+        cx, cy = _bounds_center(*bounds)
+        print(f"[tv] Skip button found: '{attrs.get('text') or attrs.get('content-desc', '')}' at ({cx}, {cy})")
+        return (cx, cy)
 
     def skip_button(self) -> bool:
         """Detect and tap the skip intro/outro/credits button.
@@ -420,6 +692,7 @@ class TvController:
         coords = self._detect_skip_button()
         if coords:
             self._tap(*coords)
+            self.invalidate_state()
             print(f"[tv] Tapped skip button at {coords}")
             return True
         return False
@@ -443,6 +716,7 @@ class TvController:
             return
 
         self._auto_skip_enabled = True
+        self._skip_scheduler = SkipScheduler()
         self._auto_skip_thread = threading.Thread(target=self._auto_skip_loop, daemon=True)
         self._auto_skip_thread.start()
         print(f"[tv] Auto-skip started for: {', '.join(sorted(self._auto_skip_apps))}")
@@ -469,31 +743,46 @@ class TvController:
             self._auto_skip_apps.discard(name)
             print(f"[tv] Auto-skip disabled for {name}")
 
+    def _auto_skip_app_enabled(self, current_app: str) -> bool:
+        """True if the foreground package belongs to an app with auto-skip on."""
+        for friendly_name, package in APP_PACKAGES.items():
+            pkg_prefix = package.split("/")[0]
+            if current_app.startswith(pkg_prefix) and friendly_name in self._auto_skip_apps:
+                return True
+        return False
+
     def _auto_skip_loop(self):
-        """Background loop that polls the UI tree for skip buttons."""
+        """Background loop that looks for skip buttons during playback.
+
+        Each poll reads the cheap batched TV state. A UI dump only happens
+        while an enabled app is playing, and only when the SkipScheduler
+        says one is due (new episode/seek, or the back-off has elapsed).
+        """
+        scheduler = self._skip_scheduler
         while self._auto_skip_enabled:
             try:
                 if not self._connected:
+                    scheduler.forget()
                     time.sleep(RECONNECT_INTERVAL)
                     continue
 
-                # Check if current app is in the auto-skip list
-                current_app = self.get_current_app()
-                app_matched = False
-                for friendly_name, package in APP_PACKAGES.items():
-                    pkg_prefix = package.split("/")[0]
-                    if current_app.startswith(pkg_prefix) and friendly_name in self._auto_skip_apps:
-                        app_matched = True
-                        break
-
-                if app_matched and self.is_playing():
-                    coords = self._detect_skip_button()
-                    if coords:
-                        self._tap(*coords)
-                        print(f"[tv] Auto-skipped intro at {coords}")
-                        # Brief cooldown after a skip to avoid double-taps
-                        time.sleep(5)
-                        continue
+                state = self.get_state()
+                current_app = state.get("current_app", "")
+                media = state.get("media", {})
+                if not self._auto_skip_app_enabled(current_app) or media.get("state") != "playing":
+                    scheduler.forget()
+                else:
+                    scheduler.observe(current_app, media.get("position"))
+                    if scheduler.due():
+                        coords = self._detect_skip_button(current_app)
+                        scheduler.record(found=coords is not None)
+                        if coords:
+                            self._tap(*coords)
+                            self.invalidate_state()
+                            print(f"[tv] Auto-skipped intro at {coords}")
+                            # Brief cooldown after a skip to avoid double-taps
+                            time.sleep(AUTO_SKIP_COOLDOWN)
+                            continue
 
             except Exception as e:
                 print(f"[tv] Auto-skip error: {e}")
@@ -502,30 +791,49 @@ class TvController:
 
     # ── TV Status ────────────────────────────────────────────────────
 
-    def get_current_app(self) -> str:
-        """Get the package name of the current foreground app.
+    def get_state(self, max_age: float = STATE_TTL) -> dict:
+        """Focused app, media session and volume from one batched ADB call.
+
+        The snapshot is cached for ``max_age`` seconds and shared by status
+        queries, the auto-skip loop and media lookups. Concurrent callers
+        wait for one fetch instead of each running their own. Commands that
+        change the TV's state invalidate it.
 
         Returns:
-            Package name string, or empty string if unavailable.
+            Dict with keys: current_app, media, volume, volume_max.
+            Empty dict if the TV is unreachable.
         """
-        result = self._shell("dumpsys window | grep -E 'mCurrentFocus|mFocusedApp'")
-        if not result:
-            return ""
+        with self._state_lock:
+            if self._state is not None and time.monotonic() - self._state_time < max_age:
+                return self._state
+            output = self._shell(_STATE_COMMAND)
+            if not output:
+                self._state = None
+                return {}
+            sections = _split_sections(output)
+            volume = _parse_volume(sections.get("volume", ""))
+            if volume:
+                self._volume_max = volume[1]
+            self._state = {
+                "current_app": _parse_current_app(sections.get("focus", "")),
+                "media": _parse_media(sections.get("media", "")),
+                "volume": volume[0] if volume else None,
+                "volume_max": self._volume_max,
+            }
+            self._state_time = time.monotonic()
+            return self._state
 
-        # Extract package name from window dump
-        # Format: "mCurrentFocus=Window{... com.netflix.ninja/com.netflix.ninja.MainActivity}"
-        match = re.search(r"(\S+/\S+)\}", result)
-        if match:
-            # Return just the package name (before the /)
-            full = match.group(1)
-            return full.split("/")[0]
+    def invalidate_state(self):
+        """Force the next get_state() to refetch."""
+        self._state_time = 0.0
 
-        # Try alternative format
-        match = re.search(r"u0\s+(\S+)/", result)
-        if match:
-            return match.group(1)
+    def get_current_app(self) -> str:
+        """Get the package name of the current foreground app.
 
-        return ""
+        Returns:
+            Package name string, or empty string if unavailable.
+        """
+        return self.get_state().get("current_app", "")
 
     def get_current_media(self) -> dict:
         """Get information about currently playing media.
@@ -534,62 +842,7 @@ class TvController:
             Dict with keys: app, title, state, artist, album.
             Empty dict if no media session is active.
         """
-        result = self._shell("dumpsys media_session")
-        if not result:
-            return {}
-
-        info = {}
-
-        # Extract active session package
-        pkg_match = re.search(r"package=(\S+)", result)
-        if pkg_match:
-            info["app"] = pkg_match.group(1)
-
-        # Extract metadata
-        title_match = re.search(r"description=([^\n,]+)", result)
-        if title_match:
-            info["title"] = title_match.group(1).strip()
-
-        # Try more specific metadata fields
-        for field in ("METADATA_KEY_TITLE", "android.media.metadata.TITLE"):
-            match = re.search(rf"{field}=([^\n,]+)", result)
-            if match:
-                info["title"] = match.group(1).strip()
-                break
-
-        for field in ("METADATA_KEY_ARTIST", "android.media.metadata.ARTIST"):
-            match = re.search(rf"{field}=([^\n,]+)", result)
-            if match:
-                info["artist"] = match.group(1).strip()
-                break
-
-        for field in ("METADATA_KEY_ALBUM", "android.media.metadata.ALBUM"):
-            match = re.search(rf"{field}=([^\n,]+)", result)
-            if match:
-                info["album"] = match.group(1).strip()
-                break
-
-        # Extract playback state
-        state_match = re.search(r"state=PlaybackState\{state=(\d+)", result)
-        if state_match:
-            state_code = int(state_match.group(1))
-            state_names = {
-                0: "none",
-                1: "stopped",
-                2: "paused",
-                3: "playing",
-                4: "fast_forwarding",
-                5: "rewinding",
-                6: "buffering",
-                7: "error",
-                8: "connecting",
-                9: "skipping_to_previous",
-                10: "skipping_to_next",
-                11: "skipping_to_queue_item",
-            }
-            info["state"] = state_names.get(state_code, f"unknown({state_code})")
-
-        return info
+        return self.get_state().get("media", {})
 
     def is_playing(self) -> bool:
         """Check if media is currently playing.
@@ -615,8 +868,10 @@ class TvController:
         }
 
         if self._connected:
-            status["current_app"] = self.get_current_app()
-            status["media"] = self.get_current_media()
+            state = self.get_state()
+            status["current_app"] = state.get("current_app", "")
+            status["media"] = state.get("media", {})
+            status["volume"] = state.get("volume")
 
         return status
 
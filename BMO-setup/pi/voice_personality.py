@@ -99,6 +99,44 @@ _EMOTION_ALIASES: dict[str, str] = {
 }
 
 
+# ── Tag Tokenizer ────────────────────────────────────────────────────
+
+# Typed tags [TYPE:value] map to these result keys; [SFX:x] is an alias for [SOUND:x]
+_TAG_KEYS = {"face": "face", "led": "led", "sound": "sound", "sfx": "sound",
+             "emotion": "emotion", "music": "music", "npc": "npc"}
+
+# One pattern for every tag: typed [TYPE:value] or standalone emotion [HAPPY]
+_TOKEN_PATTERN = re.compile(
+    r"\[(?:"
+    r"(?P<type>" + "|".join(_TAG_KEYS) + r"):(?P<value>[^\]]+)"
+    r"|(?P<emotion>" + "|".join(BMO_EMOTIONS) + r")"
+    r")\]",
+    re.IGNORECASE,
+)
+_SPACES = re.compile(r"  +")
+
+# An unclosed "[" this far from the end of a chunk can't be a tag, so it's text
+_MAX_TAG_LEN = 48
+
+
+def _tokens(text: str):
+    """Yield ("text", str) and (key, value) pieces of ``text`` in order, in one scan.
+
+    Standalone emotion tags yield ("standalone_emotion", canonical name).
+    """
+    pos = 0
+    for m in _TOKEN_PATTERN.finditer(text):
+        if m.start() > pos:
+            yield "text", text[pos:m.start()]
+        if m.group("type"):
+            yield _TAG_KEYS[m.group("type").lower()], m.group("value").strip()
+        else:
+            yield "standalone_emotion", m.group("emotion").lower()
+        pos = m.end()
+    if pos < len(text):
+        yield "text", text[pos:]
+
+
 # ── Emotion Detection ────────────────────────────────────────────────
 
 def detect_emotion(text: str) -> str | None:
@@ -115,46 +153,25 @@ def detect_emotion(text: str) -> str | None:
         >>> detect_emotion("Just a normal sentence.")
         None
     """
-    # Check for explicit [EMOTION:xxx] tag
-    match = re.search(r"\[EMOTION:(\w+)\]", text, re.IGNORECASE)
-    if match:
-        emotion = match.group(1).lower()
-        if emotion in BMO_EMOTIONS:
-            return emotion
-
-    # Check for shorthand tags like [HAPPY], [DRAMATIC]
-    for alias, canonical in _EMOTION_ALIASES.items():
-        if f"[{alias}]" in text or f"[{alias.upper()}]" in text:
-            return canonical
-
-    return None
+    standalone = None
+    for key, value in _tokens(text):
+        # An explicit [EMOTION:xxx] tag wins over shorthand tags
+        if key == "emotion" and value.lower() in BMO_EMOTIONS:
+            return value.lower()
+        if key == "standalone_emotion" and standalone is None:
+            standalone = value
+    return standalone
 
 
 # ── Expression Tag Parser ────────────────────────────────────────────
 
-# All recognized tag patterns: [TYPE:value]
-_TAG_PATTERN = re.compile(
-    r"\["
-    r"(?P<type>FACE|LED|SOUND|EMOTION|MUSIC|NPC)"
-    r":(?P<value>[^\]]+)"
-    r"\]",
-    re.IGNORECASE,
-)
-
-# Standalone emotion tags: [HAPPY], [DRAMATIC], etc.
-_STANDALONE_EMOTION_PATTERN = re.compile(
-    r"\[(?P<emotion>" + "|".join(re.escape(a) for a in _EMOTION_ALIASES) + r")\]",
-    re.IGNORECASE,
-)
-
-
 def parse_response_tags(text: str) -> dict:
     """Extract all hardware control tags from a BMO response string.
 
     Parses tags like:
         [FACE:happy]     -> face expression change
         [LED:blue]       -> LED color change
-        [SOUND:chime]    -> play sound effect
+        [SOUND:chime]    -> play sound effect ([SFX:chime] is the same)
         [EMOTION:happy]  -> TTS emotion reference
         [MUSIC:combat]   -> music mood change
         [NPC:gruff_dwarf] -> NPC voice selection
@@ -178,29 +195,91 @@ def parse_response_tags(text: str) -> dict:
         "npc": None,
     }
 
-    # Extract typed tags [TYPE:value]
-    for match in _TAG_PATTERN.finditer(text):
-        tag_type = match.group("type").lower()
-        value = match.group("value").strip()
-        result[tag_type] = value
-
-    # Extract standalone emotion tags [HAPPY], [DRAMATIC], etc.
-    for match in _STANDALONE_EMOTION_PATTERN.finditer(text):
-        emotion_raw = match.group("emotion")
-        canonical = _EMOTION_ALIASES.get(emotion_raw, _EMOTION_ALIASES.get(emotion_raw.upper()))
-        if canonical and result["emotion"] is None:
-            result["emotion"] = canonical
-
-    # Strip all tags from the clean text
-    clean = _TAG_PATTERN.sub("", text)
-    clean = _STANDALONE_EMOTION_PATTERN.sub("", clean)
-    # Collapse extra whitespace left behind by tag removal
-    clean = re.sub(r"  +", " ", clean).strip()
-    result["clean_text"] = clean
+    parts = []
+    standalone = None
+    for key, value in _tokens(text):
+        if key == "text":
+            parts.append(value)
+        elif key == "standalone_emotion":
+            standalone = standalone or value
+        else:
+            result[key] = value   # Last typed tag of each kind wins
+    if result["emotion"] is None:
+        result["emotion"] = standalone
 
+    # Collapse extra whitespace left behind by tag removal
+    result["clean_text"] = _SPACES.sub(" ", "".join(parts)).strip()
     return result
 
 
+class TagStream:
+    """Incremental tag tokenizer for a streamed reply.
+
+    ``feed(chunk)`` returns the pieces that are complete so far: ("text", str)
+    and (key, value) for each tag, where key is one of face, led, sound,
+    emotion, music or npc. Only an unfinished "[…" at the end of a chunk is
+    held back, so text already seen is never scanned again. ``voice`` is the
+    (emotion, npc) in effect at the end of everything returned so far; use
+    ``feed_speech()`` to get the voice for each piece of text within a chunk.
+    """
+
+    def __init__(self):
+        self._pending = ""
+        self.tags: dict[str, str | None] = {k: None for k in set(_TAG_KEYS.values())}
+
+    @property
+    def voice(self) -> tuple[str | None, str | None]:
+        return self.tags["emotion"], self.tags["npc"]
+
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        text = self._pending + chunk
+        self._pending = ""
+        cut = text.rfind("[")
+        if cut != -1 and "]" not in text[cut:] and len(text) - cut <= _MAX_TAG_LEN:
+            text, self._pending = text[:cut], text[cut:]
+        return self._emit(text)
+
+    def close(self) -> list[tuple[str, str]]:
+        """Flush whatever is held back (an unterminated "[" is just text)."""
+        text, self._pending = self._pending, ""
+        return self._emit(text)
+
+    def feed_speech(self, chunk: str) -> list[tuple[str, str | None, str | None]]:
+        """Like ``feed()``, but only the text: (text, emotion, npc) per piece,
+        each in the voice set by the tags before it."""
+        voice = self.voice
+        return self._speech(self.feed(chunk), voice)
+
+    def close_speech(self) -> list[tuple[str, str | None, str | None]]:
+        voice = self.voice
+        return self._speech(self.close(), voice)
+
+    @staticmethod
+    def _speech(tokens, voice) -> list[tuple[str, str | None, str | None]]:
+        emotion, npc = voice
+        out = []
+        for key, value in tokens:
+            if key == "emotion":
+                emotion = value
+            elif key == "npc":
+                npc = value
+            elif key == "text":
+                out.append((value, emotion, npc))
+        return out
+
+    def _emit(self, text: str) -> list[tuple[str, str]]:
+        out = []
+        for key, value in _tokens(text):
+            if key == "standalone_emotion":
+                key = "emotion"
+            if key != "text":
+                if key == "emotion":
+                    value = value.lower()
+                self.tags[key] = value
+            out.append((key, value))
+        return out
+
+
 def get_speaker_file(npc: str | None = None, emotion: str | None = None) -> str:
     """Resolve the Fish Speech speaker reference WAV file name.
 
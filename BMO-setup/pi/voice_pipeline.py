@@ -831,18 +831,24 @@ class VoicePipeline:
     def _tts_worker(self):
         """Background thread: pops sentences from queue and speaks them.
 
-        Batches short consecutive sentences (< 80 chars) together to reduce
+        Queue items are (text, emotion, npc). Batches short consecutive
+        sentences (< 80 chars) spoken in the same voice together to reduce
         API round-trips and inter-sentence gaps.
         """
+        pending = None
         while True:
-            try:
-                text = self._tts_queue.get(timeout=0.1)
-            except queue.Empty:
-                continue
-            if text is None:
+            if pending is not None:
+                item, pending = pending, None
+            else:
+                try:
+                    item = self._tts_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            if item is None:
                 break
             if self._tts_interrupted.is_set():
                 continue
+            text, emotion, npc = item
 
             # Batch short sentences: peek at queue for more short items
             if len(text) < 80:
@@ -850,12 +856,16 @@ class VoicePipeline:
                 batch_len = len(text)
                 while batch_len < 250:
                     try:
-                        next_text = self._tts_queue.get_nowait()
+                        next_item = self._tts_queue.get_nowait()
                     except queue.Empty:
                         break
-                    if next_text is None:
+                    if next_item is None:
                         self._tts_queue.put(None)  # put sentinel back
                         break
+                    if next_item[1:] != (emotion, npc):
+                        pending = next_item  # voice change starts the next utterance
+                        break
+                    next_text = next_item[0]
                     batch.append(next_text)
                     batch_len += len(next_text)
                     if len(next_text) >= 80:
@@ -866,19 +876,20 @@ class VoicePipeline:
             try:
                 provider = getattr(self, '_tts_provider', 'auto')
                 if provider == "piper_bmo" or (provider == "auto" and PIPER_BMO_AVAILABLE):
-                    self._bmo_speak(text)
+                    self._bmo_speak(text, emotion=emotion, npc=npc)
                 elif provider == "edge":
                     self._edge_speak(text)
                 else:
                     # Fish Audio has the BMO voice clone — best quality
-                    self._cloud_speak(text)
+                    self._cloud_speak(text, emotion=emotion, npc=npc)
             except Exception:
                 try:
                     self._edge_speak(text)
                 except Exception as e:
                     print(f"[tts-worker] All TTS failed: {e}")
             finally:
-                self._tts_worker_active.clear()
+                if pending is None:
+                    self._tts_worker_active.clear()
 
     def _wait_for_tts(self):
         """Block until the TTS queue is drained and the worker finishes speaking."""
@@ -906,8 +917,12 @@ class VoicePipeline:
         Sentences are pushed to a queue as they complete. A dedicated TTS worker
         thread speaks them in order, so the LLM keeps generating while TTS plays.
         The user hears the first sentence within 1-2 seconds of the LLM starting.
-        Returns the full response text.
+        Response tags are tokenized as chunks arrive; an [EMOTION:x] or [NPC:x]
+        tag ends the current sentence so the voice switches mid-reply.
+        Returns the full response text (tags included).
         """
+        from voice_personality import TagStream
+
         self._emit("status", {"state": "speaking"})
         self._is_speaking = True
         # Don't reset _speak_volume — it's set by the volume slider and should persist
@@ -926,44 +941,56 @@ class VoicePipeline:
         worker.start()
 
         full_text = ""
+        tags = TagStream()
         try:
             buffer = ""
+            voice = tags.voice      # (emotion, npc) of the text in buffer
             sentences_queued = 0
 
+            def queue_sentence(sentence: str, label: str):
+                nonlocal sentences_queued
+                tts_text = self._strip_markdown(sentence)
+                if tts_text:
+                    sentences_queued += 1
+                    print(f"[stream] Queue {label} {sentences_queued}: {tts_text[:60]}...")
+                    self._tts_queue.put((tts_text, *voice))
+
+            def add_speech(pieces):
+                nonlocal buffer, voice
+                for text, emotion, npc in pieces:
+                    if (emotion, npc) != voice:
+                        # Speak what came before the tag in the old voice
+                        if buffer.strip():
+                            queue_sentence(buffer.strip(), "sentence")
+                        buffer = ""
+                        voice = (emotion, npc)
+                    buffer += text
+
             for chunk in text_gen:
                 if self._tts_interrupted.is_set():
                     break
                 full_text += chunk
-                buffer += chunk
+                add_speech(tags.feed_speech(chunk))
 
                 while True:
                     match = re.search(r'[.!?][\s\n]', buffer)
-                    if not match and len(buffer) > 60:
-                        match = re.search(r',\s', buffer[40:])
-                        if match:
-                            class _M:
-                                def end(self_inner):
-                                    return match.end() + 40
-                            match = _M()
-                    if not match:
+                    end = match.end() if match else None
+                    if end is None and len(buffer) > 60:
+                        # Long clause with no sentence end yet: split at a comma
+                        comma = re.search(r',\s', buffer[40:])
+                        if comma:
+                            end = comma.end() + 40
+                    if end is None:
                         break
-                    end = match.end()
                     sentence = buffer[:end].strip()
                     buffer = buffer[end:]
                     if sentence:
-                        tts_text = self._strip_markdown(sentence)
-                        if tts_text:
-                            sentences_queued += 1
-                            print(f"[stream] Queue sentence {sentences_queued}: {tts_text[:60]}...")
-                            self._tts_queue.put(tts_text)
+                        queue_sentence(sentence, "sentence")
 
+            add_speech(tags.close_speech())
             remaining = buffer.strip()
             if remaining and not self._tts_interrupted.is_set():
-                tts_text = self._strip_markdown(remaining)
-                if tts_text:
-                    sentences_queued += 1
-                    print(f"[stream] Queue final ({sentences_queued}): {tts_text[:60]}...")
-                    self._tts_queue.put(tts_text)
+                queue_sentence(remaining, "final")
 
             # Signal worker to exit after all sentences are spoken
             self._tts_queue.put(None)
@@ -1605,7 +1632,7 @@ class VoicePipeline:
                 self._bmo_speak(text, emotion)
                 return
             elif provider == "fish":
-                self._cloud_speak(text, speaker)
+                self._cloud_speak(text, speaker, emotion=emotion)
                 return
             elif provider == "edge":
                 self._edge_speak(text)
@@ -1856,20 +1883,33 @@ class VoicePipeline:
             chunks.append(current)
         return chunks or [text]
 
-    def _cloud_speak(self, text: str, speaker: str = "bmo_calm"):
+    def _cloud_speak(self, text: str, speaker: str | None = None,
+                     emotion: str | None = None, npc: str | None = None):
         """Generate speech via Fish Audio API with pipelined playback + caching.
 
         Uses opus format (30-50% smaller). Caches results to disk.
         Splits text into sentence-sized chunks and overlaps TTS generation
         of the next chunk with playback of the current one.
+        ``npc``/``emotion`` pick the Fish voice ID (when one is configured)
+        and speed/pitch prosody; the cache is keyed by that voice.
         """
         from concurrent.futures import ThreadPoolExecutor, Future
         from cloud_providers import FISH_AUDIO_VOICE_ID
+        from voice_personality import NPC_PROSODY, get_prosody, get_speaker_file
+
+        voice_id = get_speaker_file(npc=npc, emotion=emotion) or FISH_AUDIO_VOICE_ID
+        prosody = get_prosody(npc=npc, emotion=emotion)
+        if speaker is None:
+            speaker = f"npc_{npc}" if npc in NPC_PROSODY else f"bmo_{emotion or 'calm'}"
+
+        def _generate(chunk_text):
+            return fish_audio_tts(chunk_text, voice_id=voice_id, format="opus",
+                                  speed=prosody.get("speed", 1.0), pitch=prosody.get("pitch", 0))
 
         chunks = self._split_tts_chunks(text, max_chars=200)
 
         if len(chunks) <= 1:
-            audio_bytes = fish_audio_tts(chunks[0], voice_id=FISH_AUDIO_VOICE_ID, format="opus")
+            audio_bytes = _generate(chunks[0])
             print(f"[tts] Got {len(audio_bytes)} bytes from Fish Audio (opus)")
             # Cache single-chunk responses
             self._tts_cache_put(text, speaker, audio_bytes, ext=".opus")
@@ -1886,9 +1926,6 @@ class VoicePipeline:
 
         is_browser = getattr(self, "_tts_output_mode", "pi") == "browser"
 
-        def _generate(chunk_text):
-            return fish_audio_tts(chunk_text, voice_id=FISH_AUDIO_VOICE_ID, format="opus")
-
         with ThreadPoolExecutor(max_workers=1) as pool:
             next_future: Future = pool.submit(_generate, chunks[0])
 
@@ -1945,9 +1982,9 @@ class VoicePipeline:
                 if os.path.exists(p):
                     os.unlink(p)
 
-    def _bmo_speak(self, text: str, emotion: str | None = None):
-        """Generate speech with custom Piper BMO voice + emotion prosody via sox."""
-        from voice_personality import get_prosody
+    def _bmo_speak(self, text: str, emotion: str | None = None, npc: str | None = None):
+        """Generate speech with custom Piper BMO voice + NPC/emotion prosody via sox."""
+        from voice_personality import NPC_PROSODY, get_prosody
 
         with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as raw_file:
             raw_path = raw_file.name
@@ -1959,7 +1996,7 @@ class VoicePipeline:
                 input=text, text=True, capture_output=True, check=True,
             )
 
-            prosody = get_prosody(emotion=emotion)
+            prosody = get_prosody(npc=npc, emotion=emotion)
             speed = prosody.get("speed", 1.0)
             pitch = prosody.get("pitch", 0)
 
@@ -1979,7 +2016,8 @@ class VoicePipeline:
                 play_path = raw_path
 
             # Cache the result
-            cache_speaker = f"piper_bmo_{emotion or 'neutral'}"
+            voice = npc if npc in NPC_PROSODY else emotion
+            cache_speaker = f"piper_bmo_{voice or 'neutral'}"
             with open(play_path, "rb") as f:
                 audio_bytes = f.read()
             self._tts_cache_put(text, cache_speaker, audio_bytes, ext=".wav")
@@ -0,0 +1,369 @@
+"""BMO Watch Service — Shared inotify-based file change notifications.
+
+One inotify file descriptor for the whole process, read by a single thread
+that sleeps in select() until the kernel reports a change — no periodic
+wakeups. Subscribers register a file or directory (optionally recursive)
+and get a debounced callback with the changed path.
+
+Files are watched through their parent directory so atomic saves
+(write temp file + rename) and files that don't exist yet are still seen.
+A directory that doesn't exist yet is covered by watching its nearest
+existing ancestor; the real watch is armed once the directory appears.
+
+Falls back to a single shared mtime-polling thread when inotify is not
+available (non-Linux dev machines, or libc without inotify).
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable
+
+DEBOUNCE = 0.05          # Seconds to coalesce a burst of events per subscriber
+POLL_INTERVAL = 2.0      # Fallback polling interval when inotify is unavailable
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_DIR_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+             | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    """Return libc with inotify symbols, or None if unsupported."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class _Subscription:
+    """One subscriber: a file, or a directory (optionally recursive)."""
+
+    def __init__(self, path: str, callback: Callable[[str], None], recursive: bool, debounce: float):
+        self.path = path
+        self.callback = callback
+        self.recursive = recursive
+        self.debounce = debounce
+        self.is_dir = os.path.isdir(path)
+        self.dirs: set[str] = set()           # Directories this subscription needs watched
+        self.missing: set[str] = set()        # Wanted directories that don't exist yet
+        self.pending: set[str] = set()        # Changed paths awaiting the debounce timer
+        self.timer: threading.Timer | None = None
+        self.snapshot: dict[str, float] = {}  # Polling fallback: path → mtime
+
+    def matches(self, changed: str) -> bool:
+        if not self.is_dir:
+            return changed == self.path
+        parent = os.path.dirname(changed)
+        if parent == self.path or changed == self.path:
+            return True
+        return self.recursive and changed.startswith(self.path + os.sep)
+
+
+class WatchService:
+    """Process-wide file watch multiplexer (inotify with polling fallback)."""
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL):
+        self._poll_interval = poll_interval
+        self._lock = threading.RLock()
+        self._subs: dict[int, _Subscription] = {}
+        self._next_id = 1
+        self._wd_to_dir: dict[int, str] = {}
+        self._dir_to_wd: dict[str, int] = {}
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self._fd = -1
+        self._libc = _load_inotify()
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+            else:
+                print(f"[watch] inotify_init1 failed ({os.strerror(ctypes.get_errno())}) — polling")
+        self._wake_r, self._wake_w = os.pipe() if self._fd >= 0 else (-1, -1)
+
+    @property
+    def using_inotify(self) -> bool:
+        return self._fd >= 0
+
+    # ── Public API ────────────────────────────────────────────────────
+
+    def watch(self, path: str, callback: Callable[[str], None], recursive: bool = False,
+              debounce: float = DEBOUNCE) -> int:
+        """Subscribe to changes under ``path``. Returns a token for unwatch()."""
+        path = os.path.abspath(os.path.expanduser(path))
+        sub = _Subscription(path, callback, recursive, debounce)
+        with self._lock:
+            token = self._next_id
+            self._next_id += 1
+            self._subs[token] = sub
+            if self.using_inotify:
+                self._add_sub_watches(sub)
+            else:
+                sub.snapshot = self._scan(sub)
+            self._ensure_running()
+        return token
+
+    def unwatch(self, token: int):
+        """Remove a subscription; kernel watches no longer needed are dropped."""
+        with self._lock:
+            sub = self._subs.pop(token, None)
+            if sub is None:
+                return
+            if sub.timer:
+                sub.timer.cancel()
+            if self.using_inotify:
+                still_needed = set().union(*(s.dirs for s in self._subs.values())) if self._subs else set()
+                for d in sub.dirs - still_needed:
+                    wd = self._dir_to_wd.pop(d, None)
+                    if wd is not None:
+                        self._wd_to_dir.pop(wd, None)
+                        self._libc.inotify_rm_watch(self._fd, wd)
+
+    def stop(self):
+        """Stop the reader/poller thread."""
+        self._running = False
+        if self._wake_w >= 0:
+            try:
+                os.write(self._wake_w, b"x")
+            except OSError:
+                pass
+        if self._thread:
+            self._thread.join(timeout=3)
+            self._thread = None
+
+    # ── inotify ───────────────────────────────────────────────────────
+
+    def _add_sub_watches(self, sub: _Subscription):
+        if not sub.is_dir:
+            self._add_dir_watch(os.path.dirname(sub.path), sub)
+            return
+        self._add_dir_watch(sub.path, sub)
+        if sub.recursive:
+            for root, dirnames, _ in os.walk(sub.path):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                for d in dirnames:
+                    self._add_dir_watch(os.path.join(root, d), sub)
+
+    def _add_dir_watch(self, directory: str, sub: _Subscription) -> bool:
+        """Watch a directory for ``sub``. Returns False if it couldn't be watched.
+
+        A directory that doesn't exist yet is remembered in ``sub.missing``
+        and its nearest existing ancestor is watched instead, so its
+        creation is seen and the watch can be re-armed.
+        """
+        sub.dirs.add(directory)
+        if directory in self._dir_to_wd:
+            sub.missing.discard(directory)
+            return True
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _DIR_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                sub.missing.add(directory)
+                parent = os.path.dirname(directory)
+                if parent != directory:
+                    self._add_dir_watch(parent, sub)
+            elif err == errno.ENOSPC:
+                print("[watch] inotify watch limit reached (fs.inotify.max_user_watches)")
+            else:
+                print(f"[watch] Cannot watch {directory}: {os.strerror(err)}")
+            return False
+        sub.missing.discard(directory)
+        self._wd_to_dir[wd] = directory
+        self._dir_to_wd[directory] = wd
+        return True
+
+    def _rearm_missing(self, created: str, rearmed: list):
+        """A directory appeared: arm watches for subscriptions waiting on it."""
+        for sub in self._subs.values():
+            waiting = [d for d in sub.missing if d == created or d.startswith(created + os.sep)]
+            # Deepest first: if it already exists the intermediate ones are moot
+            for d in sorted(waiting, key=len, reverse=True):
+                if d in sub.missing and self._add_dir_watch(d, sub):
+                    sub.missing.difference_update(
+                        m for m in waiting if d == m or d.startswith(m + os.sep))
+                    if sub not in rearmed:
+                        rearmed.append(sub)
+
+    def _read_loop(self):
+        while self._running:
+            try:
+                readable, _, _ = select.select([self._fd, self._wake_r], [], [])
+            except (OSError, ValueError):
+                return
+            if self._wake_r in readable:
+                return
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError as e:
+                print(f"[watch] inotify read failed: {e}")
+                return
+            self._handle_events(data)
+
+    def _handle_events(self, data: bytes):
+        offset = 0
+        changed: list[str] = []
+        rearmed: list[_Subscription] = []     # Subs whose missing directory appeared
+        overflow = False
+        with self._lock:
+            while offset + _EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                directory = self._wd_to_dir.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    # Directory deleted or moved away: fall back to its ancestor
+                    self._wd_to_dir.pop(wd, None)
+                    self._dir_to_wd.pop(directory, None)
+                    for sub in self._subs.values():
+                        if directory in sub.dirs:
+                            self._add_dir_watch(directory, sub)
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                changed.append(path)
+
+                # New subdirectory inside a recursive subscription — watch it too
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._rearm_missing(path, rearmed)
+                    for sub in self._subs.values():
+                        if sub.is_dir and sub.recursive and sub.matches(path):
+                            self._add_dir_watch(path, sub)
+                            for root, dirnames, _ in os.walk(path):
+                                for d in dirnames:
+                                    self._add_dir_watch(os.path.join(root, d), sub)
+
+            subs = list(self._subs.values())
+
+        # Anything created before the new watch was armed would be missed
+        for sub in rearmed:
+            if os.path.exists(sub.path):
+                self._schedule(sub, sub.path)
+        for sub in subs:
+            if overflow:
+                self._schedule(sub, sub.path)
+                continue
+            for path in changed:
+                if sub.matches(path):
+                    self._schedule(sub, path)
+
+    # ── Polling fallback ──────────────────────────────────────────────
+
+    def _scan(self, sub: _Subscription) -> dict[str, float]:
+        """Snapshot mtimes for a subscription (fallback mode only)."""
+        snap = {}
+        targets = [sub.path]
+        if sub.is_dir:
+            if sub.recursive:
+                targets = []
+                for root, dirnames, filenames in os.walk(sub.path):
+                    dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                    targets.extend(os.path.join(root, n) for n in filenames)
+            else:
+                try:
+                    targets = [os.path.join(sub.path, n) for n in os.listdir(sub.path)]
+                except OSError:
+                    targets = []
+        for t in targets:
+            try:
+                snap[t] = os.path.getmtime(t)
+            except OSError:
+                pass
+        return snap
+
+    def _poll_loop(self):
+        while self._running:
+            time.sleep(self._poll_interval)
+            with self._lock:
+                subs = list(self._subs.values())
+            for sub in subs:
+                current = self._scan(sub)
+                old = sub.snapshot
+                sub.snapshot = current
+                for path in set(current) | set(old):
+                    if current.get(path) != old.get(path):
+                        self._schedule(sub, path)
+
+    # ── Dispatch ──────────────────────────────────────────────────────
+
+    def _ensure_running(self):
+        if self._running:
+            return
+        self._running = True
+        target = self._read_loop if self.using_inotify else self._poll_loop
+        self._thread = threading.Thread(target=target, daemon=True)
+        self._thread.start()
+
+    def _schedule(self, sub: _Subscription, path: str):
+        """Collect a change and arm the subscriber's debounce timer if idle."""
+        with self._lock:
+            sub.pending.add(path)
+            if sub.timer is not None:
+                return
+            sub.timer = threading.Timer(sub.debounce, self._fire, args=(sub,))
+            sub.timer.daemon = True
+            sub.timer.start()
+
+    def _fire(self, sub: _Subscription):
+        with self._lock:
+            paths = sorted(sub.pending)
+            sub.pending.clear()
+            sub.timer = None
+        for path in paths:
+            try:
+                sub.callback(path)
+            except Exception as e:
+                print(f"[watch] Callback error for {path}: {e}")
+
+
+# ── Module-level Singleton ───────────────────────────────────────────
+
+_service: WatchService | None = None
+_service_lock = threading.Lock()
+
+
+def get_watch_service() -> WatchService:
+    """Return the process-wide watch service, creating it on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = WatchService()
+            mode = "inotify" if _service.using_inotify else f"polling every {POLL_INTERVAL:.0f}s"
+            print(f"[watch] File watch service started ({mode})")
+        return _service
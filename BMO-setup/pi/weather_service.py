@@ -55,6 +55,7 @@ class WeatherService:
         self._running = False
         self._poll_thread = None
         self._last_weather_code = None
+        self._listeners: list = []   # Called with each fresh poll result
 
     # ── Fetch Weather ────────────────────────────────────────────────
 
@@ -132,10 +133,19 @@ class WeatherService:
     def stop_polling(self):
         self._running = False
 
+    def add_listener(self, fn):
+        """Call ``fn(weather)`` after every background poll."""
+        self._listeners.append(fn)
+
     def _poll_loop(self):
         while self._running:
             weather = self._fetch()
             self._emit("weather_update", weather)
+            for listener in self._listeners:
+                try:
+                    listener(weather)
+                except Exception as e:
+                    print(f"[weather] Listener failed: {e}")
             self._check_severe_weather(weather)
             time.sleep(POLL_INTERVAL)
 